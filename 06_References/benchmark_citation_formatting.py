@@ -0,0 +1,73 @@
+"""
+Bibliography formatting throughput benchmark for citation_manager.
+
+Formats a synthetic library in every supported style and reports
+references/second for per-reference format_citation calls, bulk
+generate_bibliography and bulk generation across a process pool.
+
+Usage:
+    python benchmark_citation_formatting.py [--references 50000] [--jobs 4]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from citation_manager import CITATION_STYLES, CitationManager
+
+FAMILY_NAMES = ['Smith', 'Johnson', 'Brown', 'Garcia', 'Miller', 'Davis', 'Wang', 'Li',
+                'Müller', 'Nguyen', 'Kim', 'Rossi', 'van der Berg', 'Tanaka', 'Silva']
+GIVEN_NAMES = ['John A.', 'Mary B.', 'Wei', 'Sarah C.', 'Hans', 'Yuki', 'Ana M.', 'Jin-Ho']
+JOURNALS = ['New England Journal of Medicine', 'The Lancet', 'Journal of Medical AI',
+            'Cardiology Research', 'PLOS ONE', 'Medical Image Analysis']
+
+
+def synthetic_references(n_references, seed=0):
+    """Reference dicts with a realistic amount of author-list repetition."""
+    rng = random.Random(seed)
+    author_lists = [', '.join(f"{rng.choice(FAMILY_NAMES)}, {rng.choice(GIVEN_NAMES)}"
+                              for _ in range(rng.randint(1, 6)))
+                    for _ in range(max(1, n_references // 5))]
+    return [{
+        'authors': rng.choice(author_lists),
+        'title': f"Study {i} of point cloud vessel segmentation",
+        'journal': rng.choice(JOURNALS),
+        'year': str(rng.randint(1995, 2025)),
+        'volume': str(rng.randint(1, 400)),
+        'issue': str(rng.randint(1, 12)) if rng.random() < 0.8 else '',
+        'pages': f"{rng.randint(1, 900)}-{rng.randint(901, 999)}",
+        'doi': f"10.1000/{i}" if rng.random() < 0.7 else '',
+    } for i in range(n_references)]
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--references', type=int, default=50000, help='Size of the synthetic library')
+    parser.add_argument('--jobs', type=int, default=4, help='Worker processes for the pooled run')
+    args = parser.parse_args()
+
+    manager = CitationManager()
+    manager.reference_database = synthetic_references(args.references)
+    n = len(manager.reference_database)
+
+    print("citation_manager formatting throughput (references/second)")
+    print("=" * 64)
+    print(f"References: {n}, CPUs: {os.cpu_count()}")
+    print(f"{'style':<12}{'per-call':>16}{'bulk':>16}{f'bulk x{args.jobs}':>16}")
+    for style in CITATION_STYLES:
+        per_call = timed(lambda: [manager.format_citation(ref, style, i)
+                                  for i, ref in enumerate(manager.reference_database, 1)])
+        bulk = timed(lambda: manager.generate_bibliography(style))
+        pooled = timed(lambda: manager.generate_bibliography(style, n_jobs=args.jobs))
+        print(f"{style:<12}{n / per_call:>16,.0f}{n / bulk:>16,.0f}{n / pooled:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Reference import throughput benchmark for citation_manager.
+
+Writes a synthetic library as PubMed XML, MEDLINE, RIS and BibTeX, then
+reports parsing throughput (records/second and MB/second) and the rate of
+importing each file into an SQLite ReferenceStore.
+
+Usage:
+    python benchmark_reference_import.py [--references 50000] [--keep DIR]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+from benchmark_citation_formatting import synthetic_references
+from citation_manager import CitationManager, iter_references_from_file, parse_authors
+
+
+def write_pubmed_xml(references, path):
+    """PubmedArticleSet with the elements the importer reads."""
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('<?xml version="1.0" ?>\n<PubmedArticleSet>\n')
+        for pmid, ref in enumerate(references, 10000000):
+            authors = ''.join(
+                f"<Author><LastName>{escape(name.full_family)}</LastName>"
+                f"<ForeName>{escape(name.given or ' '.join(name.initials))}</ForeName></Author>"
+                for name in parse_authors(ref['authors']))
+            file.write(
+                f"<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article><Journal><JournalIssue>"
+                f"<Volume>{ref['volume']}</Volume><Issue>{ref['issue']}</Issue>"
+                f"<PubDate><Year>{ref['year']}</Year></PubDate></JournalIssue>"
+                f"<Title>{escape(ref['journal'])}</Title></Journal>"
+                f"<ArticleTitle>{escape(ref['title'])}</ArticleTitle>"
+                f"<Pagination><MedlinePgn>{ref['pages']}</MedlinePgn></Pagination>"
+                f"<ELocationID EIdType=\"doi\">{ref['doi']}</ELocationID>"
+                f"<Abstract><AbstractText>{escape(ref['title'])} abstract.</AbstractText></Abstract>"
+                f"<AuthorList>{authors}</AuthorList><Language>eng</Language></Article>"
+                f"</MedlineCitation></PubmedArticle>\n")
+        file.write('</PubmedArticleSet>\n')
+
+
+def write_medline(references, path):
+    """MEDLINE (.nbib) records separated by blank lines."""
+    with open(path, 'w', encoding='utf-8') as file:
+        for pmid, ref in enumerate(references, 10000000):
+            lines = [f"PMID- {pmid}", f"TI  - {ref['title']}", f"DP  - {ref['year']} Jan",
+                     f"JT  - {ref['journal']}", f"VI  - {ref['volume']}", f"IP  - {ref['issue']}",
+                     f"PG  - {ref['pages']}"]
+            lines += [f"FAU - {name.full_family}, {name.given or ''.join(name.initials)}"
+                      for name in parse_authors(ref['authors'])]
+            if ref['doi']:
+                lines.append(f"LID - {ref['doi']} [doi]")
+            file.write('\n'.join(lines) + '\n\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--references', type=int, default=50000, help='Records per file')
+    parser.add_argument('--keep', help='Directory to keep the generated files in')
+    args = parser.parse_args()
+
+    directory = args.keep or tempfile.mkdtemp(prefix='reference_import_')
+    os.makedirs(directory, exist_ok=True)
+    references = synthetic_references(args.references)
+    exporter = CitationManager()
+    exporter.reference_database = references
+    files = {
+        'pubmed': os.path.join(directory, 'library.xml'),
+        'medline': os.path.join(directory, 'library.nbib'),
+        'ris': os.path.join(directory, 'library.ris'),
+        'bibtex': os.path.join(directory, 'library.bib'),
+    }
+    write_pubmed_xml(references, files['pubmed'])
+    write_medline(references, files['medline'])
+    exporter.export_bibliography_to_file(files['ris'], 'apa', 'ris')
+    exporter.export_bibliography_to_file(files['bibtex'], 'apa', 'bibtex')
+
+    print("citation_manager import throughput")
+    print("=" * 72)
+    print(f"Records per file: {args.references}  (files in {directory})")
+    print(f"{'format':<10}{'size MB':>10}{'parse rec/s':>16}{'parse MB/s':>14}{'store rec/s':>16}")
+    for file_format, path in files.items():
+        size = os.path.getsize(path) / 1e6
+        start = time.perf_counter()
+        count = sum(1 for _ in iter_references_from_file(path, file_format))
+        parse_time = time.perf_counter() - start
+
+        manager = CitationManager(os.path.join(directory, f'{file_format}.db'))
+        start = time.perf_counter()
+        manager.import_references(path, file_format)
+        store_time = time.perf_counter() - start
+        manager.reference_database.close()
+        os.remove(os.path.join(directory, f'{file_format}.db'))
+
+        print(f"{file_format:<10}{size:>10.1f}{count / parse_time:>16,.0f}"
+              f"{size / parse_time:>14.1f}{count / store_time:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
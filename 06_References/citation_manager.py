@@ -9,25 +9,2196 @@ with features for format conversion, validation, and bibliography generation.
 
 import re
 import csv
+import functools
+import glob
+import gzip
+import hashlib
+import html
+import io
 import json
+import os
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
 import pandas as pd
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from itertools import chain, combinations, islice
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from urllib.parse import urlparse
+from xml.etree import ElementTree
 import unicodedata
 
 
+# Terminates each title so every byte starts a full 4-byte shingle
+_SHINGLE_PADDING = b'\x00\x00\x00'
+_NON_WORD = re.compile(r'[^\w\s]')
+
+
+class LinkValidator:
+    """Concurrent DOI and URL checker used by CitationManager.validate_references.
+    
+    Requests share one pooled session and run in a thread pool, with at most
+    ``per_host_limit`` requests in flight per host. Connection errors, timeouts
+    and 429/5xx responses are retried with exponential backoff. Definitive
+    answers are kept in a JSON cache file for ``cache_ttl`` seconds. In
+    ``offline`` mode only the DOI/URL format is checked.
+    """
+    
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    
+    def __init__(self, max_workers: int = 16, per_host_limit: int = 4, timeout: float = 5,
+                 retries: int = 2, backoff: float = 0.5, cache_path: Optional[str] = None,
+                 cache_ttl: float = 7 * 24 * 3600, doi_resolver: str = 'https://doi.org/',
+                 offline: bool = False):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+        self.doi_resolver = doi_resolver.rstrip('/') + '/'
+        self.offline = offline
+        
+        self._cache = self._load_cache()
+        self._cache_lock = threading.Lock()
+        self._host_limits = {}
+        self._host_lock = threading.Lock()
+        self._session = None
+    
+    @staticmethod
+    def normalize_doi(doi) -> Optional[str]:
+        """Return the bare DOI if it is well formed, otherwise None."""
+        if not isinstance(doi, str) or not doi.strip():
+            return None
+        doi = re.sub(r'^(?:https?://)?(?:dx\.)?doi\.org/|^doi:\s*', '', doi.strip(), flags=re.IGNORECASE)
+        return doi if re.match(r'^10\.\d+/.+', doi) else None
+    
+    @staticmethod
+    def url_format_valid(url) -> bool:
+        """Check that a URL has an http(s) scheme and a host."""
+        if not isinstance(url, str) or not url.strip():
+            return False
+        parsed = urlparse(url.strip())
+        return parsed.scheme in ('http', 'https') and bool(parsed.netloc)
+    
+    def validate(self, items: List[Tuple[str, str]]) -> List[Dict]:
+        """Check ``(kind, value)`` pairs, kind being 'doi' or 'url'.
+        
+        Each distinct value is checked once; results are returned in input
+        order as dicts with 'kind', 'value', 'valid', 'status', 'verified'
+        (a resolver answered), 'unreachable' (the request failed after all
+        retries, so the link is not valid) and 'cached'.
+        """
+        unique = list(dict.fromkeys(items))
+        if self.offline or len(unique) <= 1:
+            checked = [self._check(kind, value) for kind, value in unique]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                checked = list(executor.map(lambda item: self._check(*item), unique))
+        self._save_cache()
+        lookup = dict(zip(unique, checked))
+        return [lookup[item] for item in items]
+    
+    def close(self):
+        """Release pooled connections."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def _check(self, kind: str, value: str) -> Dict:
+        result = {'kind': kind, 'value': value, 'valid': False, 'status': None,
+                  'verified': False, 'unreachable': False, 'cached': False}
+        if kind == 'doi':
+            doi = self.normalize_doi(value)
+            if doi is None:
+                return result
+            # The resolver answers with a redirect for registered DOIs
+            url, follow_redirects = self.doi_resolver + doi, False
+        else:
+            if not self.url_format_valid(value):
+                return result
+            url, follow_redirects = value.strip(), True
+        
+        result['valid'] = True  # well formed; refined below when online
+        if self.offline:
+            return result
+        
+        key = f"{kind}:{url}"
+        entry = self._cache.get(key)
+        if entry is not None and time.time() - entry['checked'] < self.cache_ttl:
+            result.update(valid=entry['valid'], status=entry['status'], verified=True, cached=True)
+            return result
+        
+        status = self._request(url, follow_redirects)
+        if status is None:
+            # DNS failure, refused connection or timeout: not valid, and not
+            # cached so that the next run checks again
+            result.update(valid=False, unreachable=True)
+            return result
+        valid = status < 400
+        result.update(valid=valid, status=status, verified=True)
+        if status not in self.RETRY_STATUS:
+            with self._cache_lock:
+                self._cache[key] = {'valid': valid, 'status': status, 'checked': time.time()}
+        return result
+    
+    def _request(self, url: str, follow_redirects: bool) -> Optional[int]:
+        """HEAD (falling back to GET) with per-host limits and retries; None on network failure."""
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            if self._session is None:
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                self._session.mount('http://', adapter)
+                self._session.mount('https://', adapter)
+            limit = self._host_limits.setdefault(host, threading.BoundedSemaphore(self.per_host_limit))
+        
+        status = None
+        for attempt in range(self.retries + 1):
+            wait = self.backoff * 2 ** attempt
+            try:
+                with limit:
+                    response = self._session.head(url, timeout=self.timeout, allow_redirects=follow_redirects)
+                    if response.status_code in (403, 405, 501):
+                        # Some servers reject HEAD; a streamed GET avoids the body
+                        response = self._session.get(url, timeout=self.timeout, stream=True,
+                                                     allow_redirects=follow_redirects)
+                        response.close()
+                status = response.status_code
+                if status not in self.RETRY_STATUS:
+                    return status
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    wait = min(float(retry_after), 60.0)
+            except requests.RequestException:
+                status = None
+            if attempt < self.retries:
+                time.sleep(wait)
+        return status
+    
+    def _load_cache(self) -> Dict:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Error loading link cache: {e}")
+            return {}
+        now = time.time()
+        return {key: entry for key, entry in cache.items() if now - entry.get('checked', 0) < self.cache_ttl}
+    
+    def _save_cache(self):
+        if not self.cache_path or self.offline:
+            return
+        with self._cache_lock:
+            payload = dict(self._cache)
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(payload, file)
+        os.replace(tmp_path, self.cache_path)
+
+
+# Columns of reference_database_template.csv
+REFERENCE_FIELDS = ['authors', 'title', 'journal', 'year', 'volume', 'issue', 'pages', 'doi', 'pmid',
+                    'url', 'abstract', 'keywords', 'notes', 'citation_count', 'read_status',
+                    'date_added', 'source_type', 'publisher', 'language', 'country']
+
+
+class ReferenceStore:
+    """SQLite-backed reference library usable in place of the list of dicts.
+    
+    Behaves like a read-mostly sequence of reference dicts (len, iteration,
+    indexing, append, copy) so CitationManager methods work unchanged, while
+    lookups by DOI, PMID, year and first author use indexes and an FTS5 index
+    covers title, abstract and keywords. Writes run in transactions; bulk
+    inserts go through add_many in batches. Fields outside the template
+    columns are kept in a JSON column. Years are stored and returned as
+    text, as in the list backend.
+    
+    Positional access maps positions to ids through an in-memory id array
+    (8 bytes per reference, loaded on first use), so ``store[i]`` is a
+    primary-key lookup.
+    """
+    
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self._ids = None
+        if path != ':memory:':
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+    
+    def _create_schema(self):
+        columns = ", ".join(REFERENCE_FIELDS)
+        new_columns = ", ".join(f"new.{field}" for field in ('title', 'abstract', 'keywords'))
+        old_columns = ", ".join(f"old.{field}" for field in ('title', 'abstract', 'keywords'))
+        with self.connection:
+            self.connection.executescript(f"""
+                CREATE TABLE IF NOT EXISTS refs (
+                    id INTEGER PRIMARY KEY, {columns},
+                    doi_key TEXT, first_author TEXT, sort_key TEXT, extra TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_refs_doi ON refs(doi_key);
+                CREATE INDEX IF NOT EXISTS idx_refs_pmid ON refs(pmid);
+                CREATE INDEX IF NOT EXISTS idx_refs_year ON refs(year);
+                CREATE INDEX IF NOT EXISTS idx_refs_first_author ON refs(first_author);
+                CREATE INDEX IF NOT EXISTS idx_refs_sort_key ON refs(sort_key);
+                CREATE VIRTUAL TABLE IF NOT EXISTS refs_fts USING fts5(
+                    title, abstract, keywords, content='refs', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS refs_ai AFTER INSERT ON refs BEGIN
+                    INSERT INTO refs_fts(rowid, title, abstract, keywords) VALUES (new.id, {new_columns});
+                END;
+                CREATE TRIGGER IF NOT EXISTS refs_ad AFTER DELETE ON refs BEGIN
+                    INSERT INTO refs_fts(refs_fts, rowid, title, abstract, keywords)
+                    VALUES ('delete', old.id, {old_columns});
+                END;
+                CREATE TRIGGER IF NOT EXISTS refs_au AFTER UPDATE ON refs BEGIN
+                    INSERT INTO refs_fts(refs_fts, rowid, title, abstract, keywords)
+                    VALUES ('delete', old.id, {old_columns});
+                    INSERT INTO refs_fts(rowid, title, abstract, keywords) VALUES (new.id, {new_columns});
+                END;
+            """)
+    
+    def __len__(self) -> int:
+        return len(self._position_ids())
+    
+    def __iter__(self):
+        return self._iter_query("SELECT * FROM refs ORDER BY id")
+    
+    def __getitem__(self, index):
+        """Positional access in insertion order (use get() for access by id)."""
+        ids = self._position_ids()
+        if isinstance(index, slice):
+            selected = ids[index]
+            if not selected:
+                return []
+            if index.step in (None, 1):
+                # Ids increase with position, so a contiguous slice is an id range
+                return list(self._iter_query("SELECT * FROM refs WHERE id BETWEEN ? AND ? ORDER BY id",
+                                             (selected[0], selected[-1])))
+            return [self.get(ref_id) for ref_id in selected]
+        try:
+            ref_id = ids[index]
+        except IndexError:
+            raise IndexError("reference index out of range")
+        return self.get(ref_id)
+    
+    def copy(self) -> List[Dict]:
+        return list(self)
+    
+    def append(self, reference: Dict):
+        self.add(reference)
+    
+    def extend(self, references):
+        self.add_many(references)
+    
+    def add(self, reference: Dict) -> int:
+        """Insert one reference and return its id."""
+        with self.connection:
+            cursor = self.connection.execute(self._insert_sql(), self._reference_to_row(reference))
+        if self._ids is not None:
+            self._ids.append(cursor.lastrowid)
+        return cursor.lastrowid
+    
+    def add_many(self, references, batch_size: int = 10000) -> int:
+        """Insert references in batches, one transaction per batch."""
+        count = 0
+        sql = self._insert_sql()
+        batch = []
+        self._ids = None
+        for reference in references:
+            batch.append(self._reference_to_row(reference))
+            if len(batch) >= batch_size:
+                with self.connection:
+                    self.connection.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            with self.connection:
+                self.connection.executemany(sql, batch)
+            count += len(batch)
+        return count
+    
+    def update(self, ref_id: int, changes: Dict) -> bool:
+        """Update fields of the reference with id ``ref_id``."""
+        reference = self.get(ref_id)
+        if reference is None:
+            return False
+        reference.update(changes)
+        row = self._reference_to_row(reference)
+        assignments = ", ".join(f"{column} = ?" for column in self._row_columns())
+        with self.connection:
+            self.connection.execute(f"UPDATE refs SET {assignments} WHERE id = ?", row + (ref_id,))
+        return True
+    
+    def delete(self, ref_id: int) -> bool:
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM refs WHERE id = ?", (ref_id,))
+        self._ids = None
+        return cursor.rowcount > 0
+    
+    def clear(self):
+        with self.connection:
+            self.connection.execute("DELETE FROM refs")
+        self._ids = None
+    
+    def get(self, ref_id: int) -> Optional[Dict]:
+        row = self.connection.execute("SELECT * FROM refs WHERE id = ?", (ref_id,)).fetchone()
+        return self._row_to_reference(row) if row is not None else None
+    
+    def ids(self) -> List[int]:
+        """Reference ids in positional order."""
+        return list(self._position_ids())
+    
+    def find_by_doi(self, doi: str) -> List[Dict]:
+        return list(self._iter_query("SELECT * FROM refs WHERE doi_key = ?", (_normalize_doi(doi),)))
+    
+    def find_by_pmid(self, pmid) -> List[Dict]:
+        return list(self._iter_query("SELECT * FROM refs WHERE pmid = ?", (_normalize_pmid(pmid),)))
+    
+    def find_by_year(self, year) -> List[Dict]:
+        return list(self._iter_query("SELECT * FROM refs WHERE year = ?", (self._year_text(year),)))
+    
+    def find_by_first_author(self, family_name: str) -> List[Dict]:
+        return list(self._iter_query("SELECT * FROM refs WHERE first_author = ?",
+                                     (_first_author_family(family_name),)))
+    
+    def full_text_search(self, query: str, limit: int = 50, raw: bool = False) -> List[Dict]:
+        """FTS5 query over title, abstract and keywords, best matches first.
+        
+        Every whitespace-separated word of ``query`` must match (as a quoted
+        FTS5 string, so text like ``covid-19`` is safe). With ``raw=True``
+        the query is passed on in FTS5 syntax (AND/OR/NOT, prefix*, NEAR);
+        a malformed raw query raises ValueError.
+        """
+        if not raw:
+            query = ' '.join('"' + word.replace('"', '""') + '"' for word in query.split())
+            if not query:
+                return []
+        sql = ("SELECT refs.*, bm25(refs_fts) AS score FROM refs_fts "
+               "JOIN refs ON refs.id = refs_fts.rowid WHERE refs_fts MATCH ? "
+               "ORDER BY score LIMIT ?")
+        try:
+            return list(self._iter_query(sql, (query, limit)))
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid full-text query {query!r}: {e}") from e
+    
+    def iter_sorted(self, by: str = 'sort_key'):
+        """Iterate references ordered by an indexed column."""
+        if by not in ('sort_key', 'first_author', 'year', 'doi_key', 'pmid', 'id'):
+            raise ValueError(f"Cannot sort by: {by}")
+        return self._iter_query(f"SELECT * FROM refs ORDER BY {by}, id")
+    
+    def close(self):
+        self.connection.close()
+    
+    def _position_ids(self) -> array:
+        if self._ids is None:
+            self._ids = array('q', (row[0] for row in self.connection.execute("SELECT id FROM refs ORDER BY id")))
+        return self._ids
+    
+    @staticmethod
+    def _year_text(year) -> Optional[str]:
+        year = _normalize_year(year)
+        return str(year) if year is not None else None
+    
+    def _iter_query(self, sql: str, parameters: Tuple = (), fetch_size: int = 1000):
+        cursor = self.connection.execute(sql, parameters)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_reference(row)
+    
+    def _row_columns(self) -> List[str]:
+        return REFERENCE_FIELDS + ['doi_key', 'first_author', 'sort_key', 'extra']
+    
+    def _insert_sql(self) -> str:
+        columns = self._row_columns()
+        return f"INSERT INTO refs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    
+    def _reference_to_row(self, reference: Dict) -> Tuple:
+        values = {}
+        for key, value in reference.items():
+            if value is None or (isinstance(value, float) and value != value):
+                continue
+            values[key] = value.item() if isinstance(value, np.generic) else value
+        if 'year' in values:
+            values['year'] = self._year_text(values['year'])
+        if 'pmid' in values:
+            values['pmid'] = _normalize_pmid(values['pmid']) or values['pmid']
+        
+        extra = {key: value for key, value in values.items() if key not in REFERENCE_FIELDS}
+        authors = _clean_text(values.get('authors'))
+        return tuple(values.get(field) for field in REFERENCE_FIELDS) + (
+            _normalize_doi(values.get('doi')) or None,
+            _first_author_family(authors) or None,
+            _author_sort_key(authors),
+            json.dumps(extra, default=str) if extra else None
+        )
+    
+    def _row_to_reference(self, row) -> Dict:
+        reference = {field: row[field] for field in REFERENCE_FIELDS if row[field] is not None}
+        if row['extra']:
+            reference.update(json.loads(row['extra']))
+        if 'score' in row.keys():
+            reference['score'] = row['score']
+        return reference
+
+
+def _clean_text(value) -> str:
+    """Return a stripped string, treating None and NaN (empty CSV cells) as empty."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value).strip()
+
+
+def _normalize_doi(doi) -> str:
+    """Lowercase DOI without resolver prefix."""
+    doi = _clean_text(doi).lower()
+    return re.sub(r'^(?:https?://)?(?:dx\.)?doi\.org/|^doi:\s*', '', doi)
+
+
+def _normalize_pmid(pmid) -> str:
+    """PMID as a plain digit string (CSV loading may turn it into a float)."""
+    pmid = _clean_text(pmid)
+    if pmid.endswith('.0'):
+        pmid = pmid[:-2]
+    return pmid if pmid.isdigit() else ""
+
+
+def _normalize_year(year):
+    """Year as an int when it is numeric, so that it indexes and compares consistently."""
+    text = _clean_text(year)
+    if text.endswith('.0'):
+        text = text[:-2]
+    return int(text) if text.isdigit() else (text or None)
+
+
+def _normalize_title(title) -> str:
+    """Accent-, case- and punctuation-insensitive title."""
+    title = _clean_text(title)
+    if not title.isascii():
+        title = unicodedata.normalize('NFKD', title)
+        title = ''.join(c for c in title if not unicodedata.combining(c))
+    return ' '.join(_NON_WORD.sub(' ', title.lower()).split())
+
+
+_NAME_PARTICLES = frozenset(['van', 'von', 'der', 'den', 'de', 'del', 'della', 'des', 'di', 'da',
+                             'dos', 'du', 'la', 'le', 'ten', 'ter', 'bin', 'ibn', 'al', 'el'])
+_NAME_SUFFIXES = {'jr': 'Jr.', 'sr': 'Sr.', 'ii': 'II', 'iii': 'III', 'iv': 'IV'}
+_AUTHOR_CONJUNCTION = re.compile(r'\s+and\s+|\s*&\s*')
+
+
+class AuthorName(NamedTuple):
+    """Structured author name; ``initials`` holds one entry per given name (``'J-H'`` for hyphenated)."""
+    family: str
+    given: str = ''
+    initials: Tuple[str, ...] = ()
+    particle: str = ''
+    suffix: str = ''
+    
+    @property
+    def full_family(self) -> str:
+        """Family name with its particle, e.g. ``van der Berg``."""
+        return f"{self.particle} {self.family}" if self.particle else self.family
+    
+    @property
+    def dotted_initials(self) -> str:
+        """Initials as ``J. A.`` (``J.-H.`` for hyphenated given names)."""
+        return ' '.join('-'.join(part + '.' for part in initial.split('-')) for initial in self.initials)
+
+
+def _is_initials(text: str) -> bool:
+    letters = text.replace('.', '').replace('-', '').replace(' ', '')
+    return 0 < len(letters) <= 4 and letters.isalpha() and letters.isupper()
+
+
+def _initials(given: str) -> Tuple[str, ...]:
+    initials = []
+    for word in given.split():
+        if _is_initials(word) and '-' not in word:
+            initials.extend(letter for letter in word if letter.isalpha())
+        elif word[0].isalpha():
+            initials.append('-'.join(part[0].upper() for part in word.split('-') if part))
+    return tuple(initials)
+
+
+def _suffix(token: str) -> str:
+    return _NAME_SUFFIXES.get(token.lower().rstrip('.'), '')
+
+
+def _split_particle(words: List[str]) -> Tuple[str, str]:
+    """Split lowercase particles (``van der``) off the front of a family name."""
+    count = 0
+    while count < len(words) - 1 and words[count] in _NAME_PARTICLES:
+        count += 1
+    return ' '.join(words[:count]), ' '.join(words[count:])
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_author_name(name: str) -> AuthorName:
+    """Parse one author name written as ``Family, Given``, ``Given Family`` or ``Family JA``.
+    
+    The name is NFC-normalized; particles (van, de, ...) and suffixes
+    (Jr., III, ...) are recognised in either order.
+    """
+    name = ' '.join(unicodedata.normalize('NFC', name).split())
+    if ',' in name:
+        parts = [part.strip() for part in name.split(',') if part.strip()]
+        suffix = ' '.join(_suffix(part) for part in parts[1:] if _suffix(part))
+        given = ' '.join(part for part in parts[1:] if not _suffix(part))
+        particle, family = _split_particle(parts[0].split()) if parts else ('', '')
+        initials = _initials(given)
+        # A given part made only of initials (Lee, DK) is kept as initials alone
+        return AuthorName(family, '' if _is_initials(given) else given, initials, particle, suffix)
+    
+    words = name.split()
+    suffix = ''
+    if len(words) > 1 and _suffix(words[-1]):
+        suffix = _suffix(words.pop())
+    if not words:
+        return AuthorName('', suffix=suffix)
+    if len(words) > 1 and _is_initials(words[-1]) and '.' not in words[-1] and not _is_initials(words[0]):
+        # Vancouver / MEDLINE order: Smith JA
+        particle, family = _split_particle(words[:-1])
+        return AuthorName(family, '', _initials(words[-1]), particle, suffix)
+    
+    # Given Family, with lowercase particles taken from the end of the given names
+    family_start = len(words) - 1
+    while family_start > 1 and words[family_start - 1] in _NAME_PARTICLES:
+        family_start -= 1
+    particle, family = _split_particle(words[family_start:])
+    given = ' '.join(words[:family_start])
+    return AuthorName(family, given, _initials(given), particle, suffix)
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_authors(authors: str) -> Tuple[AuthorName, ...]:
+    """Parse an ``authors`` field into AuthorName records.
+    
+    Entries may be separated by semicolons, ``and``/``&`` or commas. A comma
+    list is read as ``Family, Given`` pairs (``Smith, John A., Johnson,
+    Mary B.``) when any item is a bare family name or initials, a given
+    part ending in an initial (``Gabriel J.``) or a family part starting
+    with a particle (``De la Cruz``), and as complete names (``John A.
+    Smith, Mary B. Johnson`` or ``Smith JA, Johnson MB``) otherwise.
+    """
+    text = ' '.join(unicodedata.normalize('NFC', authors).split())
+    if ';' in text:
+        return tuple(parse_author_name(entry) for entry in text.split(';') if entry.strip())
+    
+    tokens = [token.strip() for token in _AUTHOR_CONJUNCTION.sub(', ', text).split(',') if token.strip()]
+    names = [token for token in tokens if not _suffix(token)]
+    paired = len(names) > 1 and any(_is_pair_part(token) for token in names)
+    
+    entries = []
+    expects_given = False
+    for token in tokens:
+        if _suffix(token) and entries:
+            entries[-1].append(token)
+        elif paired and expects_given:
+            entries[-1].append(token)
+            expects_given = False
+        else:
+            entries.append([token])
+            expects_given = paired
+    return tuple(parse_author_name(', '.join(entry)) for entry in entries)
+
+
+def _is_pair_part(token: str) -> bool:
+    """Whether a comma-separated item can only be half of a ``Family, Given`` pair."""
+    words = token.split()
+    if len(words) < 2 or _is_initials(token):
+        return True
+    if _is_initials(words[-1]) and '.' not in words[-1]:
+        return False  # Vancouver order (Smith JA) is a complete name
+    # A complete name never ends in a dotted initial or starts with a particle
+    return bool(re.fullmatch(r'[A-Z]\.(?:-[A-Z]\.)?', words[-1])) or words[0].lower() in _NAME_PARTICLES
+
+
+def _author_sort_key(authors) -> str:
+    """First author's family name with particle, the bibliography sort key."""
+    names = parse_authors(_clean_text(authors))
+    return names[0].full_family if names else ""
+
+
+def _first_author_family(authors) -> str:
+    """Normalized family name of the first author, used for blocking and lookups."""
+    names = parse_authors(_clean_text(authors))
+    return _family_key(names[0].full_family) if names else ""
+
+
+def _family_key(family: str) -> str:
+    """Lookup key of a family name: normalized, without leading particles of any case.
+    
+    ``Van der Berg``, ``van der Berg`` and ``Berg`` share a key, while
+    compound names such as ``García Márquez`` are kept whole.
+    """
+    words = _normalize_title(family).split()
+    count = 0
+    while count < len(words) - 1 and words[count] in _NAME_PARTICLES:
+        count += 1
+    return ' '.join(words[count:])
+
+
+class SearchIndex:
+    """Positional inverted index with BM25 ranking over reference text fields.
+    
+    Documents are numbered by their position in the reference database and
+    added incrementally. Postings are compact ``array`` buffers (document
+    ids, term frequencies and token positions) read as NumPy arrays at query
+    time, so a query touches only the posting lists of its own terms.
+    
+    Query syntax: plain terms are ranked (any may match), ``+term`` is
+    required, ``-term`` excluded, ``"exact phrase"`` required as a phrase,
+    ``field:term`` / ``field:"phrase"`` restrict a clause to one field and
+    ``year:2020`` or ``year:2018..2022`` filter by publication year.
+    """
+    
+    FIELD_WEIGHTS = {'title': 2.0, 'keywords': 1.5, 'abstract': 1.0, 'notes': 0.5}
+    _QUERY_CLAUSE = re.compile(r'(?P<op>[+-]?)(?:(?P<field>\w+):)?(?:"(?P<phrase>[^"]*)"|(?P<term>[^\s"]+))')
+    _TOKEN = re.compile(r'[^\W_]+')
+    
+    def __init__(self, fields: Optional[Dict[str, float]] = None, k1: float = 1.2, b: float = 0.75):
+        self.field_weights = dict(fields or self.FIELD_WEIGHTS)
+        self.k1 = k1
+        self.b = b
+        self.n_docs = 0
+        self._years = array('i')
+        self._lengths = {field: array('I') for field in self.field_weights}
+        self._total_length = {field: 0 for field in self.field_weights}
+        # field -> term -> [doc ids, term frequencies, position starts, positions]
+        self._postings = {field: {} for field in self.field_weights}
+    
+    @classmethod
+    def tokenize(cls, text) -> List[str]:
+        """Lowercase, accent-free word tokens."""
+        text = _clean_text(text)
+        if not text.isascii():
+            text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+        return cls._TOKEN.findall(text.lower())
+    
+    def add(self, reference: Dict) -> int:
+        """Index one reference and return its document number."""
+        self.add_many([reference])
+        return self.n_docs - 1
+    
+    def add_many(self, references, batch_size: int = 20000) -> int:
+        """Index references in batches; returns the number added."""
+        count = 0
+        batch = []
+        for reference in references:
+            batch.append(reference)
+            if len(batch) >= batch_size:
+                count += self._add_batch(batch)
+                batch = []
+        if batch:
+            count += self._add_batch(batch)
+        return count
+    
+    def _add_batch(self, references: List[Dict]) -> int:
+        # Tokens of the whole batch are sorted by (term, document, position)
+        # once, then appended to each term's posting arrays in slices
+        first_doc = self.n_docs
+        for field in self.field_weights:
+            vocabulary = {}
+            term_ids = []
+            lengths = []
+            for reference in references:
+                tokens = self.tokenize(reference.get(field))
+                term_ids.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+                lengths.append(len(tokens))
+            self._lengths[field].extend(lengths)
+            self._total_length[field] += sum(lengths)
+            if not term_ids:
+                continue
+            
+            lengths = np.array(lengths)
+            terms = np.array(term_ids, dtype=np.int64)
+            docs = np.repeat(np.arange(first_doc, first_doc + len(references), dtype=np.uint32), lengths)
+            positions = (np.arange(len(terms)) - np.repeat(np.cumsum(lengths) - lengths, lengths)).astype(np.uint32)
+            order = np.lexsort((positions, docs, terms))
+            terms, docs, positions = terms[order], docs[order], positions[order]
+            
+            new_pair = np.concatenate(([True], (terms[1:] != terms[:-1]) | (docs[1:] != docs[:-1])))
+            pair_starts = np.flatnonzero(new_pair)
+            pair_terms = terms[pair_starts]
+            pair_docs = docs[pair_starts]
+            pair_tfs = np.diff(np.append(pair_starts, len(terms))).astype(np.uint32)
+            term_bounds = np.flatnonzero(np.concatenate(([True], pair_terms[1:] != pair_terms[:-1])))
+            term_bounds = np.append(term_bounds, len(pair_terms))
+            
+            tokens_by_id = list(vocabulary)
+            postings = self._postings[field]
+            for lo, hi in zip(term_bounds[:-1], term_bounds[1:]):
+                token = tokens_by_id[pair_terms[lo]]
+                entry = postings.get(token)
+                if entry is None:
+                    entry = postings[token] = [array('I'), array('I'), array('I'), array('I')]
+                position_lo = pair_starts[lo]
+                position_hi = pair_starts[hi] if hi < len(pair_starts) else len(terms)
+                entry[0].frombytes(pair_docs[lo:hi].tobytes())
+                entry[1].frombytes(pair_tfs[lo:hi].tobytes())
+                starts = len(entry[3]) + pair_starts[lo:hi] - position_lo
+                entry[2].frombytes(starts.astype(np.uint32).tobytes())
+                entry[3].frombytes(positions[position_lo:position_hi].tobytes())
+        
+        for reference in references:
+            year = _normalize_year(reference.get('year'))
+            self._years.append(year if isinstance(year, int) else -1)
+        self.n_docs += len(references)
+        return len(references)
+    
+    def search(self, query: str, limit: int = 20, year_from: Optional[int] = None,
+               year_to: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Return ``(document number, score)`` pairs, best first."""
+        if self.n_docs == 0:
+            return []
+        scores = np.zeros(self.n_docs)
+        allowed = np.ones(self.n_docs, dtype=bool)
+        ranked = False
+        
+        for match in self._QUERY_CLAUSE.finditer(query):
+            op, field = match.group('op'), match.group('field')
+            text = match.group('phrase') if match.group('phrase') is not None else match.group('term')
+            if field == 'year':
+                low, dots, high = text.partition('..')
+                if dots:
+                    year_from = int(low) if low.isdigit() else year_from
+                    year_to = int(high) if high.isdigit() else year_to
+                elif low.isdigit():
+                    year_from = year_to = int(low)
+                continue
+            fields = [field] if field in self.field_weights else list(self.field_weights)
+            tokens = self.tokenize(text)
+            if not tokens:
+                continue
+            
+            phrase = match.group('phrase') is not None and len(tokens) > 1
+            clause_docs = np.zeros(self.n_docs, dtype=bool)
+            for name in fields:
+                docs, tfs = self._phrase_postings(name, tokens) if phrase else self._term_postings(name, tokens)
+                if len(docs) == 0:
+                    continue
+                clause_docs[docs] = True
+                if op != '-':
+                    scores[docs] += self.field_weights[name] * self._bm25(name, docs, tfs)
+            
+            if op == '-':
+                allowed &= ~clause_docs
+            else:
+                ranked = True
+                if op == '+' or phrase:
+                    allowed &= clause_docs
+        
+        if year_from is not None or year_to is not None:
+            years = np.frombuffer(self._years, dtype=np.int32)
+            allowed &= years >= (year_from if year_from is not None else 0)
+            if year_to is not None:
+                allowed &= (years <= year_to) & (years >= 0)
+        
+        if not ranked:
+            candidates = np.flatnonzero(allowed)[:limit]
+            return [(int(doc), 0.0) for doc in candidates]
+        scores[~allowed] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(int(doc), float(scores[doc])) for doc in candidates]
+    
+    def save(self, path: str):
+        """Persist the index with pickle (arrays are stored as raw buffers)."""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(self.__dict__, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'SearchIndex':
+        index = cls.__new__(cls)
+        with open(path, 'rb') as file:
+            index.__dict__.update(pickle.load(file))
+        return index
+    
+    def _term_postings(self, field: str, tokens: List[str]):
+        # A multi-token bare term (e.g. "covid-19") is scored as its tokens
+        docs, tfs = [], []
+        for token in tokens:
+            entry = self._postings[field].get(token)
+            if entry is not None:
+                docs.append(np.frombuffer(entry[0], dtype=np.uint32))
+                tfs.append(np.frombuffer(entry[1], dtype=np.uint32))
+        if not docs:
+            return np.array([], dtype=np.uint32), np.array([], dtype=np.uint32)
+        if len(docs) == 1:
+            return docs[0], tfs[0]
+        docs, tfs = np.concatenate(docs), np.concatenate(tfs)
+        unique, inverse = np.unique(docs, return_inverse=True)
+        return unique, np.bincount(inverse, weights=tfs).astype(np.uint32)
+    
+    def _phrase_postings(self, field: str, tokens: List[str]):
+        entries = [self._postings[field].get(token) for token in tokens]
+        if any(entry is None for entry in entries):
+            return np.array([], dtype=np.uint32), np.array([], dtype=np.uint32)
+        
+        # Documents containing every token, with each token's posting row
+        docs = np.frombuffer(entries[0][0], dtype=np.uint32)
+        rows = [np.arange(len(docs))]
+        for entry in entries[1:]:
+            docs, keep, other = np.intersect1d(docs, np.frombuffer(entry[0], dtype=np.uint32),
+                                               assume_unique=True, return_indices=True)
+            rows = [r[keep] for r in rows] + [other]
+        if len(docs) == 0:
+            return docs, np.array([], dtype=np.uint32)
+        
+        # Phrase starts are (document, position - offset) keys shared by all tokens
+        matches = None
+        for offset, (entry, row) in enumerate(zip(entries, rows)):
+            tfs = np.frombuffer(entry[1], dtype=np.uint32)[row].astype(np.int64)
+            starts = np.frombuffer(entry[2], dtype=np.uint32)[row].astype(np.int64)
+            gather = np.repeat(starts - (np.cumsum(tfs) - tfs), tfs) + np.arange(tfs.sum())
+            positions = np.frombuffer(entry[3], dtype=np.uint32)[gather].astype(np.int64) - offset
+            keys = (np.repeat(docs.astype(np.int64), tfs) << 32) + positions
+            keys = keys[positions >= 0]
+            matches = keys if matches is None else np.intersect1d(matches, keys, assume_unique=True)
+            if len(matches) == 0:
+                return np.array([], dtype=np.uint32), np.array([], dtype=np.uint32)
+        
+        matched_docs, counts = np.unique(matches >> 32, return_counts=True)
+        return matched_docs.astype(np.uint32), counts.astype(np.uint32)
+    
+    def _bm25(self, field: str, docs, tfs):
+        n_docs_with = len(docs)
+        idf = np.log(1 + (self.n_docs - n_docs_with + 0.5) / (n_docs_with + 0.5))
+        lengths = np.frombuffer(self._lengths[field], dtype=np.uint32)[docs]
+        average = self._total_length[field] / self.n_docs or 1.0
+        tfs = tfs.astype(float)
+        return idf * tfs * (self.k1 + 1) / (tfs + self.k1 * (1 - self.b + self.b * lengths / average))
+
+
+_JOURNAL_ABBREVIATIONS = {
+    "Journal of the American College of Cardiology": "J Am Coll Cardiol",
+    "New England Journal of Medicine": "N Engl J Med",
+    "The Lancet": "Lancet",
+    "Nature": "Nature",
+    "Science": "Science",
+    "PLOS ONE": "PLoS One",
+    "IEEE Transactions": "IEEE Trans"
+}
+
+
+# Formatted author lists are also cached per unique raw ``authors`` value,
+# since they repeat heavily across a library
+def _format_single_author_apa(name: AuthorName) -> str:
+    text = f"{name.full_family}, {name.dotted_initials}" if name.initials else name.full_family
+    return f"{text}, {name.suffix}" if name.suffix else text
+
+
+def _format_inverted(name: AuthorName) -> str:
+    """Family, Given (MLA/Chicago first author)."""
+    given = name.given or name.dotted_initials
+    text = f"{name.full_family}, {given}" if given else name.full_family
+    return f"{text}, {name.suffix}" if name.suffix else text
+
+
+def _format_direct(name: AuthorName) -> str:
+    """Given Family (MLA/Chicago subsequent authors)."""
+    given = name.given or name.dotted_initials
+    text = f"{given} {name.full_family}" if given else name.full_family
+    return f"{text}, {name.suffix}" if name.suffix else text
+
+
+@functools.lru_cache(maxsize=65536)
+def _format_authors_apa(authors: str) -> str:
+    author_list = [_format_single_author_apa(name) for name in parse_authors(authors)]
+    if len(author_list) <= 1:
+        return ''.join(author_list)
+    return ", ".join(author_list[:-1]) + f", & {author_list[-1]}"
+
+
+@functools.lru_cache(maxsize=65536)
+def _format_authors_vancouver(authors: str) -> str:
+    formatted_authors = []
+    for name in parse_authors(authors):
+        text = name.full_family
+        if name.initials:
+            text += ' ' + ''.join(initial.replace('-', '') for initial in name.initials)
+        if name.suffix:
+            text += ' ' + name.suffix.rstrip('.')
+        formatted_authors.append(text)
+    return ", ".join(formatted_authors)
+
+
+@functools.lru_cache(maxsize=65536)
+def _format_authors_mla(authors: str) -> str:
+    names = parse_authors(authors)
+    if not names:
+        return ''
+    return ", and ".join([_format_inverted(names[0])] + [_format_direct(name) for name in names[1:]])
+
+
+@functools.lru_cache(maxsize=65536)
+def _format_authors_chicago(authors: str) -> str:
+    names = parse_authors(authors)
+    if len(names) <= 1:
+        return ''.join(_format_inverted(name) for name in names)
+    formatted = [_format_inverted(names[0])] + [_format_direct(name) for name in names[1:]]
+    return ", ".join(formatted[:-1]) + f", and {formatted[-1]}"
+
+
+@functools.lru_cache(maxsize=65536)
+def _format_authors_ieee(authors: str) -> str:
+    ieee_authors = []
+    for name in parse_authors(authors):
+        text = f"{name.dotted_initials} {name.full_family}" if name.initials else name.full_family
+        ieee_authors.append(f"{text}, {name.suffix}" if name.suffix else text)
+    return ", ".join(ieee_authors)
+
+
+def _ensure_period(text: str) -> str:
+    return text if text.endswith('.') else text + '.'
+
+
+class CitationTemplate:
+    """Citation style compiled once from template segments.
+    
+    Each segment is rendered in order and the non-empty ones are joined with
+    ``separator``. Template syntax:
+    
+    - ``{field}`` or ``{field:transform}`` inserts a reference field; a segment
+      or ``[...]`` section is dropped when any field it uses directly is empty.
+      ``{number}`` is the citation number.
+    - ``[a|b]`` is an optional section rendering its first alternative whose
+      fields are all present; ``|`` also separates alternatives of a segment.
+    - ``<sep|[..][..]>`` joins the non-empty sections with ``sep``.
+    - A section or segment with no fields of its own is dropped when all of
+      its nested sections are empty. ``\\`` escapes a syntax character.
+    
+    Templates are compiled into a Python function at construction (see
+    ``source``), so formatting a reference does no style dispatch, template
+    parsing or per-segment function calls.
+    """
+    
+    TRANSFORMS = {
+        'period': lambda value: _ensure_period(str(value)),
+        'journal_abbrev': lambda value: _JOURNAL_ABBREVIATIONS.get(value, value),
+        'apa_authors': lambda value: _format_authors_apa(str(value)),
+        'vancouver_authors': lambda value: _format_authors_vancouver(str(value)),
+        'mla_authors': lambda value: _ensure_period(_format_authors_mla(str(value))),
+        'chicago_authors': lambda value: _format_authors_chicago(str(value)),
+        'ieee_authors': lambda value: _format_authors_ieee(str(value)),
+    }
+    
+    def __init__(self, name: str, segments: List[str], separator: str = ' ', numbered: bool = False):
+        self.name = name
+        self.segments = list(segments)
+        self.separator = separator
+        self.numbered = numbered
+        parsed = [self._parse(segment, 0, '')[0] for segment in self.segments]
+        self._render, self._render_row, self.fields, self.source = self._compile(parsed)
+    
+    def __reduce__(self):
+        return (CitationTemplate, (self.name, self.segments, self.separator, self.numbered))
+    
+    def format(self, reference: Dict, citation_number: int = 1) -> str:
+        """Format one reference."""
+        return self._render(reference, citation_number)
+    
+    def format_many(self, references, start: int = 1) -> Tuple[List[str], List[Tuple[int, str]]]:
+        """Format references numbered from ``start``; returns (citations, errors)."""
+        return self._format_all(self._render, references, start)
+    
+    def row(self, reference: Dict) -> Tuple:
+        """The fields this template uses, as a tuple for format_rows."""
+        return tuple(map(reference.get, self.fields))
+    
+    def format_rows(self, rows, start: int = 1) -> Tuple[List[str], List[Tuple[int, str]]]:
+        """Like format_many, for tuples produced by row()."""
+        return self._format_all(self._render_row, rows, start)
+    
+    @staticmethod
+    def _format_all(render, items, start: int):
+        citations = []
+        errors = []
+        for number, item in enumerate(items, start):
+            try:
+                citations.append(render(item, number))
+            except Exception as e:
+                errors.append((number, str(e)))
+        return citations, errors
+    
+    def _parse(self, template: str, position: int, closing: str):
+        """Parse alternatives up to ``closing``; returns (alternatives, position)."""
+        alternatives = [[]]
+        text = []
+        
+        def flush():
+            if text:
+                alternatives[-1].append(('text', ''.join(text)))
+                text.clear()
+        
+        while position < len(template):
+            char = template[position]
+            if char == '\\':
+                text.append(template[position + 1])
+                position += 2
+                continue
+            if char == closing:
+                break
+            if char == '|':
+                flush()
+                alternatives.append([])
+            elif char == '{':
+                flush()
+                end = template.index('}', position)
+                name, _, transform = template[position + 1:end].partition(':')
+                if transform and transform not in self.TRANSFORMS:
+                    raise ValueError(f"Unknown template transform: {transform}")
+                alternatives[-1].append(('field', name.strip(), transform))
+                position = end
+            elif char == '[':
+                flush()
+                section, position = self._parse(template, position + 1, ']')
+                alternatives[-1].append(('section', section))
+            elif char == '<':
+                flush()
+                end = template.index('|', position)
+                separator = template[position + 1:end]
+                sections, position = self._parse(template, end + 1, '>')
+                children = [item[1] for item in sections[0] if item[0] == 'section']
+                alternatives[-1].append(('group', separator, children))
+            elif char in ']>':
+                raise ValueError(f"Unbalanced '{char}' in citation template: {template}")
+            else:
+                text.append(char)
+            position += 1
+        else:
+            if closing:
+                raise ValueError(f"Missing '{closing}' in citation template: {template}")
+        flush()
+        return alternatives, position
+    
+    def _compile(self, segments):
+        """Generate the Python source of the render functions and compile it.
+        
+        ``render(reference, number)`` reads fields from a reference dict and
+        ``render_row(row, number)`` from a tuple ordered like ``self.fields``
+        (the compact form sent to worker processes).
+        """
+        self._variables = {}
+        self._lines = []
+        self._temporaries = 0
+        outputs = [self._emit_section(alternatives, 1) for alternatives in segments]
+        outputs = ''.join(f"{output}, " for output in outputs)
+        body = self._lines + [f"    return {self.separator!r}.join([text for text in ({outputs}) if text])"]
+        fields = [name for name in self._variables if name != 'number']
+        variables = [self._variables[name] for name in fields]
+        
+        source = "def render(reference, number):\n    get = reference.get\n"
+        source += ''.join(f"    {variable} = get({name!r})\n" for name, variable in zip(fields, variables))
+        source += '\n'.join(body) + "\n\n"
+        source += "def render_row(row, number):\n"
+        source += f"    {''.join(f'{variable}, ' for variable in variables)}= row\n" if variables else ""
+        source += '\n'.join(body) + "\n"
+        
+        namespace = {f"t_{name}": convert for name, convert in self.TRANSFORMS.items()}
+        exec(compile(source, f"<citation template {self.name}>", 'exec'), namespace)
+        del self._variables, self._lines, self._temporaries
+        return namespace['render'], namespace['render_row'], tuple(fields), source
+    
+    def _variable(self, field: str) -> str:
+        if field == 'number':
+            self._variables.setdefault(field, 'number')
+        return self._variables.setdefault(field, f"v{len(self._variables)}")
+    
+    def _temporary(self) -> str:
+        self._temporaries += 1
+        return f"s{self._temporaries}"
+    
+    def _emit(self, depth: int, line: str):
+        self._lines.append('    ' * depth + line)
+    
+    def _emit_section(self, alternatives, depth: int) -> str:
+        target = self._temporary()
+        self._emit(depth, f"{target} = ''")
+        for index, items in enumerate(alternatives):
+            if index:
+                self._emit(depth, f"if not {target}:")
+            self._emit_sequence(items, target, depth + 1 if index else depth)
+        return target
+    
+    def _emit_group(self, separator: str, sections, depth: int) -> str:
+        children = ''.join(f"{self._emit_section(section, depth)}, " for section in sections)
+        target = self._temporary()
+        self._emit(depth, f"{target} = {separator!r}.join([text for text in ({children}) if text])")
+        return target
+    
+    def _emit_sequence(self, items, target: str, depth: int):
+        fields = [item for item in items if item[0] == 'field']
+        conditions = [self._variable(item[1]) for item in fields if item[1] != 'number']
+        if conditions:
+            self._emit(depth, f"if {' and '.join(conditions)}:")
+            depth += 1
+        
+        pieces = []
+        children = []
+        for item in items:
+            if item[0] == 'text':
+                pieces.append(repr(item[1]))
+            elif item[0] == 'field':
+                variable = self._variable(item[1])
+                pieces.append(f"t_{item[2]}({variable})" if item[2] else f"str({variable})")
+            else:
+                if item[0] == 'section':
+                    child = self._emit_section(item[1], depth)
+                else:
+                    child = self._emit_group(item[1], item[2], depth)
+                pieces.append(child)
+                children.append(child)
+        if children and not fields:
+            self._emit(depth, f"if {' or '.join(children)}:")
+            depth += 1
+        self._emit(depth, f"{target} = {' + '.join(pieces) or repr('')}")
+
+
+CITATION_STYLES = {
+    'apa': CitationTemplate('apa', [
+        '{authors:apa_authors}', '({year})', '{title:period}',
+        '*{journal}*[, *{volume}*[({issue})]][, {pages}].',
+        'https://doi.org/{doi}|{url}'
+    ]),
+    'vancouver': CitationTemplate('vancouver', [
+        '{number}.', '{authors:vancouver_authors}.', '{title:period}', '{journal:journal_abbrev}.',
+        '<|[<;|[{year}][{volume}[({issue})]]>][:{pages}]>.'
+    ], numbered=True),
+    'mla': CitationTemplate('mla', [
+        '{authors:mla_authors}', '"{title}"', '*{journal}*,',
+        'vol. {volume}[, no. {issue}],', '{year},', 'pp. {pages}.'
+    ]),
+    'chicago': CitationTemplate('chicago', [
+        '{authors:chicago_authors}', '"{title}"', '*{journal}*', '{volume}[, no. {issue}]',
+        '<|[({year})][: {pages}]>.'
+    ]),
+    'ieee': CitationTemplate('ieee', [
+        '\\[{number}\\]', '{authors:ieee_authors},', '"{title},"', '*{journal}*,',
+        '<, |[vol. {volume}][no. {issue}][pp. {pages}][{year}]>.'
+    ], numbered=True),
+}
+
+
+def get_citation_style(style) -> CitationTemplate:
+    """Return the compiled template for a style name (or a CitationTemplate)."""
+    if isinstance(style, CitationTemplate):
+        return style
+    template = CITATION_STYLES.get(style) or CITATION_STYLES.get(str(style).lower())
+    if template is None:
+        raise ValueError(f"Unsupported citation style: {style}")
+    return template
+
+
+def _format_citation_chunk(template: CitationTemplate, rows: List[Tuple], start: int):
+    """Process-pool worker for bulk bibliography generation."""
+    return template.format_rows(rows, start)
+
+
+# Entry types per export format, matched against the reference's source_type
+_SOURCE_TYPES = [
+    ('book', ('book', 'BOOK', 'book')),
+    ('conference', ('inproceedings', 'CONF', 'paper-conference')),
+    ('proceedings', ('inproceedings', 'CONF', 'paper-conference')),
+    ('thesis', ('phdthesis', 'THES', 'thesis')),
+    ('report', ('techreport', 'RPRT', 'report')),
+    ('web', ('misc', 'ELEC', 'webpage')),
+]
+_BIBTEX_SPECIAL = re.compile(r'[\\{}&%$#_~^]')
+# BibTeX counts escaped braces too, so literal braces become balanced commands
+_BIBTEX_ESCAPES = {'\\': r'\textbackslash{}', '{': r'\textbraceleft{}', '}': r'\textbraceright{}',
+                   '~': r'\textasciitilde{}', '^': r'\textasciicircum{}'}
+_PAGE_RANGE = re.compile(r'\s*[-–—]+\s*')
+
+
+def _reference_types(reference: Dict) -> Tuple[str, str, str]:
+    """(BibTeX, RIS, CSL) entry types of a reference."""
+    source_type = _clean_text(reference.get('source_type')).lower()
+    for keyword, types in _SOURCE_TYPES:
+        if keyword in source_type:
+            return types
+    return ('article', 'JOUR', 'article-journal')
+
+
+def _reference_keywords(reference: Dict) -> List[str]:
+    return [keyword.strip() for keyword in re.split(r'[;,]', _clean_text(reference.get('keywords')))
+            if keyword.strip()]
+
+
+def _citation_key(reference: Dict, used: Dict[str, int]) -> str:
+    """BibTeX key such as ``smith2023``, with a letter suffix for repeats."""
+    names = parse_authors(_clean_text(reference.get('authors')))
+    family = _normalize_title(names[0].family).replace(' ', '') if names else 'anon'
+    base = f"{family or 'anon'}{_clean_text(reference.get('year')).split('.')[0]}"
+    count = used.get(base, 0)
+    used[base] = count + 1
+    if not count:
+        return base
+    suffix = ''
+    while count:
+        count, remainder = divmod(count - 1, 26)
+        suffix = chr(ord('a') + remainder) + suffix
+    return base + suffix
+
+
+def _bibtex_name(name: AuthorName) -> str:
+    """``von Last, Jr., First`` form."""
+    given = name.given or name.dotted_initials
+    return ', '.join([name.full_family] + ([name.suffix] if name.suffix else []) + ([given] if given else []))
+
+
+def _bibtex_value(field: str, value: str) -> str:
+    """Plain text as a BibTeX field value; braces in DOIs and URLs are percent-encoded."""
+    if field in ('doi', 'url'):
+        return value.replace('{', '%7B').replace('}', '%7D')
+    return _BIBTEX_SPECIAL.sub(lambda m: _BIBTEX_ESCAPES.get(m.group(), '\\' + m.group()), value)
+
+
+def _bibtex_entry(reference: Dict, key: str) -> str:
+    authors = ' and '.join(_bibtex_name(name) for name in parse_authors(_clean_text(reference.get('authors'))))
+    fields = [
+        ('author', authors),
+        ('title', _clean_text(reference.get('title'))),
+        ('journal', _clean_text(reference.get('journal'))),
+        ('year', _clean_text(reference.get('year')).split('.')[0]),
+        ('volume', _clean_text(reference.get('volume'))),
+        ('number', _clean_text(reference.get('issue'))),
+        ('pages', _PAGE_RANGE.sub('--', _clean_text(reference.get('pages')))),
+        ('doi', _normalize_doi(reference.get('doi'))),
+        ('pmid', _normalize_pmid(reference.get('pmid'))),
+        ('url', _clean_text(reference.get('url'))),
+        ('publisher', _clean_text(reference.get('publisher'))),
+        ('language', _clean_text(reference.get('language'))),
+        ('keywords', ', '.join(_reference_keywords(reference))),
+        ('abstract', _clean_text(reference.get('abstract'))),
+        ('note', _clean_text(reference.get('notes'))),
+    ]
+    body = ',\n'.join(f"  {name} = {{{_bibtex_value(name, value)}}}" for name, value in fields if value)
+    return f"@{_reference_types(reference)[0]}{{{key},\n{body}\n}}\n\n"
+
+
+def _ris_record(reference: Dict) -> str:
+    lines = [f"TY  - {_reference_types(reference)[1]}"]
+    for name in parse_authors(_clean_text(reference.get('authors'))):
+        lines.append(f"AU  - {_format_inverted(name)}")
+    pages = [page for page in _PAGE_RANGE.split(_clean_text(reference.get('pages')), 1) if page]
+    for tag, value in [
+        ('TI', _clean_text(reference.get('title'))),
+        ('JO', _clean_text(reference.get('journal'))),
+        ('PY', _clean_text(reference.get('year')).split('.')[0]),
+        ('VL', _clean_text(reference.get('volume'))),
+        ('IS', _clean_text(reference.get('issue'))),
+        ('SP', pages[0] if pages else ''),
+        ('EP', pages[1] if len(pages) > 1 else ''),
+        ('DO', _normalize_doi(reference.get('doi'))),
+        ('AN', _normalize_pmid(reference.get('pmid'))),
+        ('UR', _clean_text(reference.get('url'))),
+        ('PB', _clean_text(reference.get('publisher'))),
+        ('LA', _clean_text(reference.get('language'))),
+        ('AB', _clean_text(reference.get('abstract'))),
+        ('N1', _clean_text(reference.get('notes'))),
+    ]:
+        if value:
+            lines.append(f"{tag}  - {' '.join(value.split())}")
+    lines.extend(f"KW  - {keyword}" for keyword in _reference_keywords(reference))
+    return '\n'.join(lines) + "\nER  - \n\n"
+
+
+def _csl_item(reference: Dict, item_id: str) -> Dict:
+    item = {'id': item_id, 'type': _reference_types(reference)[2]}
+    authors = []
+    for name in parse_authors(_clean_text(reference.get('authors'))):
+        author = {'family': name.family}
+        if name.given or name.initials:
+            author['given'] = name.given or name.dotted_initials
+        if name.particle:
+            author['non-dropping-particle'] = name.particle
+        if name.suffix:
+            author['suffix'] = name.suffix
+        authors.append(author)
+    if authors:
+        item['author'] = authors
+    year = _normalize_year(reference.get('year'))
+    if isinstance(year, int):
+        item['issued'] = {'date-parts': [[year]]}
+    for key, value in [
+        ('title', _clean_text(reference.get('title'))),
+        ('container-title', _clean_text(reference.get('journal'))),
+        ('volume', _clean_text(reference.get('volume'))),
+        ('issue', _clean_text(reference.get('issue'))),
+        ('page', _clean_text(reference.get('pages'))),
+        ('DOI', _normalize_doi(reference.get('doi'))),
+        ('PMID', _normalize_pmid(reference.get('pmid'))),
+        ('URL', _clean_text(reference.get('url'))),
+        ('publisher', _clean_text(reference.get('publisher'))),
+        ('language', _clean_text(reference.get('language'))),
+        ('abstract', _clean_text(reference.get('abstract'))),
+        ('keyword', ', '.join(_reference_keywords(reference))),
+        ('note', _clean_text(reference.get('notes'))),
+    ]:
+        if value:
+            item[key] = value
+    return item
+
+
+# Importers: each parser streams a file and yields reference dicts with
+# the columns of reference_database_template.csv
+_RIS_TYPES = {'JOUR': 'Journal Article', 'BOOK': 'Book', 'CHAP': 'Book Section', 'CONF': 'Conference Paper',
+              'CPAPER': 'Conference Paper', 'THES': 'Thesis', 'RPRT': 'Report', 'ELEC': 'Web Page'}
+_BIBTEX_TYPES = {'article': 'Journal Article', 'book': 'Book', 'inbook': 'Book Section',
+                 'incollection': 'Book Section', 'inproceedings': 'Conference Paper',
+                 'conference': 'Conference Paper', 'phdthesis': 'Thesis', 'mastersthesis': 'Thesis',
+                 'techreport': 'Report', 'online': 'Web Page', 'misc': 'Other'}
+_YEAR = re.compile(r'\b(1[5-9]\d\d|20\d\d)\b')
+_BIBTEX_ENTRY_START = re.compile(r'@\s*([A-Za-z]+)\s*([{(])')
+_BIBTEX_LINE_ENTRY = re.compile(r'^[ \t]*@\s*[A-Za-z]+\s*[{(]', re.MULTILINE)
+_BIBTEX_PAREN_TOKEN = re.compile(r'[{}")]')
+_BIBTEX_FIELD = re.compile(r'\s*([A-Za-z][\w\-:.]*)\s*=\s*')
+_BIBTEX_BARE_VALUE = re.compile(r'[^\s,#}]+')
+_BRACE = re.compile(r'[{}]')
+_LATEX_DOTLESS = re.compile(r'\\([ij])(?![A-Za-z])')
+_LATEX_ACCENT = re.compile(r'\\([\'"`^~=.])\s*(?:\{\s*(\w)\s*\}|(\w))|\\([uvHc])(?:\s*\{\s*(\w)\s*\}|\s+(\w))')
+_LATEX_ACCENTS = {"'": '\u0301', '"': '\u0308', '`': '\u0300', '^': '\u0302', '~': '\u0303', '=': '\u0304',
+                  '.': '\u0307', 'u': '\u0306', 'v': '\u030c', 'H': '\u030b', 'c': '\u0327'}
+_LATEX_LETTER = re.compile(r'\\(ss|aa|AA|ae|AE|oe|OE|o|O|l|L)(?![A-Za-z])\s*')
+_LATEX_LETTERS = {'ss': 'ß', 'aa': 'å', 'AA': 'Å', 'ae': 'æ', 'AE': 'Æ', 'oe': 'œ', 'OE': 'Œ',
+                  'o': 'ø', 'O': 'Ø', 'l': 'ł', 'L': 'Ł'}
+_LATEX_ESCAPE = re.compile(r'\\([&%$#_])')
+# Symbols written by _bibtex_value; decoded to placeholders so brace and tilde cleanup leaves them alone
+_LATEX_SYMBOL = re.compile(r'\\(textbackslash|textbraceleft|textbraceright|textasciitilde|textasciicircum)'
+                           r'(?![A-Za-z])\s*(?:\{\})?|\\([{}])')
+_LATEX_SYMBOLS = {'textbackslash': '\ue000', 'textbraceleft': '\ue001', '{': '\ue001',
+                  'textbraceright': '\ue002', '}': '\ue002', 'textasciitilde': '\ue003',
+                  'textasciicircum': '\ue004'}
+_LATEX_PLACEHOLDERS = str.maketrans({'\ue000': '\\', '\ue001': '{', '\ue002': '}', '\ue003': '~', '\ue004': '^'})
+_LATEX_COMMAND = re.compile(r'\\[A-Za-z]+\s*')
+
+
+def _open_text(filepath: str):
+    if str(filepath).endswith('.gz'):
+        return gzip.open(filepath, 'rt', encoding='utf-8-sig', errors='replace')
+    return open(filepath, 'r', encoding='utf-8-sig', errors='replace')
+
+
+def _open_binary(filepath: str):
+    return gzip.open(filepath, 'rb') if str(filepath).endswith('.gz') else open(filepath, 'rb')
+
+
+def _join_author_names(names) -> str:
+    """Authors as ``Family, Given; Family, Given``, which parse_authors reads unambiguously.
+    
+    Strings are parsed as personal names; corporate authors are passed as
+    AuthorName records and kept verbatim.
+    """
+    return '; '.join(_format_inverted(name if isinstance(name, AuthorName) else parse_author_name(name))
+                     for name in names if name)
+
+
+def _imported_reference(record: Dict) -> Dict:
+    """Drop empty values, keep template column order and stamp date_added."""
+    reference = {field: record[field] for field in REFERENCE_FIELDS if record.get(field)}
+    reference['date_added'] = datetime.now().strftime('%Y-%m-%d')
+    return reference
+
+
+def _first_year(*values) -> str:
+    for value in values:
+        match = _YEAR.search(value or '')
+        if match:
+            return match.group()
+    return ''
+
+
+def _iter_tagged_records(lines, split_line, end_tag: Optional[str] = None):
+    """Line-oriented state machine shared by the RIS, MEDLINE and EndNote refer formats.
+    
+    ``split_line`` returns (tag, value) for a tag line and None otherwise.
+    Untagged lines continue the previous value; records end at ``end_tag``,
+    or at blank lines when there is no end tag.
+    """
+    record = {}
+    last = None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        parsed = split_line(line)
+        if parsed:
+            tag, value = parsed
+            if tag == end_tag:
+                if record:
+                    yield record
+                record, last = {}, None
+                continue
+            record.setdefault(tag, []).append(value.strip())
+            last = tag
+        elif not line.strip():
+            if end_tag is None and record:
+                yield record
+                record, last = {}, None
+        elif last is not None:
+            values = record[last]
+            values[-1] = f"{values[-1]} {line.strip()}".strip()
+    if record:
+        yield record
+
+
+def _split_ris_line(line: str):
+    if len(line) >= 5 and line[2:5] == '  -' and line[:2].isalnum():
+        return line[:2], line[6:]
+    return None
+
+
+def _split_medline_line(line: str):
+    if len(line) >= 5 and line[4] == '-' and line[0] != ' ' and line[:4].rstrip().isalnum():
+        return line[:4].rstrip(), line[6:]
+    return None
+
+
+def _split_refer_line(line: str):
+    if len(line) >= 2 and line[0] == '%' and line[1] != ' ':
+        return line[:2], line[3:]
+    return None
+
+
+def _iter_ris(filepath: str):
+    with _open_text(filepath) as file:
+        for tags in _iter_tagged_records(file, _split_ris_line, end_tag='ER'):
+            first = lambda *names: next((tags[name][0] for name in names if tags.get(name)), '')
+            start, end = first('SP'), first('EP')
+            yield _imported_reference({
+                'authors': _join_author_names(tags.get('AU', []) + tags.get('A1', [])),
+                'title': first('TI', 'T1'),
+                'journal': first('JO', 'JF', 'T2', 'JA', 'J2'),
+                'year': _first_year(first('PY'), first('Y1'), first('DA')),
+                'volume': first('VL'),
+                'issue': first('IS', 'CP'),
+                'pages': f"{start}-{end}" if start and end and start != end else start,
+                'doi': _normalize_doi(first('DO')),
+                'url': first('UR', 'L2'),
+                'abstract': first('AB', 'N2'),
+                'keywords': ', '.join(tags.get('KW', [])),
+                'notes': first('N1'),
+                'source_type': _RIS_TYPES.get(first('TY'), first('TY')),
+                'publisher': first('PB'),
+                'language': first('LA'),
+            })
+
+
+def _iter_medline(filepath: str):
+    with _open_text(filepath) as file:
+        for tags in _iter_tagged_records(file, _split_medline_line):
+            first = lambda *names: next((tags[name][0] for name in names if tags.get(name)), '')
+            pmid = first('PMID')
+            doi = next((value[:-6].strip() for value in tags.get('LID', []) + tags.get('AID', [])
+                        if value.endswith('[doi]')), '')
+            yield _imported_reference({
+                'authors': _join_author_names(tags.get('FAU') or tags.get('AU', [])),
+                'title': first('TI', 'BTI'),
+                'journal': first('JT', 'TA'),
+                'year': _first_year(first('DP')),
+                'volume': first('VI'),
+                'issue': first('IP'),
+                'pages': first('PG'),
+                'doi': _normalize_doi(doi),
+                'pmid': pmid,
+                'url': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else '',
+                'abstract': first('AB'),
+                'keywords': ', '.join(tags.get('OT') or [term.replace('*', '') for term in tags.get('MH', [])]),
+                'source_type': first('PT'),
+                'language': first('LA'),
+                'country': first('PL'),
+            })
+
+
+def _iter_refer(filepath: str):
+    with _open_text(filepath) as file:
+        for tags in _iter_tagged_records(file, _split_refer_line):
+            first = lambda *names: next((tags[name][0] for name in names if tags.get(name)), '')
+            yield _imported_reference({
+                'authors': _join_author_names(tags.get('%A', [])),
+                'title': first('%T'),
+                'journal': first('%J', '%B'),
+                'year': _first_year(first('%D')),
+                'volume': first('%V'),
+                'issue': first('%N'),
+                'pages': first('%P'),
+                'doi': _normalize_doi(first('%R')),
+                'url': first('%U'),
+                'abstract': first('%X'),
+                'keywords': ', '.join(tags.get('%K', [])),
+                'notes': first('%Z'),
+                'source_type': first('%0'),
+                'publisher': first('%I'),
+                'language': first('%G'),
+            })
+
+
+def _xml_text(element) -> str:
+    return ' '.join(''.join(element.itertext()).split()) if element is not None else ''
+
+
+def _iter_xml_records(filepath: str, tag: str):
+    """Yield complete ``tag`` elements, clearing the tree behind them to keep memory flat."""
+    with _open_binary(filepath) as file:
+        root = None
+        for event, element in ElementTree.iterparse(file, events=('start', 'end')):
+            if root is None:
+                root = element
+            elif event == 'end' and element.tag == tag:
+                yield element
+                root.clear()
+
+
+def _iter_pubmed_xml(filepath: str):
+    for entry in _iter_xml_records(filepath, 'PubmedArticle'):
+        citation = entry.find('MedlineCitation')
+        article = citation.find('Article')
+        pmid = citation.findtext('PMID', '').strip()
+        
+        authors = []
+        for author in article.iterfind('AuthorList/Author'):
+            family = author.findtext('LastName')
+            if family:
+                parts = [family, author.findtext('ForeName') or author.findtext('Initials') or '',
+                         author.findtext('Suffix') or '']
+                authors.append(', '.join(part.strip() for part in parts if part and part.strip()))
+            elif author.find('CollectiveName') is not None:
+                authors.append(AuthorName(_xml_text(author.find('CollectiveName'))))
+        
+        journal_issue = article.find('Journal/JournalIssue')
+        pub_date = journal_issue.find('PubDate') if journal_issue is not None else None
+        year = _first_year(pub_date.findtext('Year') if pub_date is not None else '',
+                           pub_date.findtext('MedlineDate') if pub_date is not None else '',
+                           article.findtext('ArticleDate/Year'))
+        doi = next((_xml_text(location) for location in article.iterfind('ELocationID')
+                    if location.get('EIdType') == 'doi'), '')
+        if not doi:
+            doi = next((_xml_text(article_id) for article_id in entry.iterfind('PubmedData/ArticleIdList/ArticleId')
+                        if article_id.get('IdType') == 'doi'), '')
+        abstract = ' '.join(f"{part.get('Label')}: {_xml_text(part)}" if part.get('Label') else _xml_text(part)
+                            for part in article.iterfind('Abstract/AbstractText'))
+        
+        yield _imported_reference({
+            'authors': _join_author_names(authors),
+            'title': _xml_text(article.find('ArticleTitle')),
+            'journal': article.findtext('Journal/Title') or article.findtext('Journal/ISOAbbreviation'),
+            'year': year,
+            'volume': journal_issue.findtext('Volume') if journal_issue is not None else '',
+            'issue': journal_issue.findtext('Issue') if journal_issue is not None else '',
+            'pages': article.findtext('Pagination/MedlinePgn'),
+            'doi': _normalize_doi(doi),
+            'pmid': pmid,
+            'url': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else '',
+            'abstract': abstract,
+            'keywords': ', '.join(_xml_text(keyword) for keyword in citation.iterfind('KeywordList/Keyword')),
+            'source_type': article.findtext('PublicationTypeList/PublicationType'),
+            'language': article.findtext('Language'),
+            'country': citation.findtext('MedlineJournalInfo/Country'),
+        })
+
+
+def _iter_endnote_xml(filepath: str):
+    for record in _iter_xml_records(filepath, 'record'):
+        text = lambda path: _xml_text(record.find(path))
+        ref_type = record.find('ref-type')
+        yield _imported_reference({
+            'authors': _join_author_names(_xml_text(author) for author in record.iterfind('contributors/authors/author')),
+            'title': text('titles/title'),
+            'journal': text('titles/secondary-title') or text('periodical/full-title'),
+            'year': _first_year(text('dates/year')),
+            'volume': text('volume'),
+            'issue': text('number'),
+            'pages': text('pages'),
+            'doi': _normalize_doi(text('electronic-resource-num')),
+            'url': text('urls/related-urls/url'),
+            'abstract': text('abstract'),
+            'keywords': ', '.join(_xml_text(keyword) for keyword in record.iterfind('keywords/keyword')),
+            'notes': text('notes'),
+            'source_type': ref_type.get('name', '') if ref_type is not None else '',
+            'publisher': text('publisher'),
+            'language': text('language'),
+        })
+
+
+def _latex_to_text(value: str) -> str:
+    """Plain text of a BibTeX value: accents, escapes and braces resolved."""
+    symbols = False
+    if '\\' in value:
+        value, symbols = _LATEX_SYMBOL.subn(lambda m: _LATEX_SYMBOLS[m.group(1) or m.group(2)], value)
+        value = _LATEX_DOTLESS.sub(r'\1', value)
+        value = _LATEX_ACCENT.sub(
+            lambda m: (m.group(2) or m.group(3) or m.group(5) or m.group(6)) + _LATEX_ACCENTS[m.group(1) or m.group(4)],
+            value)
+        value = _LATEX_LETTER.sub(lambda m: _LATEX_LETTERS[m.group(1)], value)
+        value = _LATEX_ESCAPE.sub(r'\1', value)
+        value = _LATEX_COMMAND.sub('', value)
+        value = unicodedata.normalize('NFC', value)
+    value = ' '.join(value.replace('{', '').replace('}', '').replace('~', ' ').split())
+    return value.translate(_LATEX_PLACEHOLDERS) if symbols else value
+
+
+def _matching_brace(text: str, open_brace: int) -> int:
+    """Index just past the brace closing ``text[open_brace]``, or -1 if not in ``text``."""
+    depth = 0
+    for match in _BRACE.finditer(text, open_brace):
+        depth += 1 if match.group() == '{' else -1
+        if not depth:
+            return match.end()
+    return -1
+
+
+def _entry_end(text: str, delimiter: int) -> int:
+    """Index just past the delimiter closing the entry opened at ``text[delimiter]``, or -1.
+    
+    Entries are written ``@type{...}`` or ``@type(...)``; in the second form the
+    closing parenthesis is the first one outside braces and quoted values.
+    """
+    if text[delimiter] == '{':
+        return _matching_brace(text, delimiter)
+    depth, quoted = 0, False
+    for match in _BIBTEX_PAREN_TOKEN.finditer(text, delimiter + 1):
+        char = match.group()
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+        elif not depth:
+            if char == '"':
+                quoted = not quoted
+            elif not quoted:
+                return match.end()
+    return -1
+
+
+def _parse_bibtex_fields(body: str, position: int, macros: Dict[str, str]) -> Dict[str, str]:
+    """Tokenize ``name = value`` pairs; values may be braced, quoted, numbers or macros joined by #."""
+    fields = {}
+    length = len(body)
+    while True:
+        match = _BIBTEX_FIELD.match(body, position)
+        if not match:
+            return fields
+        name, position = match.group(1).lower(), match.end()
+        parts = []
+        while position < length:
+            char = body[position]
+            if char == '{':
+                end = _matching_brace(body, position)
+                end = length if end < 0 else end
+                parts.append(body[position + 1:end - 1])
+            elif char == '"':
+                end = body.find('"', position + 1)
+                while end >= 0 and body.count('{', position, end) != body.count('}', position, end):
+                    end = body.find('"', end + 1)
+                end = length - 1 if end < 0 else end
+                parts.append(body[position + 1:end])
+                end += 1
+            else:
+                token = _BIBTEX_BARE_VALUE.match(body, position)
+                if not token:
+                    break
+                end = token.end()
+                parts.append(macros.get(token.group().lower(), token.group()))
+            position = end
+            while position < length and body[position].isspace():
+                position += 1
+            if position < length and body[position] == '#':
+                position += 1
+                while position < length and body[position].isspace():
+                    position += 1
+                continue
+            break
+        fields[name] = ''.join(parts)
+        while position < length and body[position].isspace():
+            position += 1
+        if position >= length or body[position] != ',':
+            return fields
+        position += 1
+
+
+def _bibtex_reference(kind: str, fields: Dict[str, str]) -> Dict:
+    # Fully braced names ({World Health Organization}) are corporate authors
+    authors = [AuthorName(_latex_to_text(name)) if name.startswith('{') and name.endswith('}') else _latex_to_text(name)
+               for name in re.split(r'\s+and\s+', fields.get('author', '').strip()) if name]
+    text = lambda name: _latex_to_text(fields.get(name, ''))
+    return _imported_reference({
+        'authors': _join_author_names(authors),
+        'title': text('title'),
+        'journal': text('journal') or text('journaltitle') or text('booktitle'),
+        'year': _first_year(fields.get('year'), fields.get('date')),
+        'volume': text('volume'),
+        'issue': text('number') or text('issue'),
+        'pages': text('pages').replace('--', '-'),
+        'doi': _normalize_doi(fields.get('doi')),
+        'pmid': _normalize_pmid(fields.get('pmid')),
+        'url': fields.get('url', '').strip(),
+        'abstract': text('abstract'),
+        'keywords': text('keywords'),
+        'notes': text('note') or text('annote'),
+        'source_type': _BIBTEX_TYPES.get(kind, kind.title()),
+        'publisher': text('publisher'),
+        'language': text('language'),
+    })
+
+
+def _iter_bibtex(filepath: str, chunk_size: int = 1 << 20):
+    macros = {}
+    buffer = ''
+    line = 1  # line number of buffer[0]
+    with _open_text(filepath) as file:
+        chunks = iter(lambda: file.read(chunk_size), '')
+        for chunk in chain(chunks, [None]):
+            at_eof = chunk is None
+            buffer += chunk or ''
+            position = 0
+            while True:
+                match = _BIBTEX_ENTRY_START.search(buffer, position)
+                if not match:
+                    # Keep a trailing '@' whose entry header is not complete yet
+                    at = buffer.rfind('@', position)
+                    position = at if at >= 0 and len(buffer) - at < 256 and not at_eof else len(buffer)
+                    break
+                end = _entry_end(buffer, match.end() - 1)
+                if end < 0:
+                    # An unclosed entry is only known to be malformed once the next
+                    # entry starts on a line of its own (or the file ends): skip to it
+                    following = _BIBTEX_LINE_ENTRY.search(buffer, match.end())
+                    if not following and not at_eof:
+                        position = match.start()
+                        break
+                    bad_line = line + buffer.count('\n', 0, match.start())
+                    print(f"Skipping malformed BibTeX entry at line {bad_line} of {filepath}")
+                    position = following.start() if following else len(buffer)
+                    continue
+                kind = match.group(1).lower()
+                body = buffer[match.end():end - 1]
+                position = end
+                if kind == 'string':
+                    macros.update((name, _latex_to_text(value))
+                                  for name, value in _parse_bibtex_fields(body, 0, macros).items())
+                elif kind not in ('comment', 'preamble'):
+                    comma = body.find(',')
+                    if comma >= 0:
+                        yield _bibtex_reference(kind, _parse_bibtex_fields(body, comma + 1, macros))
+            line += buffer.count('\n', 0, position)
+            buffer = buffer[position:]
+
+
+_IMPORTERS = {
+    'pubmed': _iter_pubmed_xml,
+    'medline': _iter_medline,
+    'ris': _iter_ris,
+    'bibtex': _iter_bibtex,
+    'endnote': _iter_endnote_xml,
+    'refer': _iter_refer,
+}
+
+
+def detect_reference_format(filepath: str) -> str:
+    """Guess the import format from the extension, or from the first kilobytes for ambiguous files."""
+    name = str(filepath).lower()
+    name = name[:-3] if name.endswith('.gz') else name
+    extension = os.path.splitext(name)[1]
+    known = {'.bib': 'bibtex', '.ris': 'ris', '.nbib': 'medline', '.medline': 'medline', '.enw': 'refer'}
+    if extension in known:
+        return known[extension]
+    
+    with _open_text(filepath) as file:
+        head = file.read(8192)
+    if '<PubmedArticle' in head:
+        return 'pubmed'
+    if '<records' in head or '<record>' in head:
+        return 'endnote'
+    if re.search(r'^PMID- ', head, re.MULTILINE):
+        return 'medline'
+    if re.search(r'^TY  - ', head, re.MULTILINE):
+        return 'ris'
+    if _BIBTEX_ENTRY_START.search(head):
+        return 'bibtex'
+    if re.search(r'^%[0AT] ', head, re.MULTILINE):
+        return 'refer'
+    raise ValueError(f"Cannot detect the reference format of {filepath}")
+
+
+def iter_references_from_file(filepath: str, file_format: Optional[str] = None):
+    """Stream references from a PubMed XML, MEDLINE, RIS, BibTeX, EndNote XML or refer file (optionally .gz).
+    
+    Records are mapped to the columns of reference_database_template.csv.
+    """
+    file_format = (file_format or detect_reference_format(filepath)).lower()
+    if file_format not in _IMPORTERS:
+        raise ValueError(f"Unsupported import format: {file_format}")
+    return _IMPORTERS[file_format](filepath)
+
+
+# In-text citations: [1], [1,3-5] (numbered), (Smith et al., 2020; Lee, 2019a)
+# (parenthetical) and Smith and Lee (2020) (narrative), matched in one pass
+_NUMBERED_CITATION = re.compile(r'\[(?P<numbers>\d+(?:\s*[-–]\s*\d+)?(?:\s*,\s*\d+(?:\s*[-–]\s*\d+)?)*)\]')
+# A parenthetical item is a name-shaped author (capitalised word with a lower-case
+# letter, or an acronym followed by a comma) and plausible years, so statistics
+# such as (N = 1500) or (SD 1200) are not read as citations
+_CITATION_NAME = r"[A-Z][\w'\-]*[a-z][\w'\-]*"
+_CITATION_PARTICLE = r"\b(?:[Vv]an|[Vv]on|[Dd]e|[Dd]el|[Dd]er|[Dd]en|[Ll]a|[Ll]e|[Dd]u|[Dd]a|[Dd]i|[Dd]os)"
+# Compound family names (García Márquez, van der Berg) are matched whole
+_CITATION_AUTHOR = (rf"(?:{_CITATION_PARTICLE}\s+)*{_CITATION_NAME}(?:\s+{_CITATION_NAME})?"
+                    rf"(?:\s+et\s+al\.?|\s+(?:and|&)\s+{_CITATION_NAME})?")
+_CITATION_YEARS = r'(?:1[5-9]\d\d|20\d\d)[a-z]?(?:\s*,\s*(?:1[5-9]\d\d|20\d\d)[a-z]?)*\b'
+_CITATION_ENTRY = (rf"(?:(?:e\.g\.,?|i\.e\.,?|see|cf\.)\s+)?"
+                   rf"(?:{_CITATION_AUTHOR},?\s+|[A-Z]{{2,}}(?:\s+[A-Z]{{2,}})*,\s*){_CITATION_YEARS}")
+_CITATION_PATTERN = re.compile(
+    _NUMBERED_CITATION.pattern +
+    rf'|\((?P<parenthetical>{_CITATION_ENTRY}(?:\s*;\s*{_CITATION_ENTRY})*)\)'
+    rf"|(?P<narrative>{_CITATION_AUTHOR}|[A-Z][\w'\-]+(?:\s+et\s+al\.?|\s+(?:and|&)\s+[A-Z][\w'\-]+)?)"
+    r"\s+\((?P<year>\d{4}[a-z]?)\)"
+)
+_CITATION_ITEM = re.compile(rf'(?P<author>(?:{_CITATION_PARTICLE}\s+)*[A-Z][^,;()\d]*?),?\s+'
+                            r'(?P<years>\d{4}[a-z]?(?:\s*,\s*\d{4}[a-z]?)*)\b')
+_CITATION_AUTHOR_SPLIT = re.compile(r'\s+et\s+al\.?|\s+(?:and|&)\s+|,')
+_NUMBER_RANGE = re.compile(r'(\d+)(?:\s*[-–]\s*(\d+))?')
+_REFERENCES_HEADING = re.compile(r'^#{1,6}\s*(?:References|Bibliography)\b', re.IGNORECASE | re.MULTILINE)
+_SECTION_HEADING = re.compile(r'#{1,6}\s')
+_FENCED_CODE = re.compile(r'^[ \t]*```.*?(?:^[ \t]*```[^\n]*$|\Z)', re.MULTILINE | re.DOTALL)
+_REFERENCE_LIST_ENTRY = re.compile(r'\s*(\d+)\.\s+(.*)')
+_MISSING_REFERENCE = '[Reference {} not found]'
+_MISSING_REFERENCE_ENTRY = re.compile(r'\[Reference \d+ not found\]')
+_LISTED_DOI = re.compile(r'\b10\.\d{4,9}/[^\s\]>]+')
+
+_WORKER_RESOLVER = None
+
+
+def _expand_citation_numbers(numbers: str, n_references: int, max_range: int = 100) -> List[int]:
+    """Numbers cited by ``1,3-5`` in order, or [] when the brackets are not a citation."""
+    keys = []
+    for match in _NUMBER_RANGE.finditer(numbers):
+        first = int(match.group(1))
+        last = int(match.group(2)) if match.group(2) else first
+        if last < first or last - first > max_range or (1800 <= first <= 2100 and first > n_references):
+            # Not a citation, e.g. a bracketed year span such as [2019-2024]
+            return []
+        keys.extend(range(first, last + 1))
+    return keys
+
+
+def _compress_citation_numbers(numbers, separator: str = ',', dash: str = '-') -> str:
+    """Sorted citation numbers with runs of three or more written as ranges (1-3,5)."""
+    numbers = sorted(set(numbers))
+    parts = []
+    start = 0
+    while start < len(numbers):
+        end = start
+        while end + 1 < len(numbers) and numbers[end + 1] == numbers[end] + 1:
+            end += 1
+        if end - start >= 2:
+            parts.append(f"{numbers[start]}{dash}{numbers[end]}")
+        else:
+            parts.extend(str(number) for number in numbers[start:end + 1])
+        start = end + 1
+    return separator.join(parts)
+
+
+def _iter_manuscript_sections(lines):
+    """Yield (heading line, body text) per Markdown section; fenced code is never split."""
+    heading = ''
+    body = []
+    in_fence = False
+    for line in lines:
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+        elif not in_fence and _SECTION_HEADING.match(line):
+            if heading or body:
+                yield heading, ''.join(body)
+            heading, body = line, []
+            continue
+        body.append(line)
+    if heading or body:
+        yield heading, ''.join(body)
+
+
+def _parse_reference_list(text: str) -> Dict[int, str]:
+    """Numbered entries (``12. Author A. Title...``) of a manuscript's reference section."""
+    entries = {}
+    number = None
+    for line in text.splitlines():
+        match = _REFERENCE_LIST_ENTRY.match(line)
+        if match:
+            number = int(match.group(1))
+            entries[number] = match.group(2).strip()
+        elif not line.strip():
+            number = None
+        elif number is not None:
+            entries[number] += ' ' + line.strip()
+    # Placeholders written for missing references are not references
+    return {number: entry for number, entry in entries.items() if not _MISSING_REFERENCE_ENTRY.fullmatch(entry)}
+
+
+def _listed_reference_matcher(references):
+    """Function returning the reference a free-text reference list entry describes, or None.
+    
+    An entry matches by a DOI it contains, else by one of its sentences
+    being a reference title.
+    """
+    dois, titles = {}, {}
+    for reference in references:
+        doi = _normalize_doi(reference.get('doi'))
+        title = _normalize_title(reference.get('title'))
+        if doi:
+            dois.setdefault(doi, reference)
+        if title:
+            titles.setdefault(title, reference)
+    
+    def match(entry: str) -> Optional[Dict]:
+        doi = _LISTED_DOI.search(entry)
+        if doi:
+            found = dois.get(_normalize_doi(doi.group().rstrip('.,;')))
+            if found is not None:
+                return found
+        for sentence in entry.split('. '):
+            found = titles.get(_normalize_title(sentence))
+            if found is not None:
+                return found
+        return None
+    
+    return match
+
+
+class CitationResolver:
+    """Resolve in-text citations of manuscripts to reference database entries.
+    
+    Numbered citations ``[n]`` resolve to the n-th reference; author-year
+    citations resolve through an index of (first-author family, year)
+    built once from the references, with year suffixes (2020a, 2020b)
+    selecting among same-key entries in database order.
+    """
+    
+    def __init__(self, references, max_range: int = 100):
+        self.max_range = max_range
+        self.n_references = 0
+        self._author_year = defaultdict(list)
+        for index, ref in enumerate(references):
+            year = _normalize_year(ref.get('year'))
+            family = _first_author_family(ref.get('authors'))
+            if family and isinstance(year, int):
+                self._author_year[(family, year)].append(index)
+            self.n_references += 1
+        self._author_year = dict(self._author_year)
+        self._resolved = {}
+    
+    def resolve(self, text: str, stop_at_references: bool = True) -> List[Dict]:
+        """Citations of ``text`` in order of appearance.
+        
+        Each citation has its ``text`` and ``start``/``end`` offsets, its
+        ``style`` ('numbered' or 'author-year'), the cited ``keys`` (numbers,
+        or (author, year) pairs with ranges expanded) and, aligned with them,
+        ``references`` (database index, or None when unresolved or ambiguous)
+        and ``candidates`` (all matching indices). Scanning stops at a
+        References/Bibliography heading unless ``stop_at_references`` is False.
+        """
+        end = len(text)
+        if stop_at_references:
+            heading = _REFERENCES_HEADING.search(text)
+            end = heading.start() if heading else end
+        
+        citations = []
+        resolved = self._resolved
+        for match in _CITATION_PATTERN.finditer(text, 0, end):
+            # Resolution depends only on the matched text, and citations repeat
+            citation_text = match.group()
+            if citation_text not in resolved:
+                resolved[citation_text] = self._resolve_match(match)
+            result = resolved[citation_text]
+            if result is not None:
+                style, keys, references, candidates = result
+                citations.append({
+                    'text': citation_text,
+                    'start': match.start(),
+                    'end': match.end(),
+                    'style': style,
+                    'keys': list(keys),
+                    'references': list(references),
+                    'candidates': [list(found) for found in candidates]
+                })
+        return citations
+    
+    def _resolve_match(self, match):
+        if match.group('numbers'):
+            keys = self._expand_numbers(match.group('numbers'))
+            if not keys:
+                return None
+            candidates = [[key - 1] if 1 <= key <= self.n_references else [] for key in keys]
+            style = 'numbered'
+        else:
+            if match.group('narrative'):
+                items = [(match.group('narrative'), match.group('year'))]
+            else:
+                items = [(item.group('author'), item.group('years'))
+                         for item in _CITATION_ITEM.finditer(match.group('parenthetical'))]
+            keys = [(author.strip(), year.strip()) for author, years in items for year in years.split(',')]
+            if not keys:
+                return None
+            candidates = [self._author_year_candidates(author, year) for author, year in keys]
+            style = 'author-year'
+        references = [found[0] if len(found) == 1 else None for found in candidates]
+        return style, tuple(keys), tuple(references), tuple(tuple(found) for found in candidates)
+    
+    def resolve_file(self, filepath: str, stop_at_references: bool = True) -> List[Dict]:
+        """Citations of a manuscript file."""
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as file:
+            return self.resolve(file.read(), stop_at_references)
+    
+    def resolve_directory(self, directory: str, patterns: Tuple[str, ...] = ('*.md', '*.txt'),
+                          n_jobs: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """Citations of every manuscript in ``directory``, keyed by path.
+        
+        With ``n_jobs > 1`` files are resolved in a process pool; the
+        resolver is sent to each worker once.
+        """
+        paths = sorted({path for pattern in patterns for path in glob.glob(os.path.join(directory, pattern))})
+        if not n_jobs or n_jobs <= 1 or len(paths) <= 1:
+            return {path: self.resolve_file(path) for path in paths}
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(paths)), initializer=_init_resolver_worker,
+                                 initargs=(self,)) as executor:
+            return dict(zip(paths, executor.map(_resolve_file_worker, paths)))
+    
+    def _expand_numbers(self, numbers: str) -> List[int]:
+        return _expand_citation_numbers(numbers, self.n_references, self.max_range)
+    
+    def _author_year_candidates(self, author: str, year: str) -> List[int]:
+        # The cited author is a family name; capitalised words before it
+        # ("As García Márquez (2018)") are dropped, longest match first
+        words = _family_key(_CITATION_AUTHOR_SPLIT.split(author)[0]).split()
+        found = []
+        for start in range(len(words)):
+            found = self._author_year.get((' '.join(words[start:]), int(year[:4])))
+            if found:
+                break
+        found = found or []
+        suffix = year[4:]
+        if suffix:
+            position = ord(suffix) - ord('a')
+            return found[position:position + 1]
+        return list(found)
+
+
+def _init_resolver_worker(resolver: CitationResolver):
+    global _WORKER_RESOLVER
+    _WORKER_RESOLVER = resolver
+
+
+def _resolve_file_worker(filepath: str) -> List[Dict]:
+    return _WORKER_RESOLVER.resolve_file(filepath)
+
+
 class CitationManager:
     """Main class for managing citations and references."""
     
-    def __init__(self):
-        self.reference_database = []
+    def __init__(self, database_path: Optional[str] = None):
+        self.reference_database = ReferenceStore(database_path) if database_path else []
         self.supported_formats = ['apa', 'vancouver', 'mla', 'chicago', 'ieee']
+        self.search_index = None
+        # The database object search_index was built from; replacing
+        # reference_database makes the index stale
+        self._indexed_database = None
+    
+    def use_reference_store(self, database_path: str = ':memory:') -> ReferenceStore:
+        """Switch to an SQLite-backed store, moving any in-memory references into it."""
+        store = ReferenceStore(database_path)
+        if not isinstance(self.reference_database, ReferenceStore):
+            store.add_many(self.reference_database)
+        self.reference_database = store
+        return store
+        
+    def add_reference(self, reference: Dict) -> int:
+        """Add a reference, indexing it for search if an index exists."""
+        self.reference_database.append(reference)
+        if (self.search_index is not None and self._indexed_database is self.reference_database
+                and self.search_index.n_docs == len(self.reference_database) - 1):
+            self.search_index.add(reference)
+        return len(self.reference_database) - 1
+    
+    def build_search_index(self, fields: Optional[Dict[str, float]] = None) -> SearchIndex:
+        """(Re)build the full-text index over title, abstract, keywords and notes."""
+        self.search_index = SearchIndex(fields)
+        self.search_index.add_many(self.reference_database)
+        self._indexed_database = self.reference_database
+        return self.search_index
+    
+    def save_search_index(self, filepath: str) -> bool:
+        """Persist the search index to disk."""
+        try:
+            if self.search_index is None:
+                self.build_search_index()
+            self.search_index.save(filepath)
+            return True
+        except Exception as e:
+            print(f"Error saving search index: {e}")
+            return False
+    
+    def load_search_index(self, filepath: str) -> bool:
+        """Load a persisted index of the current library; references added since are indexed on the next search."""
+        try:
+            self.search_index = SearchIndex.load(filepath)
+            self._indexed_database = self.reference_database
+            return True
+        except Exception as e:
+            print(f"Error loading search index: {e}")
+            return False
+    
+    def search(self, query: str, limit: int = 20, year_from: Optional[int] = None,
+               year_to: Optional[int] = None) -> List[Dict]:
+        """Full-text search with BM25 ranking.
+        
+        Supports ``+required``, ``-excluded``, ``"phrases"``, field clauses such
+        as ``title:catheter`` or ``keywords:"point cloud"`` and year filters
+        (``year:2020``, ``year:2018..2022`` or the keyword arguments). The
+        index is built on first use, rebuilt when the library is replaced or
+        loaded, and extended with references appended since; call
+        build_search_index after editing or deleting references.
+        """
+        n_references = len(self.reference_database)
+        if (self.search_index is None or self._indexed_database is not self.reference_database
+                or self.search_index.n_docs > n_references):
+            self.build_search_index()
+        elif self.search_index.n_docs < n_references:
+            self.search_index.add_many(islice(iter(self.reference_database), self.search_index.n_docs, None))
         
-    def load_references_from_csv(self, filepath: str) -> bool:
+        results = []
+        for index, score in self.search_index.search(query, limit, year_from, year_to):
+            results.append({'index': index, 'score': score, 'reference': self.reference_database[index]})
+        return results
+    
+    def load_references_from_csv(self, filepath: str, chunksize: int = 50000) -> bool:
         """Load references from CSV file."""
+        self.search_index = None
         try:
+            if isinstance(self.reference_database, ReferenceStore):
+                self.reference_database.clear()
+                for chunk in pd.read_csv(filepath, chunksize=chunksize):
+                    self.reference_database.add_many(chunk.to_dict('records'))
+                return True
             df = pd.read_csv(filepath)
             self.reference_database = df.to_dict('records')
             return True
@@ -37,21 +2208,59 @@ class CitationManager:
     
     def load_references_from_json(self, filepath: str) -> bool:
         """Load references from JSON file."""
+        self.search_index = None
         try:
             with open(filepath, 'r', encoding='utf-8') as file:
-                self.reference_database = json.load(file)
+                references = json.load(file)
+            if isinstance(self.reference_database, ReferenceStore):
+                self.reference_database.clear()
+                self.reference_database.add_many(references)
+            else:
+                self.reference_database = references
             return True
         except Exception as e:
             print(f"Error loading JSON: {e}")
             return False
     
-    def save_references_to_csv(self, filepath: str) -> bool:
+    def import_references(self, filepath: str, file_format: Optional[str] = None,
+                          batch_size: int = 5000) -> bool:
+        """Append references from a PubMed XML, MEDLINE, RIS, BibTeX, EndNote XML or refer file.
+        
+        The file is parsed as a stream and records are added in batches, so a
+        ReferenceStore receives one transaction per ``batch_size`` records.
+        """
+        try:
+            records = iter_references_from_file(filepath, file_format)
+            for batch in iter(lambda: list(islice(records, batch_size)), []):
+                if isinstance(self.reference_database, ReferenceStore):
+                    self.reference_database.add_many(batch)
+                else:
+                    self.reference_database.extend(batch)
+            return True
+        except Exception as e:
+            print(f"Error importing references: {e}")
+            return False
+    
+    def save_references_to_csv(self, filepath: str, chunksize: int = 50000) -> bool:
         """Save references to CSV file."""
         try:
             if not self.reference_database:
                 print("No references to save.")
                 return False
             
+            if isinstance(self.reference_database, ReferenceStore):
+                # Stream the store in chunks with a fixed column order
+                rows = iter(self.reference_database)
+                first = True
+                while True:
+                    chunk = list(islice(rows, chunksize))
+                    if not chunk:
+                        break
+                    df = pd.DataFrame(chunk).reindex(columns=REFERENCE_FIELDS)
+                    df.to_csv(filepath, mode='w' if first else 'a', header=first, index=False, encoding='utf-8')
+                    first = False
+                return True
+            
             df = pd.DataFrame(self.reference_database)
             df.to_csv(filepath, index=False, encoding='utf-8')
             return True
@@ -61,328 +2270,103 @@ class CitationManager:
     
     def format_authors_apa(self, authors: str) -> str:
         """Format authors for APA style."""
-        if not authors:
-            return ""
-        
-        author_list = [name.strip() for name in authors.split(',')]
-        if len(author_list) == 1:
-            return self._format_single_author_apa(author_list[0])
-        elif len(author_list) == 2:
-            return f"{self._format_single_author_apa(author_list[0])}, & {self._format_single_author_apa(author_list[1])}"
-        else:
-            formatted_authors = [self._format_single_author_apa(name) for name in author_list[:-1]]
-            return ", ".join(formatted_authors) + f", & {self._format_single_author_apa(author_list[-1])}"
+        return _format_authors_apa(authors) if authors else ""
     
     def _format_single_author_apa(self, name: str) -> str:
         """Format single author name for APA style (Last, F. M.)."""
-        parts = name.strip().split()
-        if len(parts) < 2:
-            return name
-        
-        last_name = parts[-1]
-        first_names = parts[:-1]
-        initials = ". ".join([n[0].upper() for n in first_names if n]) + "."
-        return f"{last_name}, {initials}"
+        return _format_single_author_apa(parse_author_name(name))
     
     def format_authors_vancouver(self, authors: str) -> str:
         """Format authors for Vancouver style."""
-        if not authors:
-            return ""
-        
-        author_list = [name.strip() for name in authors.split(',')]
-        formatted_authors = []
-        
-        for name in author_list:
-            parts = name.strip().split()
-            if len(parts) >= 2:
-                last_name = parts[-1]
-                initials = "".join([n[0].upper() for n in parts[:-1] if n])
-                formatted_authors.append(f"{last_name} {initials}")
-            else:
-                formatted_authors.append(name)
-        
-        return ", ".join(formatted_authors)
+        return _format_authors_vancouver(authors) if authors else ""
     
     def format_authors_mla(self, authors: str) -> str:
         """Format authors for MLA style."""
-        if not authors:
-            return ""
-        
-        author_list = [name.strip() for name in authors.split(',')]
-        if len(author_list) == 1:
-            parts = author_list[0].strip().split()
-            if len(parts) >= 2:
-                return f"{parts[-1]}, {' '.join(parts[:-1])}"
-            return author_list[0]
-        else:
-            # First author: Last, First. Subsequent authors: First Last
-            first_author = author_list[0].strip().split()
-            if len(first_author) >= 2:
-                formatted_first = f"{first_author[-1]}, {' '.join(first_author[:-1])}"
-            else:
-                formatted_first = author_list[0]
-            
-            other_authors = [name.strip() for name in author_list[1:]]
-            return formatted_first + ", and " + ", and ".join(other_authors)
+        return _format_authors_mla(authors) if authors else ""
     
     def generate_apa_citation(self, reference: Dict) -> str:
         """Generate APA format citation."""
-        citation_parts = []
-        
-        # Authors
-        if reference.get('authors'):
-            authors = self.format_authors_apa(reference['authors'])
-            citation_parts.append(authors)
-        
-        # Year
-        if reference.get('year'):
-            citation_parts.append(f"({reference['year']})")
-        
-        # Title
-        if reference.get('title'):
-            title = reference['title']
-            if not title.endswith('.'):
-                title += '.'
-            citation_parts.append(title)
-        
-        # Journal and publication details
-        if reference.get('journal'):
-            journal_part = f"*{reference['journal']}*"
-            
-            # Volume and issue
-            if reference.get('volume'):
-                journal_part += f", *{reference['volume']}*"
-                if reference.get('issue'):
-                    journal_part += f"({reference['issue']})"
-            
-            # Pages
-            if reference.get('pages'):
-                journal_part += f", {reference['pages']}"
-            
-            citation_parts.append(journal_part + ".")
-        
-        # DOI or URL
-        if reference.get('doi'):
-            citation_parts.append(f"https://doi.org/{reference['doi']}")
-        elif reference.get('url'):
-            citation_parts.append(reference['url'])
-        
-        return " ".join(citation_parts)
+        return CITATION_STYLES['apa'].format(reference)
     
     def generate_vancouver_citation(self, reference: Dict, citation_number: int) -> str:
         """Generate Vancouver format citation."""
-        citation_parts = []
-        
-        # Authors
-        if reference.get('authors'):
-            authors = self.format_authors_vancouver(reference['authors'])
-            citation_parts.append(authors + ".")
-        
-        # Title
-        if reference.get('title'):
-            title = reference['title']
-            if not title.endswith('.'):
-                title += '.'
-            citation_parts.append(title)
-        
-        # Journal
-        if reference.get('journal'):
-            journal_name = reference['journal']
-            # Abbreviate common journal names (basic implementation)
-            journal_abbrev = self._abbreviate_journal_vancouver(journal_name)
-            citation_parts.append(journal_abbrev + ".")
-        
-        # Year, Volume, Issue, Pages
-        pub_details = []
-        if reference.get('year'):
-            pub_details.append(str(reference['year']))
-        
-        if reference.get('volume'):
-            volume_part = str(reference['volume'])
-            if reference.get('issue'):
-                volume_part += f"({reference['issue']})"
-            pub_details.append(volume_part)
-        
-        if reference.get('pages'):
-            pub_details.append(f":{reference['pages']}")
-        
-        if pub_details:
-            citation_parts.append("".join(pub_details) + ".")
-        
-        # Add citation number at the beginning
-        return f"{citation_number}. " + " ".join(citation_parts)
+        return CITATION_STYLES['vancouver'].format(reference, citation_number)
     
     def _abbreviate_journal_vancouver(self, journal_name: str) -> str:
         """Basic journal name abbreviation for Vancouver style."""
         # This is a simplified version - in practice, you'd use official abbreviations
-        abbreviations = {
-            "Journal of the American College of Cardiology": "J Am Coll Cardiol",
-            "New England Journal of Medicine": "N Engl J Med",
-            "The Lancet": "Lancet",
-            "Nature": "Nature",
-            "Science": "Science",
-            "PLOS ONE": "PLoS One",
-            "IEEE Transactions": "IEEE Trans"
-        }
-        return abbreviations.get(journal_name, journal_name)
+        return _JOURNAL_ABBREVIATIONS.get(journal_name, journal_name)
     
     def generate_mla_citation(self, reference: Dict) -> str:
         """Generate MLA format citation."""
-        citation_parts = []
-        
-        # Authors
-        if reference.get('authors'):
-            authors = self.format_authors_mla(reference['authors'])
-            citation_parts.append(authors + ".")
-        
-        # Title (in quotes for articles)
-        if reference.get('title'):
-            title = f'"{reference["title"]}"'
-            citation_parts.append(title)
-        
-        # Container (Journal)
-        if reference.get('journal'):
-            citation_parts.append(f"*{reference['journal']}*,")
-        
-        # Volume and issue
-        if reference.get('volume'):
-            vol_part = f"vol. {reference['volume']}"
-            if reference.get('issue'):
-                vol_part += f", no. {reference['issue']}"
-            citation_parts.append(vol_part + ",")
-        
-        # Date
-        if reference.get('year'):
-            citation_parts.append(f"{reference['year']},")
-        
-        # Pages
-        if reference.get('pages'):
-            pages = reference['pages'].replace('-', '-')  # En dash
-            citation_parts.append(f"pp. {pages}.")
-        
-        return " ".join(citation_parts)
+        return CITATION_STYLES['mla'].format(reference)
     
     def generate_chicago_citation(self, reference: Dict) -> str:
         """Generate Chicago format citation (Notes-Bibliography)."""
-        citation_parts = []
-        
-        # Authors (different format for Chicago)
-        if reference.get('authors'):
-            author_list = [name.strip() for name in reference['authors'].split(',')]
-            if len(author_list) == 1:
-                citation_parts.append(author_list[0].strip())
-            else:
-                citation_parts.append(", ".join(author_list))
-        
-        # Title
-        if reference.get('title'):
-            title = f'"{reference["title"]}"'
-            citation_parts.append(title)
-        
-        # Journal
-        if reference.get('journal'):
-            citation_parts.append(f"*{reference['journal']}*")
-        
-        # Volume and issue
-        if reference.get('volume'):
-            vol_part = str(reference['volume'])
-            if reference.get('issue'):
-                vol_part += f", no. {reference['issue']}"
-            citation_parts.append(vol_part)
-        
-        # Date and pages
-        date_page = []
-        if reference.get('year'):
-            date_page.append(f"({reference['year']})")
-        if reference.get('pages'):
-            date_page.append(f": {reference['pages']}")
-        
-        if date_page:
-            citation_parts.append("".join(date_page) + ".")
-        
-        return " ".join(citation_parts)
+        return CITATION_STYLES['chicago'].format(reference)
     
     def generate_ieee_citation(self, reference: Dict, citation_number: int) -> str:
         """Generate IEEE format citation."""
-        citation_parts = []
-        
-        # Authors (initials first)
-        if reference.get('authors'):
-            author_list = [name.strip() for name in reference['authors'].split(',')]
-            ieee_authors = []
-            for name in author_list:
-                parts = name.strip().split()
-                if len(parts) >= 2:
-                    first_initials = ". ".join([n[0].upper() for n in parts[:-1]]) + "."
-                    ieee_authors.append(f"{first_initials} {parts[-1]}")
-                else:
-                    ieee_authors.append(name)
-            citation_parts.append(", ".join(ieee_authors) + ",")
-        
-        # Title
-        if reference.get('title'):
-            title = f'"{reference["title"]},"'
-            citation_parts.append(title)
-        
-        # Journal (italicized)
-        if reference.get('journal'):
-            citation_parts.append(f"*{reference['journal']}*,")
-        
-        # Volume, issue, pages, year
-        pub_info = []
-        if reference.get('volume'):
-            pub_info.append(f"vol. {reference['volume']}")
-        if reference.get('issue'):
-            pub_info.append(f"no. {reference['issue']}")
-        if reference.get('pages'):
-            pub_info.append(f"pp. {reference['pages']}")
-        if reference.get('year'):
-            pub_info.append(str(reference['year']))
-        
-        if pub_info:
-            citation_parts.append(", ".join(pub_info) + ".")
-        
-        return f"[{citation_number}] " + " ".join(citation_parts)
+        return CITATION_STYLES['ieee'].format(reference, citation_number)
     
     def format_citation(self, reference: Dict, style: str, citation_number: int = 1) -> str:
         """Format a single citation in the specified style."""
-        style = style.lower()
-        
-        if style == 'apa':
-            return self.generate_apa_citation(reference)
-        elif style == 'vancouver':
-            return self.generate_vancouver_citation(reference, citation_number)
-        elif style == 'mla':
-            return self.generate_mla_citation(reference)
-        elif style == 'chicago':
-            return self.generate_chicago_citation(reference)
-        elif style == 'ieee':
-            return self.generate_ieee_citation(reference, citation_number)
-        else:
-            raise ValueError(f"Unsupported citation style: {style}")
+        return get_citation_style(style).format(reference, citation_number)
     
-    def generate_bibliography(self, style: str, sort_alphabetical: bool = True) -> List[str]:
-        """Generate complete bibliography in specified format."""
+    def generate_bibliography(self, style: str, sort_alphabetical: bool = True,
+                              n_jobs: Optional[int] = None, chunk_size: int = 10000) -> List[str]:
+        """Generate complete bibliography in specified format.
+        
+        Citations are rendered with the style's compiled template. With
+        ``n_jobs > 1``, chunks of ``chunk_size`` references are formatted
+        in a process pool; output order and numbering are unchanged.
+        """
         if not self.reference_database:
             return []
         
-        citations = []
-        references = self.reference_database.copy()
-        
-        # Sort references
-        if sort_alphabetical and style.lower() in ['apa', 'mla', 'chicago']:
-            references.sort(key=lambda x: x.get('authors', '').split(',')[0].strip())
+        template = get_citation_style(style)
+        references = self._bibliography_order(template, sort_alphabetical)
         
         # Generate citations
-        for i, ref in enumerate(references, 1):
+        if n_jobs and n_jobs > 1:
+            rows = map(template.row, references)
+            chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+            citations = []
+            errors = []
+            start = 1
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = []
+                for chunk in chunks:
+                    futures.append(executor.submit(_format_citation_chunk, template, chunk, start))
+                    start += len(chunk)
+                for future in futures:
+                    chunk_citations, chunk_errors = future.result()
+                    citations.extend(chunk_citations)
+                    errors.extend(chunk_errors)
+        else:
+            citations, errors = template.format_many(references)
+        
+        for i, error in errors:
+            print(f"Error formatting reference {i}: {error}")
+        return citations
+    
+    def iter_bibliography(self, style: str, sort_alphabetical: bool = True):
+        """Yield formatted citations one at a time, in generate_bibliography order."""
+        template = get_citation_style(style)
+        for i, ref in enumerate(self._bibliography_order(template, sort_alphabetical), 1):
             try:
-                citation = self.format_citation(ref, style, i)
-                citations.append(citation)
+                yield template.format(ref, i)
             except Exception as e:
                 print(f"Error formatting reference {i}: {e}")
-                continue
-        
-        return citations
+    
+    def _bibliography_order(self, template: CitationTemplate, sort_alphabetical: bool):
+        """References in bibliography order (the SQLite store streams them from its sort index)."""
+        references = self.reference_database
+        if sort_alphabetical and template.name in ['apa', 'mla', 'chicago']:
+            if isinstance(references, ReferenceStore):
+                return references.iter_sorted('sort_key')
+            return sorted(references, key=lambda x: _author_sort_key(x.get('authors')))
+        return references
     
     def convert_citation_format(self, citation_text: str, from_style: str, to_style: str) -> str:
         """Convert citation from one format to another."""
@@ -417,39 +2401,356 @@ class CitationManager:
         return parsed if parsed else None
     
     def extract_citations_from_text(self, text: str) -> List[str]:
-        """Extract citation references from text."""
-        citations = []
+        """Extract citation references from text (unique, in order of first appearance)."""
+        return list(dict.fromkeys(citation['text'] for citation in
+                                  CitationResolver([]).resolve(text, stop_at_references=False)))
+    
+    def citation_resolver(self) -> CitationResolver:
+        """Resolver indexing the current reference database."""
+        return CitationResolver(self.reference_database)
+    
+    def resolve_citations(self, text: str) -> List[Dict]:
+        """Ordered in-text citations of ``text`` mapped to reference indices (see CitationResolver)."""
+        return self.citation_resolver().resolve(text)
+    
+    def resolve_manuscripts(self, directory: str, n_jobs: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """Resolve the citations of every .md/.txt manuscript in ``directory``."""
+        return self.citation_resolver().resolve_directory(directory, n_jobs=n_jobs)
+    
+    def renumber_manuscript(self, input_path: str, output_path: Optional[str] = None,
+                            state_path: Optional[str] = None) -> Dict:
+        """Renumber Vancouver citations by first appearance and rebuild the bibliography.
         
-        # Pattern for numbered citations [1], [2], etc.
-        numbered_pattern = r'\[(\d+(?:,\s*\d+)*(?:-\d+)?)\]'
-        numbered_matches = re.findall(numbered_pattern, text)
-        citations.extend([f"[{match}]" for match in numbered_matches])
+        The manuscript is read section by section (Markdown headings) in a
+        single pass: each ``[n]`` citation gets its new number when first
+        seen and is rewritten immediately (ranges like [3-7] are expanded
+        and re-compressed). The References section is replaced by the
+        cited entries in the new order. When the manuscript has a numbered
+        list, its entries are kept, reformatted with
+        generate_vancouver_citation when a database reference matches them
+        by DOI or title; without a list, old number n is the n-th database
+        reference. Numbers found in neither place get a placeholder that
+        later runs still report as missing.
         
-        # Pattern for author-year citations (Smith, 2020)
-        author_year_pattern = r'\([A-Za-z]+(?:\s+(?:et\s+al\.?|&\s+[A-Za-z]+))?,\s*\d{4}[a-z]?\)'
-        author_year_matches = re.findall(author_year_pattern, text)
-        citations.extend(author_year_matches)
+        With ``state_path``, per-section hashes and output are saved as JSON;
+        a re-run reuses every section whose text and incoming numbering are
+        unchanged, so only edited sections are rescanned. The output is
+        written atomically to ``output_path`` (default: in place).
         
-        return list(set(citations))  # Remove duplicates
+        Returns a summary with the old-to-new ``mapping``, ``missing`` old
+        numbers and the counts of processed and reused sections.
+        """
+        output_path = output_path or input_path
+        try:
+            previous = []
+            if state_path and os.path.exists(state_path):
+                with open(state_path, 'r', encoding='utf-8') as file:
+                    previous = json.load(file).get('sections', [])
+            
+            order = []
+            new_numbers = {}
+            # Rolling fingerprint of ``order``, the numbering a section starts from
+            fingerprint = hashlib.blake2b(digest_size=16)
+            
+            def assign(old):
+                order.append(old)
+                new_numbers[old] = len(order)
+                fingerprint.update(b'%d,' % old)
+            
+            def renumber(match):
+                old_numbers = _expand_citation_numbers(match.group('numbers'), len(self.reference_database))
+                if not old_numbers:
+                    return match.group()
+                for old in old_numbers:
+                    if old not in new_numbers:
+                        assign(old)
+                separator = ', ' if ', ' in match.group() else ','
+                dash = '–' if '–' in match.group() else '-'
+                return f"[{_compress_citation_numbers([new_numbers[old] for old in old_numbers], separator, dash)}]"
+            
+            sections = []
+            listed_references = {}
+            references_heading = None
+            after_references = []
+            processed = reused = 0
+            directory = os.path.dirname(os.path.abspath(output_path))
+            with open(input_path, 'r', encoding='utf-8') as source, \
+                    tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory,
+                                                suffix='.tmp', delete=False) as target:
+                for heading, body in _iter_manuscript_sections(source):
+                    if references_heading is None and _REFERENCES_HEADING.match(heading):
+                        references_heading = heading
+                        listed_references = _parse_reference_list(body)
+                        continue
+                    
+                    text = heading + body
+                    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+                    state_in = fingerprint.hexdigest()
+                    cached = previous[len(sections)] if len(sections) < len(previous) else None
+                    if cached and cached['hash'] == digest and cached['state_in'] == state_in:
+                        output = cached['output']
+                        for old in cached['added']:
+                            assign(old)
+                        reused += 1
+                    else:
+                        first_new = len(order)
+                        # Fenced code is copied unchanged
+                        pieces = []
+                        position = 0
+                        for code in _FENCED_CODE.finditer(text):
+                            pieces.append(_NUMBERED_CITATION.sub(renumber, text[position:code.start()]))
+                            pieces.append(code.group())
+                            position = code.end()
+                        pieces.append(_NUMBERED_CITATION.sub(renumber, text[position:]))
+                        output = ''.join(pieces)
+                        cached = {'hash': digest, 'state_in': state_in, 'added': order[first_new:],
+                                  'output': output}
+                        processed += 1
+                    sections.append(cached)
+                    
+                    # Sections after the bibliography are held back until it is written
+                    if references_heading is None:
+                        target.write(output)
+                    else:
+                        after_references.append(output)
+                
+                if references_heading is None:
+                    references_heading = "\n## References\n"
+                target.write(references_heading + "\n")
+                missing = []
+                match_reference = _listed_reference_matcher(self.reference_database) if listed_references else None
+                for old in order:
+                    entry = listed_references.get(old)
+                    if listed_references:
+                        reference = match_reference(entry) if entry else None
+                    elif 1 <= old <= len(self.reference_database):
+                        reference = self.reference_database[old - 1]
+                    else:
+                        reference = None
+                    if reference is not None:
+                        citation = self.generate_vancouver_citation(reference, new_numbers[old])
+                    elif entry:
+                        citation = f"{new_numbers[old]}. {entry}"
+                    else:
+                        citation = f"{new_numbers[old]}. {_MISSING_REFERENCE.format(old)}"
+                        missing.append(old)
+                    target.write(citation + "\n\n")
+                target.writelines(after_references)
+            # The temporary file is created 0600; keep the mode of the file it replaces
+            shutil.copymode(output_path if os.path.exists(output_path) else input_path, target.name)
+            os.replace(target.name, output_path)
+            
+            if state_path:
+                with open(state_path, 'w', encoding='utf-8') as file:
+                    json.dump({'input': os.path.abspath(input_path), 'sections': sections}, file)
+            
+            return {
+                'output_path': output_path,
+                'mapping': dict(new_numbers),
+                'n_references': len(order),
+                'missing': missing,
+                'sections_processed': processed,
+                'sections_reused': reused
+            }
+        except Exception as e:
+            print(f"Error renumbering manuscript: {e}")
+            if 'target' in locals() and os.path.exists(target.name):
+                os.remove(target.name)
+            return {}
     
-    def check_duplicate_references(self) -> List[Tuple[int, int]]:
-        """Check for duplicate references in the database."""
-        duplicates = []
+    def check_duplicate_references(self, fuzzy: bool = False, threshold: float = 0.8) -> List[Tuple[int, int]]:
+        """Check for duplicate references in the database.
         
-        for i in range(len(self.reference_database)):
-            for j in range(i + 1, len(self.reference_database)):
-                ref1 = self.reference_database[i]
-                ref2 = self.reference_database[j]
-                
-                # Check for duplicates based on title and DOI
-                if (ref1.get('title') and ref2.get('title') and 
-                    ref1['title'].lower().strip() == ref2['title'].lower().strip()):
-                    duplicates.append((i, j))
-                elif (ref1.get('doi') and ref2.get('doi') and 
-                      ref1['doi'] == ref2['doi']):
-                    duplicates.append((i, j))
+        Exact duplicates share a normalized DOI, PMID or title and are found
+        through hash indexes in linear time. With ``fuzzy=True``, near-duplicate
+        titles (Jaccard similarity of character shingles >= ``threshold``) are
+        added using MinHash/LSH (see find_duplicate_clusters).
+        """
+        duplicates = set()
+        for group in self._exact_duplicate_groups():
+            duplicates.update(combinations(group, 2))
+        if fuzzy:
+            duplicates.update(self._near_duplicate_pairs(threshold, expand=True))
+        return sorted(duplicates)
+    
+    def find_duplicate_clusters(self, fuzzy: bool = True, threshold: float = 0.8,
+                                num_perm: int = 128, bands: int = 16) -> List[List[int]]:
+        """Group duplicate references into clusters of database indices.
+        
+        Records are linked when they share a normalized DOI, PMID or title,
+        or (with ``fuzzy=True``) when their titles are near-duplicates. Fuzzy
+        candidates come from MinHash signatures of title shingles, bucketed by
+        LSH bands within blocks of the same year or the same first author, and
+        are verified with the exact Jaccard similarity, so the cost grows
+        roughly linearly with the number of references.
+        """
+        parent = list(range(len(self.reference_database)))
+        
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        def union(i, j):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
         
-        return duplicates
+        for group in self._exact_duplicate_groups():
+            for index in group[1:]:
+                union(group[0], index)
+        if fuzzy:
+            for i, j in self._near_duplicate_pairs(threshold, num_perm, bands):
+                union(i, j)
+        
+        clusters = defaultdict(list)
+        for index in range(len(parent)):
+            clusters[find(index)].append(index)
+        return sorted((members for members in clusters.values() if len(members) > 1),
+                      key=lambda members: members[0])
+    
+    def _exact_duplicate_groups(self) -> List[List[int]]:
+        """Index groups sharing a normalized DOI, PMID or title."""
+        index = defaultdict(list)
+        for i, ref in enumerate(self.reference_database):
+            doi = _normalize_doi(ref.get('doi'))
+            if doi:
+                index[('doi', doi)].append(i)
+            pmid = _normalize_pmid(ref.get('pmid'))
+            if pmid:
+                index[('pmid', pmid)].append(i)
+            title = _normalize_title(ref.get('title'))
+            if title:
+                index[('title', title)].append(i)
+        return [group for group in index.values() if len(group) > 1]
+    
+    def _near_duplicate_pairs(self, threshold: float = 0.8, num_perm: int = 128,
+                              bands: int = 16, max_shingles: int = 1 << 18,
+                              perm_chunk: int = 16, expand: bool = False) -> set:
+        """Verified near-duplicate title pairs found with MinHash/LSH.
+        
+        References with the same normalized title (already paired by the
+        exact index) are hashed once, under the blocking keys of all of them,
+        so common titles such as "Erratum" do not produce quadratic candidate
+        pairs. Pairs are reported between the first references of such groups
+        unless ``expand`` is set, which pairs every member.
+        
+        Titles are hashed in blocks of at most ``max_shingles`` shingles and
+        ``perm_chunk`` permutations at a time, so the hash matrix never
+        exceeds ``perm_chunk * max_shingles`` values (32 MB by default).
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rows = num_perm // bands
+        
+        rng = np.random.default_rng(0)
+        a = (rng.integers(0, 2**63, num_perm, dtype=np.uint64) | np.uint64(1))[:, None]
+        b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)[:, None]
+        band_mix = rng.integers(1, 2**63, rows, dtype=np.uint64)
+        key_mix = rng.integers(1, 2**63, 2, dtype=np.uint64)
+        
+        indices = []
+        titles = []
+        members = []
+        title_docs = {}
+        block_codes = {}
+        doc_blocks = []
+        for i, ref in enumerate(self.reference_database):
+            title = _normalize_title(ref.get('title'))
+            if not title:
+                continue
+            doc = title_docs.get(title)
+            if doc is None:
+                doc = title_docs[title] = len(indices)
+                indices.append(i)
+                titles.append(title.encode('utf-8'))
+                members.append([i])
+                doc_blocks.append(set())
+            else:
+                members[doc].append(i)
+            # Block on year and on first author, so a differing year
+            # (e.g. preprint vs. journal version) can still be matched
+            year = ('year', _clean_text(ref.get('year')).split('.')[0])
+            author = ('author', _first_author_family(ref.get('authors')))
+            doc_blocks[doc].add(block_codes.setdefault(year, len(block_codes)))
+            doc_blocks[doc].add(block_codes.setdefault(author, len(block_codes)))
+        if len(indices) < 2:
+            return set()
+        
+        # Block boundaries by shingle count (one shingle per title byte)
+        bounds = [0]
+        n_shingles = 0
+        for i, title in enumerate(titles):
+            if n_shingles and n_shingles + len(title) > max_shingles:
+                bounds.append(i)
+                n_shingles = 0
+            n_shingles += len(title)
+        bounds.append(len(titles))
+        
+        band_hashes = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            block = titles[start:end]
+            
+            # Shingles are the 4-byte windows starting at every byte of a title,
+            # read directly as 32-bit integers; the padding ends each title
+            padded = np.frombuffer(_SHINGLE_PADDING.join(block) + _SHINGLE_PADDING, dtype=np.uint8)
+            padded = padded.astype(np.uint64)
+            windows = (padded[:-3] << 24) | (padded[1:-2] << 16) | (padded[2:-1] << 8) | padded[3:]
+            lengths = np.array([len(title) for title in block])
+            offsets = np.cumsum(lengths) - lengths
+            starts = offsets + np.arange(len(block)) * len(_SHINGLE_PADDING)
+            shingles = windows[np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())]
+            
+            # MinHash with multiply-shift hashing (wrapping arithmetic is intended)
+            signatures = np.empty((len(block), num_perm), dtype=np.uint64)
+            with np.errstate(over='ignore'):
+                for perm in range(0, num_perm, perm_chunk):
+                    hashed = a[perm:perm + perm_chunk] * shingles
+                    hashed += b[perm:perm + perm_chunk]
+                    hashed >>= np.uint64(32)
+                    signatures[:, perm:perm + perm_chunk] = np.minimum.reduceat(hashed, offsets, axis=1).T
+                band_hashes.append((signatures.reshape(len(block), bands, rows) * band_mix).sum(axis=2))
+        band_hashes = np.concatenate(band_hashes)
+        
+        # Bucket key per (document, band, blocking key); hash collisions only
+        # add candidates, which are verified below
+        n_blocks = np.array([len(blocks) for blocks in doc_blocks])
+        codes = np.fromiter((code for blocks in doc_blocks for code in sorted(blocks)), dtype=np.uint64,
+                            count=n_blocks.sum())
+        doc = np.repeat(np.repeat(np.arange(len(indices)), n_blocks), bands)
+        band = np.tile(np.arange(bands), len(codes))
+        block_code = np.repeat(codes, bands)
+        with np.errstate(over='ignore'):
+            keys = band_hashes[doc, band] + block_code * key_mix[0] + band.astype(np.uint64) * key_mix[1]
+        order = np.argsort(keys, kind='stable')
+        keys, doc = keys[order], doc[order]
+        run_starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        run_lengths = np.diff(np.append(run_starts, len(keys)))
+        
+        pairs = set()
+        checked = set()
+        shingle_sets = {}
+        for start, length in zip(run_starts[run_lengths > 1], run_lengths[run_lengths > 1]):
+            for doc_i, doc_j in combinations(sorted(set(doc[start:start + length].tolist())), 2):
+                if (doc_i, doc_j) in checked:
+                    continue
+                checked.add((doc_i, doc_j))
+                for d in (doc_i, doc_j):
+                    if d not in shingle_sets:
+                        shingle_sets[d] = self._title_shingles(titles[d])
+                set_i, set_j = shingle_sets[doc_i], shingle_sets[doc_j]
+                if len(set_i & set_j) / len(set_i | set_j) >= threshold:
+                    if expand:
+                        pairs.update((min(i, j), max(i, j)) for i in members[doc_i] for j in members[doc_j])
+                    else:
+                        pairs.add((indices[doc_i], indices[doc_j]))
+        return pairs
+    
+    def _title_shingles(self, title: bytes) -> set:
+        """4-byte shingles of a UTF-8 encoded normalized title (one per byte)."""
+        padded = title + _SHINGLE_PADDING
+        return {padded[i:i + 4] for i in range(len(title))}
     
     def validate_doi(self, doi: str) -> bool:
         """Validate DOI by checking if it resolves."""
@@ -500,8 +2801,15 @@ class CitationManager:
         except Exception:
             return False
     
-    def validate_references(self) -> Dict:
-        """Validate all references in the database."""
+    def validate_references(self, offline: bool = False,
+                            validator: Optional[LinkValidator] = None) -> Dict:
+        """Validate all references in the database.
+        
+        DOIs and URLs are resolved concurrently by a LinkValidator (pass a
+        configured one for caching, concurrency or a custom resolver; it is
+        left open for reuse). ``offline=True`` only checks their format,
+        also when a validator is passed.
+        """
         validation_results = {
             'total_references': len(self.reference_database),
             'valid_dois': 0,
@@ -509,14 +2817,17 @@ class CitationManager:
             'valid_urls': 0,
             'invalid_urls': 0,
             'missing_fields': [],
+            'invalid_links': [],
             'duplicates': []
         }
         
         required_fields = ['authors', 'title', 'year']
+        links = []
+        link_indices = []
         
         for i, ref in enumerate(self.reference_database):
             # Check required fields
-            missing = [field for field in required_fields if not ref.get(field)]
+            missing = [field for field in required_fields if not _clean_text(ref.get(field))]
             if missing:
                 validation_results['missing_fields'].append({
                     'reference_index': i,
@@ -524,49 +2835,116 @@ class CitationManager:
                     'title': ref.get('title', 'No title')
                 })
             
-            # Validate DOI
-            if ref.get('doi'):
-                if self.validate_doi(ref['doi']):
-                    validation_results['valid_dois'] += 1
-                else:
-                    validation_results['invalid_dois'] += 1
-            
-            # Validate URL
-            if ref.get('url'):
-                if self.validate_url(ref['url']):
-                    validation_results['valid_urls'] += 1
-                else:
-                    validation_results['invalid_urls'] += 1
+            for kind in ('doi', 'url'):
+                value = _clean_text(ref.get(kind))
+                if value:
+                    links.append((kind, value))
+                    link_indices.append(i)
+        
+        owns_validator = validator is None or (offline and not validator.offline)
+        if owns_validator:
+            validator = LinkValidator(offline=offline)
+        try:
+            results = validator.validate(links)
+        finally:
+            if owns_validator:
+                validator.close()
+        
+        for i, result in zip(link_indices, results):
+            outcome = 'valid' if result['valid'] else 'invalid'
+            validation_results[f"{outcome}_{result['kind']}s"] += 1
+            if not result['valid']:
+                validation_results['invalid_links'].append({
+                    'reference_index': i,
+                    'field': result['kind'],
+                    'value': result['value'],
+                    'status': result['status'],
+                    'unreachable': result['unreachable']
+                })
         
         # Check for duplicates
         validation_results['duplicates'] = self.check_duplicate_references()
         
         return validation_results
     
-    def export_bibliography_to_file(self, filepath: str, style: str, format_type: str = 'text') -> bool:
-        """Export bibliography to file."""
+    EXPORT_FORMATS = ('text', 'html', 'markdown', 'bibtex', 'ris', 'csljson')
+    
+    def export_bibliography_to_file(self, filepath: str, style: str, format_type: str = 'text',
+                                    compress: Optional[bool] = None, sort_alphabetical: bool = True,
+                                    buffer_size: int = 1 << 20) -> bool:
+        """Export bibliography to file.
+        
+        Entries are streamed to a buffered file as they are formatted, so
+        memory use does not grow with the library. ``format_type`` is 'text',
+        'html' or 'markdown' (citations in ``style``), or one of the record
+        formats 'bibtex', 'ris' and 'csljson' (``style`` is not used). The
+        output is gzip-compressed when ``compress`` is true, or when it is
+        None and ``filepath`` ends in '.gz'.
+        """
+        format_type = format_type.lower()
+        if format_type not in self.EXPORT_FORMATS:
+            print(f"Error exporting bibliography: unsupported format {format_type}")
+            return False
+        if compress is None:
+            compress = str(filepath).endswith('.gz')
+        
         try:
-            bibliography = self.generate_bibliography(style)
-            
-            if format_type.lower() == 'text':
-                with open(filepath, 'w', encoding='utf-8') as file:
-                    file.write(f"Bibliography - {style.upper()} Format\n")
-                    file.write("=" * 50 + "\n\n")
-                    for citation in bibliography:
-                        file.write(citation + "\n\n")
-            
-            elif format_type.lower() == 'html':
-                with open(filepath, 'w', encoding='utf-8') as file:
-                    file.write("<html><head><title>Bibliography</title></head><body>\n")
-                    file.write(f"<h1>Bibliography - {style.upper()} Format</h1>\n<ol>\n")
-                    for citation in bibliography:
-                        file.write(f"<li>{citation}</li>\n")
-                    file.write("</ol></body></html>")
-            
+            if format_type in ('text', 'html', 'markdown'):
+                get_citation_style(style)
+            if compress:
+                file = io.TextIOWrapper(io.BufferedWriter(gzip.GzipFile(filepath, 'wb', compresslevel=6),
+                                                          buffer_size), encoding='utf-8')
+            else:
+                file = open(filepath, 'w', encoding='utf-8', buffering=buffer_size)
+            with file:
+                file.writelines(self._export_chunks(style, format_type, sort_alphabetical))
             return True
         except Exception as e:
             print(f"Error exporting bibliography: {e}")
             return False
+    
+    def _export_chunks(self, style: str, format_type: str, sort_alphabetical: bool):
+        """Generate the text of an export piece by piece."""
+        if format_type in ('text', 'html', 'markdown'):
+            template = get_citation_style(style)
+            citations = self.iter_bibliography(template, sort_alphabetical)
+        
+        if format_type == 'text':
+            yield f"Bibliography - {style.upper()} Format\n"
+            yield "=" * 50 + "\n\n"
+            for citation in citations:
+                yield citation + "\n\n"
+        
+        elif format_type == 'html':
+            yield "<html><head><title>Bibliography</title></head><body>\n"
+            yield f"<h1>Bibliography - {html.escape(style.upper())} Format</h1>\n<ol>\n"
+            for citation in citations:
+                yield f"<li>{html.escape(citation)}</li>\n"
+            yield "</ol></body></html>"
+        
+        elif format_type == 'markdown':
+            yield f"# Bibliography - {style.upper()} Format\n\n"
+            for i, citation in enumerate(citations, 1):
+                # Numbered styles already carry their own citation number
+                yield f"{citation}\n\n" if template.numbered else f"{i}. {citation}\n\n"
+        
+        elif format_type == 'bibtex':
+            used_keys = {}
+            for ref in self.reference_database:
+                yield _bibtex_entry(ref, _citation_key(ref, used_keys))
+        
+        elif format_type == 'ris':
+            for ref in self.reference_database:
+                yield _ris_record(ref)
+        
+        elif format_type == 'csljson':
+            # A JSON array written item by item
+            yield "["
+            used_keys = {}
+            for i, ref in enumerate(self.reference_database):
+                item = _csl_item(ref, _citation_key(ref, used_keys))
+                yield (",\n" if i else "\n") + json.dumps(item, ensure_ascii=False)
+            yield "\n]\n"
 
 
 def main():
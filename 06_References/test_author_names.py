@@ -0,0 +1,72 @@
+"""Tests for author-name parsing and the author formatters built on it."""
+
+import pytest
+
+from citation_manager import AuthorName, CitationManager, parse_author_name, parse_authors
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Smith, John A.', AuthorName('Smith', 'John A.', ('J', 'A'))),
+    ('Smith JA', AuthorName('Smith', '', ('J', 'A'))),
+    ('Lee, DK', AuthorName('Lee', '', ('D', 'K'))),
+    ('John A. Smith', AuthorName('Smith', 'John A.', ('J', 'A'))),
+    ('Ludwig van Beethoven', AuthorName('Beethoven', 'Ludwig', ('L',), 'van')),
+    ('van der Berg, Jan', AuthorName('Berg', 'Jan', ('J',), 'van der')),
+    ('Kim, Jin-Ho', AuthorName('Kim', 'Jin-Ho', ('J-H',))),
+    ('Martin Luther King Jr.', AuthorName('King', 'Martin Luther', ('M', 'L'), suffix='Jr.')),
+    ('Smith, John, III', AuthorName('Smith', 'John', ('J',), suffix='III')),
+])
+def test_parse_author_name(name, expected):
+    assert parse_author_name(name) == expected
+
+
+def test_author_name_views():
+    name = parse_author_name('van der Berg, Jin-Ho A.')
+    assert name.full_family == 'van der Berg'
+    assert name.dotted_initials == 'J.-H. A.'
+
+
+@pytest.mark.parametrize('authors, families', [
+    ('Smith, John A., Johnson, Mary B.', ['Smith', 'Johnson']),
+    ('Garcia, Maria, Lee, David K., Patel, Amit', ['Garcia', 'Lee', 'Patel']),
+    ('John A. Smith, Mary B. Johnson', ['Smith', 'Johnson']),
+    ('John Smith, Mary Johnson', ['Smith', 'Johnson']),
+    ('Smith JA, Johnson MB, van der Berg J', ['Smith', 'Johnson', 'van der Berg']),
+    ('Smith, J. and Lee, K.', ['Smith', 'Lee']),
+    ('Smith, J. & Lee, K.', ['Smith', 'Lee']),
+    ('Smith, John; Lee, Kim; World Health Organization', ['Smith', 'Lee', 'Organization']),
+    ('García Márquez, Gabriel José, De la Cruz, Juan Pablo', ['García Márquez', 'De la Cruz']),
+    ('García Márquez, Gabriel J., Smith Jones, Mary', ['García Márquez', 'Smith Jones']),
+])
+def test_parse_authors_splits_entries(authors, families):
+    assert [name.full_family for name in parse_authors(authors)] == families
+
+
+def test_parse_authors_normalizes_unicode():
+    composed = parse_authors('Müller, Hans')
+    decomposed = parse_authors('Müller, Hans')
+    assert composed == decomposed
+
+
+@pytest.mark.parametrize('style, expected', [
+    ('apa', 'García Márquez, G. J., & De la Cruz, J. P.'),
+    ('vancouver', 'García Márquez GJ, De la Cruz JP'),
+])
+def test_formatters_use_parsed_names(style, expected):
+    manager = CitationManager()
+    reference = {'authors': 'García Márquez, Gabriel José, De la Cruz, Juan Pablo', 'title': 'T',
+                 'journal': 'J', 'year': '2020'}
+    assert expected in manager.format_citation(reference, style)
+
+
+@pytest.mark.parametrize('backend', ['list', 'store'])
+def test_bibliography_sorts_by_parsed_first_author(backend):
+    manager = CitationManager()
+    if backend == 'store':
+        manager.use_reference_store()
+    for authors in ['Zhang, Wei', 'Bob Young, Mary Johnson', 'Carter, Amy', 'van der Berg, Jan']:
+        manager.add_reference({'authors': authors, 'title': authors, 'journal': 'J', 'year': '2020'})
+
+    bibliography = manager.generate_bibliography('apa')
+
+    assert [entry.split(',')[0] for entry in bibliography] == ['Carter', 'Young', 'Zhang', 'van der Berg']
@@ -0,0 +1,80 @@
+"""Tests for CitationResolver."""
+
+import pytest
+
+from citation_manager import CitationResolver
+
+REFERENCES = [
+    {'authors': 'Smith, John; Lee, Kim', 'title': 'A', 'year': '2020'},
+    {'authors': 'Lee, Kim; Kim, Min', 'title': 'B', 'year': '2019'},
+    {'authors': 'Lee, Kim', 'title': 'C', 'year': '2019'},
+    {'authors': 'Patel, Amit', 'title': 'D', 'year': 2018.0},
+]
+
+
+@pytest.fixture
+def resolver():
+    return CitationResolver(REFERENCES)
+
+
+@pytest.mark.parametrize('text', [
+    'We enrolled patients (N = 1500) at three sites.',
+    'Costs were high (SD 1200) across arms.',
+    'The effect was significant (p < 0.05, n = 2000).',
+    'Follow-up lasted (Median 1200 days) overall.',
+    'Data from (Table 2, 2020) were excluded.',
+])
+def test_statistics_in_parentheses_are_not_citations(resolver, text):
+    assert resolver.resolve(text) == []
+
+
+def test_author_year_citations(resolver):
+    text = 'Prior work (Smith et al., 2020; Lee & Kim, 2019a) agrees with Smith and Lee (2020) (see Patel 2018).'
+
+    citations = resolver.resolve(text)
+
+    assert [c['text'] for c in citations] == ['(Smith et al., 2020; Lee & Kim, 2019a)', 'Smith and Lee (2020)',
+                                              '(see Patel 2018)']
+    assert citations[0]['keys'] == [('Smith et al.', '2020'), ('Lee & Kim', '2019a')]
+    assert citations[0]['references'] == [0, 1]
+    assert citations[1]['references'] == [0]
+    assert citations[2]['references'] == [3]
+
+
+def test_compound_family_names_and_particles():
+    resolver = CitationResolver([
+        {'authors': 'García Márquez, Gabriel', 'year': '2018'},
+        {'authors': 'Van der Berg, Anna', 'year': '2019'},
+        {'authors': 'van der Berg, Piet', 'year': '2020'},
+        {'authors': 'Márquez, Ana', 'year': '2018'},
+    ])
+    text = ('As García Márquez (2018) and (García Márquez, 2018) note, van der Berg (2019) and '
+            '(Van der Berg, 2020; Márquez 2018) disagree with Berg (2019).')
+
+    citations = resolver.resolve(text)
+
+    assert [c['text'] for c in citations] == ['García Márquez (2018)', '(García Márquez, 2018)', 'van der Berg (2019)',
+                                              '(Van der Berg, 2020; Márquez 2018)', 'Berg (2019)']
+    assert [c['references'] for c in citations] == [[0], [0], [1], [2, 3], [1]]
+
+
+def test_year_suffix_selects_among_same_author_year(resolver):
+    citations = resolver.resolve('(Lee, 2019a, 2019b) and (Lee, 2019)')
+
+    assert citations[0]['references'] == [1, 2]
+    assert citations[1]['references'] == [None] and citations[1]['candidates'] == [[1, 2]]
+
+
+def test_numbered_citations_and_ranges(resolver):
+    citations = resolver.resolve('Shown before [1, 3-4] and [9]; cohort years [2019-2024] are not cited.')
+
+    assert [c['keys'] for c in citations] == [[1, 3, 4], [9]]
+    assert citations[0]['references'] == [0, 2, 3]
+    assert citations[1]['references'] == [None]
+
+
+def test_scanning_stops_at_references_heading(resolver):
+    text = 'Body [1].\n\n## References\n\n1. Smith J. A. 2020 [2].\n'
+
+    assert [c['text'] for c in resolver.resolve(text)] == ['[1]']
+    assert len(resolver.resolve(text, stop_at_references=False)) == 2
@@ -0,0 +1,90 @@
+"""Tests for the compiled citation templates and bibliography generation."""
+
+import pickle
+
+import pytest
+
+from citation_manager import CITATION_STYLES, CitationManager, CitationTemplate, get_citation_style
+
+FULL = {'authors': 'Smith, John A., Johnson, Mary B.', 'title': 'Machine learning in imaging',
+        'journal': 'Journal of the American College of Cardiology', 'year': '2023', 'volume': '15',
+        'issue': '3', 'pages': '245-260', 'doi': '10.1000/182'}
+SPARSE = {'authors': 'Lee, Ann', 'title': 'Registry report', 'journal': 'Heart', 'year': '2020',
+          'url': 'https://example.org/r'}
+
+
+@pytest.mark.parametrize('style, reference, expected', [
+    ('apa', FULL, 'Smith, J. A., & Johnson, M. B. (2023) Machine learning in imaging. '
+                  '*Journal of the American College of Cardiology*, *15*(3), 245-260. https://doi.org/10.1000/182'),
+    ('apa', SPARSE, 'Lee, A. (2020) Registry report. *Heart*. https://example.org/r'),
+    ('vancouver', FULL, '7. Smith JA, Johnson MB. Machine learning in imaging. J Am Coll Cardiol. 2023;15(3):245-260.'),
+    ('vancouver', SPARSE, '7. Lee A. Registry report. Heart. 2020.'),
+    ('mla', FULL, 'Smith, John A., and Mary B. Johnson. "Machine learning in imaging" '
+                  '*Journal of the American College of Cardiology*, vol. 15, no. 3, 2023, pp. 245-260.'),
+    ('mla', SPARSE, 'Lee, Ann. "Registry report" *Heart*, 2020,'),
+    ('chicago', FULL, 'Smith, John A., and Mary B. Johnson "Machine learning in imaging" '
+                      '*Journal of the American College of Cardiology* 15, no. 3 (2023): 245-260.'),
+    ('chicago', SPARSE, 'Lee, Ann "Registry report" *Heart* (2020).'),
+    ('ieee', FULL, '[7] J. A. Smith, M. B. Johnson, "Machine learning in imaging," '
+                   '*Journal of the American College of Cardiology*, vol. 15, no. 3, pp. 245-260, 2023.'),
+    ('ieee', SPARSE, '[7] A. Lee, "Registry report," *Heart*, 2020.'),
+])
+def test_styles_render_expected_citations(style, reference, expected):
+    template = get_citation_style(style.upper())
+
+    assert template.format(reference, 7) == expected
+    assert template.format_rows([template.row(reference)], start=7) == ([expected], [])
+    assert pickle.loads(pickle.dumps(template)).format(reference, 7) == expected
+
+
+def test_template_sections_alternatives_and_escapes():
+    template = CitationTemplate('custom', [
+        '\\[{number}\\]', '{title:period}', '<, |[vol. {volume}[({issue})]][{pages}]>', '{doi}|{url}|\\{none\\}'
+    ])
+
+    assert template.format({'title': 'A', 'volume': 2, 'issue': 4, 'pages': '1-3', 'doi': 'd'}, 5) == \
+        '[5] A. vol. 2(4), 1-3 d'
+    assert template.format({'title': 'A', 'issue': 4, 'url': 'u'}) == '[1] A. u'
+    assert template.format({}) == '[1] {none}'
+    assert template.fields == ('title', 'volume', 'issue', 'pages', 'doi', 'url')
+
+    with pytest.raises(ValueError):
+        CitationTemplate('bad', ['{title:shout}'])
+    with pytest.raises(ValueError):
+        CitationTemplate('bad', ['[{title}'])
+    with pytest.raises(ValueError):
+        get_citation_style('harvard')
+
+
+@pytest.fixture
+def manager():
+    manager = CitationManager()
+    manager.reference_database = [
+        dict(FULL, authors=f"{family}, Ann", year=str(2000 + n % 20), issue=None if n % 3 else str(n))
+        for n, family in enumerate(['Young', 'Adams', 'Moore', 'Baker', 'Ortiz', 'Clark', 'Nguyen'] * 5)
+    ]
+    return manager
+
+
+@pytest.mark.parametrize('style', sorted(CITATION_STYLES))
+def test_pooled_bibliography_matches_serial(manager, style):
+    serial = manager.generate_bibliography(style)
+
+    assert manager.generate_bibliography(style, n_jobs=2, chunk_size=4) == serial
+    assert list(manager.iter_bibliography(style)) == serial
+    assert len(serial) == 35
+    if CITATION_STYLES[style].numbered:
+        assert [citation.split(' ', 1)[0].strip('[].') for citation in serial] == [str(n) for n in range(1, 36)]
+    else:
+        assert serial[0].startswith('Adams') and serial[-1].startswith('Young')
+
+
+def test_formatting_errors_are_reported_and_skipped(manager, capsys):
+    manager.reference_database[3]['journal'] = ['unhashable']
+
+    serial = manager.generate_bibliography('vancouver')
+    pooled = manager.generate_bibliography('vancouver', n_jobs=2, chunk_size=4)
+
+    assert pooled == serial and len(serial) == 34
+    assert serial[3].startswith('5. ')
+    assert capsys.readouterr().out.count('Error formatting reference 4:') == 2
@@ -0,0 +1,73 @@
+"""Tests for duplicate detection in CitationManager."""
+
+import pytest
+
+from citation_manager import CitationManager
+
+
+@pytest.fixture
+def manager():
+    manager = CitationManager()
+    manager.reference_database = [
+        {'title': 'Deep learning for coronary angiography', 'authors': 'Smith, J.', 'year': '2020',
+         'doi': '10.1000/abc'},
+        {'title': 'An unrelated registry study', 'authors': 'Jones, K.', 'year': '2020',
+         'doi': 'https://doi.org/10.1000/ABC'},
+        {'title': 'Point cloud segmentation of the subclavian artery', 'authors': 'Wang, L.',
+         'year': '2021', 'pmid': '12345'},
+        {'title': 'Point-Cloud Segmentation of the Subclavian Artery.', 'authors': 'Li, H.',
+         'year': '2019'},
+        {'title': 'Subclavian artery point clouds', 'authors': 'Wang, L.', 'year': '2022',
+         'pmid': 12345.0},
+        {'title': 'Point cloud segmentation of the subclavian arteries', 'authors': 'Wang, L.',
+         'year': '2021'},
+        {'title': 'Transcatheter valve outcomes in elderly patients', 'authors': 'Brown, A.',
+         'year': '2018'},
+    ]
+    return manager
+
+
+def test_exact_duplicates_by_doi_pmid_and_title(manager):
+    assert manager.check_duplicate_references() == [(0, 1), (2, 3), (2, 4)]
+
+
+def test_fuzzy_duplicates_are_verified_by_jaccard(manager):
+    # 5 is a near-duplicate of 2 (same year and first author, Jaccard 0.82);
+    # 3 shares no blocking key with 5 but has the same title as 2, so it is
+    # hashed together with 2 and paired with 5 as well
+    assert manager.check_duplicate_references(fuzzy=True, threshold=0.8) == [(0, 1), (2, 3), (2, 4), (2, 5), (3, 5)]
+    assert manager.check_duplicate_references(fuzzy=True, threshold=0.9) == [(0, 1), (2, 3), (2, 4)]
+
+
+def test_duplicate_clusters(manager):
+    clusters = manager.find_duplicate_clusters(threshold=0.8)
+    assert clusters == [[0, 1], [2, 3, 4, 5]]
+    assert manager.find_duplicate_clusters(fuzzy=False) == [[0, 1], [2, 3, 4]]
+
+
+def test_near_duplicates_do_not_depend_on_block_or_permutation_chunking(manager):
+    manager.reference_database = manager.reference_database * 40
+    expected = manager._near_duplicate_pairs(0.8)
+    assert manager._near_duplicate_pairs(0.8, max_shingles=64, perm_chunk=128) == expected
+    assert manager._near_duplicate_pairs(0.8, max_shingles=1 << 20, perm_chunk=1) == expected
+
+
+def test_band_count_must_divide_permutations(manager):
+    with pytest.raises(ValueError):
+        manager._near_duplicate_pairs(num_perm=100, bands=16)
+
+
+def test_identical_titles_are_hashed_once(manager, monkeypatch):
+    manager.reference_database = [
+        {'title': 'Correction to the coronary registry report', 'authors': f'Author{n}, A.',
+         'year': str(1990 + n % 30)} for n in range(2000)
+    ] + [{'title': 'Correction to the Coronary Registry Report.', 'authors': 'Other, B.', 'year': '2001'},
+         {'title': 'Correction to the coronary registry reports', 'authors': 'Author5, A.', 'year': '1995'}]
+    verified = []
+    title_shingles = CitationManager._title_shingles
+    monkeypatch.setattr(CitationManager, '_title_shingles',
+                        lambda self, title: verified.append(title) or title_shingles(self, title))
+
+    assert manager._near_duplicate_pairs(0.8) == {(0, 2001)}
+    assert len(verified) == 2
+    assert manager._near_duplicate_pairs(0.8, expand=True) == {(n, 2001) for n in range(2001)}
@@ -0,0 +1,122 @@
+"""Tests for CitationManager.export_bibliography_to_file."""
+
+import gzip
+import json
+import re
+
+import pytest
+
+from citation_manager import CitationManager, _bibtex_value
+
+REFERENCES = [
+    {'authors': 'Smith, John A., Johnson, Mary B.', 'title': 'Machine learning in imaging',
+     'journal': 'Journal of Medical AI', 'year': '2023', 'volume': '15', 'issue': '3',
+     'pages': '245-260', 'doi': '10.1000/182', 'keywords': 'machine learning; imaging'},
+    {'authors': 'Smith, Jane', 'title': 'A {curly} title with 50% & x_1, a \\ and ~2^3',
+     'journal': 'Cardiology Research', 'year': 2023.0, 'pages': '1–9',
+     'abstract': 'Unbalanced } brace', 'url': 'https://example.org/{id}', 'source_type': 'Book'},
+]
+
+
+@pytest.fixture
+def manager():
+    manager = CitationManager()
+    manager.reference_database = [dict(reference) for reference in REFERENCES]
+    return manager
+
+
+def _braces_balanced(text):
+    depth = 0
+    for char in text:
+        depth += {'{': 1, '}': -1}.get(char, 0)
+        if depth < 0:
+            return False
+    return depth == 0
+
+
+def test_bibtex_value_escapes_every_special_character():
+    assert _bibtex_value('title', '50% & $5 #1 x_1') == r'50\% \& \$5 \#1 x\_1'
+    assert _bibtex_value('title', 'a \\ b') == r'a \textbackslash{} b'
+    assert _bibtex_value('title', '{ } ~ ^') == r'\textbraceleft{} \textbraceright{} \textasciitilde{} \textasciicircum{}'
+    assert _bibtex_value('url', 'https://x.org/{a}_%20') == 'https://x.org/%7Ba%7D_%20'
+
+
+def test_bibtex_export(manager, tmp_path):
+    path = tmp_path / 'library.bib'
+    assert manager.export_bibliography_to_file(str(path), 'apa', 'bibtex')
+    text = path.read_text(encoding='utf-8')
+
+    entries = re.findall(r'^@(\w+)\{([^,]+),', text, re.MULTILINE)
+    assert entries == [('article', 'smith2023'), ('book', 'smith2023a')]
+    assert 'author = {Smith, John A. and Johnson, Mary B.}' in text
+    assert 'pages = {1--9}' in text
+    assert 'keywords = {machine learning, imaging}' in text
+    for entry in text.split('\n\n@'):
+        assert _braces_balanced(entry)
+    assert '\\ and' not in text
+
+
+def test_ris_export(manager, tmp_path):
+    path = tmp_path / 'library.ris'
+    assert manager.export_bibliography_to_file(str(path), 'apa', 'ris')
+    records = path.read_text(encoding='utf-8').split('ER  - \n')
+
+    assert records[0].startswith('TY  - JOUR\nAU  - Smith, John A.\nAU  - Johnson, Mary B.\n')
+    assert 'SP  - 245\nEP  - 260' in records[0]
+    assert 'KW  - machine learning\nKW  - imaging' in records[0]
+    assert records[1].strip().startswith('TY  - BOOK')
+
+
+def test_csl_json_export(manager, tmp_path):
+    path = tmp_path / 'library.json'
+    assert manager.export_bibliography_to_file(str(path), 'apa', 'csljson')
+    items = json.loads(path.read_text(encoding='utf-8'))
+
+    assert [item['id'] for item in items] == ['smith2023', 'smith2023a']
+    assert items[0]['author'] == [{'family': 'Smith', 'given': 'John A.'}, {'family': 'Johnson', 'given': 'Mary B.'}]
+    assert items[0]['issued'] == {'date-parts': [[2023]]}
+    assert items[1]['title'] == REFERENCES[1]['title']
+
+
+@pytest.mark.parametrize('format_type, marker', [
+    ('text', 'Bibliography - APA Format'),
+    ('html', '<li>Smith, J. A., &amp; Johnson, M. B. (2023) Machine learning in imaging.'),
+    ('markdown', '1. Smith, J. A., & Johnson, M. B. (2023) Machine learning in imaging.'),
+])
+def test_formatted_exports(manager, tmp_path, format_type, marker):
+    path = tmp_path / f'library.{format_type}'
+    assert manager.export_bibliography_to_file(str(path), 'apa', format_type)
+    assert marker in path.read_text(encoding='utf-8')
+
+
+def test_vancouver_markdown_keeps_citation_numbers(manager, tmp_path):
+    path = tmp_path / 'library.md'
+    assert manager.export_bibliography_to_file(str(path), 'vancouver', 'markdown')
+    lines = [line for line in path.read_text(encoding='utf-8').splitlines() if line[:1].isdigit()]
+    assert [line.split('.')[0] for line in lines] == ['1', '2']
+
+
+@pytest.mark.parametrize('fields, expected', [
+    ({'year': '2022', 'volume': '12', 'issue': '1', 'pages': '15-25'}, 'J AI. 2022;12(1):15-25.'),
+    ({'year': '2022', 'pages': '15-25'}, 'J AI. 2022:15-25.'),
+    ({'volume': '12', 'pages': '15-25'}, 'J AI. 12:15-25.'),
+    ({'year': '2022'}, 'J AI. 2022.'),
+])
+def test_vancouver_separates_year_and_volume(fields, expected):
+    reference = dict({'authors': 'Smith, John A.', 'title': 'First study on AI applications', 'journal': 'J AI'},
+                     **fields)
+    citation = CitationManager().generate_vancouver_citation(reference, 1)
+    assert citation == f"1. Smith JA. First study on AI applications. {expected}"
+
+
+def test_gzip_export_matches_plain_export(manager, tmp_path):
+    plain, compressed = tmp_path / 'library.ris', tmp_path / 'library.ris.gz'
+    assert manager.export_bibliography_to_file(str(plain), 'apa', 'ris')
+    assert manager.export_bibliography_to_file(str(compressed), 'apa', 'ris')
+    with gzip.open(compressed, 'rt', encoding='utf-8') as file:
+        assert file.read() == plain.read_text(encoding='utf-8')
+
+
+def test_export_rejects_unknown_format_and_style(manager, tmp_path):
+    assert not manager.export_bibliography_to_file(str(tmp_path / 'x'), 'apa', 'docx')
+    assert not manager.export_bibliography_to_file(str(tmp_path / 'x'), 'harvard', 'text')
@@ -0,0 +1,220 @@
+"""Tests for the reference importers and CitationManager.import_references."""
+
+import gzip
+
+import pytest
+
+from citation_manager import CitationManager, _iter_bibtex, detect_reference_format, iter_references_from_file
+
+BIBTEX = r"""
+@string{jmai = "Journal of Medical AI"}
+
+@Article{smith2023,
+  author = {Smith, John A. and M{\"u}ller, Hans and {World Health Organization}},
+  title = {{Machine} learning in imaging},
+  journal = jmai,
+  year = 2023,
+  volume = {15}, number = {3}, pages = {245--260},
+  doi = {https://doi.org/10.1000/182},
+}
+
+@comment{ignored}
+
+@book(lee2020,
+  author = "Lee, Kim",
+  title = "Point clouds (and meshes)",
+  publisher = {Springer},
+  year = {2020}
+)
+"""
+
+RIS = """TY  - JOUR
+AU  - Smith, John A.
+AU  - Lee, Kim
+TI  - Vessel segmentation
+  with point clouds
+JO  - Medical Image Analysis
+PY  - 2021
+SP  - 10
+EP  - 19
+KW  - vessels
+KW  - point clouds
+DO  - 10.1000/ABC
+ER  -
+"""
+
+MEDLINE = """PMID- 12345
+TI  - Catheter exchange outcomes.
+FAU - Garcia, Maria
+FAU - Lee, Kim
+DP  - 2019 Mar
+JT  - Cardiology Research
+LID - 10.1000/xyz [doi]
+MH  - *Catheters
+
+PMID- 67890
+TI  - Second record.
+AU  - Patel A
+DP  - 2020
+"""
+
+PUBMED_XML = """<?xml version="1.0"?>
+<PubmedArticleSet>
+<PubmedArticle>
+  <MedlineCitation>
+    <PMID>111</PMID>
+    <Article>
+      <Journal><JournalIssue><Volume>7</Volume><PubDate><Year>2022</Year></PubDate></JournalIssue>
+        <Title>Radiology</Title></Journal>
+      <ArticleTitle>Deep <i>learning</i> for CT</ArticleTitle>
+      <AuthorList>
+        <Author><LastName>Kim</LastName><ForeName>Jin-Ho</ForeName></Author>
+        <Author><CollectiveName>CT Consortium</CollectiveName></Author>
+      </AuthorList>
+      <ELocationID EIdType="doi">10.1000/ct</ELocationID>
+      <Abstract><AbstractText Label="AIM">Test.</AbstractText></Abstract>
+    </Article>
+  </MedlineCitation>
+</PubmedArticle>
+</PubmedArticleSet>
+"""
+
+ENDNOTE_XML = """<xml><records><record>
+  <ref-type name="Journal Article">17</ref-type>
+  <contributors><authors><author>Smith, John</author></authors></contributors>
+  <titles><title>EndNote title</title><secondary-title>EndNote Journal</secondary-title></titles>
+  <dates><year>2018</year></dates>
+</record></records></xml>
+"""
+
+REFER = """%0 Journal Article
+%A Smith, John
+%T Refer title
+%J Refer Journal
+%D 2017
+
+%0 Book
+%A Lee, Kim
+%T Second refer title
+%D 2016
+"""
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_bibtex_import(tmp_path):
+    references = list(iter_references_from_file(_write(tmp_path, 'library.bib', BIBTEX)))
+
+    assert [ref['title'] for ref in references] == ['Machine learning in imaging', 'Point clouds (and meshes)']
+    first, second = references
+    assert first['authors'] == 'Smith, John A.; Müller, Hans; World Health Organization'
+    assert first['journal'] == 'Journal of Medical AI'
+    assert (first['year'], first['pages'], first['doi']) == ('2023', '245-260', '10.1000/182')
+    assert (second['source_type'], second['publisher'], second['year']) == ('Book', 'Springer', '2020')
+
+
+def test_bibtex_resyncs_after_an_unclosed_entry(tmp_path, capsys):
+    valid = [f"@article{{key{n},\n  title = {{Valid {n}}},\n  year = {{2020}}\n}}\n\n" for n in range(200)]
+    broken = "@article{broken,\n  title = {Missing its closing brace,\n  year = {2021}\n\n"
+    path = _write(tmp_path, 'library.bib', ''.join(valid[:100] + [broken] + valid[100:]))
+    manager = CitationManager()
+
+    assert manager.import_references(path)
+
+    titles = [ref['title'] for ref in manager.reference_database]
+    assert len(titles) == 200 and 'Valid 199' in titles
+    assert 'Skipping malformed BibTeX entry at line 501' in capsys.readouterr().out
+
+
+def test_bibtex_reports_an_unclosed_final_entry(tmp_path, capsys):
+    path = _write(tmp_path, 'library.bib', BIBTEX + "@article{tail, title = {Never closed\n")
+
+    assert len(list(iter_references_from_file(path))) == 2
+    assert 'Skipping malformed BibTeX entry' in capsys.readouterr().out
+
+
+def test_bibtex_entries_spanning_read_chunks(tmp_path):
+    path = _write(tmp_path, 'library.bib', BIBTEX * 3)
+    assert len(list(_iter_bibtex(path, chunk_size=7))) == 6
+
+
+def test_bibtex_export_round_trip(tmp_path):
+    manager = CitationManager()
+    reference = {'authors': 'Smith, John A.; Johnson, Mary B.', 'title': 'A {curly} title with 50% & x_1, a \\ and ~2^3',
+                 'journal': 'Journal of Medical AI', 'year': '2023', 'volume': '15', 'pages': '245-260',
+                 'doi': '10.1000/182', 'url': 'https://example.org/a_b'}
+    manager.reference_database = [dict(reference)]
+    path = str(tmp_path / 'library.bib')
+    assert manager.export_bibliography_to_file(path, 'apa', 'bibtex')
+
+    imported, = iter_references_from_file(path)
+
+    for field in reference:
+        assert imported[field] == reference[field]
+
+
+def test_ris_export_round_trip(tmp_path):
+    manager = CitationManager()
+    manager.reference_database = list(iter_references_from_file(_write(tmp_path, 'in.ris', RIS)))
+    path = str(tmp_path / 'out.ris')
+    assert manager.export_bibliography_to_file(path, 'apa', 'ris')
+
+    original, = manager.reference_database
+    imported, = iter_references_from_file(path)
+
+    assert original['title'] == 'Vessel segmentation with point clouds'
+    for field in ('authors', 'title', 'journal', 'year', 'pages', 'doi', 'keywords'):
+        assert imported[field] == original[field]
+
+
+def test_medline_import(tmp_path):
+    first, second = iter_references_from_file(_write(tmp_path, 'records.nbib', MEDLINE))
+
+    assert first['authors'] == 'Garcia, Maria; Lee, Kim'
+    assert (first['pmid'], first['year'], first['doi']) == ('12345', '2019', '10.1000/xyz')
+    assert first['keywords'] == 'Catheters'
+    assert second['authors'] == 'Patel, A.'
+
+
+def test_pubmed_xml_import(tmp_path):
+    reference, = iter_references_from_file(_write(tmp_path, 'pubmed.xml', PUBMED_XML))
+
+    assert reference['title'] == 'Deep learning for CT'
+    assert reference['authors'] == 'Kim, Jin-Ho; CT Consortium'
+    assert (reference['year'], reference['volume'], reference['doi']) == ('2022', '7', '10.1000/ct')
+    assert reference['abstract'] == 'AIM: Test.'
+
+
+def test_endnote_and_refer_import(tmp_path):
+    endnote, = iter_references_from_file(_write(tmp_path, 'library.xml', ENDNOTE_XML))
+    refer = list(iter_references_from_file(_write(tmp_path, 'library.enw', REFER)))
+
+    assert (endnote['title'], endnote['journal'], endnote['year']) == ('EndNote title', 'EndNote Journal', '2018')
+    assert [ref['title'] for ref in refer] == ['Refer title', 'Second refer title']
+
+
+@pytest.mark.parametrize('name, text, expected', [
+    ('a.txt', PUBMED_XML, 'pubmed'),
+    ('a.xml', ENDNOTE_XML, 'endnote'),
+    ('a.txt', MEDLINE, 'medline'),
+    ('a.txt', RIS, 'ris'),
+    ('a.txt', BIBTEX, 'bibtex'),
+    ('a.txt', '@book(lee2020, title = "x")', 'bibtex'),
+    ('a.txt', REFER, 'refer'),
+    ('a.bib', '', 'bibtex'),
+])
+def test_detect_reference_format(tmp_path, name, text, expected):
+    assert detect_reference_format(_write(tmp_path, name, text)) == expected
+
+
+def test_gzip_input(tmp_path):
+    path = tmp_path / 'library.ris.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        file.write(RIS)
+
+    reference, = iter_references_from_file(str(path))
+    assert reference['journal'] == 'Medical Image Analysis'
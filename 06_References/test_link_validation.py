@@ -0,0 +1,144 @@
+"""Tests for LinkValidator and CitationManager.validate_references."""
+
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from citation_manager import CitationManager, LinkValidator
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # path -> list of statuses returned on successive requests (last one repeats)
+    responses = {}
+    requests = []
+
+    def do_HEAD(self):
+        self.requests.append(self.path)
+        statuses = self.responses.get(self.path, [404])
+        status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        self.send_response(status)
+        if status in (301, 302):
+            self.send_header('Location', 'https://publisher.invalid/article')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.responses = {'/10.1000/ok': [302], '/10.1000/flaky': [503, 200], '/page': [200]}
+    _Handler.requests = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class _TrackingValidator(LinkValidator):
+    closed = 0
+
+    def close(self):
+        self.closed += 1
+        super().close()
+
+    def _request(self, url, follow_redirects):
+        raise AssertionError("offline validation must not touch the network")
+
+
+@pytest.fixture
+def manager():
+    manager = CitationManager()
+    manager.reference_database = [
+        {'authors': 'Smith, J.', 'title': 'A', 'year': '2020', 'doi': 'doi:10.1000/ok'},
+        {'authors': 'Lee, K.', 'title': 'B', 'year': '2021', 'doi': 'not a doi', 'url': 'ftp://x'},
+        {'authors': '', 'title': 'C', 'year': '2022', 'url': 'https://example.org/paper'},
+    ]
+    return manager
+
+
+def test_format_checks():
+    assert LinkValidator.normalize_doi('https://dx.doi.org/10.1000/xyz') == '10.1000/xyz'
+    assert LinkValidator.normalize_doi('doi: 10.1000/xyz') == '10.1000/xyz'
+    assert LinkValidator.normalize_doi('11.1000/xyz') is None
+    assert LinkValidator.url_format_valid('https://example.org/a')
+    assert not LinkValidator.url_format_valid('example.org/a')
+
+
+def test_validate_references_offline(manager):
+    results = manager.validate_references(offline=True)
+
+    assert (results['valid_dois'], results['invalid_dois']) == (1, 1)
+    assert (results['valid_urls'], results['invalid_urls']) == (1, 1)
+    assert results['missing_fields'] == [{'reference_index': 2, 'missing': ['authors'], 'title': 'C'}]
+    assert {(link['reference_index'], link['field']) for link in results['invalid_links']} == {(1, 'doi'), (1, 'url')}
+
+
+def test_offline_is_honoured_with_a_validator_and_caller_validator_stays_open(manager):
+    validator = _TrackingValidator()
+
+    results = manager.validate_references(offline=True, validator=validator)
+
+    assert results['valid_dois'] == 1
+    assert validator.closed == 0
+
+
+def test_online_validation_with_retries_and_cache(server, tmp_path):
+    cache_path = str(tmp_path / 'links.json')
+    validator = LinkValidator(doi_resolver=server, cache_path=cache_path, backoff=0.01)
+    items = [('doi', '10.1000/ok'), ('doi', '10.1000/missing'), ('doi', '10.1000/flaky'),
+             ('url', f"{server}/page"), ('doi', '10.1000/ok')]
+
+    results = validator.validate(items)
+    validator.close()
+
+    assert [r['valid'] for r in results] == [True, False, True, True, True]
+    assert [r['status'] for r in results] == [302, 404, 200, 200, 302]
+    assert _Handler.requests.count('/10.1000/flaky') == 2
+    assert _Handler.requests.count('/10.1000/ok') == 1
+
+    _Handler.requests.clear()
+    cached = LinkValidator(doi_resolver=server, cache_path=cache_path).validate(items[:2])
+    assert all(r['cached'] for r in cached)
+    assert _Handler.requests == []
+
+
+def test_validate_references_online_uses_caller_validator(manager, server):
+    manager.reference_database[2]['url'] = f"{server}/page"
+    validator = LinkValidator(doi_resolver=server)
+
+    results = manager.validate_references(validator=validator)
+
+    assert results['valid_dois'] == 1 and results['valid_urls'] == 1
+    assert validator._session is not None
+    validator.close()
+
+
+@pytest.fixture
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_unreachable_links_are_invalid_and_not_cached(manager, closed_port, tmp_path):
+    url = f"http://127.0.0.1:{closed_port}/paper"
+    cache_path = str(tmp_path / 'links.json')
+    validator = LinkValidator(doi_resolver=f"http://127.0.0.1:{closed_port}", cache_path=cache_path,
+                              retries=1, backoff=0.01, timeout=1)
+
+    results = validator.validate([('url', url), ('doi', '10.1000/ok')])
+
+    assert [(r['valid'], r['verified'], r['unreachable']) for r in results] == [(False, False, True)] * 2
+    assert validator._cache == {}
+
+    manager.reference_database[2]['url'] = url
+    summary = manager.validate_references(validator=validator)
+    validator.close()
+    assert (summary['valid_dois'], summary['valid_urls']) == (0, 0)
+    assert {(link['reference_index'], link['field'], link['unreachable']) for link in summary['invalid_links']} == {
+        (0, 'doi', True), (1, 'doi', False), (1, 'url', False), (2, 'url', True)}
@@ -0,0 +1,107 @@
+"""Tests for the SQLite-backed ReferenceStore."""
+
+import pytest
+
+from citation_manager import CitationManager, ReferenceStore
+
+REFERENCES = [
+    {'authors': 'Smith, John A., Lee, Kim', 'title': 'Vessel segmentation with point clouds',
+     'journal': 'Medical Image Analysis', 'year': '2021', 'doi': 'https://doi.org/10.1000/ABC',
+     'pmid': 12345.0, 'abstract': 'Subclavian artery geometry', 'dataset': 'internal'},
+    {'authors': 'García Márquez, Gabriel', 'title': 'Catheter exchange outcomes', 'year': 2019.0,
+     'keywords': 'catheter; outcomes'},
+    {'authors': 'Lee, Kim', 'title': 'Registry of coronary interventions', 'year': '2021'},
+]
+
+
+@pytest.fixture
+def store():
+    store = ReferenceStore()
+    store.add_many(REFERENCES)
+    yield store
+    store.close()
+
+
+def test_sequence_protocol(store):
+    assert len(store) == 3
+    assert store[0]['title'] == REFERENCES[0]['title']
+    assert store[-1]['title'] == REFERENCES[2]['title']
+    assert [ref['title'] for ref in store[1:]] == [REFERENCES[1]['title'], REFERENCES[2]['title']]
+    assert [ref['title'] for ref in store[::2]] == [REFERENCES[0]['title'], REFERENCES[2]['title']]
+    assert store[5:] == []
+    with pytest.raises(IndexError):
+        store[3]
+    assert [ref['title'] for ref in store] == [ref['title'] for ref in REFERENCES]
+
+
+def test_values_are_normalized_like_the_list_backend(store):
+    first = store[0]
+    assert first['year'] == '2021'
+    assert store[1]['year'] == '2019'
+    assert first['pmid'] == '12345'
+    assert first['dataset'] == 'internal'
+
+
+def test_indexed_lookups(store):
+    assert [ref['title'] for ref in store.find_by_doi('10.1000/abc')] == [REFERENCES[0]['title']]
+    assert len(store.find_by_pmid('12345')) == 1
+    assert len(store.find_by_year(2021)) == 2
+    assert len(store.find_by_year('2021')) == 2
+    assert [ref['title'] for ref in store.find_by_first_author('Lee, K.')] == [REFERENCES[2]['title']]
+    assert [ref['title'] for ref in store.find_by_first_author('García Márquez, G.')] == [REFERENCES[1]['title']]
+    store.append({'authors': 'Van der Berg, Anna', 'title': 'Particles'})
+    assert [ref['title'] for ref in store.find_by_first_author('van der Berg, A.')] == ['Particles']
+    assert [ref['title'] for ref in store.full_text_search('catheter')] == [REFERENCES[1]['title']]
+
+
+def test_full_text_queries_are_quoted_unless_raw(store):
+    store.append({'title': 'COVID-19 and "stent" thrombosis', 'year': '2021'})
+
+    assert [ref['title'] for ref in store.full_text_search('covid-19')] == ['COVID-19 and "stent" thrombosis']
+    assert len(store.full_text_search('"stent" AND: NEAR(')) == 0
+    assert [ref['title'] for ref in store.full_text_search('Catheter OUTCOMES')] == [REFERENCES[1]['title']]
+    assert store.full_text_search('   ') == []
+
+    assert len(store.full_text_search('catheter OR vessel*', raw=True)) == 2
+    with pytest.raises(ValueError):
+        store.full_text_search('covid-19', raw=True)
+
+def test_positions_follow_appends_and_deletes(store):
+    ids = store.ids()
+    assert store[2]['title'] == REFERENCES[2]['title']
+
+    store.append({'title': 'Appended', 'year': '2024'})
+    assert len(store) == 4 and store[-1]['title'] == 'Appended'
+
+    assert store.delete(ids[1])
+    assert len(store) == 3
+    assert [ref['title'] for ref in store] == [REFERENCES[0]['title'], REFERENCES[2]['title'], 'Appended']
+    assert store[1]['title'] == REFERENCES[2]['title']
+
+    assert store.update(ids[0], {'title': 'Updated'})
+    assert store[0]['title'] == 'Updated'
+    assert store.full_text_search('updated')[0]['title'] == 'Updated'
+
+    store.clear()
+    assert len(store) == 0
+
+
+def test_manager_with_store_backend(tmp_path):
+    manager = CitationManager(str(tmp_path / 'library.db'))
+    for reference in REFERENCES:
+        manager.add_reference(reference)
+    assert len(manager.reference_database) == 3
+    assert manager.check_duplicate_references() == []
+    assert manager.generate_bibliography('apa')[0].startswith('García Márquez, G.')
+    manager.reference_database.close()
+
+    reopened = ReferenceStore(str(tmp_path / 'library.db'))
+    assert len(reopened) == 3 and reopened[0]['year'] == '2021'
+    reopened.close()
+
+
+def test_use_reference_store_moves_list_references():
+    manager = CitationManager()
+    manager.reference_database = [dict(reference) for reference in REFERENCES]
+    store = manager.use_reference_store()
+    assert manager.reference_database is store and len(store) == 3
@@ -0,0 +1,131 @@
+"""Tests for CitationManager.renumber_manuscript."""
+
+import os
+import stat
+
+import pytest
+
+from citation_manager import CitationManager
+
+MANUSCRIPT = """# Title
+
+## Introduction
+
+First [3], then [1-2] and [5].
+
+```python
+values = [3]
+```
+
+## Methods
+
+Again [3, 5] and a span [2019-2024].
+
+## References
+
+1. Alpha A. First listed reference. J One. 2020;1:1-2.
+
+2. Beta B. Second listed reference. J Two. 2021;2:3-4.
+
+3. Gamma C. Third listed reference. doi:10.1000/third.
+
+## Appendix
+
+See [1].
+"""
+
+
+@pytest.fixture
+def manuscript(tmp_path):
+    path = tmp_path / 'paper.md'
+    path.write_text(MANUSCRIPT, encoding='utf-8')
+    return path
+
+
+def test_renumbers_by_first_appearance(manuscript):
+    result = CitationManager().renumber_manuscript(str(manuscript))
+    text = manuscript.read_text(encoding='utf-8')
+
+    assert result['mapping'] == {3: 1, 1: 2, 2: 3, 5: 4}
+    assert result['missing'] == [5]
+    assert 'First [1], then [2,3] and [4].' in text
+    assert 'values = [3]' in text
+    assert 'Again [1, 4] and a span [2019-2024].' in text
+    assert '1. Gamma C. Third listed reference. doi:10.1000/third.\n\n2. Alpha A. First listed' in text
+    assert '4. [Reference 5 not found]' in text
+    assert text.index('## References') < text.index('## Appendix') and text.endswith('See [2].\n')
+
+
+def test_rerun_still_reports_missing_references(manuscript):
+    manager = CitationManager()
+    manager.renumber_manuscript(str(manuscript))
+
+    result = manager.renumber_manuscript(str(manuscript))
+
+    assert result['missing'] == [4]
+    assert result['mapping'] == {1: 1, 2: 2, 3: 3, 4: 4}
+    assert '4. [Reference 4 not found]' in manuscript.read_text(encoding='utf-8')
+
+
+def test_manuscript_list_takes_priority_over_database_positions(manuscript):
+    manager = CitationManager()
+    manager.reference_database = [
+        {'authors': 'Unrelated, Zed', 'title': 'Unrelated paper', 'journal': 'J Z', 'year': '2000'},
+        {'authors': 'Other, Yan', 'title': 'Another unrelated paper', 'journal': 'J Y', 'year': '2001'},
+        {'authors': 'Third, Xi', 'title': 'Database copy of the third', 'journal': 'J X', 'year': '2022',
+         'doi': '10.1000/THIRD'},
+        {'authors': 'Beta, Bo', 'title': 'Second listed reference', 'journal': 'J Two', 'year': '2021'},
+    ]
+
+    manager.renumber_manuscript(str(manuscript))
+    text = manuscript.read_text(encoding='utf-8')
+
+    assert 'Unrelated' not in text
+    assert '1. Third X. Database copy of the third' in text
+    assert '2. Alpha A. First listed reference.' in text
+    assert '3. Beta B. Second listed reference. J Two. 2021.' in text
+
+
+def test_database_positions_without_a_reference_list(tmp_path):
+    path = tmp_path / 'paper.md'
+    path.write_text('# Body\n\nCited [2] and [1].\n', encoding='utf-8')
+    manager = CitationManager()
+    manager.reference_database = [{'authors': 'Alpha, A', 'title': 'First', 'journal': 'J', 'year': '2020'},
+                                  {'authors': 'Beta, B', 'title': 'Second', 'journal': 'J', 'year': '2021'}]
+
+    result = manager.renumber_manuscript(str(path))
+    text = path.read_text(encoding='utf-8')
+
+    assert result['missing'] == []
+    assert 'Cited [1] and [2].' in text
+    assert text.index('1. Beta B. Second.') < text.index('2. Alpha A. First.')
+
+
+def test_file_mode_is_preserved(manuscript, tmp_path):
+    os.chmod(manuscript, 0o644)
+    output = tmp_path / 'out.md'
+
+    CitationManager().renumber_manuscript(str(manuscript))
+    CitationManager().renumber_manuscript(str(manuscript), str(output))
+
+    assert stat.S_IMODE(os.stat(manuscript).st_mode) == 0o644
+    assert stat.S_IMODE(os.stat(output).st_mode) == 0o644
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_state_reuses_unchanged_sections(manuscript, tmp_path):
+    manager = CitationManager()
+    state = str(tmp_path / 'state.json')
+    output = str(tmp_path / 'out.md')
+
+    first = manager.renumber_manuscript(str(manuscript), output, state)
+    second = manager.renumber_manuscript(str(manuscript), output, state)
+    assert second['sections_reused'] == first['sections_processed'] and second['sections_processed'] == 0
+
+    manuscript.write_text(MANUSCRIPT.replace('Again [3, 5]', 'Again [2, 5]'), encoding='utf-8')
+    edited = manager.renumber_manuscript(str(manuscript), output, state)
+    full = manager.renumber_manuscript(str(manuscript), str(tmp_path / 'full.md'))
+
+    assert edited['sections_processed'] == 1
+    assert open(output, encoding='utf-8').read() == (tmp_path / 'full.md').read_text(encoding='utf-8')
+    assert edited['mapping'] == full['mapping']
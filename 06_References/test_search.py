@@ -0,0 +1,141 @@
+"""Tests for SearchIndex and CitationManager.search."""
+
+import math
+import random
+
+import pandas as pd
+import pytest
+
+from citation_manager import CitationManager, SearchIndex
+
+REFERENCES = [
+    {'title': 'Point cloud segmentation of the subclavian artery', 'abstract': 'Deep learning on CT point clouds.',
+     'keywords': 'point cloud; vessel', 'year': '2021'},
+    {'title': 'Cloud computing for hospital records', 'abstract': 'A point about storage costs.', 'year': '2019'},
+    {'title': 'Vessel wall imaging with MRI', 'abstract': 'Segmentation of the carotid vessel wall.',
+     'keywords': 'vessel', 'year': '2018'},
+    {'title': 'Coronary CT angiography outcomes', 'abstract': 'Registry of 1500 patients.', 'year': 'n.d.'},
+    {'title': 'Écho-Doppler des artères sous-clavières', 'abstract': 'Sténose de l’artère.', 'year': '2022'},
+]
+
+
+def bm25(documents, query_tokens, k1=1.2, b=0.75):
+    """Textbook single-field BM25, for comparison."""
+    tokenized = [SearchIndex.tokenize(text) for text in documents]
+    average = sum(map(len, tokenized)) / len(tokenized)
+    scores = [0.0] * len(tokenized)
+    for token in query_tokens:
+        containing = sum(token in tokens for tokens in tokenized)
+        idf = math.log(1 + (len(tokenized) - containing + 0.5) / (containing + 0.5))
+        for doc, tokens in enumerate(tokenized):
+            tf = tokens.count(token)
+            scores[doc] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / average))
+    return scores
+
+
+def test_scores_match_reference_bm25():
+    rng = random.Random(4)
+    vocabulary = ['stent', 'artery', 'vessel', 'cloud', 'point', 'graft', 'aorta', 'flow']
+    documents = [' '.join(rng.choices(vocabulary, k=rng.randint(1, 30))) for _ in range(300)]
+    index = SearchIndex({'title': 1.0})
+    index.add_many([{'title': text} for text in documents], batch_size=64)
+
+    expected = bm25(documents, ['stent', 'aorta'])
+    results = index.search('stent aorta', limit=300)
+
+    assert {doc: score for doc, score in results} == pytest.approx(
+        {doc: score for doc, score in enumerate(expected) if score > 0})
+    assert [score for _, score in results] == sorted((score for score in expected if score > 0), reverse=True)
+    assert len(index.search('stent aorta', limit=5)) == 5
+
+
+def test_field_weights_rank_title_matches_first():
+    index = SearchIndex()
+    index.add_many(REFERENCES)
+
+    assert [doc for doc, _ in index.search('vessel')] == [2, 0]
+    assert [doc for doc, _ in index.search('title:vessel')] == [2]
+    assert index.search('arteres') == index.search('ARTÈRES') != []
+
+
+def test_phrases_required_and_excluded_terms():
+    index = SearchIndex()
+    index.add_many(REFERENCES)
+
+    # Both documents contain "point" and "cloud", only one as a phrase
+    assert [doc for doc, _ in index.search('point cloud')] == [0, 1]
+    assert [doc for doc, _ in index.search('"point cloud"')] == [0]
+    assert [doc for doc, _ in index.search('"cloud point"')] == []
+    assert [doc for doc, _ in index.search('keywords:"point cloud"')] == [0]
+    assert [doc for doc, _ in index.search('segmentation +vessel')] == [2, 0]
+    assert [doc for doc, _ in index.search('segmentation -vessel')] == []
+    assert [doc for doc, _ in index.search('cloud -hospital')] == [0]
+
+
+def test_year_filters():
+    index = SearchIndex()
+    index.add_many(REFERENCES)
+
+    assert [doc for doc, _ in index.search('vessel year:2021')] == [0]
+    assert [doc for doc, _ in index.search('segmentation year:2018..2020')] == [2]
+    assert sorted(doc for doc, _ in index.search('year:2019..')) == [0, 1, 4]
+    assert [doc for doc, _ in index.search('', year_to=2019)] == [1, 2]
+
+
+def test_incremental_adds_match_a_full_rebuild(tmp_path):
+    whole = SearchIndex()
+    whole.add_many(REFERENCES)
+    incremental = SearchIndex()
+    incremental.add_many(REFERENCES[:2])
+    path = str(tmp_path / 'index.pkl')
+    incremental.save(path)
+    incremental = SearchIndex.load(path)
+    for reference in REFERENCES[2:]:
+        incremental.add(reference)
+
+    for query in ('vessel', '"point cloud"', 'segmentation -cloud', 'ct year:2020..'):
+        assert incremental.search(query) == pytest.approx(whole.search(query))
+
+
+def test_manager_search_picks_up_new_references():
+    manager = CitationManager()
+    manager.reference_database = list(REFERENCES[:3])
+    assert [hit['index'] for hit in manager.search('angiography')] == []
+
+    manager.add_reference(REFERENCES[3])
+    manager.reference_database.append(REFERENCES[4])
+    assert [hit['index'] for hit in manager.search('angiography')] == [3]
+    assert manager.search('sous clavieres')[0]['reference'] is REFERENCES[4]
+
+    del manager.reference_database[3:]
+    assert manager.search('angiography') == []
+
+
+@pytest.mark.parametrize('store', [False, True])
+def test_loading_a_library_replaces_the_index(tmp_path, store):
+    manager = CitationManager()
+    if store:
+        manager.use_reference_store()
+    for reference in REFERENCES[:2]:
+        manager.add_reference(reference)
+    assert [hit['index'] for hit in manager.search('cloud')] == [0, 1]
+
+    path = tmp_path / 'library.json'
+    path.write_text('[{"title": "Unrelated alpha"}, {"title": "Unrelated beta"}, {"title": "Cloud gamma"}]')
+    assert manager.load_references_from_json(str(path))
+    assert [hit['reference']['title'] for hit in manager.search('cloud')] == ['Cloud gamma']
+
+    pd.DataFrame({'title': ['Catheter delta', 'Cloud epsilon']}).to_csv(tmp_path / 'library.csv', index=False)
+    assert manager.load_references_from_csv(str(tmp_path / 'library.csv'))
+    assert [hit['reference']['title'] for hit in manager.search('cloud')] == ['Cloud epsilon']
+
+
+def test_assigning_a_new_library_replaces_the_index():
+    manager = CitationManager()
+    manager.reference_database = list(REFERENCES[:3])
+    assert manager.search('angiography') == []
+
+    manager.reference_database = [REFERENCES[3], REFERENCES[0], REFERENCES[1]]
+    manager.add_reference(REFERENCES[2])
+    assert [hit['index'] for hit in manager.search('angiography')] == [0]
+    assert [hit['index'] for hit in manager.search('title:vessel')] == [3]
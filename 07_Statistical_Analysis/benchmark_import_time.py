@@ -0,0 +1,63 @@
+"""
+Import-time benchmark for medical_stats_toolkit.
+
+Each measurement runs in a fresh interpreter so module caches do not hide
+the real start-up cost of short-lived batch jobs and CLI calls.
+
+Usage:
+    python benchmark_import_time.py [--repeats 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ['scipy.stats', 'matplotlib.pyplot', 'seaborn', 'sklearn.metrics',
+                 'statsmodels.api', 'lifelines', 'pingouin']
+
+MEASURE_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import medical_stats_toolkit
+imported = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+start = time.perf_counter()
+medical_stats_toolkit.DescriptiveStatistics.summary_statistics([1.0, 2.0, 3.0, 4.0])
+first_call = time.perf_counter() - start
+print(imported, first_call, ','.join(heavy), sep='|')
+"""
+
+
+def measure_once():
+    """Time the import and a first DescriptiveStatistics call in a new process."""
+    output = subprocess.run(
+        [sys.executable, '-c', MEASURE_SCRIPT.format(heavy=HEAVY_MODULES)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    imported, first_call, heavy = output.split('|')
+    return float(imported), float(first_call), [name for name in heavy.split(',') if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=5, help='Number of fresh interpreters to time')
+    args = parser.parse_args()
+    
+    results = [measure_once() for _ in range(args.repeats)]
+    import_times = [r[0] for r in results]
+    first_calls = [r[1] for r in results]
+    
+    print("medical_stats_toolkit import-time benchmark")
+    print("=" * 50)
+    print(f"Runs: {args.repeats}")
+    print(f"Import time (median): {statistics.median(import_times) * 1000:.1f} ms "
+          f"[min {min(import_times) * 1000:.1f}, max {max(import_times) * 1000:.1f}]")
+    print(f"First DescriptiveStatistics call (median): {statistics.median(first_calls) * 1000:.1f} ms")
+    print(f"Heavy modules loaded by import alone: {', '.join(results[0][2]) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
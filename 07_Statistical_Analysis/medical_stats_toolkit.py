@@ -21,39 +21,467 @@ Requirements:
     scikit-learn>=1.0.0
     pingouin>=0.5.0
     forestplot>=0.3.0
+
+Only numpy and pandas are imported eagerly; the remaining dependencies are
+loaded on first use by the classes and functions that need them.
+
+Test, effect size, meta-analysis and classification results are returned as
+slots-based result objects that behave like read-only dicts and offer
+to_dict()/to_frame(); ResultBatch stores many of them as NumPy columns.
 """
 
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import hashlib
+import heapq
+import importlib
+import inspect
+import io
+import itertools
+import json
+import os
+import pickle
+import tempfile
+import warnings
+
 import numpy as np
 import pandas as pd
-from scipy import stats
-from scipy.stats import chi2_contingency, fisher_exact
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import roc_curve, auc, confusion_matrix, classification_report
-from sklearn.metrics import precision_recall_curve, average_precision_score
-import statsmodels.api as sm
-import statsmodels.stats.power as smp
-from statsmodels.stats.contingency_tables import mcnemar
-from statsmodels.stats.proportion import proportions_ztest, proportion_confint
-from statsmodels.stats.multitest import multipletests
-import warnings
 warnings.filterwarnings('ignore')
 
-# Optional dependencies with graceful handling
-try:
-    from lifelines import KaplanMeierFitter, CoxPHFitter
-    from lifelines.statistics import logrank_test, multivariate_logrank_test
-    LIFELINES_AVAILABLE = True
-except ImportError:
-    LIFELINES_AVAILABLE = False
-    print("Warning: lifelines not available. Survival analysis functions will be limited.")
 
-try:
-    import pingouin as pg
-    PINGOUIN_AVAILABLE = True
-except ImportError:
-    PINGOUIN_AVAILABLE = False
-    print("Warning: pingouin not available. Some advanced statistical tests will be limited.")
+class _LazyImport:
+    """
+    Proxy for a module, or an attribute of a module, imported on first use.
+    
+    Heavy dependencies (scipy, matplotlib, seaborn, scikit-learn, statsmodels,
+    lifelines) are only loaded by the classes and functions that need them,
+    keeping ``import medical_stats_toolkit`` fast for short-lived jobs.
+    """
+    
+    def __init__(self, module_name, attribute=None):
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+    
+    def _load(self):
+        if self._target is None:
+            target = importlib.import_module(self._module_name)
+            if self._attribute is not None:
+                target = getattr(target, self._attribute)
+            self._target = target
+        return self._target
+    
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+    
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+    
+    def __repr__(self):
+        name = self._module_name + (f".{self._attribute}" if self._attribute else "")
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<lazy import {name} ({state})>"
+
+
+stats = _LazyImport('scipy.stats')
+optimize = _LazyImport('scipy.optimize')
+special = _LazyImport('scipy.special')
+spatial = _LazyImport('scipy.spatial')
+chi2_contingency = _LazyImport('scipy.stats', 'chi2_contingency')
+fisher_exact = _LazyImport('scipy.stats', 'fisher_exact')
+plt = _LazyImport('matplotlib.pyplot')
+mcollections = _LazyImport('matplotlib.collections')
+sns = _LazyImport('seaborn')
+roc_curve = _LazyImport('sklearn.metrics', 'roc_curve')
+auc = _LazyImport('sklearn.metrics', 'auc')
+confusion_matrix = _LazyImport('sklearn.metrics', 'confusion_matrix')
+classification_report = _LazyImport('sklearn.metrics', 'classification_report')
+precision_recall_curve = _LazyImport('sklearn.metrics', 'precision_recall_curve')
+average_precision_score = _LazyImport('sklearn.metrics', 'average_precision_score')
+sm = _LazyImport('statsmodels.api')
+smp = _LazyImport('statsmodels.stats.power')
+mcnemar = _LazyImport('statsmodels.stats.contingency_tables', 'mcnemar')
+proportions_ztest = _LazyImport('statsmodels.stats.proportion', 'proportions_ztest')
+proportion_confint = _LazyImport('statsmodels.stats.proportion', 'proportion_confint')
+multipletests = _LazyImport('statsmodels.stats.multitest', 'multipletests')
+
+# Optional dependencies, checked on first use rather than at import
+KaplanMeierFitter = _LazyImport('lifelines', 'KaplanMeierFitter')
+CoxPHFitter = _LazyImport('lifelines', 'CoxPHFitter')
+logrank_test = _LazyImport('lifelines.statistics', 'logrank_test')
+multivariate_logrank_test = _LazyImport('lifelines.statistics', 'multivariate_logrank_test')
+pg = _LazyImport('pingouin')
+
+_OPTIONAL_DEPENDENCIES = {
+    'lifelines': "Warning: lifelines not available. Survival analysis functions will be limited.",
+    'pingouin': "Warning: pingouin not available. Some advanced statistical tests will be limited."
+}
+_optional_dependency_status = {}
+
+
+def optional_dependency_available(name):
+    """
+    Check whether an optional dependency can be imported.
+    
+    The import is attempted once, on first call; a warning is printed the
+    first time a missing dependency is requested.
+    """
+    if name not in _optional_dependency_status:
+        try:
+            importlib.import_module(name)
+            _optional_dependency_status[name] = True
+        except ImportError:
+            _optional_dependency_status[name] = False
+            print(_OPTIONAL_DEPENDENCIES.get(name, f"Warning: {name} not available."))
+    return _optional_dependency_status[name]
+
+
+def __getattr__(name):
+    # Backwards-compatible availability flags, resolved lazily
+    if name == 'LIFELINES_AVAILABLE':
+        return optional_dependency_available('lifelines')
+    if name == 'PINGOUIN_AVAILABLE':
+        return optional_dependency_available('pingouin')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _scalar_or_array(values):
+    """Return Python scalars for 0-d results and arrays otherwise."""
+    values = np.asarray(values)
+    return values.item() if values.ndim == 0 else values
+
+
+class ToolkitResult(Mapping):
+    """
+    Compact, read-only result record.
+    
+    Results store their fields in ``__slots__`` instead of a per-instance
+    dict, and implement the Mapping protocol so existing code can keep
+    using ``result['p_value']``, ``result.get(...)`` and ``dict(result)``.
+    Nested results (for example the summary statistics inside a t-test)
+    are flattened into dotted column names by ``to_frame`` and
+    ``ResultBatch``.
+    """
+    
+    __slots__ = ()
+    _slots = ()
+    _fields = ()
+    _columnar = False
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        own = tuple(cls.__dict__.get('__slots__', ()))
+        cls._slots = cls._slots + own
+        if '_fields' not in cls.__dict__:
+            cls._fields = cls._fields + own
+    
+    def __init__(self, **values):
+        for name in self._slots:
+            object.__setattr__(self, name, values.pop(name, None))
+        if values:
+            raise TypeError(f"{type(self).__name__} got unexpected fields: {sorted(values)}")
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+    
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self):
+        return iter(self._fields)
+    
+    def __len__(self):
+        return len(self._fields)
+    
+    def __reduce__(self):
+        return (_rebuild_result, (type(self), {name: getattr(self, name) for name in self._slots}))
+    
+    def __repr__(self):
+        scalars = ', '.join(f"{name}={value!r}" for name, value in self._flat_items()
+                            if np.ndim(value) == 0 and not isinstance(value, dict))
+        return f"{type(self).__name__}({scalars})"
+    
+    def replace(self, **changes):
+        """Return a copy of the result with some fields replaced."""
+        values = {name: getattr(self, name) for name in self._slots}
+        values.update(changes)
+        return type(self)(**values)
+    
+    def to_dict(self):
+        """
+        Convert the result to a plain (nested) dict.
+        
+        Returns:
+        --------
+        dict : Same keys and values as the legacy dict results
+        """
+        return {name: value.to_dict() if isinstance(value, ToolkitResult) else value
+                for name, value in self.items()}
+    
+    def to_frame(self):
+        """
+        Convert the result to a DataFrame.
+        
+        Scalar results give a single row; nested results become dotted
+        columns (e.g. ``group1_stats.mean``). For batch results, every
+        1-D array field becomes a column with one row per table.
+        
+        Returns:
+        --------
+        pd.DataFrame : Tabular view of the result
+        """
+        columns = {}
+        for name, value in self._flat_items():
+            if isinstance(value, dict):
+                continue
+            ndim = np.ndim(value)
+            if ndim == 0 or (self._columnar and ndim == 1):
+                columns[name] = value
+        if not any(np.ndim(value) for value in columns.values()):
+            return pd.DataFrame([columns])
+        return pd.DataFrame(columns)
+    
+    def _flat_items(self, prefix=''):
+        # Stored slots rather than public fields, so derived views such as
+        # the confusion matrix dict are flattened to their numeric parts
+        for name in self._slots:
+            value = getattr(self, name)
+            if isinstance(value, ToolkitResult):
+                yield from value._flat_items(f"{prefix}{name}.")
+            else:
+                yield f"{prefix}{name}", value
+
+
+def _rebuild_result(result_type, values):
+    return result_type(**values)
+
+
+class SummaryStatisticsResult(ToolkitResult):
+    """Descriptive statistics of one numeric sample."""
+    __slots__ = ('n', 'missing', 'mean', 'std', 'sem', 'median', 'q1', 'q3', 'iqr', 'min', 'max',
+                 'range', 'ci_lower', 'ci_upper', 'confidence_level', 'shapiro_stat', 'shapiro_p',
+                 'normal_distribution')
+
+
+class IndependentTTestResult(ToolkitResult):
+    """Independent samples t-test."""
+    __slots__ = ('test', 't_statistic', 'p_value', 'degrees_of_freedom', 'alternative',
+                 'equal_variances_assumed', 'levene_statistic', 'levene_p_value',
+                 'equal_variances_supported', 'cohens_d', 'group1_stats', 'group2_stats',
+                 'significant', 'interpretation')
+
+
+class PairedTTestResult(ToolkitResult):
+    """Paired samples t-test."""
+    __slots__ = ('test', 't_statistic', 'p_value', 'degrees_of_freedom', 'n_pairs', 'alternative',
+                 'cohens_d', 'before_stats', 'after_stats', 'difference_stats', 'significant',
+                 'interpretation')
+
+
+class MannWhitneyResult(ToolkitResult):
+    """Mann-Whitney U test."""
+    __slots__ = ('test', 'u_statistic', 'p_value', 'alternative', 'n_group1', 'n_group2',
+                 'effect_size_r', 'significant', 'median_group1', 'median_group2')
+
+
+class ChiSquareResult(ToolkitResult):
+    """Chi-square test of independence for one contingency table."""
+    __slots__ = ('test', 'chi2_statistic', 'p_value', 'degrees_of_freedom', 'cramers_v', 'phi',
+                 'odds_ratio', 'fisher_exact_p', 'expected_frequencies', 'significant',
+                 'minimum_expected', 'assumption_met')
+
+
+class ChiSquareBatchResult(ToolkitResult):
+    """Vectorized chi-square tests, one entry per 2x2 table."""
+    __slots__ = ('test', 'chi2_statistic', 'p_value', 'degrees_of_freedom', 'phi', 'cramers_v',
+                 'odds_ratio', 'fisher_exact_p', 'significant', 'minimum_expected', 'assumption_met')
+    _columnar = True
+
+
+class CochranMantelHaenszelResult(ToolkitResult):
+    """Cochran-Mantel-Haenszel test of conditional independence."""
+    __slots__ = ('test', 'cmh_statistic', 'p_value', 'degrees_of_freedom', 'common_odds_ratio',
+                 'or_ci_lower', 'or_ci_upper', 'n_strata', 'significant')
+    _columnar = True
+
+
+class BreslowDayResult(ToolkitResult):
+    """Breslow-Day test for homogeneity of odds ratios."""
+    __slots__ = ('test', 'statistic', 'p_value', 'degrees_of_freedom', 'homogeneous')
+    _columnar = True
+
+
+class OddsRatioResult(ToolkitResult):
+    """Odds ratio with confidence interval."""
+    __slots__ = ('odds_ratio', 'ci_lower', 'ci_upper', 'log_or', 'se_log_or')
+    _columnar = True
+
+
+class RelativeRiskResult(ToolkitResult):
+    """Relative risk with confidence interval."""
+    __slots__ = ('relative_risk', 'risk1', 'risk2', 'ci_lower', 'ci_upper')
+    _columnar = True
+
+
+class TwoByTwoResult(ToolkitResult):
+    """Odds ratio, relative risk and risk difference for 2x2 tables."""
+    __slots__ = ('odds_ratio', 'or_ci_lower', 'or_ci_upper', 'log_or', 'se_log_or', 'relative_risk',
+                 'rr_ci_lower', 'rr_ci_upper', 'risk1', 'risk2', 'risk_difference', 'rd_ci_lower',
+                 'rd_ci_upper', 'zero_cell_corrected')
+    _columnar = True
+
+
+class MantelHaenszelResult(ToolkitResult):
+    """Mantel-Haenszel pooled odds ratio and relative risk."""
+    __slots__ = ('odds_ratio', 'or_ci_lower', 'or_ci_upper', 'se_log_or', 'relative_risk',
+                 'rr_ci_lower', 'rr_ci_upper', 'se_log_rr', 'n_strata', 'confidence_level')
+    _columnar = True
+
+
+class MetaAnalysisResult(ToolkitResult):
+    """Fixed- or random-effects meta-analysis."""
+    __slots__ = ('pooled_effect_size', 'pooled_se', 'ci_lower', 'ci_upper', 'z_score', 'p_value',
+                 'q_statistic', 'q_p_value', 'i_squared', 'tau_squared', 'weights', 'significant',
+                 'heterogeneity', 'model', 'effect_sizes', 'variances', 'study_names')
+
+
+class ClassificationMetricsResult(ToolkitResult):
+    """
+    Binary classification metrics.
+    
+    The confusion matrix is stored as four integer slots and exposed as the
+    legacy ``confusion_matrix`` dict on access. Curve fields are None when
+    no scores were given.
+    """
+    __slots__ = ('tp', 'tn', 'fp', 'fn', 'sensitivity_recall', 'specificity', 'precision_ppv', 'npv',
+                 'accuracy', 'f1_score', 'lr_positive', 'lr_negative', 'auc_roc', 'auc_pr',
+                 'roc_curve', 'pr_curve')
+    _fields = ('confusion_matrix',) + __slots__[4:]
+    
+    @property
+    def confusion_matrix(self):
+        return {'TP': self.tp, 'TN': self.tn, 'FP': self.fp, 'FN': self.fn}
+
+
+class DiagnosticTestResult(ClassificationMetricsResult):
+    """Diagnostic test metrics, optionally with population predictive values."""
+    __slots__ = ('population_prevalence', 'ppv_population', 'npv_population')
+
+
+class ResultBatch:
+    """
+    Columnar container for many results of one type.
+    
+    Each (flattened) field is kept in a NumPy array that grows by doubling,
+    so storing millions of simulation results costs a few bytes per value
+    instead of one dict per result. Numeric and boolean fields get native
+    dtypes; anything else (strings, arrays, dicts) falls back to an object
+    column.
+    
+    Examples:
+    ---------
+    >>> batch = ResultBatch()
+    >>> for _ in range(1000):
+    ...     batch.append(HypothesisTests.t_test_paired(before, after))
+    >>> batch['p_value'].mean(), batch['difference_stats.mean']
+    >>> batch.to_frame()
+    """
+    
+    def __init__(self, result_type=None, capacity=1024):
+        self.result_type = result_type
+        self._capacity = max(int(capacity), 1)
+        self._size = 0
+        self._columns = {}
+        self._nested_types = {}
+    
+    @classmethod
+    def from_results(cls, results):
+        """Build a batch from an iterable of results of the same type."""
+        batch = cls()
+        for result in results:
+            batch.append(result)
+        return batch
+    
+    def append(self, result):
+        """Add one result to the batch."""
+        if self.result_type is None:
+            self.result_type = type(result)
+        if type(result) is not self.result_type:
+            raise TypeError(f"Expected {self.result_type.__name__}, got {type(result).__name__}")
+        if self._size == 0:
+            self._nested_types = {name: type(value) for name, value in result.items()
+                                  if isinstance(value, ToolkitResult)}
+        
+        if self._size == self._capacity:
+            self._capacity *= 2
+            for name, column in self._columns.items():
+                grown = np.empty(self._capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                self._columns[name] = grown
+        
+        for name, value in result._flat_items():
+            column = self._columns.get(name)
+            if column is None:
+                column = np.empty(self._capacity, dtype=ResultBatch._column_dtype(value))
+                if column.dtype == object:
+                    column[:] = None
+                self._columns[name] = column
+            elif column.dtype != object and ResultBatch._column_dtype(value, column.dtype) != column.dtype:
+                column = column.astype(ResultBatch._column_dtype(value, column.dtype))
+                self._columns[name] = column
+            column[self._size] = value
+        self._size += 1
+    
+    def __len__(self):
+        return self._size
+    
+    def __getitem__(self, field):
+        return self._columns[field][:self._size]
+    
+    @property
+    def columns(self):
+        return list(self._columns)
+    
+    def row(self, index):
+        """Rebuild the result stored at ``index``."""
+        if not -self._size <= index < self._size:
+            raise IndexError(index)
+        index %= self._size
+        nested = {}
+        for name, column in self._columns.items():
+            value = column[index]
+            if isinstance(value, np.generic):
+                value = value.item()
+            target = nested
+            *parents, leaf = name.split('.')
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = value
+        for name, result_type in self._nested_types.items():
+            if isinstance(nested.get(name), dict):
+                nested[name] = result_type(**nested[name])
+        return self.result_type(**nested)
+    
+    def to_frame(self):
+        """Return the batch as a DataFrame with one row per result."""
+        return pd.DataFrame({name: self[name] for name in self._columns})
+    
+    @staticmethod
+    def _column_dtype(value, current=None):
+        if value is None or isinstance(value, (str, dict, ToolkitResult)) or np.ndim(value) != 0:
+            return np.dtype(object)
+        dtype = np.asarray(value).dtype
+        if dtype.kind not in 'biuf':
+            return np.dtype(object)
+        if current is None:
+            return dtype
+        if (current.kind == 'b') != (dtype.kind == 'b'):
+            return np.dtype(object)
+        return np.result_type(current, dtype)
 
 
 class DescriptiveStatistics:
@@ -76,7 +504,7 @@ class DescriptiveStatistics:
             
         Returns:
         --------
-        dict : Dictionary with statistics
+        SummaryStatisticsResult : Dictionary-like statistics record
         """
         data = np.array(data)
         data_clean = data[~np.isnan(data)]
@@ -106,26 +534,26 @@ class DescriptiveStatistics:
         else:
             shapiro_stat, shapiro_p = np.nan, np.nan
             
-        return {
-            'n': n,
-            'missing': len(data) - n,
-            'mean': mean,
-            'std': std,
-            'sem': sem,
-            'median': median,
-            'q1': q1,
-            'q3': q3,
-            'iqr': iqr,
-            'min': np.min(data_clean),
-            'max': np.max(data_clean),
-            'range': np.max(data_clean) - np.min(data_clean),
-            'ci_lower': ci_lower,
-            'ci_upper': ci_upper,
-            'confidence_level': confidence_level,
-            'shapiro_stat': shapiro_stat,
-            'shapiro_p': shapiro_p,
-            'normal_distribution': shapiro_p > 0.05 if not np.isnan(shapiro_p) else None
-        }
+        return SummaryStatisticsResult(
+            n=n,
+            missing=len(data) - n,
+            mean=mean,
+            std=std,
+            sem=sem,
+            median=median,
+            q1=q1,
+            q3=q3,
+            iqr=iqr,
+            min=np.min(data_clean),
+            max=np.max(data_clean),
+            range=np.max(data_clean) - np.min(data_clean),
+            ci_lower=ci_lower,
+            ci_upper=ci_upper,
+            confidence_level=confidence_level,
+            shapiro_stat=shapiro_stat,
+            shapiro_p=shapiro_p,
+            normal_distribution=shapiro_p > 0.05 if not np.isnan(shapiro_p) else None
+        )
     
     @staticmethod
     def categorical_summary(data, sort_by_freq=True):
@@ -189,7 +617,7 @@ class HypothesisTests:
             
         Returns:
         --------
-        dict : Test results with interpretation
+        IndependentTTestResult : Test results with interpretation
         """
         g1 = np.array(group1)[~np.isnan(group1)]
         g2 = np.array(group2)[~np.isnan(group2)]
@@ -219,22 +647,22 @@ class HypothesisTests:
         # Effect size (Cohen's d)
         cohen_d = EffectSizes.cohens_d(g1, g2)
         
-        return {
-            'test': 'Independent samples t-test',
-            't_statistic': t_stat,
-            'p_value': p_value,
-            'degrees_of_freedom': df,
-            'alternative': alternative,
-            'equal_variances_assumed': equal_var,
-            'levene_statistic': levene_stat,
-            'levene_p_value': levene_p,
-            'equal_variances_supported': levene_p > 0.05,
-            'cohens_d': cohen_d,
-            'group1_stats': desc1,
-            'group2_stats': desc2,
-            'significant': p_value < 0.05,
-            'interpretation': HypothesisTests._interpret_t_test(t_stat, p_value, cohen_d)
-        }
+        return IndependentTTestResult(
+            test='Independent samples t-test',
+            t_statistic=t_stat,
+            p_value=p_value,
+            degrees_of_freedom=df,
+            alternative=alternative,
+            equal_variances_assumed=equal_var,
+            levene_statistic=levene_stat,
+            levene_p_value=levene_p,
+            equal_variances_supported=levene_p > 0.05,
+            cohens_d=cohen_d,
+            group1_stats=desc1,
+            group2_stats=desc2,
+            significant=p_value < 0.05,
+            interpretation=HypothesisTests._interpret_t_test(t_stat, p_value, cohen_d)
+        )
     
     @staticmethod
     def t_test_paired(before, after, alternative='two-sided'):
@@ -250,7 +678,7 @@ class HypothesisTests:
             
         Returns:
         --------
-        dict : Test results with interpretation
+        PairedTTestResult : Test results with interpretation
         """
         before = np.array(before)
         after = np.array(after)
@@ -274,20 +702,20 @@ class HypothesisTests:
         # Effect size
         cohen_d = np.mean(differences) / np.std(differences, ddof=1)
         
-        return {
-            'test': 'Paired samples t-test',
-            't_statistic': t_stat,
-            'p_value': p_value,
-            'degrees_of_freedom': df,
-            'n_pairs': len(differences),
-            'alternative': alternative,
-            'cohens_d': cohen_d,
-            'before_stats': desc_before,
-            'after_stats': desc_after,
-            'difference_stats': desc_diff,
-            'significant': p_value < 0.05,
-            'interpretation': HypothesisTests._interpret_paired_t_test(t_stat, p_value, cohen_d, np.mean(differences))
-        }
+        return PairedTTestResult(
+            test='Paired samples t-test',
+            t_statistic=t_stat,
+            p_value=p_value,
+            degrees_of_freedom=df,
+            n_pairs=len(differences),
+            alternative=alternative,
+            cohens_d=cohen_d,
+            before_stats=desc_before,
+            after_stats=desc_after,
+            difference_stats=desc_diff,
+            significant=p_value < 0.05,
+            interpretation=HypothesisTests._interpret_paired_t_test(t_stat, p_value, cohen_d, np.mean(differences))
+        )
     
     @staticmethod
     def mann_whitney_u(group1, group2, alternative='two-sided'):
@@ -303,7 +731,7 @@ class HypothesisTests:
             
         Returns:
         --------
-        dict : Test results
+        MannWhitneyResult : Test results
         """
         g1 = np.array(group1)[~np.isnan(group1)]
         g2 = np.array(group2)[~np.isnan(group2)]
@@ -316,18 +744,18 @@ class HypothesisTests:
         z_score = stats.norm.ppf(1 - p_value/2) if alternative == 'two-sided' else stats.norm.ppf(1 - p_value)
         effect_size_r = abs(z_score) / np.sqrt(n_total)
         
-        return {
-            'test': 'Mann-Whitney U test',
-            'u_statistic': statistic,
-            'p_value': p_value,
-            'alternative': alternative,
-            'n_group1': n1,
-            'n_group2': n2,
-            'effect_size_r': effect_size_r,
-            'significant': p_value < 0.05,
-            'median_group1': np.median(g1),
-            'median_group2': np.median(g2)
-        }
+        return MannWhitneyResult(
+            test='Mann-Whitney U test',
+            u_statistic=statistic,
+            p_value=p_value,
+            alternative=alternative,
+            n_group1=n1,
+            n_group2=n2,
+            effect_size_r=effect_size_r,
+            significant=p_value < 0.05,
+            median_group1=np.median(g1),
+            median_group2=np.median(g2)
+        )
     
     @staticmethod
     def chi_square_test(contingency_table):
@@ -341,7 +769,7 @@ class HypothesisTests:
             
         Returns:
         --------
-        dict : Test results including effect sizes
+        ChiSquareResult : Test results including effect sizes
         """
         table = np.array(contingency_table)
         chi2_stat, p_value, dof, expected = chi2_contingency(table)
@@ -358,20 +786,229 @@ class HypothesisTests:
         else:
             odds_ratio, fisher_p = None, None
         
-        return {
-            'test': 'Chi-square test of independence',
-            'chi2_statistic': chi2_stat,
-            'p_value': p_value,
-            'degrees_of_freedom': dof,
-            'cramers_v': cramers_v,
-            'phi': phi,
-            'odds_ratio': odds_ratio,
-            'fisher_exact_p': fisher_p,
-            'expected_frequencies': expected,
-            'significant': p_value < 0.05,
-            'minimum_expected': np.min(expected),
-            'assumption_met': np.min(expected) >= 5
-        }
+        return ChiSquareResult(
+            test='Chi-square test of independence',
+            chi2_statistic=chi2_stat,
+            p_value=p_value,
+            degrees_of_freedom=dof,
+            cramers_v=cramers_v,
+            phi=phi,
+            odds_ratio=odds_ratio,
+            fisher_exact_p=fisher_p,
+            expected_frequencies=expected,
+            significant=p_value < 0.05,
+            minimum_expected=np.min(expected),
+            assumption_met=np.min(expected) >= 5
+        )
+    
+    @staticmethod
+    def chi_square_test_batch(a, b=None, c=None, d=None, correction=True, fisher=True):
+        """
+        Vectorised chi-square and Fisher exact tests for many 2x2 tables.
+        
+        Parameters:
+        -----------
+        a, b, c, d : array-like
+            Cells of each 2x2 table ([a, b], [c, d]), or an N x 2 x 2 array as ``a``
+        correction : bool
+            Apply Yates' continuity correction, as chi2_contingency does (default: True)
+        fisher : bool
+            Also compute two-sided Fisher exact p-values (default: True)
+            
+        Returns:
+        --------
+        ChiSquareBatchResult : Arrays of test statistics, p-values and effect sizes
+        """
+        a, b, c, d = EffectSizes._table_cells(a, b, c, d)
+        n = a + b + c + d
+        row1, row2, col1, col2 = a + b, c + d, a + c, b + d
+        margin_product = row1 * row2 * col1 * col2
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation = np.abs(a * d - b * c) / n  # |O - E|, identical for every cell
+            if correction:
+                deviation = np.maximum(deviation - 0.5, 0)
+            chi2_stat = deviation**2 * n**3 / margin_product
+            p_value = stats.chi2.sf(chi2_stat, 1)
+            phi = np.sqrt(chi2_stat / n)
+            odds_ratio = (a * d) / (b * c)
+            minimum_expected = np.minimum(row1, row2) * np.minimum(col1, col2) / n
+        
+        return ChiSquareBatchResult(
+            test='Chi-square test of independence',
+            chi2_statistic=_scalar_or_array(chi2_stat),
+            p_value=_scalar_or_array(p_value),
+            degrees_of_freedom=1,
+            phi=_scalar_or_array(phi),
+            cramers_v=_scalar_or_array(phi),
+            odds_ratio=_scalar_or_array(odds_ratio),
+            fisher_exact_p=HypothesisTests.fisher_exact_batch(a, b, c, d) if fisher else None,
+            significant=_scalar_or_array(p_value < 0.05),
+            minimum_expected=_scalar_or_array(minimum_expected),
+            assumption_met=_scalar_or_array(minimum_expected >= 5)
+        )
+    
+    @staticmethod
+    def cochran_mantel_haenszel_test(tables, correction=True):
+        """
+        Cochran-Mantel-Haenszel test of conditional independence across strata.
+        
+        Parameters:
+        -----------
+        tables : array-like
+            K x 2 x 2 array (or ... x K x 2 x 2) with one 2x2 table per stratum
+        correction : bool
+            Apply continuity correction (default: True)
+            
+        Returns:
+        --------
+        CochranMantelHaenszelResult : CMH statistic, p-value and Mantel-Haenszel pooled odds ratio
+        """
+        a, b, c, d = EffectSizes._stratified_cells(tables)
+        n = a + b + c + d
+        n1, n0, m1, m0 = a + b, c + d, a + c, b + d
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = n1 * m1 / n
+            variance = np.where(n > 1, n1 * n0 * m1 * m0 / (n**2 * (n - 1)), 0.0)
+            deviation = np.abs(np.nansum(a - expected, axis=-1))
+            if correction:
+                deviation = np.maximum(deviation - 0.5, 0)
+            cmh_stat = deviation**2 / np.nansum(variance, axis=-1)
+        p_value = stats.chi2.sf(cmh_stat, 1)
+        
+        pooled = EffectSizes.mantel_haenszel(tables)
+        
+        return CochranMantelHaenszelResult(
+            test='Cochran-Mantel-Haenszel test',
+            cmh_statistic=_scalar_or_array(cmh_stat),
+            p_value=_scalar_or_array(p_value),
+            degrees_of_freedom=1,
+            common_odds_ratio=pooled['odds_ratio'],
+            or_ci_lower=pooled['or_ci_lower'],
+            or_ci_upper=pooled['or_ci_upper'],
+            n_strata=pooled['n_strata'],
+            significant=_scalar_or_array(p_value < 0.05)
+        )
+    
+    @staticmethod
+    def breslow_day_test(tables, tarone=True):
+        """
+        Breslow-Day test for homogeneity of odds ratios across strata.
+        
+        Expected cell counts under the Mantel-Haenszel common odds ratio are
+        obtained for all strata at once from the closed-form quadratic root.
+        
+        Parameters:
+        -----------
+        tables : array-like
+            K x 2 x 2 array (or ... x K x 2 x 2) with one 2x2 table per stratum
+        tarone : bool
+            Apply Tarone's adjustment (default: True)
+            
+        Returns:
+        --------
+        BreslowDayResult : Breslow-Day statistic and p-value
+        """
+        a, b, c, d = EffectSizes._stratified_cells(tables)
+        n1, n0, m1 = a + b, c + d, a + c
+        common_or = np.asarray(EffectSizes.mantel_haenszel(tables)['odds_ratio'])[..., None]
+        
+        # Solve (1 - OR) x^2 + (n0 - m1 + OR (n1 + m1)) x - OR n1 m1 = 0 for x in the support
+        with np.errstate(divide='ignore', invalid='ignore'):
+            qa = 1 - common_or
+            qb = n0 - m1 + common_or * (n1 + m1)
+            qc = -common_or * n1 * m1
+            q = -0.5 * (qb + np.sign(qb) * np.sqrt(qb**2 - 4 * qa * qc))
+            low, high = np.maximum(0, m1 - n0), np.minimum(n1, m1)
+            root1, root2 = q / qa, qc / q
+            in_support = (root1 >= low - 1e-9) & (root1 <= high + 1e-9)
+            fitted = np.where(in_support & np.isfinite(root1), root1, root2)
+            
+            variance = 1 / (1/fitted + 1/(n1 - fitted) + 1/(m1 - fitted) + 1/(n0 - m1 + fitted))
+            contributions = np.where(variance > 0, (a - fitted)**2 / variance, 0.0)
+            bd_stat = np.nansum(contributions, axis=-1)
+            if tarone:
+                bd_stat = bd_stat - (np.nansum(a - fitted, axis=-1)**2 /
+                                     np.nansum(np.where(variance > 0, variance, 0.0), axis=-1))
+            # Strata without variance (a margin of zero) carry no information
+            df = np.sum(variance > 0, axis=-1) - 1
+        p_value = stats.chi2.sf(bd_stat, df)
+        
+        return BreslowDayResult(
+            test='Breslow-Day test' + (' (Tarone-adjusted)' if tarone else ''),
+            statistic=_scalar_or_array(bd_stat),
+            p_value=_scalar_or_array(p_value),
+            degrees_of_freedom=_scalar_or_array(df),
+            homogeneous=_scalar_or_array(p_value >= 0.05)
+        )
+    
+    @staticmethod
+    def fisher_exact_batch(a, b=None, c=None, d=None, alternative='two-sided', block_size=2_000_000):
+        """
+        Vectorised Fisher exact test for many 2x2 tables.
+        
+        Hypergeometric log-probabilities are evaluated with gammaln over the
+        whole support of every table at once. Tables are processed in blocks,
+        grouped by support width, so memory stays bounded for large counts.
+        
+        Parameters:
+        -----------
+        a, b, c, d : array-like
+            Cells of each 2x2 table ([a, b], [c, d]), or an N x 2 x 2 array as ``a``
+        alternative : str
+            Alternative hypothesis ('two-sided', 'less', 'greater')
+        block_size : int
+            Maximum number of support points evaluated per block
+            
+        Returns:
+        --------
+        float or numpy.ndarray : Fisher exact p-values
+        """
+        cells = EffectSizes._table_cells(a, b, c, d)
+        shape = cells[0].shape
+        a, b, c, d = [np.rint(x).astype(np.int64).ravel() for x in cells]
+        n, row1, col1 = a + b + c + d, a + b, a + c
+        
+        if alternative == 'less':
+            return _scalar_or_array(stats.hypergeom.cdf(a, n, row1, col1).reshape(shape))
+        elif alternative == 'greater':
+            return _scalar_or_array(stats.hypergeom.sf(a - 1, n, row1, col1).reshape(shape))
+        elif alternative != 'two-sided':
+            raise ValueError(f"Unsupported alternative: {alternative}")
+        
+        def log_pmf(x, n, row1, col1):
+            return (special.gammaln(row1 + 1) - special.gammaln(x + 1) - special.gammaln(row1 - x + 1) +
+                    special.gammaln(n - row1 + 1) - special.gammaln(col1 - x + 1) -
+                    special.gammaln(n - row1 - col1 + x + 1) -
+                    special.gammaln(n + 1) + special.gammaln(col1 + 1) + special.gammaln(n - col1 + 1))
+        
+        support_low = np.maximum(0, col1 - (n - row1))
+        support_high = np.minimum(row1, col1)
+        width = support_high - support_low + 1
+        
+        p_values = np.empty(len(a))
+        order = np.argsort(width, kind='stable')
+        start = 0
+        while start < len(order):
+            rows = max(1, block_size // width[order[start]])
+            end = min(len(order), start + rows)
+            if (end - start) * width[order[end - 1]] > block_size:
+                end = start + max(1, block_size // width[order[end - 1]])
+            idx = order[start:end]
+            
+            x = support_low[idx, None] + np.arange(width[idx].max())[None, :]
+            valid = x <= support_high[idx, None]
+            x = np.minimum(x, support_high[idx, None])
+            log_p = log_pmf(x, n[idx, None], row1[idx, None], col1[idx, None])
+            log_p_obs = log_pmf(a[idx], n[idx], row1[idx], col1[idx])
+            
+            # Sum probabilities of all tables at most as likely as the observed one
+            as_extreme = valid & (log_p <= log_p_obs[:, None] + 1e-7)
+            p_values[idx] = np.minimum(np.where(as_extreme, np.exp(log_p), 0).sum(axis=1), 1.0)
+            start = end
+        
+        return _scalar_or_array(p_values.reshape(shape))
     
     @staticmethod
     def _interpret_t_test(t_stat, p_value, cohen_d):
@@ -464,24 +1101,24 @@ class EffectSizes:
         
         Parameters:
         -----------
-        a, b, c, d : int
+        a, b, c, d : int or array-like
             Cells of 2x2 contingency table:
             [a, b]
             [c, d]
+            Arrays are analysed table by table.
         confidence_level : float
             Confidence level (default: 0.95)
             
         Returns:
         --------
-        dict : Odds ratio and confidence interval
+        OddsRatioResult : Odds ratio and confidence interval
         """
-        if a == 0 or b == 0 or c == 0 or d == 0:
-            # Add continuity correction
-            a, b, c, d = a + 0.5, b + 0.5, c + 0.5, d + 0.5
+        a, b, c, d = EffectSizes._haldane_correction(*EffectSizes._table_cells(a, b, c, d))
         
-        or_value = (a * d) / (b * c)
-        log_or = np.log(or_value)
-        se_log_or = np.sqrt(1/a + 1/b + 1/c + 1/d)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            or_value = (a * d) / (b * c)
+            log_or = np.log(or_value)
+            se_log_or = np.sqrt(1/a + 1/b + 1/c + 1/d)
         
         alpha = 1 - confidence_level
         z_critical = stats.norm.ppf(1 - alpha/2)
@@ -489,13 +1126,13 @@ class EffectSizes:
         ci_lower = np.exp(log_or - z_critical * se_log_or)
         ci_upper = np.exp(log_or + z_critical * se_log_or)
         
-        return {
-            'odds_ratio': or_value,
-            'ci_lower': ci_lower,
-            'ci_upper': ci_upper,
-            'log_or': log_or,
-            'se_log_or': se_log_or
-        }
+        return OddsRatioResult(
+            odds_ratio=_scalar_or_array(or_value),
+            ci_lower=_scalar_or_array(ci_lower),
+            ci_upper=_scalar_or_array(ci_upper),
+            log_or=_scalar_or_array(log_or),
+            se_log_or=_scalar_or_array(se_log_or)
+        )
     
     @staticmethod
     def relative_risk_ci(a, b, c, d, confidence_level=0.95):
@@ -504,21 +1141,24 @@ class EffectSizes:
         
         Parameters:
         -----------
-        a, b, c, d : int
-            Cells of 2x2 contingency table
+        a, b, c, d : int or array-like
+            Cells of 2x2 contingency table. Arrays are analysed table by table.
         confidence_level : float
             Confidence level (default: 0.95)
             
         Returns:
         --------
-        dict : Relative risk and confidence interval
+        RelativeRiskResult : Relative risk and confidence interval
         """
-        risk1 = a / (a + b)
-        risk2 = c / (c + d)
-        rr = risk1 / risk2
+        a, b, c, d = EffectSizes._haldane_correction(*EffectSizes._table_cells(a, b, c, d))
         
-        log_rr = np.log(rr)
-        se_log_rr = np.sqrt(1/a - 1/(a+b) + 1/c - 1/(c+d))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            risk1 = a / (a + b)
+            risk2 = c / (c + d)
+            rr = risk1 / risk2
+            
+            log_rr = np.log(rr)
+            se_log_rr = np.sqrt(1/a - 1/(a+b) + 1/c - 1/(c+d))
         
         alpha = 1 - confidence_level
         z_critical = stats.norm.ppf(1 - alpha/2)
@@ -526,13 +1166,151 @@ class EffectSizes:
         ci_lower = np.exp(log_rr - z_critical * se_log_rr)
         ci_upper = np.exp(log_rr + z_critical * se_log_rr)
         
-        return {
-            'relative_risk': rr,
-            'risk1': risk1,
-            'risk2': risk2,
-            'ci_lower': ci_lower,
-            'ci_upper': ci_upper
-        }
+        return RelativeRiskResult(
+            relative_risk=_scalar_or_array(rr),
+            risk1=_scalar_or_array(risk1),
+            risk2=_scalar_or_array(risk2),
+            ci_lower=_scalar_or_array(ci_lower),
+            ci_upper=_scalar_or_array(ci_upper)
+        )
+    
+    @staticmethod
+    def two_by_two_batch(a, b=None, c=None, d=None, confidence_level=0.95):
+        """
+        Vectorised effect sizes for many 2x2 tables at once.
+        
+        Tables with a zero cell receive the Haldane-Anscombe correction (0.5
+        added to every cell) for the odds ratio and relative risk; the risk
+        difference uses the observed counts.
+        
+        Parameters:
+        -----------
+        a, b, c, d : array-like
+            Cells of each 2x2 table ([a, b], [c, d]). Alternatively pass an
+            N x 2 x 2 array as ``a`` and leave b, c, d unset.
+        confidence_level : float
+            Confidence level (default: 0.95)
+            
+        Returns:
+        --------
+        TwoByTwoResult : Arrays of odds ratios, relative risks, risk differences and CIs
+        """
+        a, b, c, d = EffectSizes._table_cells(a, b, c, d)
+        odds = EffectSizes.odds_ratio_ci(a, b, c, d, confidence_level)
+        risk = EffectSizes.relative_risk_ci(a, b, c, d, confidence_level)
+        
+        z_critical = stats.norm.ppf(1 - (1 - confidence_level)/2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            risk1 = a / (a + b)
+            risk2 = c / (c + d)
+            risk_difference = risk1 - risk2
+            se_rd = np.sqrt(risk1 * (1 - risk1) / (a + b) + risk2 * (1 - risk2) / (c + d))
+        
+        return TwoByTwoResult(
+            odds_ratio=odds['odds_ratio'],
+            or_ci_lower=odds['ci_lower'],
+            or_ci_upper=odds['ci_upper'],
+            log_or=odds['log_or'],
+            se_log_or=odds['se_log_or'],
+            relative_risk=risk['relative_risk'],
+            rr_ci_lower=risk['ci_lower'],
+            rr_ci_upper=risk['ci_upper'],
+            risk1=_scalar_or_array(risk1),
+            risk2=_scalar_or_array(risk2),
+            risk_difference=_scalar_or_array(risk_difference),
+            rd_ci_lower=_scalar_or_array(risk_difference - z_critical * se_rd),
+            rd_ci_upper=_scalar_or_array(risk_difference + z_critical * se_rd),
+            zero_cell_corrected=_scalar_or_array((a == 0) | (b == 0) | (c == 0) | (d == 0))
+        )
+    
+    @staticmethod
+    def mantel_haenszel(tables, confidence_level=0.95):
+        """
+        Mantel-Haenszel pooled odds ratio and risk ratio across strata.
+        
+        The variance of log OR uses the Robins-Breslow-Greenland estimator and
+        the variance of log RR the Greenland-Robins estimator. All strata are
+        summed in vectorised form; leading dimensions are treated as separate
+        stratified analyses.
+        
+        Parameters:
+        -----------
+        tables : array-like
+            K x 2 x 2 array (or ... x K x 2 x 2) with one 2x2 table per stratum:
+            [exposed events, exposed non-events]
+            [unexposed events, unexposed non-events]
+        confidence_level : float
+            Confidence level (default: 0.95)
+            
+        Returns:
+        --------
+        MantelHaenszelResult : Pooled OR and RR with confidence intervals
+        """
+        a, b, c, d = EffectSizes._stratified_cells(tables)
+        n = a + b + c + d
+        z_critical = stats.norm.ppf(1 - (1 - confidence_level)/2)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Odds ratio with Robins-Breslow-Greenland variance
+            P, Q = (a + d) / n, (b + c) / n
+            R, S = a * d / n, b * c / n
+            sum_R, sum_S = np.nansum(R, axis=-1), np.nansum(S, axis=-1)
+            odds_ratio = sum_R / sum_S
+            var_log_or = (np.nansum(P * R, axis=-1) / (2 * sum_R**2) +
+                          np.nansum(P * S + Q * R, axis=-1) / (2 * sum_R * sum_S) +
+                          np.nansum(Q * S, axis=-1) / (2 * sum_S**2))
+            se_log_or = np.sqrt(var_log_or)
+            
+            # Risk ratio with Greenland-Robins variance
+            n1, n0, m1 = a + b, c + d, a + c
+            rr_numerator = np.nansum(a * n0 / n, axis=-1)
+            rr_denominator = np.nansum(c * n1 / n, axis=-1)
+            relative_risk = rr_numerator / rr_denominator
+            var_log_rr = (np.nansum((n1 * n0 * m1 - a * c * n) / n**2, axis=-1) /
+                          (rr_numerator * rr_denominator))
+            se_log_rr = np.sqrt(var_log_rr)
+            
+            log_or, log_rr = np.log(odds_ratio), np.log(relative_risk)
+        
+        return MantelHaenszelResult(
+            odds_ratio=_scalar_or_array(odds_ratio),
+            or_ci_lower=_scalar_or_array(np.exp(log_or - z_critical * se_log_or)),
+            or_ci_upper=_scalar_or_array(np.exp(log_or + z_critical * se_log_or)),
+            se_log_or=_scalar_or_array(se_log_or),
+            relative_risk=_scalar_or_array(relative_risk),
+            rr_ci_lower=_scalar_or_array(np.exp(log_rr - z_critical * se_log_rr)),
+            rr_ci_upper=_scalar_or_array(np.exp(log_rr + z_critical * se_log_rr)),
+            se_log_rr=_scalar_or_array(se_log_rr),
+            n_strata=a.shape[-1],
+            confidence_level=confidence_level
+        )
+    
+    @staticmethod
+    def _stratified_cells(tables):
+        """Return cells of a ... x K x 2 x 2 array, dropping strata with no observations."""
+        tables = np.asarray(tables, dtype=float)
+        if tables.ndim < 3 or tables.shape[-2:] != (2, 2):
+            raise ValueError("Expected a K x 2 x 2 array of stratum tables")
+        a, b, c, d = EffectSizes._table_cells(tables)
+        empty = (a + b + c + d) == 0
+        return tuple(np.where(empty, np.nan, x) for x in (a, b, c, d))
+    
+    @staticmethod
+    def _table_cells(a, b=None, c=None, d=None):
+        """Return the four cells of one or many 2x2 tables as float arrays."""
+        if b is None and c is None and d is None:
+            tables = np.asarray(a, dtype=float)
+            if tables.shape[-2:] != (2, 2):
+                raise ValueError("Expected a 2x2 table or an N x 2 x 2 array of tables")
+            return tables[..., 0, 0], tables[..., 0, 1], tables[..., 1, 0], tables[..., 1, 1]
+        
+        return tuple(np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (a, b, c, d)]))
+    
+    @staticmethod
+    def _haldane_correction(a, b, c, d, correction=0.5):
+        """Add the continuity correction to every cell of tables with a zero cell."""
+        zero_cell = (a == 0) | (b == 0) | (c == 0) | (d == 0)
+        return tuple(np.where(zero_cell, x + correction, x) for x in (a, b, c, d))
 
 
 class PowerAnalysis:
@@ -565,7 +1343,7 @@ class PowerAnalysis:
         if n2 is None:
             n2 = n1
         
-        return smp.ttest_power(effect_size, n1, alpha, alternative=alternative, n2=n2)
+        return smp.TTestIndPower().power(effect_size, n1, alpha, ratio=n2/n1, alternative=alternative)
     
     @staticmethod
     def sample_size_t_test_independent(effect_size, power=0.8, alpha=0.05, ratio=1, alternative='two-sided'):
@@ -608,6 +1386,9 @@ class PowerAnalysis:
         """
         Power calculation for comparing two proportions.
         
+        Uses the normal approximation on Cohen's h (arcsine-transformed
+        difference of the proportions).
+        
         Parameters:
         -----------
         p1, p2 : float
@@ -626,621 +1407,2841 @@ class PowerAnalysis:
         if n2 is None:
             n2 = n1
             
-        return smp.zt_ind_solve_power(effect_size=None, nobs1=n1, alpha=alpha, 
-                                     power=None, ratio=n2/n1, alternative=alternative,
-                                     prop2=p2, prop1=p1)
-
-
-class SurvivalAnalysis:
-    """
-    Class for survival analysis functions.
-    Requires lifelines package.
-    """
+        effect_size = 2 * np.arcsin(np.sqrt(p1)) - 2 * np.arcsin(np.sqrt(p2))
+        return smp.NormalIndPower().power(effect_size, n1, alpha, ratio=n2/n1, alternative=alternative)
     
     @staticmethod
-    def kaplan_meier_analysis(durations, event_observed, groups=None, alpha=0.05):
+    def power_t_test_paired(effect_size, n_pairs, alpha=0.05, alternative='two-sided'):
         """
-        Kaplan-Meier survival analysis.
+        Power calculation for paired samples t-test (noncentral t).
+        
+        All arguments broadcast against each other, so a grid of designs
+        can be evaluated in one call.
         
         Parameters:
         -----------
-        durations : array-like
-            Duration until event or censoring
-        event_observed : array-like
-            Whether event was observed (1) or censored (0)
-        groups : array-like, optional
-            Group labels for comparison
-        alpha : float
-            Significance level for confidence intervals
+        effect_size : float or array-like
+            Cohen's d of the paired differences (mean difference / SD of differences)
+        n_pairs : int or array-like
+            Number of pairs
+        alpha : float or array-like
+            Type I error rate (default: 0.05)
+        alternative : str
+            Alternative hypothesis ('two-sided', 'larger', 'smaller')
             
         Returns:
         --------
-        dict : Survival analysis results
+        float or numpy.ndarray : Statistical power
         """
-        if not LIFELINES_AVAILABLE:
-            return {"error": "lifelines package not available"}
+        d, n, alpha = np.broadcast_arrays(np.asarray(effect_size, dtype=float),
+                                          np.asarray(n_pairs, dtype=float),
+                                          np.asarray(alpha, dtype=float))
+        df = n - 1
+        noncentrality = d * np.sqrt(n)
         
-        if groups is None:
-            # Single group analysis
-            kmf = KaplanMeierFitter(alpha=alpha)
-            kmf.fit(durations, event_observed)
-            
-            return {
-                'survival_function': kmf.survival_function_,
-                'confidence_interval': kmf.confidence_interval_,
-                'median_survival': kmf.median_survival_time_,
-                'median_ci': kmf.confidence_interval_survival_times_,
-                'event_table': kmf.event_table
-            }
+        if alternative == 'two-sided':
+            t_critical = stats.t.ppf(1 - alpha/2, df)
+            power = (stats.nct.sf(t_critical, df, noncentrality) +
+                     stats.nct.cdf(-t_critical, df, noncentrality))
+        elif alternative == 'larger':
+            power = stats.nct.sf(stats.t.ppf(1 - alpha, df), df, noncentrality)
+        elif alternative == 'smaller':
+            power = stats.nct.cdf(-stats.t.ppf(1 - alpha, df), df, noncentrality)
         else:
-            # Group comparison
-            results = {}
-            unique_groups = np.unique(groups)
-            
-            for group in unique_groups:
-                mask = groups == group
-                kmf = KaplanMeierFitter(alpha=alpha, label=str(group))
-                kmf.fit(durations[mask], event_observed[mask])
-                
-                results[group] = {
-                    'survival_function': kmf.survival_function_,
-                    'confidence_interval': kmf.confidence_interval_,
-                    'median_survival': kmf.median_survival_time_,
-                    'event_table': kmf.event_table
-                }
-            
-            # Log-rank test
-            if len(unique_groups) == 2:
-                group1_mask = groups == unique_groups[0]
-                group2_mask = groups == unique_groups[1]
-                
-                logrank_result = logrank_test(
-                    durations[group1_mask], durations[group2_mask],
-                    event_observed[group1_mask], event_observed[group2_mask]
-                )
-                
-                results['logrank_test'] = {
-                    'test_statistic': logrank_result.test_statistic,
-                    'p_value': logrank_result.p_value,
-                    'degrees_of_freedom': 1,
-                    'significant': logrank_result.p_value < 0.05
-                }
-            
-            return results
+            raise ValueError(f"Unsupported alternative: {alternative}")
+        
+        return _scalar_or_array(power)
     
     @staticmethod
-    def cox_regression(durations, event_observed, covariates_df, alpha=0.05):
+    def sample_size_t_test_paired(effect_size, power=0.8, alpha=0.05, alternative='two-sided'):
         """
-        Cox proportional hazards regression.
+        Sample size calculation for paired samples t-test.
+        
+        The normal approximation is used as a starting point and refined to the
+        smallest number of pairs reaching the target power under the noncentral t.
         
         Parameters:
         -----------
-        durations : array-like
-            Duration until event or censoring
-        event_observed : array-like
-            Whether event was observed (1) or censored (0)
-        covariates_df : pandas.DataFrame
-            Covariates for regression
-        alpha : float
-            Significance level
+        effect_size : float or array-like
+            Cohen's d of the paired differences
+        power : float or array-like
+            Desired statistical power (default: 0.8)
+        alpha : float or array-like
+            Type I error rate (default: 0.05)
+        alternative : str
+            Alternative hypothesis ('two-sided', 'larger', 'smaller')
             
         Returns:
         --------
-        dict : Cox regression results
+        dict : Sample size calculations
         """
-        if not LIFELINES_AVAILABLE:
-            return {"error": "lifelines package not available"}
+        d, power, alpha = np.broadcast_arrays(np.asarray(effect_size, dtype=float),
+                                              np.asarray(power, dtype=float),
+                                              np.asarray(alpha, dtype=float))
+        if np.any(d == 0):
+            raise ValueError("effect_size must be non-zero")
         
-        # Prepare data
-        data = covariates_df.copy()
-        data['duration'] = durations
-        data['event'] = event_observed
+        z_alpha = PowerAnalysis._z_critical(alpha, alternative)
+        n_normal = ((z_alpha + stats.norm.ppf(power)) / d)**2
         
-        # Fit Cox model
-        cph = CoxPHFitter(alpha=alpha)
-        cph.fit(data, duration_col='duration', event_col='event')
+        n_pairs = PowerAnalysis._solve_sample_size(
+            lambda n: PowerAnalysis.power_t_test_paired(d, n, alpha, alternative),
+            power, n_min=2, n_start=n_normal
+        )
         
         return {
-            'summary': cph.summary,
-            'hazard_ratios': cph.hazard_ratios_,
-            'confidence_intervals': cph.confidence_intervals_,
-            'p_values': cph.summary['p'],
-            'concordance_index': cph.concordance_index_,
-            'log_likelihood': cph.log_likelihood_,
-            'aic': cph.AIC_,
-            'partial_aic': cph.AIC_partial_
+            'n_pairs': _scalar_or_array(n_pairs),
+            'effect_size': _scalar_or_array(d),
+            'power': _scalar_or_array(power),
+            'alpha': _scalar_or_array(alpha),
+            'alternative': alternative
         }
-
-
-class MetaAnalysis:
-    """
-    Class for meta-analysis functions.
-    """
     
     @staticmethod
-    def fixed_effects_meta(effect_sizes, variances, study_names=None):
+    def sample_size_proportion_test(p1, p2, power=0.8, alpha=0.05, ratio=1, alternative='two-sided',
+                                    continuity_correction=False):
         """
-        Fixed-effects meta-analysis.
+        Sample size calculation for comparing two independent proportions.
+        
+        Uses the closed-form normal approximation with pooled variance under the
+        null hypothesis, optionally with the Fleiss continuity correction.
         
         Parameters:
         -----------
-        effect_sizes : array-like
-            Effect sizes from individual studies
-        variances : array-like
-            Variances of effect sizes
-        study_names : array-like, optional
-            Names of studies
+        p1, p2 : float or array-like
+            Expected proportions in group 1 and group 2
+        power : float or array-like
+            Desired statistical power (default: 0.8)
+        alpha : float or array-like
+            Type I error rate (default: 0.05)
+        ratio : float or array-like
+            Ratio of sample sizes n2/n1 (default: 1)
+        alternative : str
+            Alternative hypothesis ('two-sided', 'larger', 'smaller')
+        continuity_correction : bool
+            Apply the Fleiss continuity correction (default: False)
             
         Returns:
         --------
-        dict : Meta-analysis results
+        dict : Sample size calculations
         """
-        es = np.array(effect_sizes)
-        var = np.array(variances)
-        weights = 1 / var
+        p1, p2, power, alpha, ratio = np.broadcast_arrays(*[
+            np.asarray(x, dtype=float) for x in (p1, p2, power, alpha, ratio)
+        ])
+        delta = np.abs(p1 - p2)
+        if np.any(delta == 0):
+            raise ValueError("p1 and p2 must differ")
         
-        # Pooled effect size
-        pooled_es = np.sum(weights * es) / np.sum(weights)
-        pooled_var = 1 / np.sum(weights)
-        pooled_se = np.sqrt(pooled_var)
+        z_alpha = PowerAnalysis._z_critical(alpha, alternative)
+        z_beta = stats.norm.ppf(power)
+        p_bar = (p1 + ratio * p2) / (1 + ratio)
         
-        # Confidence interval
-        z_critical = stats.norm.ppf(0.975)
-        ci_lower = pooled_es - z_critical * pooled_se
-        ci_upper = pooled_es + z_critical * pooled_se
+        n1 = (z_alpha * np.sqrt(p_bar * (1 - p_bar) * (1 + 1/ratio)) +
+              z_beta * np.sqrt(p1 * (1 - p1) + p2 * (1 - p2) / ratio))**2 / delta**2
         
-        # Test of overall effect
-        z_score = pooled_es / pooled_se
-        p_value = 2 * (1 - stats.norm.cdf(abs(z_score)))
+        if continuity_correction:
+            n1 = n1 / 4 * (1 + np.sqrt(1 + 2 * (ratio + 1) / (n1 * ratio * delta)))**2
         
-        # Heterogeneity
-        q_stat = np.sum(weights * (es - pooled_es)**2)
-        df = len(es) - 1
-        q_p_value = 1 - stats.chi2.cdf(q_stat, df)
-        i_squared = max(0, (q_stat - df) / q_stat * 100)
+        n1_size = np.ceil(n1)
+        n2_size = np.ceil(n1 * ratio)
         
         return {
-            'pooled_effect_size': pooled_es,
-            'pooled_se': pooled_se,
-            'ci_lower': ci_lower,
-            'ci_upper': ci_upper,
-            'z_score': z_score,
-            'p_value': p_value,
-            'q_statistic': q_stat,
-            'q_p_value': q_p_value,
-            'i_squared': i_squared,
-            'tau_squared': 0,  # Fixed effects assumes tau² = 0
-            'weights': weights,
-            'significant': p_value < 0.05,
-            'heterogeneity': 'Low' if i_squared < 25 else 'Moderate' if i_squared < 75 else 'High'
+            'n1': _scalar_or_array(n1_size.astype(int)),
+            'n2': _scalar_or_array(n2_size.astype(int)),
+            'total_n': _scalar_or_array((n1_size + n2_size).astype(int)),
+            'p1': _scalar_or_array(p1),
+            'p2': _scalar_or_array(p2),
+            'power': _scalar_or_array(power),
+            'alpha': _scalar_or_array(alpha),
+            'ratio': _scalar_or_array(ratio),
+            'alternative': alternative,
+            'continuity_correction': continuity_correction
         }
     
     @staticmethod
-    def random_effects_meta(effect_sizes, variances, study_names=None, method='DL'):
+    def sample_size_non_inferiority_means(mean_difference, margin, sd, power=0.8, alpha=0.025,
+                                          ratio=1, higher_is_better=True):
         """
-        Random-effects meta-analysis using DerSimonian-Laird method.
+        Sample size for a non-inferiority comparison of two means.
+        
+        Tests H0: treatment - control <= -margin (or >= margin when lower values
+        are better) with a one-sided test. The normal approximation is refined
+        to the exact noncentral t solution.
         
         Parameters:
         -----------
-        effect_sizes : array-like
-            Effect sizes from individual studies
-        variances : array-like
-            Variances of effect sizes
-        study_names : array-like, optional
-            Names of studies
-        method : str
-            Method for tau² estimation (default: 'DL')
+        mean_difference : float or array-like
+            Expected true difference (treatment - control), often 0
+        margin : float or array-like
+            Non-inferiority margin (positive, on the outcome scale)
+        sd : float or array-like
+            Common standard deviation of the outcome
+        power : float or array-like
+            Desired statistical power (default: 0.8)
+        alpha : float or array-like
+            One-sided Type I error rate (default: 0.025)
+        ratio : float or array-like
+            Ratio of sample sizes n2/n1, group 1 = treatment (default: 1)
+        higher_is_better : bool
+            Whether higher outcome values are favourable (default: True)
             
         Returns:
         --------
-        dict : Meta-analysis results
+        dict : Sample size calculations
         """
-        es = np.array(effect_sizes)
-        var = np.array(variances)
-        
-        # First, calculate Q statistic using fixed effects
-        weights_fe = 1 / var
-        pooled_es_fe = np.sum(weights_fe * es) / np.sum(weights_fe)
-        q_stat = np.sum(weights_fe * (es - pooled_es_fe)**2)
-        df = len(es) - 1
-        
-        # Estimate tau²
-        if method == 'DL':
-            c = np.sum(weights_fe) - np.sum(weights_fe**2) / np.sum(weights_fe)
-            tau_squared = max(0, (q_stat - df) / c)
-        else:
-            tau_squared = 0
-        
-        # Random effects weights
-        weights_re = 1 / (var + tau_squared)
+        diff, margin, sd, power, alpha, ratio = np.broadcast_arrays(*[
+            np.asarray(x, dtype=float) for x in (mean_difference, margin, sd, power, alpha, ratio)
+        ])
+        if np.any(margin <= 0):
+            raise ValueError("margin must be positive")
         
-        # Pooled effect size
-        pooled_es = np.sum(weights_re * es) / np.sum(weights_re)
-        pooled_var = 1 / np.sum(weights_re)
-        pooled_se = np.sqrt(pooled_var)
+        distance = (diff if higher_is_better else -diff) + margin
+        if np.any(distance <= 0):
+            raise ValueError("Expected difference lies beyond the non-inferiority margin")
         
-        # Confidence interval
-        z_critical = stats.norm.ppf(0.975)
-        ci_lower = pooled_es - z_critical * pooled_se
-        ci_upper = pooled_es + z_critical * pooled_se
+        z_sum = stats.norm.ppf(1 - alpha) + stats.norm.ppf(power)
+        n_normal = z_sum**2 * sd**2 * (1 + 1/ratio) / distance**2
         
-        # Test of overall effect
-        z_score = pooled_es / pooled_se
-        p_value = 2 * (1 - stats.norm.cdf(abs(z_score)))
+        def power_func(n1):
+            df = n1 * (1 + ratio) - 2
+            noncentrality = distance / (sd * np.sqrt(1/n1 + 1/(n1 * ratio)))
+            return stats.nct.sf(stats.t.ppf(1 - alpha, df), df, noncentrality)
         
-        # Heterogeneity statistics
-        q_p_value = 1 - stats.chi2.cdf(q_stat, df)
-        i_squared = max(0, (q_stat - df) / q_stat * 100)
+        n1 = PowerAnalysis._solve_sample_size(power_func, power, n_min=2, n_start=n_normal)
+        n2 = np.ceil(n1 * ratio).astype(int)
         
         return {
-            'pooled_effect_size': pooled_es,
-            'pooled_se': pooled_se,
-            'ci_lower': ci_lower,
-            'ci_upper': ci_upper,
-            'z_score': z_score,
-            'p_value': p_value,
-            'q_statistic': q_stat,
-            'q_p_value': q_p_value,
-            'i_squared': i_squared,
-            'tau_squared': tau_squared,
-            'weights': weights_re,
-            'significant': p_value < 0.05,
-            'heterogeneity': 'Low' if i_squared < 25 else 'Moderate' if i_squared < 75 else 'High'
+            'n1': _scalar_or_array(n1),
+            'n2': _scalar_or_array(n2),
+            'total_n': _scalar_or_array(n1 + n2),
+            'mean_difference': _scalar_or_array(diff),
+            'margin': _scalar_or_array(margin),
+            'sd': _scalar_or_array(sd),
+            'power': _scalar_or_array(power),
+            'alpha': _scalar_or_array(alpha),
+            'ratio': _scalar_or_array(ratio)
         }
-
-
-class MLEvaluationMetrics:
-    """
-    Class for machine learning evaluation metrics commonly used in medical AI.
-    """
     
     @staticmethod
-    def binary_classification_metrics(y_true, y_pred, y_scores=None, pos_label=1):
+    def sample_size_non_inferiority_proportions(p_treatment, p_control, margin, power=0.8,
+                                                alpha=0.025, ratio=1, higher_is_better=True):
         """
-        Comprehensive binary classification metrics.
+        Sample size for a non-inferiority comparison of two proportions.
+        
+        Closed-form normal approximation with unpooled variance (Blackwelder).
         
         Parameters:
         -----------
-        y_true : array-like
-            True binary labels
-        y_pred : array-like
-            Predicted binary labels
-        y_scores : array-like, optional
-            Prediction scores/probabilities
-        pos_label : int or str
-            Positive class label
+        p_treatment, p_control : float or array-like
+            Expected proportions in the treatment (group 1) and control (group 2) arms
+        margin : float or array-like
+            Non-inferiority margin on the risk-difference scale (positive)
+        power : float or array-like
+            Desired statistical power (default: 0.8)
+        alpha : float or array-like
+            One-sided Type I error rate (default: 0.025)
+        ratio : float or array-like
+            Ratio of sample sizes n2/n1 (default: 1)
+        higher_is_better : bool
+            Whether the proportion is a favourable outcome, e.g. success rather
+            than complication (default: True)
             
         Returns:
         --------
-        dict : Classification metrics
+        dict : Sample size calculations
         """
-        # Confusion matrix
-        tn, fp, fn, tp = confusion_matrix(y_true, y_pred, labels=[1-pos_label, pos_label]).ravel()
+        p_t, p_c, margin, power, alpha, ratio = np.broadcast_arrays(*[
+            np.asarray(x, dtype=float) for x in (p_treatment, p_control, margin, power, alpha, ratio)
+        ])
+        if np.any(margin <= 0):
+            raise ValueError("margin must be positive")
         
-        # Basic metrics
-        sensitivity = tp / (tp + fn) if (tp + fn) > 0 else 0
-        specificity = tn / (tn + fp) if (tn + fp) > 0 else 0
-        ppv = tp / (tp + fp) if (tp + fp) > 0 else 0  # Precision/PPV
-        npv = tn / (tn + fn) if (tn + fn) > 0 else 0
-        accuracy = (tp + tn) / (tp + tn + fp + fn)
+        diff = p_t - p_c
+        distance = (diff if higher_is_better else -diff) + margin
+        if np.any(distance <= 0):
+            raise ValueError("Expected difference lies beyond the non-inferiority margin")
         
-        # F1 score
-        f1 = 2 * (ppv * sensitivity) / (ppv + sensitivity) if (ppv + sensitivity) > 0 else 0
+        z_sum = stats.norm.ppf(1 - alpha) + stats.norm.ppf(power)
+        n1 = z_sum**2 * (p_t * (1 - p_t) + p_c * (1 - p_c) / ratio) / distance**2
         
-        # Likelihood ratios
-        lr_positive = sensitivity / (1 - specificity) if specificity < 1 else np.inf
-        lr_negative = (1 - sensitivity) / specificity if specificity > 0 else np.inf
+        n1_size = np.ceil(n1)
+        n2_size = np.ceil(n1 * ratio)
         
-        results = {
-            'confusion_matrix': {'TP': tp, 'TN': tn, 'FP': fp, 'FN': fn},
-            'sensitivity_recall': sensitivity,
-            'specificity': specificity,
-            'precision_ppv': ppv,
-            'npv': npv,
-            'accuracy': accuracy,
-            'f1_score': f1,
-            'lr_positive': lr_positive,
-            'lr_negative': lr_negative
+        return {
+            'n1': _scalar_or_array(n1_size.astype(int)),
+            'n2': _scalar_or_array(n2_size.astype(int)),
+            'total_n': _scalar_or_array((n1_size + n2_size).astype(int)),
+            'p_treatment': _scalar_or_array(p_t),
+            'p_control': _scalar_or_array(p_c),
+            'margin': _scalar_or_array(margin),
+            'power': _scalar_or_array(power),
+            'alpha': _scalar_or_array(alpha),
+            'ratio': _scalar_or_array(ratio)
         }
-        
-        # ROC and PR curves if scores provided
-        if y_scores is not None:
-            fpr, tpr, roc_thresholds = roc_curve(y_true, y_scores, pos_label=pos_label)
-            auc_roc = auc(fpr, tpr)
-            
-            precision, recall, pr_thresholds = precision_recall_curve(y_true, y_scores, pos_label=pos_label)
-            auc_pr = auc(recall, precision)
-            
-            results.update({
-                'auc_roc': auc_roc,
-                'auc_pr': auc_pr,
-                'roc_curve': {'fpr': fpr, 'tpr': tpr, 'thresholds': roc_thresholds},
-                'pr_curve': {'precision': precision, 'recall': recall, 'thresholds': pr_thresholds}
-            })
-        
-        return results
     
     @staticmethod
-    def diagnostic_test_evaluation(y_true, y_pred, prevalence=None):
+    def sample_size_mcnemar(p10, p01, power=0.8, alpha=0.05, alternative='two-sided'):
         """
-        Evaluation metrics for diagnostic tests.
+        Sample size (number of pairs) for McNemar's test of paired proportions.
+        
+        Uses Connor's (1987) closed-form approximation.
         
         Parameters:
         -----------
-        y_true : array-like
-            True labels (1 for disease, 0 for no disease)
-        y_pred : array-like
-            Predicted labels
-        prevalence : float, optional
-            Disease prevalence in population
+        p10, p01 : float or array-like
+            Expected probabilities of the two discordant cells
+            (positive/negative and negative/positive)
+        power : float or array-like
+            Desired statistical power (default: 0.8)
+        alpha : float or array-like
+            Type I error rate (default: 0.05)
+        alternative : str
+            Alternative hypothesis ('two-sided', 'larger', 'smaller')
             
         Returns:
         --------
-        dict : Diagnostic test metrics
+        dict : Sample size calculations
         """
-        metrics = MLEvaluationMetrics.binary_classification_metrics(y_true, y_pred)
+        p10, p01, power, alpha = np.broadcast_arrays(*[
+            np.asarray(x, dtype=float) for x in (p10, p01, power, alpha)
+        ])
+        p_discordant = p10 + p01
+        diff = p10 - p01
+        if np.any(diff == 0):
+            raise ValueError("p10 and p01 must differ")
         
-        sensitivity = metrics['sensitivity_recall']
-        specificity = metrics['specificity']
+        z_alpha = PowerAnalysis._z_critical(alpha, alternative)
+        z_beta = stats.norm.ppf(power)
+        n_pairs = np.ceil((z_alpha * np.sqrt(p_discordant) +
+                           z_beta * np.sqrt(p_discordant - diff**2))**2 / diff**2)
         
-        # If prevalence provided, calculate predictive values for population
-        if prevalence is not None:
-            ppv_pop = (sensitivity * prevalence) / (sensitivity * prevalence + (1 - specificity) * (1 - prevalence))
-            npv_pop = (specificity * (1 - prevalence)) / (specificity * (1 - prevalence) + (1 - sensitivity) * prevalence)
-            
-            metrics.update({
+        return {
+            'n_pairs': _scalar_or_array(n_pairs.astype(int)),
+            'expected_discordant_pairs': _scalar_or_array(n_pairs * p_discordant),
+            'p10': _scalar_or_array(p10),
+            'p01': _scalar_or_array(p01),
+            'power': _scalar_or_array(power),
+            'alpha': _scalar_or_array(alpha),
+            'alternative': alternative
+        }
+    
+    @staticmethod
+    def sample_size_logrank(hazard_ratio, power=0.8, alpha=0.05, ratio=1, p_event=None,
+                            method='schoenfeld', alternative='two-sided'):
+        """
+        Required number of events and sample size for the log-rank test.
+        
+        Parameters:
+        -----------
+        hazard_ratio : float or array-like
+            Hazard ratio of group 1 relative to group 2
+        power : float or array-like
+            Desired statistical power (default: 0.8)
+        alpha : float or array-like
+            Type I error rate (default: 0.05)
+        ratio : float or array-like
+            Ratio of sample sizes n2/n1 (default: 1)
+        p_event : float or array-like, optional
+            Overall probability of observing the event during follow-up.
+            When omitted only the number of events is returned.
+        method : str
+            'schoenfeld' (log hazard ratio) or 'freedman' (default: 'schoenfeld')
+        alternative : str
+            Alternative hypothesis ('two-sided', 'larger', 'smaller')
+            
+        Returns:
+        --------
+        dict : Required events and sample sizes
+        """
+        hr, power, alpha, ratio = np.broadcast_arrays(*[
+            np.asarray(x, dtype=float) for x in (hazard_ratio, power, alpha, ratio)
+        ])
+        if np.any(hr <= 0) or np.any(hr == 1):
+            raise ValueError("hazard_ratio must be positive and different from 1")
+        
+        z_sum = PowerAnalysis._z_critical(alpha, alternative) + stats.norm.ppf(power)
+        
+        if method == 'schoenfeld':
+            prop1 = 1 / (1 + ratio)
+            events = z_sum**2 / (prop1 * (1 - prop1) * np.log(hr)**2)
+        elif method == 'freedman':
+            phi = 1 / ratio  # n1/n2
+            events = z_sum**2 * (1 + phi * hr)**2 / (phi * (1 - hr)**2)
+        else:
+            raise ValueError(f"Unsupported method: {method}")
+        events = np.ceil(events)
+        
+        results = {
+            'events': _scalar_or_array(events.astype(int)),
+            'n1': None,
+            'n2': None,
+            'total_n': None,
+            'hazard_ratio': _scalar_or_array(hr),
+            'power': _scalar_or_array(power),
+            'alpha': _scalar_or_array(alpha),
+            'ratio': _scalar_or_array(ratio),
+            'method': method,
+            'alternative': alternative
+        }
+        
+        if p_event is not None:
+            p_event = np.broadcast_to(np.asarray(p_event, dtype=float), events.shape)
+            total = events / p_event
+            n1_size = np.ceil(total / (1 + ratio))
+            n2_size = np.ceil(total * ratio / (1 + ratio))
+            results.update({
+                'n1': _scalar_or_array(n1_size.astype(int)),
+                'n2': _scalar_or_array(n2_size.astype(int)),
+                'total_n': _scalar_or_array((n1_size + n2_size).astype(int))
+            })
+        
+        return results
+    
+    @staticmethod
+    def alpha_spending(information_fractions, alpha=0.05, spending='obrien-fleming', rho=1.0):
+        """
+        Lan-DeMets alpha-spending function.
+        
+        Parameters:
+        -----------
+        information_fractions : float or array-like
+            Information fractions t in (0, 1]
+        alpha : float
+            Total Type I error to spend
+        spending : str
+            'obrien-fleming', 'pocock' or 'power' (Kim-DeMets, alpha * t**rho)
+        rho : float
+            Exponent for the power family (default: 1)
+            
+        Returns:
+        --------
+        float or numpy.ndarray : Cumulative alpha spent at each fraction
+        """
+        t = np.asarray(information_fractions, dtype=float)
+        
+        if spending == 'obrien-fleming':
+            spent = 2 * stats.norm.sf(stats.norm.isf(alpha/2) / np.sqrt(t))
+        elif spending == 'pocock':
+            spent = alpha * np.log(1 + (np.e - 1) * t)
+        elif spending == 'power':
+            spent = alpha * t**rho
+        else:
+            raise ValueError(f"Unsupported spending function: {spending}")
+        
+        return _scalar_or_array(np.minimum(spent, alpha))
+    
+    @staticmethod
+    def group_sequential_boundaries(n_looks=5, information_fractions=None, alpha=0.05,
+                                    spending='obrien-fleming', sides=2, rho=1.0):
+        """
+        Efficacy boundaries for a group-sequential design using alpha spending.
+        
+        Boundaries are found look by look so that the probability of first
+        crossing at each look under H0 equals the alpha spent in that interval.
+        The multivariate normal integrals are evaluated with the recursive
+        numerical integration of Armitage, McPherson and Rowe (Jennison &
+        Turnbull, 2000, ch. 19).
+        
+        Parameters:
+        -----------
+        n_looks : int
+            Number of equally spaced analyses (ignored if information_fractions given)
+        information_fractions : array-like, optional
+            Increasing information fractions of each analysis, ending at 1
+        alpha : float
+            Overall Type I error rate (default: 0.05)
+        spending : str
+            'obrien-fleming', 'pocock' or 'power' (default: 'obrien-fleming')
+        sides : int
+            1 for one-sided upper boundaries, 2 for symmetric two-sided (default: 2)
+        rho : float
+            Exponent for the power spending family (default: 1)
+            
+        Returns:
+        --------
+        dict : Boundaries, nominal p-values and alpha spent per look
+        """
+        t = PowerAnalysis._information_fractions(n_looks, information_fractions)
+        if sides not in (1, 2):
+            raise ValueError("sides must be 1 or 2")
+        
+        # Spend alpha per side so two-sided boundaries match the one-sided design at alpha/2
+        cumulative_alpha = sides * np.atleast_1d(
+            PowerAnalysis.alpha_spending(t, alpha / sides, spending, rho))
+        increments = np.diff(np.concatenate(([0.0], cumulative_alpha)))
+        
+        upper = np.empty(len(t))
+        z, h = None, None
+        
+        for k in range(len(t)):
+            target = increments[k]
+            lower_k = lambda b: -b if sides == 2 else -np.inf
+            
+            if target <= 0:
+                upper[k] = np.inf
+            elif k == 0:
+                upper[k] = stats.norm.isf(target / sides)
+            else:
+                sd = np.sqrt(t[k] - t[k-1])
+                shift = z * np.sqrt(t[k-1])
+                
+                def excess(b):
+                    cross = stats.norm.sf((b * np.sqrt(t[k]) - shift) / sd)
+                    if sides == 2:
+                        cross = cross + stats.norm.cdf((-b * np.sqrt(t[k]) - shift) / sd)
+                    return h @ cross - target
+                
+                b_marginal = stats.norm.isf(target / sides)
+                upper[k] = b_marginal if excess(b_marginal) >= 0 else \
+                    optimize.brentq(excess, -10.0 if sides == 1 else 0.0, b_marginal, xtol=1e-10)
+            
+            if k < len(t) - 1:
+                z, h = PowerAnalysis._gs_update_density(z, h, t, k, lower_k(upper[k]), upper[k], drift=0.0)
+        
+        lower = -upper if sides == 2 else np.full(len(t), -np.inf)
+        
+        return {
+            'information_fractions': t,
+            'upper_boundaries': upper,
+            'lower_boundaries': lower,
+            'nominal_p_values': sides * stats.norm.sf(upper),
+            'alpha_spent': increments,
+            'cumulative_alpha': cumulative_alpha,
+            'alpha': alpha,
+            'sides': sides,
+            'spending': spending
+        }
+    
+    @staticmethod
+    def group_sequential_design(n_looks=5, information_fractions=None, power=0.8, alpha=0.05,
+                                spending='obrien-fleming', sides=2, rho=1.0, n_fixed=None):
+        """
+        Group-sequential design: boundaries, maximum and expected sample size,
+        and stopping probabilities under H0 and H1.
+        
+        Parameters:
+        -----------
+        n_looks : int
+            Number of equally spaced analyses (ignored if information_fractions given)
+        information_fractions : array-like, optional
+            Increasing information fractions of each analysis, ending at 1
+        power : float
+            Desired statistical power (default: 0.8)
+        alpha : float
+            Overall Type I error rate (default: 0.05)
+        spending : str
+            'obrien-fleming', 'pocock' or 'power' (default: 'obrien-fleming')
+        sides : int
+            1 for one-sided, 2 for symmetric two-sided boundaries (default: 2)
+        rho : float
+            Exponent for the power spending family (default: 1)
+        n_fixed : int, optional
+            Total sample size of the equivalent fixed design (e.g. from
+            sample_size_t_test_independent); sample sizes are scaled from it
+            
+        Returns:
+        --------
+        dict : Design characteristics
+        """
+        design = PowerAnalysis.group_sequential_boundaries(n_looks, information_fractions, alpha,
+                                                           spending, sides, rho)
+        t = design['information_fractions']
+        upper, lower = design['upper_boundaries'], design['lower_boundaries']
+        
+        def crossing(drift):
+            return PowerAnalysis._gs_crossing_probabilities(upper, lower, t, drift)
+        
+        # Drift (expected Z at full information) giving the target power
+        drift_fixed = stats.norm.isf(alpha / sides) + stats.norm.ppf(power)
+        drift = optimize.brentq(lambda d: crossing(d)[0].sum() - power,
+                                0.0, 3 * drift_fixed, xtol=1e-10)
+        inflation_factor = (drift / drift_fixed)**2
+        
+        upper_h0, lower_h0 = crossing(0.0)
+        upper_h1, lower_h1 = crossing(drift)
+        stop_h0 = PowerAnalysis._gs_stopping_probabilities(upper_h0 + lower_h0)
+        stop_h1 = PowerAnalysis._gs_stopping_probabilities(upper_h1 + lower_h1)
+        
+        design.update({
+            'power': power,
+            'drift': drift,
+            'inflation_factor': inflation_factor,
+            'efficacy_probabilities_h0': upper_h0 + lower_h0,
+            'efficacy_probabilities_h1': upper_h1,
+            'cumulative_power': np.cumsum(upper_h1),
+            'stopping_probabilities_h0': stop_h0,
+            'stopping_probabilities_h1': stop_h1,
+            'expected_information_h0': np.sum(stop_h0 * t),
+            'expected_information_h1': np.sum(stop_h1 * t),
+            'n_fixed': n_fixed,
+            'n_max': None,
+            'n_per_look': None,
+            'expected_n_h0': None,
+            'expected_n_h1': None
+        })
+        
+        if n_fixed is not None:
+            n_max = int(np.ceil(n_fixed * inflation_factor))
+            design.update({
+                'n_max': n_max,
+                'n_per_look': np.ceil(n_max * t).astype(int),
+                'expected_n_h0': n_max * design['expected_information_h0'],
+                'expected_n_h1': n_max * design['expected_information_h1']
+            })
+        
+        return design
+    
+    @staticmethod
+    def _information_fractions(n_looks, information_fractions):
+        """Validate or build equally spaced information fractions."""
+        if information_fractions is None:
+            if n_looks < 1:
+                raise ValueError("n_looks must be at least 1")
+            return np.arange(1, n_looks + 1) / n_looks
+        
+        t = np.asarray(information_fractions, dtype=float)
+        if t.ndim != 1 or np.any(t <= 0) or np.any(np.diff(t) <= 0) or not np.isclose(t[-1], 1):
+            raise ValueError("information_fractions must be increasing in (0, 1] and end at 1")
+        return t
+    
+    @staticmethod
+    def _gs_stopping_probabilities(crossing_probabilities):
+        """Probability of stopping at each look (the final look absorbs the remainder)."""
+        stop = np.array(crossing_probabilities, dtype=float)
+        stop[-1] = 1 - stop[:-1].sum()
+        return stop
+    
+    @staticmethod
+    def _gs_grid(mean, lower, upper, r=18):
+        """
+        Integration grid and Simpson weights for one look (Jennison & Turnbull).
+        
+        Points are concentrated around the expected Z value and truncated to
+        the continuation region (lower, upper).
+        """
+        i = np.arange(1, 6 * r)
+        x = mean + np.where(i < r, -3 - 4 * np.log(r / i),
+                            np.where(i <= 5 * r, -3 + 3 * (i - r) / (2 * r),
+                                     3 + 4 * np.log(r / (6 * r - i))))
+        if lower > x[0]:
+            x = np.concatenate(([lower], x[x > lower]))
+        if upper < x[-1]:
+            x = np.concatenate((x[x < upper], [upper]))
+        
+        # Add midpoints and Simpson's rule weights
+        z = np.empty(2 * len(x) - 1)
+        z[0::2] = x
+        z[1::2] = (x[:-1] + x[1:]) / 2
+        d = np.diff(x)
+        w = np.zeros(len(z))
+        w[1::2] = 4 * d / 6
+        w[0:-1:2] += d / 6
+        w[2::2] += d / 6
+        return z, w
+    
+    @staticmethod
+    def _gs_update_density(z, h, t, k, lower, upper, drift):
+        """
+        Sub-density of Z_k on its continuation region, weighted for integration.
+        
+        Z_k * sqrt(t_k) has independent increments N(drift * dt, dt) on the
+        information-fraction scale, so each look is one matrix-vector product.
+        """
+        mean = drift * np.sqrt(t[k])
+        z_new, w_new = PowerAnalysis._gs_grid(mean, lower, upper)
+        
+        if k == 0:
+            return z_new, w_new * stats.norm.pdf(z_new - mean)
+        
+        dt = t[k] - t[k-1]
+        shift = z * np.sqrt(t[k-1]) + drift * dt
+        kernel = stats.norm.pdf((z_new[:, None] * np.sqrt(t[k]) - shift[None, :]) / np.sqrt(dt))
+        return z_new, w_new * (kernel @ h) * np.sqrt(t[k] / dt)
+    
+    @staticmethod
+    def _gs_crossing_probabilities(upper, lower, t, drift):
+        """Probabilities of first crossing the upper and lower boundary at each look."""
+        n_looks = len(t)
+        cross_upper = np.zeros(n_looks)
+        cross_lower = np.zeros(n_looks)
+        z, h = None, None
+        
+        for k in range(n_looks):
+            if k == 0:
+                mean = drift * np.sqrt(t[0])
+                cross_upper[0] = stats.norm.sf(upper[0] - mean)
+                cross_lower[0] = stats.norm.cdf(lower[0] - mean)
+            else:
+                sd = np.sqrt(t[k] - t[k-1])
+                shift = z * np.sqrt(t[k-1]) + drift * (t[k] - t[k-1])
+                cross_upper[k] = h @ stats.norm.sf((upper[k] * np.sqrt(t[k]) - shift) / sd)
+                cross_lower[k] = h @ stats.norm.cdf((lower[k] * np.sqrt(t[k]) - shift) / sd)
+            
+            if k < n_looks - 1:
+                z, h = PowerAnalysis._gs_update_density(z, h, t, k, lower[k], upper[k], drift)
+        
+        return cross_upper, cross_lower
+    
+    @staticmethod
+    def _solve_sample_size(power_func, target_power, n_min=2, n_start=None, n_max=1e9):
+        """
+        Vectorised integer root finder shared by the iterative solvers.
+        
+        Finds, element-wise, the smallest integer n >= n_min for which
+        power_func(n) >= target_power, assuming power is increasing in n.
+        The upper bracket starts at n_start (e.g. a normal approximation) and
+        is doubled where needed, then all elements are bisected together.
+        """
+        target = np.asarray(target_power, dtype=float)
+        lo = np.full(target.shape, n_min - 1, dtype=float)
+        if n_start is None:
+            hi = np.full(target.shape, float(n_min))
+        else:
+            hi = np.maximum(np.ceil(np.broadcast_to(n_start, target.shape)), n_min).astype(float)
+        
+        # Expand the upper bracket until every design reaches the target power
+        short = power_func(hi) < target
+        while np.any(short):
+            if np.any(hi[short] >= n_max):
+                raise ValueError("Target power not reachable below n_max")
+            lo = np.where(short, hi, lo)
+            hi = np.where(short, hi * 2, hi)
+            short = power_func(hi) < target
+        
+        # Bisect all designs simultaneously
+        active = hi - lo > 1
+        while np.any(active):
+            mid = np.floor((lo + hi) / 2)
+            reached = power_func(mid) >= target
+            hi = np.where(active & reached, mid, hi)
+            lo = np.where(active & ~reached, mid, lo)
+            active = hi - lo > 1
+        
+        return hi.astype(int)
+    
+    @staticmethod
+    def _z_critical(alpha, alternative):
+        """Standard normal critical value for the given alternative."""
+        if alternative == 'two-sided':
+            return stats.norm.ppf(1 - np.asarray(alpha)/2)
+        elif alternative in ('larger', 'smaller'):
+            return stats.norm.ppf(1 - np.asarray(alpha))
+        raise ValueError(f"Unsupported alternative: {alternative}")
+
+
+class SurvivalAnalysis:
+    """
+    Class for survival analysis functions.
+    Requires lifelines package.
+    """
+    
+    @staticmethod
+    def kaplan_meier_analysis(durations, event_observed, groups=None, alpha=0.05):
+        """
+        Kaplan-Meier survival analysis.
+        
+        Parameters:
+        -----------
+        durations : array-like
+            Duration until event or censoring
+        event_observed : array-like
+            Whether event was observed (1) or censored (0)
+        groups : array-like, optional
+            Group labels for comparison
+        alpha : float
+            Significance level for confidence intervals
+            
+        Returns:
+        --------
+        dict : Survival analysis results
+        """
+        if not optional_dependency_available('lifelines'):
+            return {"error": "lifelines package not available"}
+        
+        if groups is None:
+            # Single group analysis
+            kmf = KaplanMeierFitter(alpha=alpha)
+            kmf.fit(durations, event_observed)
+            
+            return {
+                'survival_function': kmf.survival_function_,
+                'confidence_interval': kmf.confidence_interval_,
+                'median_survival': kmf.median_survival_time_,
+                'median_ci': kmf.confidence_interval_survival_times_,
+                'event_table': kmf.event_table
+            }
+        else:
+            # Group comparison
+            results = {}
+            unique_groups = np.unique(groups)
+            
+            for group in unique_groups:
+                mask = groups == group
+                kmf = KaplanMeierFitter(alpha=alpha, label=str(group))
+                kmf.fit(durations[mask], event_observed[mask])
+                
+                results[group] = {
+                    'survival_function': kmf.survival_function_,
+                    'confidence_interval': kmf.confidence_interval_,
+                    'median_survival': kmf.median_survival_time_,
+                    'event_table': kmf.event_table
+                }
+            
+            # Log-rank test
+            if len(unique_groups) == 2:
+                group1_mask = groups == unique_groups[0]
+                group2_mask = groups == unique_groups[1]
+                
+                logrank_result = logrank_test(
+                    durations[group1_mask], durations[group2_mask],
+                    event_observed[group1_mask], event_observed[group2_mask]
+                )
+                
+                results['logrank_test'] = {
+                    'test_statistic': logrank_result.test_statistic,
+                    'p_value': logrank_result.p_value,
+                    'degrees_of_freedom': 1,
+                    'significant': logrank_result.p_value < 0.05
+                }
+            
+            return results
+    
+    @staticmethod
+    def cox_regression(durations, event_observed, covariates_df, alpha=0.05):
+        """
+        Cox proportional hazards regression.
+        
+        Parameters:
+        -----------
+        durations : array-like
+            Duration until event or censoring
+        event_observed : array-like
+            Whether event was observed (1) or censored (0)
+        covariates_df : pandas.DataFrame
+            Covariates for regression
+        alpha : float
+            Significance level
+            
+        Returns:
+        --------
+        dict : Cox regression results
+        """
+        if not optional_dependency_available('lifelines'):
+            return {"error": "lifelines package not available"}
+        
+        # Prepare data
+        data = covariates_df.copy()
+        data['duration'] = durations
+        data['event'] = event_observed
+        
+        # Fit Cox model
+        cph = CoxPHFitter(alpha=alpha)
+        cph.fit(data, duration_col='duration', event_col='event')
+        
+        return {
+            'summary': cph.summary,
+            'hazard_ratios': cph.hazard_ratios_,
+            'confidence_intervals': cph.confidence_intervals_,
+            'p_values': cph.summary['p'],
+            'concordance_index': cph.concordance_index_,
+            'log_likelihood': cph.log_likelihood_,
+            'aic': cph.AIC_,
+            'partial_aic': cph.AIC_partial_
+        }
+
+
+class MetaAnalysis:
+    """
+    Class for meta-analysis functions.
+    """
+    
+    @staticmethod
+    def fixed_effects_meta(effect_sizes, variances, study_names=None):
+        """
+        Fixed-effects meta-analysis.
+        
+        Parameters:
+        -----------
+        effect_sizes : array-like
+            Effect sizes from individual studies
+        variances : array-like
+            Variances of effect sizes
+        study_names : array-like, optional
+            Names of studies
+            
+        Returns:
+        --------
+        MetaAnalysisResult : Meta-analysis results
+        """
+        es = np.array(effect_sizes)
+        var = np.array(variances)
+        weights = 1 / var
+        
+        # Pooled effect size
+        pooled_es = np.sum(weights * es) / np.sum(weights)
+        pooled_var = 1 / np.sum(weights)
+        pooled_se = np.sqrt(pooled_var)
+        
+        # Confidence interval
+        z_critical = stats.norm.ppf(0.975)
+        ci_lower = pooled_es - z_critical * pooled_se
+        ci_upper = pooled_es + z_critical * pooled_se
+        
+        # Test of overall effect
+        z_score = pooled_es / pooled_se
+        p_value = 2 * (1 - stats.norm.cdf(abs(z_score)))
+        
+        # Heterogeneity
+        q_stat = np.sum(weights * (es - pooled_es)**2)
+        df = len(es) - 1
+        q_p_value = 1 - stats.chi2.cdf(q_stat, df)
+        i_squared = max(0, (q_stat - df) / q_stat * 100)
+        
+        return MetaAnalysisResult(
+            pooled_effect_size=pooled_es,
+            pooled_se=pooled_se,
+            ci_lower=ci_lower,
+            ci_upper=ci_upper,
+            z_score=z_score,
+            p_value=p_value,
+            q_statistic=q_stat,
+            q_p_value=q_p_value,
+            i_squared=i_squared,
+            tau_squared=0,  # Fixed effects assumes tau² = 0
+            weights=weights,
+            significant=p_value < 0.05,
+            heterogeneity='Low' if i_squared < 25 else 'Moderate' if i_squared < 75 else 'High',
+            model='fixed',
+            effect_sizes=es,
+            variances=var,
+            study_names=study_names
+        )
+    
+    @staticmethod
+    def random_effects_meta(effect_sizes, variances, study_names=None, method='DL'):
+        """
+        Random-effects meta-analysis using DerSimonian-Laird method.
+        
+        Parameters:
+        -----------
+        effect_sizes : array-like
+            Effect sizes from individual studies
+        variances : array-like
+            Variances of effect sizes
+        study_names : array-like, optional
+            Names of studies
+        method : str
+            Method for tau² estimation (default: 'DL')
+            
+        Returns:
+        --------
+        MetaAnalysisResult : Meta-analysis results
+        """
+        es = np.array(effect_sizes)
+        var = np.array(variances)
+        
+        # First, calculate Q statistic using fixed effects
+        weights_fe = 1 / var
+        pooled_es_fe = np.sum(weights_fe * es) / np.sum(weights_fe)
+        q_stat = np.sum(weights_fe * (es - pooled_es_fe)**2)
+        df = len(es) - 1
+        
+        # Estimate tau²
+        if method == 'DL':
+            c = np.sum(weights_fe) - np.sum(weights_fe**2) / np.sum(weights_fe)
+            tau_squared = max(0, (q_stat - df) / c)
+        else:
+            tau_squared = 0
+        
+        # Random effects weights
+        weights_re = 1 / (var + tau_squared)
+        
+        # Pooled effect size
+        pooled_es = np.sum(weights_re * es) / np.sum(weights_re)
+        pooled_var = 1 / np.sum(weights_re)
+        pooled_se = np.sqrt(pooled_var)
+        
+        # Confidence interval
+        z_critical = stats.norm.ppf(0.975)
+        ci_lower = pooled_es - z_critical * pooled_se
+        ci_upper = pooled_es + z_critical * pooled_se
+        
+        # Test of overall effect
+        z_score = pooled_es / pooled_se
+        p_value = 2 * (1 - stats.norm.cdf(abs(z_score)))
+        
+        # Heterogeneity statistics
+        q_p_value = 1 - stats.chi2.cdf(q_stat, df)
+        i_squared = max(0, (q_stat - df) / q_stat * 100)
+        
+        return MetaAnalysisResult(
+            pooled_effect_size=pooled_es,
+            pooled_se=pooled_se,
+            ci_lower=ci_lower,
+            ci_upper=ci_upper,
+            z_score=z_score,
+            p_value=p_value,
+            q_statistic=q_stat,
+            q_p_value=q_p_value,
+            i_squared=i_squared,
+            tau_squared=tau_squared,
+            weights=weights_re,
+            significant=p_value < 0.05,
+            heterogeneity='Low' if i_squared < 25 else 'Moderate' if i_squared < 75 else 'High',
+            model='random',
+            effect_sizes=es,
+            variances=var,
+            study_names=study_names
+        )
+
+
+class MLEvaluationMetrics:
+    """
+    Class for machine learning evaluation metrics commonly used in medical AI.
+    """
+    
+    @staticmethod
+    def binary_classification_metrics(y_true, y_pred, y_scores=None, pos_label=1):
+        """
+        Comprehensive binary classification metrics.
+        
+        Parameters:
+        -----------
+        y_true : array-like
+            True binary labels
+        y_pred : array-like
+            Predicted binary labels
+        y_scores : array-like, optional
+            Prediction scores/probabilities
+        pos_label : int or str
+            Positive class label
+            
+        Returns:
+        --------
+        ClassificationMetricsResult : Classification metrics
+        """
+        # Confusion matrix
+        tn, fp, fn, tp = confusion_matrix(y_true, y_pred, labels=[1-pos_label, pos_label]).ravel()
+        
+        # Basic metrics
+        sensitivity = tp / (tp + fn) if (tp + fn) > 0 else 0
+        specificity = tn / (tn + fp) if (tn + fp) > 0 else 0
+        ppv = tp / (tp + fp) if (tp + fp) > 0 else 0  # Precision/PPV
+        npv = tn / (tn + fn) if (tn + fn) > 0 else 0
+        accuracy = (tp + tn) / (tp + tn + fp + fn)
+        
+        # F1 score
+        f1 = 2 * (ppv * sensitivity) / (ppv + sensitivity) if (ppv + sensitivity) > 0 else 0
+        
+        # Likelihood ratios
+        lr_positive = sensitivity / (1 - specificity) if specificity < 1 else np.inf
+        lr_negative = (1 - sensitivity) / specificity if specificity > 0 else np.inf
+        
+        results = {
+            'tp': tp, 'tn': tn, 'fp': fp, 'fn': fn,
+            'sensitivity_recall': sensitivity,
+            'specificity': specificity,
+            'precision_ppv': ppv,
+            'npv': npv,
+            'accuracy': accuracy,
+            'f1_score': f1,
+            'lr_positive': lr_positive,
+            'lr_negative': lr_negative
+        }
+        
+        # ROC and PR curves if scores provided
+        if y_scores is not None:
+            fpr, tpr, roc_thresholds = roc_curve(y_true, y_scores, pos_label=pos_label)
+            auc_roc = auc(fpr, tpr)
+            
+            precision, recall, pr_thresholds = precision_recall_curve(y_true, y_scores, pos_label=pos_label)
+            auc_pr = auc(recall, precision)
+            
+            results.update({
+                'auc_roc': auc_roc,
+                'auc_pr': auc_pr,
+                'roc_curve': {'fpr': fpr, 'tpr': tpr, 'thresholds': roc_thresholds},
+                'pr_curve': {'precision': precision, 'recall': recall, 'thresholds': pr_thresholds}
+            })
+        
+        return ClassificationMetricsResult(**results)
+    
+    @staticmethod
+    def diagnostic_test_evaluation(y_true, y_pred, prevalence=None):
+        """
+        Evaluation metrics for diagnostic tests.
+        
+        Parameters:
+        -----------
+        y_true : array-like
+            True labels (1 for disease, 0 for no disease)
+        y_pred : array-like
+            Predicted labels
+        prevalence : float, optional
+            Disease prevalence in population
+            
+        Returns:
+        --------
+        DiagnosticTestResult : Diagnostic test metrics
+        """
+        metrics = MLEvaluationMetrics.binary_classification_metrics(y_true, y_pred)
+        values = {name: getattr(metrics, name) for name in metrics._slots}
+        
+        sensitivity = metrics['sensitivity_recall']
+        specificity = metrics['specificity']
+        
+        # If prevalence provided, calculate predictive values for population
+        if prevalence is not None:
+            ppv_pop = (sensitivity * prevalence) / (sensitivity * prevalence + (1 - specificity) * (1 - prevalence))
+            npv_pop = (specificity * (1 - prevalence)) / (specificity * (1 - prevalence) + (1 - sensitivity) * prevalence)
+            
+            values.update({
                 'population_prevalence': prevalence,
                 'ppv_population': ppv_pop,
                 'npv_population': npv_pop
             })
         
-        return metrics
-
-
-class MedicalVisualizations:
-    """
-    Class for medical research visualizations.
-    """
+        return DiagnosticTestResult(**values)
+
+
+class MedicalVisualizations:
+    """
+    Class for medical research visualizations.
+    """
+    
+    @staticmethod
+    def forest_plot(effect_sizes=None, variances=None, study_names=None, title="Forest Plot", 
+                   effect_label="Effect Size", figsize=(10, 8), ax=None, meta_result=None,
+                   subgroups=None, rows_per_page=None):
+        """
+        Create a forest plot for meta-analysis.
+        
+        Studies are drawn with collection artists (one LineCollection for the
+        confidence intervals, one scatter for the weighted squares and one
+        PolyCollection for the diamonds), so thousands of rows stay fast.
+        
+        Parameters:
+        -----------
+        effect_sizes : array-like
+            Effect sizes from studies (not needed with meta_result)
+        variances : array-like
+            Variances of effect sizes (not needed with meta_result)
+        study_names : array-like
+            Names of studies
+        title : str
+            Plot title
+        effect_label : str
+            Label for effect size
+        figsize : tuple
+            Figure size (per page)
+        ax : matplotlib.axes.Axes, optional
+            Existing axes to draw into (not with rows_per_page)
+        meta_result : dict, optional
+            Result of MetaAnalysis.fixed_effects_meta or random_effects_meta;
+            its studies, weights and pooled estimate are drawn as-is. Without
+            it a fixed-effects pooled estimate is computed.
+        subgroups : array-like, optional
+            Subgroup label of each study; studies are grouped into sections
+            with a subtotal diamond using the same model as the pooled result
+        rows_per_page : int, optional
+            Split the plot across several figures with at most this many rows.
+            Pages are Agg-backed figures that are not registered with pyplot;
+            save them with ``fig.savefig`` (render_batch writes one file per page).
+            
+        Returns:
+        --------
+        matplotlib.figure.Figure : Forest plot, or a list of page figures
+            (always a list, even for one page) when rows_per_page is given
+        """
+        if meta_result is None:
+            meta_result = MetaAnalysis.fixed_effects_meta(effect_sizes, variances, study_names)
+        es = np.asarray(meta_result['effect_sizes'], dtype=float)
+        var = np.asarray(meta_result['variances'], dtype=float)
+        if study_names is None:
+            study_names = meta_result.get('study_names')
+        if study_names is None:
+            study_names = [f"Study {i}" for i in range(1, len(es) + 1)]
+        model = meta_result.get('model', 'fixed')
+        
+        rows, max_weight = MedicalVisualizations._forest_rows(es, var, np.asarray(study_names, dtype=object),
+                                                              np.asarray(meta_result['weights'], dtype=float),
+                                                              meta_result, model, subgroups)
+        
+        n_rows = len(rows['kind'])
+        if rows_per_page is None or n_rows <= rows_per_page:
+            pages = [slice(0, n_rows)]
+        else:
+            pages = [slice(i, i + rows_per_page) for i in range(0, n_rows, rows_per_page)]
+        paginated = rows_per_page is not None
+        if ax is not None and paginated:
+            raise ValueError("ax cannot be combined with rows_per_page")
+        
+        finite = np.isfinite(rows['lower']) & np.isfinite(rows['upper'])
+        x_min, x_max = min(rows['lower'][finite].min(), 0), max(rows['upper'][finite].max(), 0)
+        padding = 0.05 * (x_max - x_min or 1)
+        
+        figures = []
+        for page_number, page in enumerate(pages, 1):
+            if paginated:
+                fig, page_ax = MedicalVisualizations._agg_figure_axes(figsize)
+            else:
+                fig, page_ax = MedicalVisualizations._figure_axes(ax, figsize)
+            MedicalVisualizations._draw_forest_rows(page_ax, {k: v[page] for k, v in rows.items()},
+                                                    max_weight)
+            page_ax.set_xlim(x_min - padding, x_max + padding)
+            page_ax.set_xlabel(effect_label)
+            page_ax.set_title(title if len(pages) == 1 else f"{title} (page {page_number} of {len(pages)})")
+            page_ax.axvline(x=0, color='black', linestyle='--', alpha=0.5)
+            page_ax.grid(True, alpha=0.3)
+            if np.any(rows['kind'][page] == 'overall'):
+                page_ax.legend(loc='lower right')
+            fig.tight_layout()
+            figures.append(fig)
+        
+        return figures if paginated else figures[0]
+    
+    @staticmethod
+    def _forest_rows(es, var, names, weights, meta_result, model, subgroups):
+        """Row table (kind, label, estimate, CI, weight) for a forest plot, top to bottom, and the largest weight."""
+        z_critical = stats.norm.ppf(0.975)
+        se = np.sqrt(var)
+        blocks = []
+        
+        def study_block(mask):
+            k = int(np.sum(mask))
+            return {'kind': np.full(k, 'study', dtype=object), 'label': names[mask],
+                    'estimate': es[mask], 'lower': es[mask] - z_critical * se[mask],
+                    'upper': es[mask] + z_critical * se[mask], 'weight': weights[mask]}
+        
+        def summary_block(kind, label, result):
+            return {'kind': np.array([kind], dtype=object), 'label': np.array([label], dtype=object),
+                    'estimate': np.array([result['pooled_effect_size']]),
+                    'lower': np.array([result['ci_lower']]), 'upper': np.array([result['ci_upper']]),
+                    'weight': np.array([np.nan])}
+        
+        if subgroups is None:
+            blocks.append(study_block(np.ones(len(es), dtype=bool)))
+        else:
+            subgroups = np.asarray(subgroups, dtype=object)
+            meta_func = MetaAnalysis.random_effects_meta if model == 'random' else MetaAnalysis.fixed_effects_meta
+            for group in pd.unique(subgroups):
+                mask = subgroups == group
+                blocks.append({'kind': np.array(['header'], dtype=object),
+                               'label': np.array([str(group)], dtype=object),
+                               'estimate': np.array([np.nan]), 'lower': np.array([np.nan]),
+                               'upper': np.array([np.nan]), 'weight': np.array([np.nan])})
+                blocks.append(study_block(mask))
+                if np.sum(mask) > 1:
+                    blocks.append(summary_block('subtotal', f"Subtotal ({int(np.sum(mask))} studies)",
+                                                meta_func(es[mask], var[mask])))
+        
+        blocks.append(summary_block('overall', f"Pooled ({model} effects)", meta_result))
+        rows = {key: np.concatenate([block[key] for block in blocks]) for key in blocks[0]}
+        return rows, np.nanmax(weights)
+    
+    @staticmethod
+    def _draw_forest_rows(ax, rows, max_weight):
+        """Draw one page of forest plot rows with collection artists."""
+        kind = rows['kind']
+        n_rows = len(kind)
+        y = np.arange(n_rows)[::-1].astype(float)
+        
+        study = kind == 'study'
+        if np.any(study):
+            segments = np.stack([np.column_stack([rows['lower'][study], y[study]]),
+                                 np.column_stack([rows['upper'][study], y[study]])], axis=1)
+            ax.add_collection(mcollections.LineCollection(segments, colors='tab:blue', linewidths=1.5))
+            sizes = 15 + 135 * rows['weight'][study] / max_weight
+            ax.scatter(rows['estimate'][study], y[study], s=sizes, marker='s', color='tab:blue', zorder=3)
+        
+        for summary_kind, color, label in (('subtotal', 'gray', None), ('overall', 'red', 'Pooled')):
+            summary = kind == summary_kind
+            if not np.any(summary):
+                continue
+            est, lower, upper, y_sum = (rows['estimate'][summary], rows['lower'][summary],
+                                        rows['upper'][summary], y[summary])
+            diamonds = np.stack([np.column_stack([lower, y_sum]), np.column_stack([est, y_sum + 0.35]),
+                                 np.column_stack([upper, y_sum]), np.column_stack([est, y_sum - 0.35])], axis=1)
+            ax.add_collection(mcollections.PolyCollection(diamonds, facecolors=color, edgecolors=color,
+                                                          label=label, zorder=3))
+        
+        ax.set_yticks(y)
+        ax.set_yticklabels(rows['label'])
+        for tick_label, row_kind in zip(ax.get_yticklabels(), kind):
+            if row_kind in ('header', 'overall'):
+                tick_label.set_fontweight('bold')
+        ax.set_ylim(-1, n_rows)
+    
+    @staticmethod
+    def kaplan_meier_plot(durations, event_observed, groups=None, confidence_intervals=True, 
+                         title="Kaplan-Meier Survival Curves", figsize=(10, 6), ax=None, max_points=5000):
+        """
+        Create Kaplan-Meier survival plot.
+        
+        Parameters:
+        -----------
+        durations : array-like
+            Time to event or censoring
+        event_observed : array-like
+            Event indicator (1=event, 0=censored)
+        groups : array-like, optional
+            Group labels for comparison
+        confidence_intervals : bool
+            Whether to show confidence intervals
+        title : str
+            Plot title
+        figsize : tuple
+            Figure size
+        ax : matplotlib.axes.Axes, optional
+            Existing axes to draw into (figsize is then ignored)
+        max_points : int, optional
+            Curves with more steps are decimated (step-preserving) to about
+            this many vertices before drawing; None draws every step
+            
+        Returns:
+        --------
+        matplotlib.figure.Figure : Kaplan-Meier plot
+        """
+        if not optional_dependency_available('lifelines'):
+            print("Error: lifelines package required for Kaplan-Meier plots")
+            return None
+        
+        fig, ax = MedicalVisualizations._figure_axes(ax, figsize)
+        
+        if groups is None:
+            # Single group
+            kmf = KaplanMeierFitter()
+            kmf.fit(durations, event_observed, label='Overall')
+            MedicalVisualizations._draw_kaplan_meier(ax, kmf, confidence_intervals, max_points)
+        else:
+            # Multiple groups
+            unique_groups = np.unique(groups)
+            colors = plt.get_cmap('Set1')(np.linspace(0, 1, len(unique_groups)))
+            
+            for i, group in enumerate(unique_groups):
+                mask = groups == group
+                kmf = KaplanMeierFitter()
+                kmf.fit(durations[mask], event_observed[mask], label=f'Group {group}')
+                MedicalVisualizations._draw_kaplan_meier(ax, kmf, confidence_intervals, max_points,
+                                                         color=colors[i])
+        
+        ax.set_title(title)
+        ax.set_xlabel('Time')
+        ax.set_ylabel('Survival Probability')
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+        
+        fig.tight_layout()
+        return fig
     
     @staticmethod
-    def forest_plot(effect_sizes, variances, study_names, title="Forest Plot", 
-                   effect_label="Effect Size", figsize=(10, 8)):
+    def roc_curve_plot(y_true, y_scores, title="ROC Curve", figsize=(8, 8), ax=None,
+                       max_points=5000, convex_hull=False):
         """
-        Create a forest plot for meta-analysis.
+        Create ROC curve plot.
         
         Parameters:
         -----------
-        effect_sizes : array-like
-            Effect sizes from studies
-        variances : array-like
-            Variances of effect sizes
-        study_names : array-like
-            Names of studies
+        y_true : array-like
+            True binary labels
+        y_scores : array-like
+            Prediction scores
         title : str
             Plot title
-        effect_label : str
-            Label for effect size
         figsize : tuple
             Figure size
+        ax : matplotlib.axes.Axes, optional
+            Existing axes to draw into (figsize is then ignored)
+        max_points : int, optional
+            Curves with more points are simplified (Douglas-Peucker) to at most
+            this many vertices before drawing; None draws every threshold
+        convex_hull : bool
+            Draw the ROC convex hull instead of the empirical curve (default: False)
             
         Returns:
         --------
-        matplotlib.figure.Figure : Forest plot
+        matplotlib.figure.Figure : ROC curve plot
         """
-        es = np.array(effect_sizes)
-        var = np.array(variances)
-        se = np.sqrt(var)
+        fpr, tpr, thresholds = roc_curve(y_true, y_scores)
+        auc_score = auc(fpr, tpr)
+        curve = MedicalVisualizations.simplify_roc_curve(fpr, tpr, thresholds, max_points, convex_hull)
         
-        # Calculate confidence intervals
-        ci_lower = es - 1.96 * se
-        ci_upper = es + 1.96 * se
+        fig, ax = MedicalVisualizations._figure_axes(ax, figsize)
         
-        # Create plot
-        fig, ax = plt.subplots(figsize=figsize)
+        ax.plot(curve['fpr'], curve['tpr'], linewidth=2, label=f'ROC Curve (AUC = {auc_score:.3f})')
+        ax.plot([0, 1], [0, 1], 'k--', linewidth=1, label='Random Classifier')
         
-        y_pos = np.arange(len(study_names))
+        ax.set_xlim([0.0, 1.0])
+        ax.set_ylim([0.0, 1.05])
+        ax.set_xlabel('False Positive Rate (1 - Specificity)')
+        ax.set_ylabel('True Positive Rate (Sensitivity)')
+        ax.set_title(title)
+        ax.legend(loc='lower right')
+        ax.grid(True, alpha=0.3)
         
-        # Plot individual studies
-        ax.errorbar(es, y_pos, xerr=[es - ci_lower, ci_upper - es], 
-                   fmt='s', markersize=8, capsize=5, capthick=2)
+        fig.tight_layout()
+        return fig
+    
+    @staticmethod
+    def simplify_roc_curve(fpr, tpr, thresholds=None, max_points=5000, convex_hull=False):
+        """
+        Reduce an ROC curve to few vertices while preserving its shape.
         
-        # Plot pooled estimate (example using fixed effects)
-        weights = 1 / var
-        pooled_es = np.sum(weights * es) / np.sum(weights)
-        pooled_se = np.sqrt(1 / np.sum(weights))
-        pooled_ci_lower = pooled_es - 1.96 * pooled_se
-        pooled_ci_upper = pooled_es + 1.96 * pooled_se
+        Parameters:
+        -----------
+        fpr, tpr : array-like
+            ROC curve coordinates sorted by increasing false positive rate
+        thresholds : array-like, optional
+            Thresholds matching each point
+        max_points : int, optional
+            Maximum number of vertices kept (Douglas-Peucker); None keeps all
+        convex_hull : bool
+            Keep only the vertices of the ROC convex hull (default: False)
+            
+        Returns:
+        --------
+        dict : Simplified 'fpr', 'tpr', 'thresholds' and the kept 'indices'
+        """
+        fpr = np.asarray(fpr, dtype=float)
+        tpr = np.asarray(tpr, dtype=float)
         
-        ax.errorbar(pooled_es, len(study_names), xerr=[[pooled_es - pooled_ci_lower], [pooled_ci_upper - pooled_es]], 
-                   fmt='D', markersize=12, capsize=5, capthick=3, color='red', label='Pooled')
+        indices = np.arange(len(fpr))
+        if convex_hull:
+            indices = MedicalVisualizations._roc_convex_hull(fpr, tpr)
+        if max_points is not None and len(indices) > max_points:
+            kept = MedicalVisualizations._douglas_peucker(fpr[indices], tpr[indices], max_points)
+            indices = indices[kept]
         
-        # Formatting
-        ax.set_yticks(y_pos)
-        ax.set_yticklabels(study_names)
-        ax.set_xlabel(effect_label)
-        ax.set_title(title)
-        ax.axvline(x=0, color='black', linestyle='--', alpha=0.5)
-        ax.grid(True, alpha=0.3)
-        ax.legend()
+        return {
+            'fpr': fpr[indices],
+            'tpr': tpr[indices],
+            'thresholds': np.asarray(thresholds)[indices] if thresholds is not None else None,
+            'indices': indices
+        }
+    
+    @staticmethod
+    def roc_curve_data(y_true, y_scores, max_points=None, convex_hull=False):
+        """
+        ROC curve coordinates for export, optionally simplified.
         
-        plt.tight_layout()
-        return fig
+        Parameters:
+        -----------
+        y_true : array-like
+            True binary labels
+        y_scores : array-like
+            Prediction scores
+        max_points : int, optional
+            Maximum number of points exported; None exports every threshold
+        convex_hull : bool
+            Export only the ROC convex hull (default: False)
+            
+        Returns:
+        --------
+        pandas.DataFrame : Columns fpr, tpr and threshold
+        """
+        fpr, tpr, thresholds = roc_curve(y_true, y_scores)
+        curve = MedicalVisualizations.simplify_roc_curve(fpr, tpr, thresholds, max_points, convex_hull)
+        return pd.DataFrame({'fpr': curve['fpr'], 'tpr': curve['tpr'], 'threshold': curve['thresholds']})
+    
+    @staticmethod
+    def kaplan_meier_curve_data(durations, event_observed, max_points=None, alpha=0.05):
+        """
+        Kaplan-Meier curve for export, optionally decimated step-preservingly.
+        
+        Parameters:
+        -----------
+        durations : array-like
+            Time to event or censoring
+        event_observed : array-like
+            Event indicator (1=event, 0=censored)
+        max_points : int, optional
+            Maximum number of steps exported; None exports every event time
+        alpha : float
+            Significance level for confidence intervals
+            
+        Returns:
+        --------
+        pandas.DataFrame : Columns time, survival, ci_lower and ci_upper
+        """
+        if not optional_dependency_available('lifelines'):
+            return {"error": "lifelines package not available"}
+        
+        kmf = KaplanMeierFitter(alpha=alpha)
+        kmf.fit(durations, event_observed)
+        times, survival, lower, upper = MedicalVisualizations._kaplan_meier_arrays(kmf)
+        
+        keep = np.arange(len(times))
+        if max_points is not None:
+            keep = MedicalVisualizations._decimate_steps(survival, max_points)
+        
+        return pd.DataFrame({'time': times[keep], 'survival': survival[keep],
+                             'ci_lower': lower[keep], 'ci_upper': upper[keep]})
+    
+    @staticmethod
+    def _draw_kaplan_meier(ax, kmf, confidence_intervals, max_points, color=None):
+        """Draw a fitted Kaplan-Meier curve, decimating it when it has too many steps."""
+        if max_points is None or len(kmf.timeline) <= max_points:
+            kmf.plot_survival_function(ax=ax, show_censors=True, ci_show=confidence_intervals, color=color)
+            return
+        
+        times, survival, lower, upper = MedicalVisualizations._kaplan_meier_arrays(kmf)
+        keep = MedicalVisualizations._decimate_steps(survival, max_points)
+        line, = ax.step(times[keep], survival[keep], where='post', color=color, label=kmf.label)
+        if confidence_intervals:
+            ax.fill_between(times[keep], lower[keep], upper[keep], step='post',
+                            alpha=0.3, color=line.get_color(), linewidth=0)
+        
+        # Censoring marks, thinned to the same budget
+        censored_times = np.sort(kmf.durations[kmf.event_observed == 0])
+        if len(censored_times) > max_points:
+            censored_times = censored_times[np.linspace(0, len(censored_times) - 1, max_points).astype(int)]
+        if len(censored_times):
+            at = np.searchsorted(times, censored_times, side='right') - 1
+            ax.plot(censored_times, survival[np.maximum(at, 0)], '+', ms=6, mew=1, color=line.get_color())
+    
+    @staticmethod
+    def _kaplan_meier_arrays(kmf):
+        """Timeline, survival and confidence bounds of a fitted KaplanMeierFitter as arrays."""
+        times = kmf.survival_function_.index.to_numpy(dtype=float)
+        survival = kmf.survival_function_.iloc[:, 0].to_numpy(dtype=float)
+        lower = kmf.confidence_interval_survival_function_.iloc[:, 0].to_numpy(dtype=float)
+        upper = kmf.confidence_interval_survival_function_.iloc[:, 1].to_numpy(dtype=float)
+        return times, survival, lower, upper
+    
+    @staticmethod
+    def _decimate_steps(survival, max_points):
+        """
+        Indices of a step-preserving subset of a monotone survival curve.
+        
+        A step is kept each time the curve has dropped by at least
+        (range / max_points) since the last kept step, so the drawn step
+        function never deviates from the full curve by more than that.
+        """
+        n = len(survival)
+        if n <= max_points:
+            return np.arange(n)
+        
+        drop = survival[0] - survival
+        step = (drop[-1] or 1.0) / max(max_points - 2, 1)
+        level = np.floor(drop / step)
+        keep = np.flatnonzero(np.diff(level) != 0) + 1
+        return np.unique(np.concatenate(([0], keep, [n - 1])))
+    
+    @staticmethod
+    def _douglas_peucker(x, y, max_points):
+        """
+        Indices of at most max_points vertices chosen by greedy Douglas-Peucker.
+        
+        The segment with the largest deviation is split first, so the kept
+        vertices minimise the maximum distance to the full polyline.
+        """
+        n = len(x)
+        if n <= max_points:
+            return np.arange(n)
+        
+        heap, keep = [], [0, n - 1]
+        
+        def push(i, j):
+            if j - i < 2:
+                return
+            dx, dy = x[j] - x[i], y[j] - y[i]
+            px, py = x[i+1:j] - x[i], y[i+1:j] - y[i]
+            length = np.hypot(dx, dy)
+            distance = np.abs(dy * px - dx * py) / length if length > 0 else np.hypot(px, py)
+            k = int(np.argmax(distance))
+            if distance[k] > 0:
+                heapq.heappush(heap, (-distance[k], i, j, i + 1 + k))
+        
+        push(0, n - 1)
+        while heap and len(keep) < max_points:
+            _, i, j, k = heapq.heappop(heap)
+            keep.append(k)
+            push(i, k)
+            push(k, j)
+        
+        return np.sort(keep)
+    
+    @staticmethod
+    def _roc_convex_hull(fpr, tpr):
+        """Indices of the points on the ROC convex hull (upper-left hull)."""
+        candidates = np.arange(len(fpr))
+        if len(fpr) > 3:
+            try:
+                hull = spatial.ConvexHull(np.column_stack([fpr, tpr]))
+                candidates = np.union1d(hull.vertices, [0, len(fpr) - 1])
+            except Exception:
+                pass  # degenerate (collinear) curves: fall back to all points
+        candidates = candidates[np.lexsort((tpr[candidates], fpr[candidates]))]
+        
+        # Monotone chain over the few remaining candidates
+        upper = []
+        for idx in candidates:
+            while len(upper) >= 2:
+                o, a = upper[-2], upper[-1]
+                cross = ((fpr[a] - fpr[o]) * (tpr[idx] - tpr[o]) -
+                         (tpr[a] - tpr[o]) * (fpr[idx] - fpr[o]))
+                if cross >= 0:
+                    upper.pop()
+                else:
+                    break
+            upper.append(idx)
+        return np.array(upper)
+    
+    @staticmethod
+    def render_batch(specs, output_dir, formats=('png',), dpi=150, n_jobs=None, chunksize=16):
+        """
+        Render many figures headlessly, in parallel, straight to files.
+        
+        Figures are drawn on Agg-backed ``Figure`` objects that are never
+        registered with pyplot, so nothing accumulates in the pyplot figure
+        manager. Each worker reuses one figure per figure size, clearing it
+        between specs, and figures are closed once the chunk is written.
+        
+        Parameters:
+        -----------
+        specs : list of dict
+            One dict per figure with keys 'plot' ('forest_plot',
+            'kaplan_meier_plot' or 'roc_curve_plot'), 'filename' (file stem)
+            and 'kwargs' (arguments for the plotting function). A forest
+            plot with 'rows_per_page' is written as one file per page,
+            ``<filename>_page<n>.<format>``.
+        output_dir : str
+            Directory for the rendered files (created if needed)
+        formats : tuple of str
+            Output formats, any of 'png', 'svg', 'pdf' (default: ('png',))
+        dpi : int
+            Resolution for raster output (default: 150)
+        n_jobs : int, optional
+            Number of worker processes; 1 renders in-process (default: CPU count)
+        chunksize : int
+            Number of specs sent to a worker at a time (default: 16)
+            
+        Returns:
+        --------
+        dict : Written files and per-figure errors
+        """
+        unsupported = set(formats) - {'png', 'svg', 'pdf'}
+        if unsupported:
+            raise ValueError(f"Unsupported output formats: {sorted(unsupported)}")
+        for spec in specs:
+            if spec.get('plot') not in MedicalVisualizations._BATCH_PLOTS:
+                raise ValueError(f"Unsupported plot type: {spec.get('plot')}")
+        os.makedirs(output_dir, exist_ok=True)
+        
+        chunks = [specs[i:i + chunksize] for i in range(0, len(specs), chunksize)]
+        n_jobs = n_jobs or os.cpu_count() or 1
+        
+        if n_jobs == 1 or len(chunks) <= 1:
+            outcomes = [_render_figure_chunk(chunk, output_dir, tuple(formats), dpi) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks)),
+                                     initializer=_init_headless_worker) as executor:
+                outcomes = list(executor.map(_render_figure_chunk, chunks,
+                                             [output_dir] * len(chunks),
+                                             [tuple(formats)] * len(chunks),
+                                             [dpi] * len(chunks)))
+        
+        files = [path for chunk_files, _ in outcomes for path in chunk_files]
+        errors = [error for _, chunk_errors in outcomes for error in chunk_errors]
+        
+        return {
+            'n_figures': len(specs) - len(errors),
+            'n_failed': len(errors),
+            'files': files,
+            'errors': errors,
+            'output_dir': output_dir
+        }
+    
+    _BATCH_PLOTS = ('forest_plot', 'kaplan_meier_plot', 'roc_curve_plot')
+    
+    @staticmethod
+    def _figure_axes(ax, figsize):
+        """Return (figure, axes), creating a new pyplot figure only when no axes is given."""
+        if ax is None:
+            return plt.subplots(figsize=figsize)
+        return ax.figure, ax
+    
+    @staticmethod
+    def _agg_figure_axes(figsize):
+        """Return (figure, axes) on an Agg canvas that pyplot does not track."""
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig, fig.add_subplot()
+
+
+def _init_headless_worker():
+    """Force the non-interactive Agg backend in batch rendering workers."""
+    os.environ['MPLBACKEND'] = 'Agg'
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render_figure_chunk(specs, output_dir, formats, dpi):
+    """Render a list of figure specs, reusing one Figure per figure size."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    figures = {}
+    files, errors = [], []
+    
+    try:
+        for spec in specs:
+            plot_func = getattr(MedicalVisualizations, spec['plot'])
+            kwargs = dict(spec.get('kwargs', {}))
+            figsize = tuple(kwargs.pop('figsize', None) or
+                            inspect.signature(plot_func).parameters['figsize'].default)
+            
+            paginated = kwargs.get('rows_per_page') is not None
+            pages = []
+            try:
+                if paginated:
+                    # Paginated plots create their own Agg page figures
+                    pages = plot_func(figsize=figsize, **kwargs)
+                    stems = [f"{spec['filename']}_page{n}" for n in range(1, len(pages) + 1)]
+                else:
+                    fig = figures.get(figsize)
+                    if fig is None:
+                        fig = Figure(figsize=figsize)
+                        FigureCanvasAgg(fig)
+                        figures[figsize] = fig
+                    fig.clear()
+                    if plot_func(ax=fig.add_subplot(), **kwargs) is None:
+                        raise RuntimeError("plotting function returned no figure")
+                    pages, stems = [fig], [spec['filename']]
+                for page, stem in zip(pages, stems):
+                    for fmt in formats:
+                        path = os.path.join(output_dir, f"{stem}.{fmt}")
+                        page.savefig(path, format=fmt, dpi=dpi)
+                        files.append(path)
+            except Exception as e:
+                errors.append({'filename': spec.get('filename'), 'plot': spec['plot'], 'error': str(e)})
+            finally:
+                if paginated:
+                    for page in pages:
+                        page.clear()
+    finally:
+        for fig in figures.values():
+            fig.clear()
+        figures.clear()
+    
+    return files, errors
+
+
+class MultipleComparisons:
+    """
+    Class for handling multiple comparisons corrections.
+    """
+    
+    @staticmethod
+    def adjust_p_values(p_values, method='holm', alpha=0.05, axis=0, storey_lambda=0.5):
+        """
+        Adjust p-values for multiple comparisons.
+        
+        Bonferroni, Holm, Hochberg, Benjamini-Hochberg, Benjamini-Yekutieli and
+        Storey q-values are computed natively and work on N-D arrays: each
+        slice along ``axis`` (e.g. each column of a 2-D array) is treated as a
+        separate family. NaN entries are ignored and do not count towards the
+        family size. Other methods are delegated to statsmodels for 1-D input.
+        
+        Parameters:
+        -----------
+        p_values : array-like
+            Unadjusted p-values
+        method : str
+            Correction method ('bonferroni', 'holm', 'hochberg', 'fdr_bh',
+            'fdr_by', 'qvalue', or any other statsmodels multipletests method)
+        alpha : float
+            Family-wise error rate or false discovery rate
+        axis : int
+            Axis along which families are laid out (default: 0, i.e. columns)
+        storey_lambda : float
+            Tuning parameter for the Storey pi0 estimate (qvalue only)
+            
+        Returns:
+        --------
+        dict : Adjusted p-values and significance
+        """
+        p_vals = np.asarray(p_values, dtype=float)
+        method = MultipleComparisons._METHOD_ALIASES.get(method, method)
+        pi0 = None
+        
+        if method in MultipleComparisons._NATIVE_METHODS:
+            p_adjusted, pi0 = MultipleComparisons._adjust_native(p_vals, method, axis, storey_lambda)
+            reject = p_adjusted <= alpha
+        elif p_vals.ndim == 1:
+            reject, p_adjusted, alpha_sidak, alpha_bonf = multipletests(
+                p_vals, alpha=alpha, method=method
+            )
+        else:
+            raise ValueError(f"Method '{method}' supports 1-D p-values only")
+        
+        count_axis = axis if p_vals.ndim > 1 else None
+        return {
+            'original_p_values': p_vals,
+            'adjusted_p_values': p_adjusted,
+            'significant_after_correction': reject,
+            'method': method,
+            'alpha': alpha,
+            'n_comparisons': _scalar_or_array(np.sum(~np.isnan(p_vals), axis=count_axis)),
+            'n_significant_original': _scalar_or_array(np.sum(p_vals < alpha, axis=count_axis)),
+            'n_significant_adjusted': _scalar_or_array(np.sum(reject, axis=count_axis)),
+            'pi0': _scalar_or_array(pi0) if pi0 is not None else None
+        }
+    
+    @staticmethod
+    def hierarchical_fdr(p_values, families=None, alpha=0.05, axis=0):
+        """
+        Two-stage hierarchical FDR control (Benjamini & Bogomolov / Yekutieli).
+        
+        Stage 1 computes a Simes p-value for each family and selects families
+        with Benjamini-Hochberg at level alpha. Stage 2 applies BH within each
+        selected family at level alpha * R / F, where R of F families were
+        selected.
+        
+        Parameters:
+        -----------
+        p_values : array-like
+            2-D array with one family per slice along ``axis`` (NaN padding
+            allowed), or 1-D p-values together with ``families`` labels
+        families : array-like, optional
+            Family label of each p-value for 1-D input
+        alpha : float
+            Target false discovery rate (default: 0.05)
+        axis : int
+            Axis along which families are laid out for 2-D input (default: 0)
+            
+        Returns:
+        --------
+        dict : Family selection and within-family decisions
+        """
+        p_vals = np.asarray(p_values, dtype=float)
+        
+        if families is not None:
+            # Pad labelled 1-D p-values into a (max family size x n families) array
+            labels, family_index = np.unique(np.asarray(families), return_inverse=True)
+            order = np.argsort(family_index, kind='stable')
+            sizes = np.bincount(family_index)
+            position = np.empty(len(p_vals), dtype=int)
+            position[order] = np.arange(len(p_vals)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            grid = np.full((sizes.max(), len(labels)), np.nan)
+            grid[position, family_index] = p_vals
+            axis = 0
+        else:
+            labels = None
+            grid = p_vals
+        
+        within = MultipleComparisons._adjust_native(grid, 'fdr_bh', axis)[0]
+        family_p = np.nanmin(within, axis=axis)
+        family_adjusted = MultipleComparisons._adjust_native(family_p, 'fdr_bh', -1)[0]
+        selected = family_adjusted <= alpha
+        
+        n_families = np.sum(~np.isnan(family_p))
+        within_alpha = alpha * np.sum(selected) / n_families
+        significant = (within <= within_alpha) & np.expand_dims(selected, axis)
+        
+        if families is not None:
+            within = within[position, family_index]
+            significant = significant[position, family_index]
+        
+        return {
+            'families': labels,
+            'family_p_values': family_p,
+            'family_adjusted_p_values': family_adjusted,
+            'selected_families': selected,
+            'n_families': int(n_families),
+            'n_selected_families': int(np.sum(selected)),
+            'within_family_alpha': within_alpha,
+            'within_family_adjusted_p_values': within,
+            'significant': significant,
+            'n_significant': int(np.sum(significant)),
+            'alpha': alpha
+        }
+    
+    @staticmethod
+    def adjust_p_values_streaming(source, output_path, method='fdr_bh', alpha=0.05, chunksize=1_000_000,
+                                  storey_lambda=0.5, column=0):
+        """
+        Memory-bounded p-value adjustment for p-value streams stored on disk.
+        
+        The source is read in chunks; each chunk is sorted and spilled to a
+        temporary run file. Global ranks are then obtained by binary search
+        against every run, and the running minimum/maximum of the step-up or
+        step-down statistic is stored per run, so exact adjusted p-values are
+        written chunk by chunk without ever holding the full vector in memory.
+        
+        Parameters:
+        -----------
+        source : str
+            ``.npy`` file (memory-mapped) or text/CSV file with p-values in ``column``
+        output_path : str
+            Destination for adjusted p-values (``.npy`` or text, one per line),
+            in the same order as the source
+        method : str
+            'bonferroni', 'holm', 'hochberg', 'fdr_bh', 'fdr_by' or 'qvalue'
+        alpha : float
+            Family-wise error rate or false discovery rate
+        chunksize : int
+            Number of p-values held in memory at a time
+        storey_lambda : float
+            Tuning parameter for the Storey pi0 estimate (qvalue only)
+        column : int
+            Column holding p-values in text sources (default: 0)
+            
+        Returns:
+        --------
+        dict : Summary of the adjustment
+        """
+        method = MultipleComparisons._METHOD_ALIASES.get(method, method)
+        if method not in MultipleComparisons._NATIVE_METHODS:
+            raise ValueError(f"Unsupported method for streaming adjustment: {method}")
+        
+        def chunks():
+            if str(source).lower().endswith('.npy'):
+                data = np.load(source, mmap_mode='r')
+                for start in range(0, len(data), chunksize):
+                    yield np.asarray(data[start:start + chunksize], dtype=float)
+            else:
+                for frame in pd.read_csv(source, header=None, usecols=[column], chunksize=chunksize):
+                    yield pd.to_numeric(frame.iloc[:, 0], errors='coerce').to_numpy(dtype=float)
+        
+        with tempfile.TemporaryDirectory() as run_dir:
+            # Pass 1: sorted runs and global counts
+            run_paths, n_total, m, n_above_lambda, n_significant_original = [], 0, 0, 0, 0
+            for chunk in chunks():
+                values = np.sort(chunk[~np.isnan(chunk)])
+                run_paths.append(os.path.join(run_dir, f'run_{len(run_paths)}.npy'))
+                np.save(run_paths[-1], values)
+                n_total += len(chunk)
+                m += len(values)
+                n_above_lambda += np.sum(values > storey_lambda)
+                n_significant_original += np.sum(values < alpha)
+            
+            runs = [np.load(path, mmap_mode='r') for path in run_paths]
+            pi0 = min(1.0, n_above_lambda / (m * (1 - storey_lambda))) if method == 'qvalue' and m else None
+            step_down = method == 'holm'
+            
+            # Pass 2: running extreme of the adjustment statistic within each run
+            extremes = []
+            for i, run in enumerate(runs):
+                values = np.asarray(run)
+                rank_left = sum(np.searchsorted(other, values, side='left') for other in runs)
+                rank_right = sum(np.searchsorted(other, values, side='right') for other in runs)
+                statistic = MultipleComparisons._step_statistic(method, values, rank_left, rank_right, m, pi0)
+                if step_down:
+                    extreme = np.maximum.accumulate(statistic)
+                elif method != 'bonferroni':
+                    extreme = np.minimum.accumulate(statistic[::-1])[::-1]
+                else:
+                    extreme = statistic
+                extremes.append(os.path.join(run_dir, f'extreme_{i}.npy'))
+                np.save(extremes[-1], extreme)
+            extremes = [np.load(path, mmap_mode='r') for path in extremes]
+            
+            # Pass 3: adjusted values in source order
+            is_npy_output = str(output_path).lower().endswith('.npy')
+            if is_npy_output:
+                output = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float64, shape=(n_total,))
+            else:
+                output = open(output_path, 'w', encoding='utf-8')
+            
+            n_significant, offset = 0, 0
+            try:
+                for chunk in chunks():
+                    if method == 'bonferroni':
+                        adjusted = m * chunk
+                    elif step_down:
+                        adjusted = np.full(len(chunk), -np.inf)
+                        for run, extreme in zip(runs, extremes):
+                            idx = np.searchsorted(run, chunk, side='right') - 1
+                            found = idx >= 0
+                            adjusted[found] = np.maximum(adjusted[found], extreme[idx[found]])
+                    else:
+                        adjusted = np.full(len(chunk), np.inf)
+                        for run, extreme in zip(runs, extremes):
+                            idx = np.searchsorted(run, chunk, side='left')
+                            found = idx < len(run)
+                            adjusted[found] = np.minimum(adjusted[found], extreme[idx[found]])
+                    
+                    adjusted = np.where(np.isnan(chunk), np.nan, np.minimum(adjusted, 1.0))
+                    n_significant += np.sum(adjusted <= alpha)
+                    if is_npy_output:
+                        output[offset:offset + len(chunk)] = adjusted
+                    else:
+                        np.savetxt(output, adjusted, fmt='%.17g')
+                    offset += len(chunk)
+            finally:
+                if is_npy_output:
+                    output.flush()
+                    del output
+                else:
+                    output.close()
+                del runs, extremes
+        
+        return {
+            'output_path': output_path,
+            'method': method,
+            'alpha': alpha,
+            'n_comparisons': int(m),
+            'n_missing': int(n_total - m),
+            'n_significant_original': int(n_significant_original),
+            'n_significant_adjusted': int(n_significant),
+            'pi0': pi0
+        }
+    
+    _NATIVE_METHODS = ('bonferroni', 'holm', 'hochberg', 'fdr_bh', 'fdr_by', 'qvalue')
+    _METHOD_ALIASES = {'simes-hochberg': 'hochberg', 'storey': 'qvalue', 'bh': 'fdr_bh', 'by': 'fdr_by'}
+    
+    @staticmethod
+    def _step_statistic(method, p, rank_left, rank_right, m, pi0=None):
+        """
+        Per-p-value statistic whose running max (Holm) or running min from
+        the top (step-up methods) gives the adjusted p-value.
+        
+        rank_left / rank_right are the number of p-values strictly below /
+        at or below p, which makes ties behave like sorted positions.
+        """
+        if method == 'bonferroni':
+            return m * p
+        elif method == 'holm':
+            return (m - rank_left) * p
+        elif method == 'hochberg':
+            return (m - rank_right + 1) * p
+        elif method == 'fdr_bh':
+            return m * p / rank_right
+        elif method == 'fdr_by':
+            return m * p / rank_right * (special.digamma(m + 1) + np.euler_gamma)
+        elif method == 'qvalue':
+            return pi0 * m * p / rank_right
+        raise ValueError(f"Unsupported method: {method}")
+    
+    @staticmethod
+    def _adjust_native(p_values, method, axis=0, storey_lambda=0.5):
+        """Adjust each family along ``axis`` independently; returns (adjusted, pi0)."""
+        p = np.moveaxis(np.asarray(p_values, dtype=float), axis, -1)
+        order = np.argsort(p, axis=-1)  # NaNs sort last
+        p_sorted = np.take_along_axis(p, order, axis=-1)
+        
+        m = np.sum(~np.isnan(p), axis=-1, keepdims=True)
+        rank = np.arange(1, p.shape[-1] + 1)
+        pi0 = None
+        if method == 'qvalue':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                pi0 = np.minimum(1.0, np.sum(p > storey_lambda, axis=-1, keepdims=True) /
+                                 (m * (1 - storey_lambda)))
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            statistic = MultipleComparisons._step_statistic(method, p_sorted, rank - 1, rank, m, pi0)
+        missing = np.isnan(p_sorted)
+        
+        if method == 'holm':
+            adjusted = np.maximum.accumulate(np.where(missing, -np.inf, statistic), axis=-1)
+        elif method == 'bonferroni':
+            adjusted = statistic
+        else:
+            flipped = np.flip(np.where(missing, np.inf, statistic), axis=-1)
+            adjusted = np.flip(np.minimum.accumulate(flipped, axis=-1), axis=-1)
+        adjusted = np.where(missing, np.nan, np.minimum(adjusted, 1.0))
+        
+        result = np.empty_like(adjusted)
+        np.put_along_axis(result, order, adjusted, axis=-1)
+        
+        if pi0 is not None:
+            pi0 = np.squeeze(pi0, axis=-1)
+        return np.moveaxis(result, -1, axis), pi0
+
+
+class ResultCache:
+    """
+    Opt-in on-disk memoization for expensive toolkit calls.
+    
+    Calls are keyed by a fingerprint of the function's bytecode, its
+    (default-filled) arguments and the raw buffers of any array inputs,
+    hashed with xxhash when installed and BLAKE2b otherwise. Results are
+    pickled into ``directory`` and evicted least-recently-used once the
+    cache grows beyond ``max_bytes``.
+    
+    Only the cached function's own bytecode is fingerprinted: edits to the
+    functions it calls are not detected. Change ``version`` (or clear the
+    cache) when upgrading the toolkit or editing helper code.
+    
+    Entries are unpickled, so the directory must be private to the user:
+    the default is ``$XDG_CACHE_HOME/medical_stats_toolkit`` (or
+    ``~/.cache/medical_stats_toolkit``), created with mode 0700, and a
+    directory owned by another user or writable by others is refused.
+    
+    Examples:
+    ---------
+    >>> cache = ResultCache('.toolkit_cache', max_bytes=2 * 1024**3)
+    >>> km = cache.call(SurvivalAnalysis.kaplan_meier_analysis, durations, events)
+    >>> cached_meta = cache.cached(MetaAnalysis.random_effects_meta)
+    >>> cache.stats()['hit_rate']
+    """
+    
+    def __init__(self, directory=None, max_bytes=1024**3, version=''):
+        self.directory = directory or self.default_directory()
+        self.max_bytes = int(max_bytes)
+        self.version = str(version)
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self._check_private(self.directory)
+        
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._function_stats = {}
+        
+        # Index of cached entries, least recently used first
+        self._index = OrderedDict()
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+        self._total_bytes = sum(self._index.values())
+    
+    @staticmethod
+    def default_directory():
+        """Per-user cache directory (``$XDG_CACHE_HOME`` or ``~/.cache``)."""
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'medical_stats_toolkit')
     
     @staticmethod
-    def kaplan_meier_plot(durations, event_observed, groups=None, confidence_intervals=True, 
-                         title="Kaplan-Meier Survival Curves", figsize=(10, 6)):
+    def _check_private(directory):
+        """Refuse directories that other users could plant pickles in."""
+        if not hasattr(os, 'getuid'):
+            return
+        info = os.stat(directory)
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"Cache directory {directory} is not owned by the current user")
+        if info.st_mode & 0o022:
+            raise PermissionError(f"Cache directory {directory} is writable by other users")
+    
+    def call(self, func, *args, **kwargs):
         """
-        Create Kaplan-Meier survival plot.
-        
-        Parameters:
-        -----------
-        durations : array-like
-            Time to event or censoring
-        event_observed : array-like
-            Event indicator (1=event, 0=censored)
-        groups : array-like, optional
-            Group labels for comparison
-        confidence_intervals : bool
-            Whether to show confidence intervals
-        title : str
-            Plot title
-        figsize : tuple
-            Figure size
-            
-        Returns:
-        --------
-        matplotlib.figure.Figure : Kaplan-Meier plot
+        Return ``func(*args, **kwargs)``, reading it from the cache if present.
         """
-        if not LIFELINES_AVAILABLE:
-            print("Error: lifelines package required for Kaplan-Meier plots")
-            return None
+        key = self.key(func, args, kwargs)
+        name = getattr(func, '__qualname__', repr(func))
+        counts = self._function_stats.setdefault(name, {'hits': 0, 'misses': 0})
         
-        fig, ax = plt.subplots(figsize=figsize)
+        found, result = self._load(key)
+        if found:
+            self._hits += 1
+            counts['hits'] += 1
+            return result
         
-        if groups is None:
-            # Single group
-            kmf = KaplanMeierFitter()
-            kmf.fit(durations, event_observed, label='Overall')
-            kmf.plot_survival_function(ax=ax, show_censors=True, ci_show=confidence_intervals)
-        else:
-            # Multiple groups
-            unique_groups = np.unique(groups)
-            colors = plt.cm.Set1(np.linspace(0, 1, len(unique_groups)))
-            
-            for i, group in enumerate(unique_groups):
-                mask = groups == group
-                kmf = KaplanMeierFitter()
-                kmf.fit(durations[mask], event_observed[mask], label=f'Group {group}')
-                kmf.plot_survival_function(ax=ax, show_censors=True, ci_show=confidence_intervals, color=colors[i])
+        self._misses += 1
+        counts['misses'] += 1
+        result = func(*args, **kwargs)
+        # Error dicts (e.g. a missing optional dependency) are not worth keeping
+        if not (isinstance(result, dict) and 'error' in result):
+            self._store(key, result)
+        return result
+    
+    def cached(self, func):
+        """Wrap ``func`` so that every call goes through the cache."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+        wrapper.cache = self
+        return wrapper
+    
+    def key(self, func, args=(), kwargs=None):
+        """
+        Fingerprint a call.
         
-        ax.set_title(title)
-        ax.set_xlabel('Time')
-        ax.set_ylabel('Survival Probability')
-        ax.grid(True, alpha=0.3)
-        ax.legend()
+        Arguments are bound to the signature with defaults applied, so
+        positional and keyword spellings of the same call share a key.
+        """
+        kwargs = kwargs or {}
+        try:
+            bound = inspect.signature(func).bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+        except (TypeError, ValueError):
+            arguments = {'args': args, 'kwargs': kwargs}
         
-        plt.tight_layout()
-        return fig
+        hasher = ResultCache._hasher()
+        hasher.update(self.version.encode())
+        hasher.update(f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}".encode())
+        code = getattr(func, '__code__', None)
+        if code is not None:
+            hasher.update(code.co_code)
+            hasher.update(repr(code.co_consts).encode())
+        for name, value in arguments.items():
+            hasher.update(name.encode())
+            ResultCache._update_fingerprint(hasher, value)
+        return hasher.hexdigest()
     
-    @staticmethod
-    def roc_curve_plot(y_true, y_scores, title="ROC Curve", figsize=(8, 8)):
+    def stats(self):
         """
-        Create ROC curve plot.
+        Cache-hit metrics.
         
-        Parameters:
-        -----------
-        y_true : array-like
-            True binary labels
-        y_scores : array-like
-            Prediction scores
-        title : str
-            Plot title
-        figsize : tuple
-            Figure size
-            
         Returns:
         --------
-        matplotlib.figure.Figure : ROC curve plot
+        dict : Hits, misses, hit rate, evictions, size and per-function counts
         """
-        fpr, tpr, thresholds = roc_curve(y_true, y_scores)
-        auc_score = auc(fpr, tpr)
+        lookups = self._hits + self._misses
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / lookups if lookups else 0.0,
+            'evictions': self._evictions,
+            'entries': len(self._index),
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'functions': {name: dict(counts) for name, counts in self._function_stats.items()}
+        }
+    
+    def clear(self):
+        """Delete every cached result and reset the metrics."""
+        for key in list(self._index):
+            self._remove(key)
+        self._hits = self._misses = self._evictions = 0
+        self._function_stats = {}
+    
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+    
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            self._forget(key)
+            return False, None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Corrupt or stale entry (e.g. written by an older toolkit version)
+            self._remove(key)
+            return False, None
         
-        fig, ax = plt.subplots(figsize=figsize)
+        os.utime(path)
+        if key in self._index:
+            self._index.move_to_end(key)
+        else:
+            self._index[key] = os.path.getsize(path)
+            self._total_bytes += self._index[key]
+        return True, result
+    
+    def _store(self, key, result):
+        try:
+            payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            print(f"Warning: result not cached ({e})")
+            return
+        if len(payload) > self.max_bytes:
+            return
         
-        ax.plot(fpr, tpr, linewidth=2, label=f'ROC Curve (AUC = {auc_score:.3f})')
-        ax.plot([0, 1], [0, 1], 'k--', linewidth=1, label='Random Classifier')
+        # Write to a temporary file first so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, self._path(key))
         
-        ax.set_xlim([0.0, 1.0])
-        ax.set_ylim([0.0, 1.05])
-        ax.set_xlabel('False Positive Rate (1 - Specificity)')
-        ax.set_ylabel('True Positive Rate (Sensitivity)')
-        ax.set_title(title)
-        ax.legend(loc='lower right')
-        ax.grid(True, alpha=0.3)
+        self._forget(key)
+        self._index[key] = len(payload)
+        self._total_bytes += len(payload)
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            self._remove(next(iter(self._index)))
+            self._evictions += 1
+    
+    def _forget(self, key):
+        self._total_bytes -= self._index.pop(key, 0)
+    
+    def _remove(self, key):
+        self._forget(key)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+    
+    @staticmethod
+    def _hasher():
+        try:
+            import xxhash
+            return xxhash.xxh3_128()
+        except ImportError:
+            return hashlib.blake2b(digest_size=16)
+    
+    @staticmethod
+    def _update_fingerprint(hasher, value):
+        """Feed a value into the hash, using raw buffers for array data."""
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            hasher.update(f"ndarray:{value.dtype.str}:{value.shape}".encode())
+            hasher.update(memoryview(np.ascontiguousarray(value)).cast('B'))
+        elif isinstance(value, (pd.Series, pd.DataFrame, pd.Index)):
+            kind = type(value).__name__
+            columns = list(value.columns) if isinstance(value, pd.DataFrame) else [getattr(value, 'name', None)]
+            hasher.update(f"{kind}:{value.shape}:{columns!r}:{list(map(str, np.atleast_1d(value.dtypes)))!r}".encode())
+            hashed = pd.util.hash_pandas_object(value, index=not isinstance(value, pd.Index)).to_numpy()
+            hasher.update(memoryview(hashed).cast('B'))
+        elif isinstance(value, (list, tuple)):
+            hasher.update(f"{type(value).__name__}:{len(value)}".encode())
+            for item in value:
+                ResultCache._update_fingerprint(hasher, item)
+        elif isinstance(value, dict):
+            hasher.update(f"dict:{len(value)}".encode())
+            for item_key in sorted(value, key=repr):
+                hasher.update(repr(item_key).encode())
+                ResultCache._update_fingerprint(hasher, value[item_key])
+        elif value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+            hasher.update(f"{type(value).__name__}:{value!r}".encode())
+        else:
+            try:
+                hasher.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            except (pickle.PicklingError, TypeError, AttributeError):
+                hasher.update(repr(value).encode())
+
+
+# Functions wrapped by enable_result_cache() when no explicit list is given
+_CACHEABLE_FUNCTIONS = (
+    ('SurvivalAnalysis', 'kaplan_meier_analysis'),
+    ('SurvivalAnalysis', 'cox_regression'),
+    ('MetaAnalysis', 'fixed_effects_meta'),
+    ('MetaAnalysis', 'random_effects_meta'),
+    ('HypothesisTests', 'fisher_exact_batch'),
+    ('MultipleComparisons', 'adjust_p_values'),
+)
+_cached_originals = {}
+
+
+def enable_result_cache(directory=None, max_bytes=1024**3, functions=None, version=''):
+    """
+    Transparently memoize expensive toolkit functions on disk.
+    
+    Parameters:
+    -----------
+    directory : str, optional
+        Cache directory, private to the user (default: ResultCache.default_directory())
+    max_bytes : int
+        Size limit; least recently used results are evicted beyond it
+    functions : list of str, optional
+        Functions to cache as 'Class.method' (default: survival analyses,
+        meta-analyses, batch Fisher tests and p-value adjustment)
+    version : str
+        Salt mixed into every key; change it to invalidate earlier results
         
-        plt.tight_layout()
-        return fig
+    Returns:
+    --------
+    ResultCache : The active cache, whose stats() exposes hit metrics
+    """
+    disable_result_cache()
+    cache = ResultCache(directory, max_bytes, version)
+    targets = _CACHEABLE_FUNCTIONS if functions is None else [name.split('.') for name in functions]
+    for class_name, method_name in targets:
+        cls = globals()[class_name]
+        original = cls.__dict__[method_name]
+        _cached_originals[(class_name, method_name)] = original
+        setattr(cls, method_name, staticmethod(cache.cached(original.__func__)))
+    return cache
 
 
-class MultipleComparisons:
+def disable_result_cache():
+    """Restore the uncached toolkit functions."""
+    for (class_name, method_name), original in _cached_originals.items():
+        setattr(globals()[class_name], method_name, original)
+    _cached_originals.clear()
+
+
+class ConvertedFileCache:
     """
-    Class for handling multiple comparisons corrections.
+    Sidecar cache of slow-to-parse files (Excel, SPSS) in a columnar format.
+    
+    Each source file and reader-argument combination is stored once as
+    Parquet (or as a pandas pickle when pyarrow is missing or the frame
+    cannot be written as Parquet), next to a JSON manifest holding the
+    source's path, size, mtime and content hash. A matching size and mtime
+    is a hit; a changed mtime with an unchanged content hash is revalidated;
+    anything else invalidates the entry. Least recently used entries are
+    removed once the cache exceeds ``max_bytes``.
+    
+    Examples:
+    ---------
+    >>> data = load_data('registry_export.xlsx', cache_dir='.load_cache')
     """
     
-    @staticmethod
-    def adjust_p_values(p_values, method='holm', alpha=0.05):
+    def __init__(self, directory, max_bytes=10 * 1024**3):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        os.makedirs(directory, exist_ok=True)
+    
+    def load(self, file_path, reader, **kwargs):
         """
-        Adjust p-values for multiple comparisons.
+        Return ``reader(file_path, **kwargs)``, converting it only when needed.
         
         Parameters:
         -----------
-        p_values : array-like
-            Unadjusted p-values
-        method : str
-            Correction method ('holm', 'bonferroni', 'fdr_bh', 'fdr_by')
-        alpha : float
-            Family-wise error rate
+        file_path : str
+            Source file
+        reader : callable
+            Function parsing the source into a DataFrame
+        **kwargs : dict
+            Reader arguments; part of the cache key
             
         Returns:
         --------
-        dict : Adjusted p-values and significance
+        pandas.DataFrame : Loaded data
         """
-        p_vals = np.array(p_values)
+        source = os.path.abspath(file_path)
+        stat = os.stat(source)
+        key = ConvertedFileCache._key(source, reader, kwargs)
+        manifest_path = os.path.join(self.directory, key + '.json')
         
-        reject, p_adjusted, alpha_sidak, alpha_bonf = multipletests(
-            p_vals, alpha=alpha, method=method
-        )
+        manifest = None
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                manifest = None
         
-        return {
-            'original_p_values': p_vals,
-            'adjusted_p_values': p_adjusted,
-            'significant_after_correction': reject,
-            'method': method,
-            'alpha': alpha,
-            'n_comparisons': len(p_vals),
-            'n_significant_original': np.sum(p_vals < alpha),
-            'n_significant_adjusted': np.sum(reject)
-        }
+        if manifest is not None and manifest['size'] == stat.st_size:
+            if manifest['mtime_ns'] != stat.st_mtime_ns:
+                # Touched or copied: only a content change invalidates the entry
+                if ConvertedFileCache._content_hash(source) == manifest['content_hash']:
+                    manifest['mtime_ns'] = stat.st_mtime_ns
+                    ConvertedFileCache._write_json(manifest_path, manifest)
+                else:
+                    manifest = None
+            if manifest is not None:
+                data = self._read(manifest)
+                if data is not None:
+                    os.utime(manifest_path)
+                    return data
+        
+        self._remove(key)
+        data = reader(file_path, **kwargs)
+        if isinstance(data, pd.DataFrame):
+            self._store(key, source, stat, data)
+        return data
+    
+    def clear(self):
+        """Delete every cached conversion."""
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                self._remove(name[:-5])
+    
+    def _read(self, manifest):
+        path = os.path.join(self.directory, manifest['data_file'])
+        try:
+            if manifest['format'] == 'parquet':
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except (OSError, ValueError, ImportError, pickle.UnpicklingError):
+            return None
+    
+    def _store(self, key, source, stat, data):
+        data_file = key + '.parquet'
+        file_format = 'parquet'
+        try:
+            data.to_parquet(os.path.join(self.directory, data_file))
+        except (ImportError, ValueError, TypeError):
+            # No pyarrow, or mixed-type object columns Parquet cannot store
+            self._remove(key)
+            data_file = key + '.pkl'
+            file_format = 'pickle'
+            data.to_pickle(os.path.join(self.directory, data_file))
+        
+        ConvertedFileCache._write_json(os.path.join(self.directory, key + '.json'), {
+            'source': source,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'content_hash': ConvertedFileCache._content_hash(source),
+            'format': file_format,
+            'data_file': data_file
+        })
+        self._evict(keep=key)
+    
+    def _evict(self, keep=None):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-5]
+            manifest_path = os.path.join(self.directory, name)
+            size = sum(os.path.getsize(os.path.join(self.directory, key + ext))
+                       for ext in ('.json', '.parquet', '.pkl')
+                       if os.path.exists(os.path.join(self.directory, key + ext)))
+            entries.append((os.path.getmtime(manifest_path), key, size))
+            total += size
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key != keep:
+                self._remove(key)
+                total -= size
+    
+    def _remove(self, key):
+        for ext in ('.json', '.parquet', '.pkl'):
+            try:
+                os.remove(os.path.join(self.directory, key + ext))
+            except FileNotFoundError:
+                pass
+    
+    @staticmethod
+    def _key(source, reader, kwargs):
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f"{source}:{getattr(reader, '__qualname__', repr(reader))}".encode())
+        ResultCache._update_fingerprint(hasher, kwargs)
+        return hasher.hexdigest()
+    
+    @staticmethod
+    def _content_hash(path, block_size=4 * 1024**2):
+        hasher = ResultCache._hasher()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+    
+    @staticmethod
+    def _write_json(path, payload):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
 
 
 # Utility functions
-def load_data(file_path, **kwargs):
+def load_data(file_path, columns=None, filters=None, downcast=False, mmap_mode='r',
+              chunksize=None, n_jobs=None, cache_dir=None, cache_max_bytes=10 * 1024**3, **kwargs):
     """
     Load data from various file formats.
     
+    Parquet and Feather/Arrow IPC files are read through pyarrow datasets:
+    only the requested ``columns`` are decoded and ``filters`` are pushed
+    down so that row groups whose statistics cannot match are skipped.
+    ``.npy`` files are memory-mapped rather than read into RAM.
+    
     Parameters:
     -----------
     file_path : str
-        Path to data file
+        Path to data file (csv, xlsx/xls, json, sav, parquet/pq,
+        feather/arrow/ipc or npy)
+    columns : list of str, optional
+        Columns to load (column projection); for 2-D .npy files, column
+        indices, and for structured .npy files, field names
+    filters : list of tuple or pyarrow.compute.Expression, optional
+        Row filters for Parquet/Feather in pyarrow's DNF form,
+        e.g. [('age', '>=', 65), ('site', 'in', ['A', 'B'])]
+    downcast : bool
+        Shrink numeric columns to the smallest safe integer type and
+        float32, and store low-cardinality text columns as categoricals
+    mmap_mode : str or None
+        Memory-map mode for .npy files (default: 'r', read-only)
+    chunksize : int, optional
+        Return an iterator of chunks of about this many rows instead of a
+        single DataFrame (csv, json lines, parquet/feather and npy)
+    n_jobs : int, optional
+        Parse CSV files in parallel byte ranges with this many processes
+        (see read_csv_parallel); -1 uses all CPUs
+    cache_dir : str, optional
+        Directory for a ConvertedFileCache; Excel and SPSS files are then
+        parsed once and re-read from a columnar copy until they change
+    cache_max_bytes : int
+        Size limit of the converted-file cache (default: 10 GB)
     **kwargs : dict
-        Additional arguments for pandas readers
+        Additional arguments for pandas readers, e.g. an explicit ``dtype``
+        mapping to skip type inference
         
     Returns:
     --------
-    pandas.DataFrame : Loaded data
+    pandas.DataFrame : Loaded data (numpy.memmap for plain .npy arrays),
+        or an iterator of chunks when ``chunksize`` is given
     """
     file_extension = file_path.lower().split('.')[-1]
     
+    if file_extension in ['parquet', 'pq', 'feather', 'arrow', 'ipc']:
+        file_format = 'parquet' if file_extension in ['parquet', 'pq'] else 'ipc'
+        if chunksize is not None:
+            return _map_chunks(_iter_arrow(file_path, file_format, columns, filters, chunksize), downcast)
+        data = _load_arrow(file_path, file_format, columns, filters)
+        return downcast_dtypes(data) if downcast else data
+    if file_extension == 'npy':
+        return _load_npy(file_path, columns, mmap_mode, downcast, chunksize)
+    if filters is not None:
+        raise ValueError("filters are only supported for Parquet and Feather files")
+    if chunksize is not None and file_extension not in ['csv', 'json']:
+        raise ValueError(f"chunksize is not supported for {file_extension} files")
+    
     if file_extension == 'csv':
-        return pd.read_csv(file_path, **kwargs)
+        if n_jobs is not None and n_jobs != 1:
+            data = read_csv_parallel(file_path, n_jobs=n_jobs, columns=columns, chunksize=chunksize, **kwargs)
+        else:
+            data = pd.read_csv(file_path, usecols=columns, chunksize=chunksize, **kwargs)
+        if chunksize is not None:
+            return _map_chunks(data, downcast)
     elif file_extension in ['xlsx', 'xls']:
-        return pd.read_excel(file_path, **kwargs)
+        if cache_dir is not None:
+            cache = ConvertedFileCache(cache_dir, cache_max_bytes)
+            data = cache.load(file_path, pd.read_excel, usecols=columns, **kwargs)
+        else:
+            data = pd.read_excel(file_path, usecols=columns, **kwargs)
     elif file_extension == 'json':
-        return pd.read_json(file_path, **kwargs)
+        if chunksize is not None:
+            # Chunked JSON reading requires line-delimited records
+            chunks = pd.read_json(file_path, lines=True, chunksize=chunksize, **kwargs)
+            if columns is not None:
+                chunks = (chunk[columns] for chunk in chunks)
+            return _map_chunks(chunks, downcast)
+        data = pd.read_json(file_path, **kwargs)
+        if columns is not None:
+            data = data[columns]
     elif file_extension == 'sav':
         try:
             import pyreadstat
-            return pd.read_spss(file_path, **kwargs)
+            if cache_dir is not None:
+                cache = ConvertedFileCache(cache_dir, cache_max_bytes)
+                data = cache.load(file_path, pd.read_spss, usecols=columns, **kwargs)
+            else:
+                data = pd.read_spss(file_path, usecols=columns, **kwargs)
         except ImportError:
             raise ImportError("pyreadstat required for SPSS files")
     else:
         raise ValueError(f"Unsupported file format: {file_extension}")
+    
+    return downcast_dtypes(data) if downcast else data
+
+
+def read_csv_parallel(file_path, n_jobs=None, dtype=None, columns=None, chunksize=None,
+                      block_size=64 * 1024**2, **kwargs):
+    """
+    Parse a large CSV file in parallel.
+    
+    The file is split into byte ranges that end on line boundaries and each
+    range is parsed by a separate process. Fields containing quoted line
+    breaks are not supported, since a split could fall inside them.
+    
+    Parameters:
+    -----------
+    file_path : str
+        Path to a CSV file with a single header line
+    n_jobs : int, optional
+        Number of worker processes (default / -1: all CPUs)
+    dtype : dict or type, optional
+        Explicit column types; recommended, since it skips pandas' type
+        inference and guarantees identical dtypes across chunks
+    columns : list of str, optional
+        Columns to keep (passed to pandas as ``usecols``)
+    chunksize : int, optional
+        Approximate rows per chunk; when given, an iterator of DataFrames
+        is returned in file order instead of one concatenated frame
+    block_size : int
+        Byte range size when ``chunksize`` is not given (default: 64 MB)
+    **kwargs : dict
+        Additional arguments for pandas.read_csv (e.g. sep, na_values)
+        
+    Returns:
+    --------
+    pandas.DataFrame or iterator of pandas.DataFrame : Parsed data
+    """
+    for option in ('header', 'names', 'skiprows', 'nrows', 'index_col'):
+        if option in kwargs:
+            raise ValueError(f"read_csv_parallel does not support '{option}'")
+    
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        sample = f.read(1024**2)
+    names = list(pd.read_csv(io.BytesIO(header), nrows=0, **kwargs).columns)
+    
+    if chunksize is not None:
+        bytes_per_row = len(sample) / max(sample.count(b'\n'), 1)
+        block_size = max(int(chunksize * bytes_per_row), 1)
+    ranges = _csv_byte_ranges(file_path, data_start, block_size)
+    
+    if n_jobs is None or n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    options = dict(kwargs, names=names, dtype=dtype, usecols=columns)
+    chunks = _parallel_csv_chunks(file_path, ranges, options, n_jobs)
+    if chunksize is not None:
+        return chunks
+    
+    frames = list(chunks)
+    if not frames:
+        return pd.read_csv(io.BytesIO(header), usecols=columns, dtype=dtype, **kwargs)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _parallel_csv_chunks(file_path, ranges, options, n_jobs):
+    """Yield parsed byte ranges in file order, with a bounded number in flight."""
+    if n_jobs == 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            yield _read_csv_range(file_path, start, end, options)
+        return
+    tasks = ((file_path, start, end, options) for start, end in ranges)
+    yield from _bounded_parallel_map(_read_csv_range, tasks, min(n_jobs, len(ranges)))
+
+
+def _csv_byte_ranges(file_path, data_start, block_size):
+    """Split a file into (start, end) byte ranges that end on line boundaries."""
+    file_size = os.path.getsize(file_path)
+    ranges = []
+    start = data_start
+    with open(file_path, 'rb') as f:
+        while start < file_size:
+            f.seek(min(start + block_size, file_size))
+            if f.tell() < file_size:
+                f.readline()  # move to the start of the next line
+            end = min(f.tell(), file_size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _read_csv_range(file_path, start, end, options):
+    """Parse one byte range of a CSV file (runs in a worker process)."""
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        buffer = f.read(end - start)
+    return pd.read_csv(io.BytesIO(buffer), header=None, **options)
+
+
+def _map_chunks(chunks, downcast):
+    """Apply optional downcasting lazily to an iterator of chunks."""
+    for chunk in chunks:
+        yield downcast_dtypes(chunk) if downcast else chunk
+
+
+def downcast_dtypes(data, categorical_threshold=0.5):
+    """
+    Reduce the memory footprint of a DataFrame.
+    
+    Integers are shrunk to the smallest type holding their range, floats
+    become float32, and text columns whose share of distinct values is at
+    most ``categorical_threshold`` become categoricals.
+    
+    Parameters:
+    -----------
+    data : pandas.DataFrame
+        Data to downcast (not modified)
+    categorical_threshold : float
+        Maximum ratio of unique values to rows for categorical conversion
+        
+    Returns:
+    --------
+    pandas.DataFrame : Downcast copy of the data
+    """
+    converted = {}
+    for name, column in data.items():
+        kind = column.dtype.kind
+        if kind in 'iu':
+            # Signed columns stay signed so differences cannot wrap around
+            converted[name] = pd.to_numeric(column, downcast='unsigned' if kind == 'u' else 'integer')
+        elif kind == 'f':
+            converted[name] = column.astype(np.float32) if column.dtype.itemsize > 4 else column
+        elif kind == 'O' or isinstance(column.dtype, pd.StringDtype):
+            n_unique = column.nunique(dropna=True)
+            if len(column) and n_unique / len(column) <= categorical_threshold:
+                converted[name] = column.astype('category')
+            else:
+                converted[name] = column
+        else:
+            converted[name] = column
+    return pd.DataFrame(converted, index=data.index)
+
+
+def _load_arrow(file_path, file_format, columns, filters):
+    """Read a Parquet or Arrow IPC file with column projection and filter pushdown."""
+    dataset, expression = _arrow_dataset(file_path, file_format, filters)
+    # The dataset is opened on a memory-mapping filesystem (see _arrow_dataset),
+    # Parquet row groups are pruned from their column statistics before any
+    # data is decoded
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _iter_arrow(file_path, file_format, columns, filters, chunksize):
+    """Stream a Parquet or Arrow IPC file as DataFrames of ``chunksize`` rows (the last may be shorter)."""
+    import pyarrow as pa
+    
+    dataset, expression = _arrow_dataset(file_path, file_format, filters)
+    # Batches never span row groups, so they are regrouped into full chunks
+    pending, n_pending = [], 0
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=chunksize):
+        pending.append(batch)
+        n_pending += batch.num_rows
+        while n_pending >= chunksize:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunksize).to_pandas()
+            rest = table.slice(chunksize)
+            pending, n_pending = rest.to_batches(), rest.num_rows
+    if n_pending:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+
+def _arrow_dataset(file_path, file_format, filters):
+    """Open a pyarrow dataset and convert DNF filters to an expression."""
+    try:
+        import pyarrow.dataset as ds
+        import pyarrow.fs as pafs
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("pyarrow required for Parquet and Feather files")
+    
+    expression = filters
+    if isinstance(filters, (list, tuple)):
+        expression = pq.filters_to_expression(filters)
+    # Memory-mapped local files let uncompressed IPC buffers be used in place
+    filesystem = pafs.LocalFileSystem(use_mmap=True)
+    return ds.dataset(os.path.abspath(file_path), format=file_format, filesystem=filesystem), expression
+
+
+def _load_npy(file_path, columns, mmap_mode, downcast, chunksize=None):
+    """Memory-map a .npy file, copying only the selected columns if requested."""
+    array = np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+    
+    if chunksize is not None:
+        return _iter_npy(array, columns, downcast, chunksize)
+    
+    if array.dtype.names is not None:
+        names = list(array.dtype.names) if columns is None else list(columns)
+        data = pd.DataFrame({name: np.asarray(array[name]) for name in names})
+        return downcast_dtypes(data) if downcast else data
+    
+    if columns is not None:
+        if array.ndim != 2:
+            raise ValueError("columns can only be selected from 2-D .npy arrays")
+        array = np.asarray(array[:, columns])
+    if downcast and array.dtype.kind == 'f' and array.dtype.itemsize > 4:
+        array = np.asarray(array, dtype=np.float32)
+    return array
+
+
+def _iter_npy(array, columns, downcast, chunksize):
+    """Yield row slices of a memory-mapped array, one chunk in memory at a time."""
+    if array.dtype.names is None and columns is not None and array.ndim != 2:
+        raise ValueError("columns can only be selected from 2-D .npy arrays")
+    for start in range(0, len(array), chunksize):
+        block = array[start:start + chunksize]
+        if array.dtype.names is not None:
+            names = list(array.dtype.names) if columns is None else list(columns)
+            data = pd.DataFrame({name: np.asarray(block[name]) for name in names})
+            yield downcast_dtypes(data) if downcast else data
+            continue
+        if columns is not None:
+            block = block[:, columns]
+        block = np.asarray(block)
+        if downcast and block.dtype.kind == 'f' and block.dtype.itemsize > 4:
+            block = block.astype(np.float32)
+        yield block
 
 
 def generate_sample_data(n_samples=100, seed=42):
     """
     Generate sample medical data for testing.
     
+    For large or clustered cohorts see generate_cohort and write_cohort.
+    
     Parameters:
     -----------
     n_samples : int
@@ -1260,7 +4261,7 @@ def generate_sample_data(n_samples=100, seed=42):
     
     # Binary variables
     gender = np.random.binomial(1, 0.6, n_samples)  # 1 = female
-    diabetes = np.random.binomial(1, 0.3 + 0.01 * (age - 65), n_samples)
+    diabetes = np.random.binomial(1, np.clip(0.3 + 0.01 * (age - 65), 0, 1), n_samples)
     
     # Treatment assignment
     treatment = np.random.binomial(1, 0.5, n_samples)
@@ -1294,6 +4295,218 @@ def generate_sample_data(n_samples=100, seed=42):
     })
 
 
+_COHORT_LATENT = ('age', 'gender', 'diabetes')
+
+
+def generate_cohort(n_samples, seed=42, chunk_size=1_000_000, n_jobs=1, correlation=None,
+                    n_sites=1, site_sd=0.0, missing=None, missing_mechanism='mcar'):
+    """
+    Generate a large synthetic cohort lazily, chunk by chunk.
+    
+    Uses the same variables and outcome model as generate_sample_data, but
+    draws from independent np.random.Generator streams spawned from one
+    SeedSequence (one per chunk), so the data are identical for any
+    ``n_jobs`` and only one chunk per worker is held in memory.
+    
+    Parameters:
+    -----------
+    n_samples : int
+        Total number of patients
+    seed : int
+        Seed of the root SeedSequence
+    chunk_size : int
+        Patients per chunk
+    n_jobs : int
+        Worker processes generating chunks ahead of the consumer (-1: all CPUs)
+    correlation : float or array-like, optional
+        Correlation of the latent normal variables behind age, gender and
+        diabetes (Gaussian copula): a scalar for an exchangeable structure
+        or a 3x3 correlation matrix
+    n_sites : int
+        Number of recruiting sites; adds a 'site' column
+    site_sd : float
+        Standard deviation of the site random intercept added to the
+        outcome, continuous outcome and hazard linear predictors
+    missing : dict, optional
+        Missing-value rate per column, e.g. {'age': 0.05, 'continuous_outcome': 0.1}
+    missing_mechanism : str
+        'mcar' (completely at random) or 'mar' (logistic in age, equal to
+        the given rate at age 65 and rising with age)
+        
+    Returns:
+    --------
+    iterator of pandas.DataFrame : Cohort chunks in patient order
+    """
+    if missing_mechanism not in ('mcar', 'mar'):
+        raise ValueError("missing_mechanism must be 'mcar' or 'mar'")
+    
+    correlation_matrix = np.eye(len(_COHORT_LATENT))
+    if correlation is not None:
+        if np.ndim(correlation) == 0:
+            correlation_matrix = np.full_like(correlation_matrix, float(correlation))
+            np.fill_diagonal(correlation_matrix, 1.0)
+        else:
+            correlation_matrix = np.asarray(correlation, dtype=float)
+            if correlation_matrix.shape != (len(_COHORT_LATENT),) * 2:
+                raise ValueError("correlation must be a scalar or a 3x3 matrix for age, gender, diabetes")
+    try:
+        cholesky = np.linalg.cholesky(correlation_matrix)
+    except np.linalg.LinAlgError:
+        raise ValueError("correlation matrix must be positive definite")
+    
+    root = np.random.SeedSequence(seed)
+    site_seed, chunk_root = root.spawn(2)
+    site_effects = np.random.default_rng(site_seed).normal(0, site_sd, n_sites)
+    
+    starts = range(0, n_samples, chunk_size)
+    seeds = chunk_root.spawn(len(starts))
+    params = {'cholesky': cholesky, 'n_sites': n_sites, 'site_effects': site_effects,
+              'missing': dict(missing or {}), 'missing_mechanism': missing_mechanism}
+    tasks = [(chunk_seed, start, min(chunk_size, n_samples - start), params)
+             for chunk_seed, start in zip(seeds, starts)]
+    
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs == 1 or len(tasks) <= 1:
+        return (_generate_cohort_chunk(*task) for task in tasks)
+    return _bounded_parallel_map(_generate_cohort_chunk, tasks, n_jobs)
+
+
+def write_cohort(output_path, n_samples, file_format=None, compression=None, **kwargs):
+    """
+    Stream a synthetic cohort to Parquet or CSV without materializing it.
+    
+    Parameters:
+    -----------
+    output_path : str
+        Destination file
+    n_samples : int
+        Total number of patients
+    file_format : str, optional
+        'parquet' or 'csv' (default: inferred from the extension)
+    compression : str, optional
+        Compression codec (e.g. 'snappy'/'zstd' for Parquet, 'gzip' for CSV;
+        default: snappy, or inferred from a CSV extension such as '.csv.gz')
+    **kwargs : dict
+        Arguments for generate_cohort (seed, chunk_size, n_jobs, ...)
+        
+    Returns:
+    --------
+    dict : Output path, format, rows and chunks written
+    """
+    if file_format is None:
+        extension = output_path.lower().split('.')[-1]
+        file_format = 'parquet' if extension in ['parquet', 'pq'] else 'csv'
+    
+    n_rows = 0
+    n_chunks = 0
+    chunks = generate_cohort(n_samples, **kwargs)
+    
+    if file_format == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow required for Parquet output")
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema, compression=compression or 'snappy')
+                writer.write_table(table)
+                n_rows += len(chunk)
+                n_chunks += 1
+        finally:
+            if writer is not None:
+                writer.close()
+    elif file_format == 'csv':
+        for chunk in chunks:
+            chunk.to_csv(output_path, mode='w' if n_chunks == 0 else 'a', header=n_chunks == 0,
+                         index=False, compression=compression or 'infer')
+            n_rows += len(chunk)
+            n_chunks += 1
+    else:
+        raise ValueError(f"Unsupported output format: {file_format}")
+    
+    return {
+        'output_path': output_path,
+        'format': file_format,
+        'n_rows': n_rows,
+        'n_chunks': n_chunks
+    }
+
+
+def _generate_cohort_chunk(chunk_seed, start, size, params):
+    """Generate one cohort chunk from its own random stream."""
+    rng = np.random.default_rng(chunk_seed)
+    
+    latent = rng.standard_normal((size, len(_COHORT_LATENT))) @ params['cholesky'].T
+    uniform = special.ndtr(latent)
+    
+    age = np.clip(65 + 15 * latent[:, 0], 18, 100)
+    # Upper tails map to 1 so positive latent correlations stay positive
+    gender = (uniform[:, 1] > 1 - 0.6).astype(np.int8)  # 1 = female
+    diabetes = (uniform[:, 2] > 1 - np.clip(0.3 + 0.01 * (age - 65), 0.01, 0.99)).astype(np.int8)
+    treatment = rng.binomial(1, 0.5, size).astype(np.int8)
+    
+    site = rng.integers(0, params['n_sites'], size)
+    site_effect = params['site_effects'][site]
+    
+    outcome_prob = np.clip(0.3 + 0.2 * treatment - 0.01 * age + 0.15 * diabetes + 0.1 * site_effect,
+                           0.01, 0.99)
+    outcome = rng.binomial(1, outcome_prob).astype(np.int8)
+    continuous_outcome = (120 + 5 * treatment - 0.5 * age + 10 * diabetes + 10 * site_effect +
+                          rng.normal(0, 10, size))
+    
+    hazard = np.exp(-2 + 0.5 * treatment + 0.02 * age + 0.3 * diabetes + site_effect)
+    survival_time = rng.exponential(1 / hazard)
+    censoring_time = rng.exponential(1 / 0.1, size)
+    
+    data = pd.DataFrame({
+        'patient_id': np.arange(start + 1, start + size + 1),
+        'site': site.astype(np.int32),
+        'age': age,
+        'gender': gender,
+        'diabetes': diabetes,
+        'treatment': treatment,
+        'outcome': outcome,
+        'continuous_outcome': continuous_outcome,
+        'survival_time': np.minimum(survival_time, censoring_time),
+        'event_observed': (survival_time <= censoring_time).astype(np.int8)
+    })
+    if params['n_sites'] == 1:
+        data = data.drop(columns='site')
+    
+    for column, rate in params['missing'].items():
+        # Float in every chunk, masked or not, so chunk schemas agree
+        data[column] = data[column].astype(np.float64)
+        if rate <= 0:
+            continue
+        if params['missing_mechanism'] == 'mar':
+            # Logistic in standardized age, centred on the mean age
+            logit = np.log(rate / (1 - rate)) + (age - 65) / 15
+            probability = special.expit(logit)
+        else:
+            probability = rate
+        mask = rng.random(size) < probability
+        data[column] = data[column].where(~mask)
+    return data
+
+
+def _bounded_parallel_map(func, tasks, n_jobs, prefetch=2):
+    """Ordered process-pool map keeping at most ``prefetch * n_jobs`` results in flight."""
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        task_iter = iter(tasks)
+        pending = [executor.submit(func, *task) for task in itertools.islice(task_iter, prefetch * n_jobs)]
+        while pending:
+            result = pending.pop(0).result()
+            task = next(task_iter, None)
+            if task is not None:
+                pending.append(executor.submit(func, *task))
+            yield result
+
+
 if __name__ == "__main__":
     # Example usage and testing
     print("Medical Statistics Toolkit - Example Usage")
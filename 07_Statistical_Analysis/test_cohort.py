@@ -0,0 +1,92 @@
+"""Tests for the synthetic cohort generators."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from medical_stats_toolkit import generate_cohort, generate_sample_data, load_data, write_cohort
+
+
+def test_generate_sample_data_is_seeded():
+    pd.testing.assert_frame_equal(generate_sample_data(200, seed=42), generate_sample_data(200, seed=42))
+
+
+def test_cohort_chunks_cover_all_patients_in_order():
+    chunks = list(generate_cohort(2500, chunk_size=1000))
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    cohort = pd.concat(chunks, ignore_index=True)
+    np.testing.assert_array_equal(cohort['patient_id'], np.arange(1, 2501))
+    assert 'site' not in cohort.columns
+
+
+def test_cohort_is_identical_for_any_number_of_workers():
+    serial = pd.concat(generate_cohort(3000, seed=7, chunk_size=1000), ignore_index=True)
+    parallel = pd.concat(generate_cohort(3000, seed=7, chunk_size=1000, n_jobs=2), ignore_index=True)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_cohort_correlation_and_sites():
+    cohort = pd.concat(generate_cohort(50_000, correlation=0.6, n_sites=4, site_sd=0.5), ignore_index=True)
+
+    assert sorted(cohort['site'].unique()) == [0, 1, 2, 3]
+    assert cohort[['age', 'gender', 'diabetes']].corr().to_numpy()[np.triu_indices(3, 1)].min() > 0.2
+    assert abs(cohort['gender'].mean() - 0.6) < 0.01
+
+
+def test_cohort_missing_mechanisms():
+    mcar = pd.concat(generate_cohort(50_000, missing={'continuous_outcome': 0.1}), ignore_index=True)
+    assert abs(mcar['continuous_outcome'].isna().mean() - 0.1) < 0.01
+
+    mar = pd.concat(generate_cohort(50_000, missing={'continuous_outcome': 0.1}, missing_mechanism='mar'),
+                    ignore_index=True)
+    old = mar['age'] > 80
+    assert mar.loc[old, 'continuous_outcome'].isna().mean() > mar.loc[~old, 'continuous_outcome'].isna().mean()
+
+
+def test_cohort_rejects_invalid_correlation():
+    with pytest.raises(ValueError):
+        next(generate_cohort(10, correlation=[[1, 2, 0], [2, 1, 0], [0, 0, 1]]))
+    with pytest.raises(ValueError):
+        generate_cohort(10, missing_mechanism='mnar')
+
+
+@pytest.mark.parametrize('filename', ['cohort.csv', 'cohort.csv.gz', 'cohort.parquet'])
+def test_write_cohort_round_trip(tmp_path, filename):
+    if filename.endswith('.parquet'):
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / filename)
+    compression = 'gzip' if filename.endswith('.gz') else None
+
+    summary = write_cohort(path, 2500, file_format='parquet' if 'parquet' in filename else 'csv',
+                           compression=compression, chunk_size=1000)
+
+    assert summary['n_rows'] == 2500 and summary['n_chunks'] == 3
+    written = pd.read_parquet(path) if filename.endswith('.parquet') else pd.read_csv(path)
+    expected = pd.concat(generate_cohort(2500, chunk_size=1000), ignore_index=True)
+    pd.testing.assert_frame_equal(written, expected, check_dtype=False)
+    if filename == 'cohort.csv':
+        assert len(load_data(path)) == 2500
+
+
+def test_write_cohort_parquet_with_sparse_missing_values(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'cohort.parquet')
+
+    # Most 50-row chunks have no missing gender; the schema must not depend on it
+    write_cohort(path, 2000, chunk_size=50, missing={'gender': 0.01, 'age': 0.0})
+
+    written = pd.read_parquet(path)
+    assert len(written) == 2000
+    assert written['gender'].dtype == np.float64 and written['age'].dtype == np.float64
+    assert 0 < written['gender'].isna().sum() < 100
+
+
+def test_write_cohort_infers_gzip_from_extension(tmp_path):
+    path = tmp_path / 'cohort.csv.gz'
+
+    summary = write_cohort(str(path), 300, chunk_size=100)
+
+    assert summary['format'] == 'csv'
+    assert path.read_bytes()[:2] == b'\x1f\x8b'
+    assert len(pd.read_csv(path)) == 300
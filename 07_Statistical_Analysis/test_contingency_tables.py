@@ -0,0 +1,130 @@
+"""Tests for the 2x2 and stratified 2x2 table analyses."""
+
+import numpy as np
+import pytest
+from scipy.stats import chi2_contingency, fisher_exact
+from statsmodels.stats.contingency_tables import StratifiedTable, Table2x2
+
+from medical_stats_toolkit import EffectSizes, HypothesisTests
+
+
+@pytest.fixture
+def tables():
+    rng = np.random.default_rng(3)
+    tables = rng.integers(1, 60, size=(200, 2, 2))
+    tables[:20] = rng.integers(1, 6, size=(20, 2, 2))
+    return tables
+
+
+@pytest.mark.parametrize('correction', [True, False])
+def test_chi_square_batch_matches_scipy(tables, correction):
+    result = HypothesisTests.chi_square_test_batch(tables, correction=correction, fisher=False)
+
+    expected = [chi2_contingency(table, correction=correction)[:2] for table in tables]
+    np.testing.assert_allclose(result.chi2_statistic, [stat for stat, _ in expected], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(result.p_value, [p for _, p in expected], rtol=1e-9)
+    assert result.fisher_exact_p is None
+
+
+@pytest.mark.parametrize('alternative', ['two-sided', 'less', 'greater'])
+def test_fisher_exact_batch_matches_scipy(tables, alternative):
+    p_values = HypothesisTests.fisher_exact_batch(tables, alternative=alternative, block_size=500)
+
+    expected = [fisher_exact(table, alternative=alternative)[1] for table in tables]
+    np.testing.assert_allclose(p_values, expected, rtol=1e-6)
+
+
+def test_cell_arguments_and_scalar_tables():
+    table = np.array([[12, 5], [3, 17]])
+
+    batch = HypothesisTests.chi_square_test_batch(*table.ravel())
+    single = HypothesisTests.chi_square_test(table)
+
+    assert batch.chi2_statistic == pytest.approx(single.chi2_statistic)
+    assert batch.fisher_exact_p == pytest.approx(single.fisher_exact_p)
+    assert batch.minimum_expected == pytest.approx(single.minimum_expected)
+    assert np.ndim(batch.p_value) == 0
+
+
+def test_two_by_two_batch_matches_statsmodels(tables):
+    result = EffectSizes.two_by_two_batch(tables)
+
+    for index in (0, 50, 199):
+        table = Table2x2(tables[index])
+        assert result.odds_ratio[index] == pytest.approx(table.oddsratio)
+        np.testing.assert_allclose([result.or_ci_lower[index], result.or_ci_upper[index]],
+                                   table.oddsratio_confint())
+        assert result.relative_risk[index] == pytest.approx(table.riskratio)
+        np.testing.assert_allclose([result.rr_ci_lower[index], result.rr_ci_upper[index]],
+                                   table.riskratio_confint())
+    a, b, c, d = tables[:, 0, 0], tables[:, 0, 1], tables[:, 1, 0], tables[:, 1, 1]
+    np.testing.assert_allclose(result.risk_difference, a / (a + b) - c / (c + d))
+    assert not result.zero_cell_corrected.any()
+
+
+def test_zero_cells_get_haldane_correction():
+    result = EffectSizes.two_by_two_batch([[[0, 10], [5, 5]], [[4, 6], [5, 5]]])
+
+    np.testing.assert_array_equal(result.zero_cell_corrected, [True, False])
+    assert result.odds_ratio[0] == pytest.approx((0.5 * 5.5) / (10.5 * 5.5))
+    assert result.risk_difference[0] == pytest.approx(-0.5)
+    assert EffectSizes.odds_ratio_ci(4, 6, 5, 5)['odds_ratio'] == pytest.approx(result.odds_ratio[1])
+
+
+@pytest.fixture
+def strata():
+    return np.array([[[12, 30], [8, 40]], [[20, 25], [10, 33]], [[5, 14], [2, 19]], [[30, 60], [25, 70]]])
+
+
+def test_mantel_haenszel_matches_statsmodels(strata):
+    result = EffectSizes.mantel_haenszel(strata)
+    table = StratifiedTable(np.moveaxis(strata, 0, -1))
+
+    assert result.odds_ratio == pytest.approx(table.oddsratio_pooled)
+    assert result.se_log_or == pytest.approx(table.logodds_pooled_se)
+    np.testing.assert_allclose([result.or_ci_lower, result.or_ci_upper], table.oddsratio_pooled_confint())
+    assert result.relative_risk == pytest.approx(table.riskratio_pooled)
+    assert result.n_strata == 4
+
+
+@pytest.mark.parametrize('correction', [True, False])
+def test_cmh_test_matches_statsmodels(strata, correction):
+    result = HypothesisTests.cochran_mantel_haenszel_test(strata, correction=correction)
+    expected = StratifiedTable(np.moveaxis(strata, 0, -1)).test_null_odds(correction=correction)
+
+    assert result.cmh_statistic == pytest.approx(expected.statistic)
+    assert result.p_value == pytest.approx(expected.pvalue)
+
+
+@pytest.mark.parametrize('tarone', [True, False])
+def test_breslow_day_matches_statsmodels(strata, tarone):
+    result = HypothesisTests.breslow_day_test(strata, tarone=tarone)
+    expected = StratifiedTable(np.moveaxis(strata, 0, -1)).test_equal_odds(adjust=tarone)
+
+    assert result.statistic == pytest.approx(expected.statistic)
+    assert result.p_value == pytest.approx(expected.pvalue)
+    assert result.degrees_of_freedom == 3
+
+
+def test_stratified_analyses_broadcast_and_skip_empty_strata(strata):
+    padded = np.concatenate([strata, np.zeros((1, 2, 2))])
+    stacked = np.stack([strata, strata[::-1]])
+
+    pooled = EffectSizes.mantel_haenszel(strata).odds_ratio
+    assert EffectSizes.mantel_haenszel(padded).odds_ratio == pytest.approx(pooled)
+    assert HypothesisTests.breslow_day_test(padded).degrees_of_freedom == 3
+    np.testing.assert_allclose(HypothesisTests.cochran_mantel_haenszel_test(stacked).p_value,
+                               HypothesisTests.cochran_mantel_haenszel_test(strata).p_value)
+    with pytest.raises(ValueError):
+        EffectSizes.mantel_haenszel(strata[0])
+
+
+def test_breslow_day_ignores_strata_without_variance(strata):
+    degenerate = np.concatenate([strata, [[[0, 5], [0, 7]], [[4, 0], [6, 0]]]])
+
+    result = HypothesisTests.breslow_day_test(degenerate)
+    expected = HypothesisTests.breslow_day_test(strata)
+
+    assert result.degrees_of_freedom == 3
+    assert result.statistic == pytest.approx(expected.statistic)
+    assert result.p_value == pytest.approx(expected.p_value)
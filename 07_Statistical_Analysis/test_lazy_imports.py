@@ -0,0 +1,52 @@
+"""Tests for the lazy loading of heavy dependencies in medical_stats_toolkit."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark_import_time import HEAVY_MODULES
+import medical_stats_toolkit
+from medical_stats_toolkit import _LazyImport
+
+
+def _run(script):
+    return subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                          capture_output=True, text=True, check=True).stdout.strip().rpartition('\n')[2]
+
+
+def test_import_loads_no_heavy_dependency():
+    script = ("import sys, medical_stats_toolkit\n"
+              f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    assert _run(script) == ''
+
+
+def test_dependencies_load_on_first_use():
+    script = ("import sys, medical_stats_toolkit as m\n"
+              "m.DescriptiveStatistics.summary_statistics([1.0, 2.0, 3.0, 4.0])\n"
+              "before = 'matplotlib.pyplot' in sys.modules\n"
+              "m.HypothesisTests.chi_square_test([[10, 20], [20, 10]])\n"
+              "print('scipy.stats' in sys.modules, before, 'statsmodels.api' in sys.modules)")
+    assert _run(script) == 'True False False'
+
+
+def test_availability_flags_are_resolved_lazily():
+    script = ("import sys, medical_stats_toolkit as m\n"
+              "loaded = 'lifelines' in sys.modules\n"
+              "flag = m.LIFELINES_AVAILABLE\n"
+              "print(loaded, flag == m.optional_dependency_available('lifelines'))")
+    assert _run(script) == 'False True'
+
+
+def test_lazy_import_proxy():
+    proxy = _LazyImport('json', 'dumps')
+    assert 'not loaded' in repr(proxy)
+    assert proxy([1]) == '[1]'
+    assert 'loaded' in repr(proxy) and 'not loaded' not in repr(proxy)
+    assert _LazyImport('os.path').join('a', 'b') == os.path.join('a', 'b')
+
+    with pytest.raises(ImportError):
+        _LazyImport('not_a_real_module').anything
+    with pytest.raises(AttributeError):
+        medical_stats_toolkit.NOT_A_FLAG
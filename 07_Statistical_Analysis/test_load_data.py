@@ -0,0 +1,193 @@
+"""Tests for load_data and its columnar, chunked and cached readers."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from medical_stats_toolkit import ConvertedFileCache, load_data
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(2)
+    return pd.DataFrame({'patient_id': np.arange(10_000),
+                         'age': rng.integers(18, 90, 10_000),
+                         'site': rng.choice(['A', 'B', 'C'], 10_000),
+                         'ldl': rng.normal(3.2, 0.8, 10_000)})
+
+
+def test_parquet_projection_and_filter_pushdown(frame, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'cohort.parquet'
+    frame.to_parquet(path, row_group_size=1000)
+
+    data = load_data(str(path), columns=['age', 'site'], filters=[('age', '>=', 65), ('site', '=', 'A')])
+
+    expected = frame.loc[(frame['age'] >= 65) & (frame['site'] == 'A'), ['age', 'site']]
+    assert list(data.columns) == ['age', 'site']
+    pd.testing.assert_frame_equal(data.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_feather_is_memory_mapped(frame, tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.feather as feather
+    path = tmp_path / 'cohort.feather'
+    feather.write_feather(frame[['patient_id', 'age', 'ldl']], path, compression='uncompressed')
+
+    from medical_stats_toolkit import _arrow_dataset
+    pool = pa.default_memory_pool()
+    allocated = pool.bytes_allocated()
+    dataset, _ = _arrow_dataset(str(path), 'ipc', None)
+    table = dataset.to_table()
+    # Uncompressed IPC columns are views of the mapped file, not heap copies
+    assert pool.bytes_allocated() == allocated
+    assert table.num_rows == len(frame)
+
+    pd.testing.assert_frame_equal(load_data(str(path)), frame[['patient_id', 'age', 'ldl']])
+
+
+def test_npy_is_memory_mapped_and_projected(tmp_path):
+    array = np.arange(30, dtype=np.float64).reshape(10, 3)
+    path = tmp_path / 'features.npy'
+    np.save(path, array)
+
+    assert isinstance(load_data(str(path)), np.memmap)
+    np.testing.assert_array_equal(load_data(str(path), columns=[0, 2]), array[:, [0, 2]])
+    assert load_data(str(path), downcast=True).dtype == np.float32
+
+
+def test_downcast_shrinks_numeric_and_text_columns(frame, tmp_path):
+    path = tmp_path / 'cohort.csv'
+    frame.to_csv(path, index=False)
+
+    data = load_data(str(path), downcast=True)
+
+    assert data['age'].dtype == np.int8
+    assert data['ldl'].dtype == np.float32
+    assert data['site'].dtype == 'category'
+    np.testing.assert_array_equal(data['patient_id'], frame['patient_id'])
+
+
+def test_filters_rejected_for_row_formats(frame, tmp_path):
+    path = tmp_path / 'cohort.csv'
+    frame.to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        load_data(str(path), filters=[('age', '>', 50)])
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'feather'])
+def test_arrow_chunks_have_requested_size(frame, tmp_path, file_format):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / f'cohort.{file_format}'
+    if file_format == 'parquet':
+        frame.to_parquet(path, row_group_size=1000)
+    else:
+        frame.to_feather(path, chunksize=1000)
+
+    chunks = list(load_data(str(path), chunksize=3000))
+
+    assert [len(chunk) for chunk in chunks] == [3000, 3000, 3000, 1000]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), frame)
+
+
+def test_parallel_csv_chunks_in_file_order(frame, tmp_path):
+    path = tmp_path / 'cohort.csv'
+    frame.to_csv(path, index=False)
+
+    chunks = list(load_data(str(path), chunksize=500, n_jobs=2))
+
+    assert len(chunks) > 10
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), frame)
+    pd.testing.assert_frame_equal(load_data(str(path), n_jobs=2), frame)
+
+
+def test_parallel_csv_iterator_bounds_work_in_flight(frame, tmp_path, monkeypatch):
+    import concurrent.futures
+    import medical_stats_toolkit
+
+    submitted = []
+
+    class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            submitted.append(args)
+            return super().submit(*args, **kwargs)
+
+    monkeypatch.setattr(medical_stats_toolkit, 'ProcessPoolExecutor', CountingExecutor)
+    path = tmp_path / 'cohort.csv'
+    frame.to_csv(path, index=False)
+
+    chunks = load_data(str(path), chunksize=100, n_jobs=2)
+    first = next(chunks)
+
+    assert len(first) > 0
+    assert len(submitted) <= 5
+    chunks.close()
+
+
+class _CountingReader:
+    """Stands in for a slow Excel/SPSS reader; parses CSV and counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path, usecols=None, **kwargs):
+        self.calls += 1
+        return pd.read_csv(path, usecols=usecols, **kwargs)
+
+
+def test_converted_file_cache_hits_and_revalidates(frame, tmp_path):
+    source = tmp_path / 'export.csv'
+    frame.to_csv(source, index=False)
+    reader, cache = _CountingReader(), ConvertedFileCache(str(tmp_path / 'cache'))
+
+    first = cache.load(str(source), reader)
+    pd.testing.assert_frame_equal(cache.load(str(source), reader), first)
+    assert reader.calls == 1
+
+    # Touched without a content change: revalidated by hash, still a hit
+    os.utime(source, ns=(0, 10**18))
+    cache.load(str(source), reader)
+    assert reader.calls == 1
+
+    # Same size, different content: converted again
+    source.write_text(source.read_text().replace('A', 'D'))
+    assert set(cache.load(str(source), reader)['site']) == {'B', 'C', 'D'}
+    assert reader.calls == 2
+
+    # Reader arguments are part of the key
+    assert list(cache.load(str(source), reader, usecols=['age']).columns) == ['age']
+    assert reader.calls == 3
+
+
+def test_converted_file_cache_pickles_mixed_columns_and_evicts(tmp_path):
+    pytest.importorskip('pyarrow')
+    mixed = tmp_path / 'mixed.csv'
+    mixed.write_text('value\n1\nx\n')
+    reader, cache = _CountingReader(), ConvertedFileCache(str(tmp_path / 'cache'), max_bytes=1)
+    mixed_reader = lambda path: pd.read_csv(path).assign(value=[1, 'x'])
+
+    cache.load(str(mixed), mixed_reader)
+    assert [name.rsplit('.', 1)[1] for name in sorted(os.listdir(tmp_path / 'cache'))] == ['json', 'pkl']
+
+    plain = tmp_path / 'plain.csv'
+    plain.write_text('a\n1\n')
+    cache.load(str(plain), reader)
+    # Over budget: only the newest entry is kept
+    assert sorted(name.rsplit('.', 1)[1] for name in os.listdir(tmp_path / 'cache')) == ['json', 'parquet']
+    cache.clear()
+    assert os.listdir(tmp_path / 'cache') == []
+
+
+def test_load_data_uses_the_cache_for_excel(frame, tmp_path, monkeypatch):
+    reader = _CountingReader()
+    monkeypatch.setattr(pd, 'read_excel', reader)
+    source = tmp_path / 'registry.xlsx'
+    frame.to_csv(source, index=False)
+
+    first = load_data(str(source), columns=['age', 'site'], cache_dir=str(tmp_path / 'cache'))
+    second = load_data(str(source), columns=['age', 'site'], cache_dir=str(tmp_path / 'cache'))
+
+    pd.testing.assert_frame_equal(first, second)
+    assert reader.calls == 1
@@ -0,0 +1,155 @@
+"""Tests for MedicalVisualizations in medical_stats_toolkit."""
+
+import os
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from medical_stats_toolkit import MedicalVisualizations, MetaAnalysis
+
+
+@pytest.fixture
+def meta_result():
+    rng = np.random.default_rng(0)
+    return MetaAnalysis.random_effects_meta(rng.normal(0.3, 0.2, 250), rng.uniform(0.01, 0.05, 250))
+
+
+def test_forest_plot_pages_are_untracked_figures(meta_result):
+    open_figures = plt.get_fignums()
+    pages = MedicalVisualizations.forest_plot(meta_result=meta_result, rows_per_page=100)
+
+    # 250 studies + pooled row
+    assert len(pages) == 3
+    assert plt.get_fignums() == open_figures
+    assert pages[0].axes[0].get_title() == "Forest Plot (page 1 of 3)"
+    assert len(pages[-1].axes[0].get_yticks()) == 51
+
+
+def test_forest_plot_paginated_return_type_is_stable(meta_result):
+    pages = MedicalVisualizations.forest_plot(meta_result=meta_result, rows_per_page=1000)
+    assert isinstance(pages, list) and len(pages) == 1
+
+    figure = MedicalVisualizations.forest_plot(meta_result=meta_result)
+    assert isinstance(figure, matplotlib.figure.Figure)
+    plt.close(figure)
+
+
+def test_forest_plot_rejects_ax_with_pagination(meta_result):
+    fig, ax = plt.subplots()
+    with pytest.raises(ValueError):
+        MedicalVisualizations.forest_plot(meta_result=meta_result, ax=ax, rows_per_page=10)
+    plt.close(fig)
+
+
+def test_render_batch_writes_one_file_per_forest_page(meta_result, tmp_path):
+    specs = [
+        {'plot': 'forest_plot', 'filename': 'paged',
+         'kwargs': {'meta_result': meta_result, 'rows_per_page': 100}},
+        {'plot': 'forest_plot', 'filename': 'single',
+         'kwargs': {'effect_sizes': [0.1, 0.4, 0.2], 'variances': [0.02, 0.03, 0.01]}},
+    ]
+    result = MedicalVisualizations.render_batch(specs, str(tmp_path), formats=('png', 'svg'), n_jobs=1)
+
+    assert result['errors'] == []
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [f"paged_page{n}.{fmt}" for n in (1, 2, 3) for fmt in ('png', 'svg')] + ['single.png', 'single.svg'])
+
+
+@pytest.fixture
+def survival_data():
+    rng = np.random.default_rng(2)
+    return rng.exponential(10, 300), rng.integers(0, 2, 300), rng.integers(0, 2, 300)
+
+
+def test_render_batch_in_worker_processes(survival_data, tmp_path):
+    durations, events, groups = survival_data
+    rng = np.random.default_rng(4)
+    labels = rng.integers(0, 2, 500)
+    specs = [{'plot': 'kaplan_meier_plot', 'filename': f'km{i}',
+              'kwargs': {'durations': durations, 'event_observed': events, 'groups': groups}} for i in range(2)]
+    specs += [{'plot': 'roc_curve_plot', 'filename': 'roc',
+               'kwargs': {'y_true': labels, 'y_scores': labels + rng.normal(0, 1, 500), 'figsize': (4, 4)}}]
+    open_figures = plt.get_fignums()
+
+    result = MedicalVisualizations.render_batch(specs, str(tmp_path / 'out'), formats=('pdf',), n_jobs=2,
+                                                chunksize=1)
+
+    assert result['errors'] == [] and result['n_figures'] == 3
+    assert sorted(os.listdir(tmp_path / 'out')) == ['km0.pdf', 'km1.pdf', 'roc.pdf']
+    assert plt.get_fignums() == open_figures
+
+
+def test_render_batch_reports_failed_specs_and_continues(tmp_path):
+    specs = [{'plot': 'roc_curve_plot', 'filename': 'broken', 'kwargs': {'y_true': [0, 1]}},
+             {'plot': 'forest_plot', 'filename': 'ok',
+              'kwargs': {'effect_sizes': [0.1, 0.4], 'variances': [0.02, 0.03]}}]
+
+    result = MedicalVisualizations.render_batch(specs, str(tmp_path), n_jobs=1)
+
+    assert result['n_failed'] == 1 and result['errors'][0]['filename'] == 'broken'
+    assert os.listdir(tmp_path) == ['ok.png']
+
+
+@pytest.mark.parametrize('specs, formats', [
+    ([{'plot': 'forest_plot', 'filename': 'x'}], ('gif',)),
+    ([{'plot': 'bar_chart', 'filename': 'x'}], ('png',)),
+])
+def test_render_batch_rejects_unsupported_requests(tmp_path, specs, formats):
+    with pytest.raises(ValueError):
+        MedicalVisualizations.render_batch(specs, str(tmp_path), formats=formats)
+
+
+@pytest.fixture
+def roc_data():
+    rng = np.random.default_rng(6)
+    labels = rng.integers(0, 2, 50_000)
+    return labels, labels * 0.8 + rng.normal(0, 1, 50_000)
+
+
+def test_simplified_roc_keeps_shape_and_endpoints(roc_data):
+    full = MedicalVisualizations.roc_curve_data(*roc_data)
+    simplified = MedicalVisualizations.roc_curve_data(*roc_data, max_points=200)
+
+    assert len(simplified) <= 200 < len(full)
+    ends = lambda curve: curve.iloc[[0, -1]][['fpr', 'tpr']].values.tolist()
+    assert ends(simplified) == ends(full)
+    assert np.trapezoid(simplified['tpr'], simplified['fpr']) == pytest.approx(np.trapezoid(full['tpr'], full['fpr']),
+                                                                               abs=1e-3)
+    assert set(simplified['threshold']) <= set(full['threshold'])
+
+
+def test_roc_convex_hull_is_concave_and_dominates(roc_data):
+    full = MedicalVisualizations.roc_curve_data(*roc_data)
+    hull = MedicalVisualizations.roc_curve_data(*roc_data, convex_hull=True)
+
+    with np.errstate(divide='ignore'):
+        slopes = np.diff(hull['tpr']) / np.diff(hull['fpr'])
+    assert np.all(np.diff(slopes[np.isfinite(slopes)]) <= 1e-9)
+    assert np.all(np.interp(full['fpr'], hull['fpr'], hull['tpr']) >= full['tpr'] - 1e-9)
+
+
+def test_decimated_kaplan_meier_stays_within_tolerance():
+    rng = np.random.default_rng(8)
+    durations, events = rng.exponential(10, 20_000), rng.integers(0, 2, 20_000)
+
+    full = MedicalVisualizations.kaplan_meier_curve_data(durations, events)
+    decimated = MedicalVisualizations.kaplan_meier_curve_data(durations, events, max_points=100)
+
+    assert len(decimated) <= 102 < len(full)
+    at = np.searchsorted(decimated['time'], full['time'], side='right') - 1
+    tolerance = (full['survival'].iloc[0] - full['survival'].iloc[-1]) / 98
+    assert np.max(np.abs(decimated['survival'].to_numpy()[at] - full['survival'])) <= tolerance + 1e-12
+
+
+def test_large_kaplan_meier_plot_draws_decimated_steps():
+    rng = np.random.default_rng(9)
+    durations, events = rng.exponential(10, 20_000), rng.integers(0, 2, 20_000)
+
+    figure = MedicalVisualizations.kaplan_meier_plot(durations, events, max_points=300)
+    steps = figure.axes[0].get_lines()[0]
+
+    assert len(steps.get_xdata()) <= 302
+    plt.close(figure)
@@ -0,0 +1,106 @@
+"""Tests for MultipleComparisons."""
+
+import numpy as np
+import pytest
+from statsmodels.stats.multitest import multipletests
+
+from medical_stats_toolkit import MultipleComparisons
+
+METHODS = ['bonferroni', 'holm', 'hochberg', 'fdr_bh', 'fdr_by', 'qvalue']
+
+
+@pytest.fixture
+def p_values():
+    rng = np.random.default_rng(11)
+    p = np.concatenate([rng.uniform(0, 0.01, 30), rng.uniform(0, 1, 170)])
+    p[5] = p[6] = p[40]  # ties
+    return rng.permutation(p)
+
+
+@pytest.mark.parametrize('method, statsmodels_method', [
+    ('bonferroni', 'bonferroni'), ('holm', 'holm'), ('hochberg', 'simes-hochberg'),
+    ('fdr_bh', 'fdr_bh'), ('fdr_by', 'fdr_by'), ('sidak', 'sidak'),
+])
+def test_adjust_p_values_matches_statsmodels(p_values, method, statsmodels_method):
+    result = MultipleComparisons.adjust_p_values(p_values, method=method)
+    reject, expected, _, _ = multipletests(p_values, alpha=0.05, method=statsmodels_method)
+
+    np.testing.assert_allclose(result['adjusted_p_values'], expected, rtol=1e-12)
+    np.testing.assert_array_equal(result['significant_after_correction'], reject)
+    assert result['n_comparisons'] == 200
+
+
+def test_storey_q_values(p_values):
+    result = MultipleComparisons.adjust_p_values(p_values, method='storey', storey_lambda=0.5)
+    bh = multipletests(p_values, method='fdr_bh')[1]
+
+    assert result['pi0'] == pytest.approx(np.sum(p_values > 0.5) / (200 * 0.5))
+    below = bh < 1
+    np.testing.assert_allclose(result['adjusted_p_values'][below], result['pi0'] * bh[below])
+    assert np.all(result['adjusted_p_values'] <= bh + 1e-15)
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_columns_are_families_and_nans_are_ignored(p_values, method):
+    grid = p_values.reshape(40, 5).copy()
+    grid[::7, 2] = np.nan
+
+    result = MultipleComparisons.adjust_p_values(grid, method=method)
+
+    for column in range(5):
+        values = grid[:, column]
+        present = ~np.isnan(values)
+        expected = MultipleComparisons.adjust_p_values(values[present], method=method)['adjusted_p_values']
+        np.testing.assert_allclose(result['adjusted_p_values'][present, column], expected)
+        assert np.all(np.isnan(result['adjusted_p_values'][~present, column]))
+    np.testing.assert_array_equal(result['n_comparisons'], [40, 40, 34, 40, 40])
+    transposed = MultipleComparisons.adjust_p_values(grid.T, method=method, axis=1)['adjusted_p_values']
+    np.testing.assert_allclose(transposed, result['adjusted_p_values'].T)
+
+
+def test_delegated_methods_require_1d_input(p_values):
+    with pytest.raises(ValueError):
+        MultipleComparisons.adjust_p_values(p_values.reshape(20, 10), method='sidak')
+
+
+def test_hierarchical_fdr():
+    rng = np.random.default_rng(5)
+    grid = rng.uniform(0, 1, (20, 6))
+    grid[:8, 1] = rng.uniform(0, 1e-4, 8)
+    grid[:3, 4] = rng.uniform(0, 1e-4, 3)
+
+    result = MultipleComparisons.hierarchical_fdr(grid)
+
+    ranks = np.arange(1, 21)[:, None]
+    simes = np.min(20 * np.sort(grid, axis=0) / ranks, axis=0)
+    np.testing.assert_allclose(result['family_p_values'], np.minimum(simes, 1))
+    np.testing.assert_array_equal(result['selected_families'], [False, True, False, False, True, False])
+    assert result['within_family_alpha'] == pytest.approx(0.05 * 2 / 6)
+    assert result['n_significant'] == np.sum(result['significant'][:, [1, 4]])
+    assert not result['significant'][:, [0, 2, 3, 5]].any()
+
+    labels = np.repeat(np.array(list('abcdef'))[None, :], 20, axis=0)
+    labelled = MultipleComparisons.hierarchical_fdr(grid.T.ravel(), families=labels.T.ravel())
+    np.testing.assert_array_equal(labelled['families'], list('abcdef'))
+    np.testing.assert_array_equal(labelled['significant'], result['significant'].T.ravel())
+
+
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('suffix', ['.npy', '.csv'])
+def test_streaming_matches_in_memory(p_values, tmp_path, method, suffix):
+    p = p_values.copy()
+    p[[3, 77]] = np.nan
+    source = tmp_path / f'p{suffix}'
+    if suffix == '.npy':
+        np.save(source, p)
+    else:
+        np.savetxt(source, p, fmt='%.17g')
+    output = tmp_path / f'adjusted{suffix}'
+
+    summary = MultipleComparisons.adjust_p_values_streaming(str(source), str(output), method=method, chunksize=37)
+
+    adjusted = np.load(output) if suffix == '.npy' else np.loadtxt(output)
+    expected = MultipleComparisons.adjust_p_values(p, method=method)
+    np.testing.assert_allclose(adjusted, expected['adjusted_p_values'], rtol=1e-12)
+    assert summary['n_comparisons'] == 198 and summary['n_missing'] == 2
+    assert summary['n_significant_adjusted'] == expected['n_significant_adjusted']
@@ -0,0 +1,113 @@
+"""Tests for the PowerAnalysis sample-size and power solvers."""
+
+import numpy as np
+import pytest
+from statsmodels.stats.power import NormalIndPower, TTestIndPower, TTestPower
+
+from medical_stats_toolkit import PowerAnalysis
+
+
+def test_power_t_test_independent_matches_statsmodels():
+    assert PowerAnalysis.power_t_test_independent(0.5, 64) == pytest.approx(TTestIndPower().power(0.5, 64, 0.05))
+    assert PowerAnalysis.power_t_test_independent(0.5, 40, 80, alternative='larger') == pytest.approx(
+        TTestIndPower().power(0.5, 40, 0.05, ratio=2, alternative='larger'))
+
+
+def test_power_proportion_test_matches_statsmodels():
+    h = 2 * np.arcsin(np.sqrt(0.3)) - 2 * np.arcsin(np.sqrt(0.5))
+    assert PowerAnalysis.power_proportion_test(0.3, 0.5, 100, 150) == pytest.approx(
+        NormalIndPower().power(h, 100, 0.05, ratio=1.5))
+
+
+@pytest.mark.parametrize('effect_size, alternative', [(0.5, 'two-sided'), (0.3, 'larger'), (-0.4, 'smaller')])
+def test_paired_t_test_matches_statsmodels(effect_size, alternative):
+    power = PowerAnalysis.power_t_test_paired(effect_size, 30, alternative=alternative)
+    assert power == pytest.approx(TTestPower().power(effect_size, 30, 0.05, alternative=alternative), rel=1e-6)
+
+    n_pairs = PowerAnalysis.sample_size_t_test_paired(effect_size, alternative=alternative)['n_pairs']
+    assert n_pairs == np.ceil(TTestPower().solve_power(effect_size, power=0.8, alpha=0.05, alternative=alternative))
+
+
+def test_proportion_sample_size_known_answers():
+    # Fleiss, Statistical Methods for Rates and Proportions: 0.4 vs 0.6, alpha 0.05, power 0.8
+    assert PowerAnalysis.sample_size_proportion_test(0.4, 0.6)['n1'] == 97
+    assert PowerAnalysis.sample_size_proportion_test(0.4, 0.6, continuity_correction=True)['n1'] == 107
+    with pytest.raises(ValueError):
+        PowerAnalysis.sample_size_proportion_test(0.5, 0.5)
+
+
+def test_non_inferiority_means_matches_one_sided_t_test():
+    result = PowerAnalysis.sample_size_non_inferiority_means(1, 5, 10, ratio=2)
+
+    expected = TTestIndPower().solve_power(0.6, power=0.8, alpha=0.025, ratio=2, alternative='larger')
+    assert result['n1'] == np.ceil(expected)
+    assert result['n2'] == np.ceil(result['n1'] * 2)
+    with pytest.raises(ValueError):
+        PowerAnalysis.sample_size_non_inferiority_means(-6, 5, 10)
+
+
+def test_non_inferiority_proportions_and_mcnemar_known_answers():
+    # (z_0.975 + z_0.8)^2 * (0.16 + 0.16) / 0.1^2 = 251.2
+    assert PowerAnalysis.sample_size_non_inferiority_proportions(0.8, 0.8, 0.1)['n1'] == 252
+    # Connor (1987): (1.96 sqrt(0.3) + 0.8416 sqrt(0.26))^2 / 0.2^2 = 56.4
+    assert PowerAnalysis.sample_size_mcnemar(0.25, 0.05)['n_pairs'] == 57
+
+
+def test_logrank_known_answers():
+    schoenfeld = PowerAnalysis.sample_size_logrank(0.7, p_event=0.5)
+    assert schoenfeld['events'] == 247
+    assert (schoenfeld['n1'], schoenfeld['n2'], schoenfeld['total_n']) == (247, 247, 494)
+    assert PowerAnalysis.sample_size_logrank(0.7, method='freedman')['events'] == 253
+    assert PowerAnalysis.sample_size_logrank(0.7)['n1'] is None
+
+
+def test_solvers_broadcast_over_design_grids():
+    result = PowerAnalysis.sample_size_proportion_test(0.4, [0.5, 0.6], power=[[0.8], [0.9]])
+    assert np.shape(result['n1']) == (2, 2)
+    assert result['n1'][0, 1] == 97
+
+    n_pairs = PowerAnalysis.sample_size_t_test_paired(np.array([0.2, 0.5, 0.8]))['n_pairs']
+    expected = [np.ceil(TTestPower().solve_power(d, power=0.8, alpha=0.05)) for d in (0.2, 0.5, 0.8)]
+    np.testing.assert_array_equal(n_pairs, expected)
+
+
+@pytest.mark.parametrize('spending, expected', [
+    # Lan-DeMets boundaries for 5 equally spaced looks, two-sided alpha 0.05 (as tabulated by gsDesign)
+    ('obrien-fleming', [4.877, 3.357, 2.680, 2.290, 2.031]),
+    ('pocock', [2.438, 2.427, 2.410, 2.397, 2.386]),
+])
+def test_group_sequential_boundaries_known_answers(spending, expected):
+    design = PowerAnalysis.group_sequential_boundaries(5, spending=spending)
+
+    np.testing.assert_allclose(design['upper_boundaries'], expected, atol=1e-3)
+    np.testing.assert_allclose(design['lower_boundaries'], -design['upper_boundaries'])
+    assert design['cumulative_alpha'][-1] == pytest.approx(0.05)
+
+
+def test_one_sided_boundaries_and_single_look():
+    design = PowerAnalysis.group_sequential_boundaries(3, alpha=0.025, sides=1)
+
+    np.testing.assert_allclose(design['upper_boundaries'], [3.710, 2.511, 1.993], atol=1e-3)
+    assert np.all(np.isneginf(design['lower_boundaries']))
+    assert PowerAnalysis.group_sequential_boundaries(1)['upper_boundaries'][0] == pytest.approx(1.959964)
+
+
+def test_boundaries_hold_type_one_error_in_simulation():
+    t = np.array([0.3, 0.6, 1.0])
+    upper = PowerAnalysis.group_sequential_boundaries(information_fractions=t)['upper_boundaries']
+    rng = np.random.default_rng(7)
+    increments = rng.standard_normal((400_000, 3)) * np.sqrt(np.diff(t, prepend=0))
+    z = np.cumsum(increments, axis=1) / np.sqrt(t)
+
+    assert np.any(np.abs(z) >= upper, axis=1).mean() == pytest.approx(0.05, abs=0.002)
+
+
+def test_group_sequential_design():
+    design = PowerAnalysis.group_sequential_design(5, n_fixed=200)
+
+    assert design['inflation_factor'] == pytest.approx(1.025, abs=1e-3)
+    assert design['n_max'] == 205
+    assert design['efficacy_probabilities_h0'].sum() == pytest.approx(0.05)
+    assert design['cumulative_power'][-1] == pytest.approx(0.8)
+    assert design['expected_n_h1'] < design['n_fixed'] < design['n_max']
+    np.testing.assert_array_equal(design['n_per_look'], [41, 82, 123, 164, 205])
@@ -0,0 +1,134 @@
+"""Tests for ResultCache and enable_result_cache."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import medical_stats_toolkit
+from medical_stats_toolkit import MetaAnalysis, ResultCache, disable_result_cache, enable_result_cache
+
+calls = []
+
+
+def expensive(values, scale=1.0):
+    calls.append(1)
+    return np.asarray(values) * scale
+
+
+def failing(values):
+    calls.append(1)
+    return {'error': 'dependency not available'}
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def test_keys_follow_arguments_and_data(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    values = np.arange(10.0)
+
+    assert cache.key(expensive, (values,)) == cache.key(expensive, (), {'values': values, 'scale': 1.0})
+    assert cache.key(expensive, (values,)) != cache.key(expensive, (values + 1,))
+    assert cache.key(expensive, (values,)) != cache.key(expensive, (values.astype(np.float32),))
+    assert cache.key(expensive, (values,)) != cache.key(expensive, (values, 2.0))
+    frame = pd.DataFrame({'a': [1, 2], 'b': [3.0, 4.0]})
+    assert cache.key(expensive, (frame,)) == cache.key(expensive, (frame.copy(),))
+    assert cache.key(expensive, (frame,)) != cache.key(expensive, (frame.assign(b=[3.0, 5.0]),))
+
+
+def test_hits_misses_and_persistence(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cached = cache.cached(expensive)
+
+    np.testing.assert_array_equal(cached([1, 2, 3], scale=2), [2, 4, 6])
+    np.testing.assert_array_equal(cached([1, 2, 3], 2), [2, 4, 6])
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate'], stats['entries']) == (1, 1, 0.5, 1)
+    assert stats['functions']['expensive'] == {'hits': 1, 'misses': 1}
+
+    reopened = ResultCache(str(tmp_path))
+    reopened.call(expensive, [1, 2, 3], 2)
+    assert len(calls) == 1 and reopened.stats()['hits'] == 1
+
+
+def test_error_results_are_not_cached(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.call(failing, [1])
+    cache.call(failing, [1])
+    assert len(calls) == 2 and cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=20_000)
+    first, second, third = (np.full(1000, float(n)) for n in range(3))
+
+    cache.call(expensive, first)
+    cache.call(expensive, second)
+    cache.call(expensive, first)  # first is now the most recently used
+    cache.call(expensive, third)
+
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] <= 20_000
+    calls.clear()
+    cache.call(expensive, first)
+    cache.call(expensive, second)
+    assert len(calls) == 1
+
+
+def test_corrupt_entries_are_recomputed(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.call(expensive, [1.0])
+    key = cache.key(expensive, ([1.0],))
+    with open(os.path.join(str(tmp_path), key + '.pkl'), 'wb') as f:
+        f.write(b'not a pickle')
+
+    np.testing.assert_array_equal(cache.call(expensive, [1.0]), [1.0])
+    assert len(calls) == 2
+
+    cache.clear()
+    assert cache.stats()['entries'] == 0 and os.listdir(str(tmp_path)) == []
+
+
+def test_enable_result_cache_wraps_and_restores_toolkit_functions(tmp_path):
+    original = MetaAnalysis.__dict__['random_effects_meta']
+    effects, variances = [0.2, 0.5, 0.3, 0.1], [0.02, 0.03, 0.01, 0.04]
+    try:
+        cache = enable_result_cache(str(tmp_path))
+        first = MetaAnalysis.random_effects_meta(effects, variances)
+        second = MetaAnalysis.random_effects_meta(effects, variances)
+        assert second['pooled_effect_size'] == first['pooled_effect_size']
+        np.testing.assert_array_equal(second['weights'], first['weights'])
+        assert cache.stats()['functions']['MetaAnalysis.random_effects_meta'] == {'hits': 1, 'misses': 1}
+    finally:
+        disable_result_cache()
+    assert MetaAnalysis.__dict__['random_effects_meta'] is original
+    assert medical_stats_toolkit._cached_originals == {}
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason='POSIX permissions')
+def test_default_directory_is_private_and_shared_directories_are_refused(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'xdg'))
+    cache = ResultCache()
+    assert cache.directory == str(tmp_path / 'xdg' / 'medical_stats_toolkit')
+    assert os.stat(cache.directory).st_mode & 0o777 == 0o700
+
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    with pytest.raises(PermissionError):
+        ResultCache(str(shared))
+
+
+def test_version_salts_the_keys(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.call(expensive, [1.0])
+    ResultCache(str(tmp_path)).call(expensive, [1.0])
+    ResultCache(str(tmp_path), version='2').call(expensive, [1.0])
+
+    assert len(calls) == 2
+    assert cache.key(expensive, ([1.0],)) != ResultCache(str(tmp_path), version='2').key(expensive, ([1.0],))
@@ -0,0 +1,71 @@
+"""Tests for the slots-based result records and ResultBatch."""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from medical_stats_toolkit import (EffectSizes, HypothesisTests, MannWhitneyResult, PairedTTestResult,
+                                   ResultBatch)
+
+
+@pytest.fixture
+def paired_samples():
+    rng = np.random.default_rng(1)
+    before = rng.normal(120, 15, 40)
+    return before, before - rng.normal(5, 8, 40)
+
+
+def test_result_behaves_like_the_legacy_dict(paired_samples):
+    result = HypothesisTests.t_test_paired(*paired_samples)
+
+    assert isinstance(result, PairedTTestResult)
+    assert result['p_value'] == result.p_value
+    assert dict(result)['n_pairs'] == 40
+    assert result.to_dict()['difference_stats']['n'] == 40
+    with pytest.raises(AttributeError):
+        result.p_value = 0.5
+    assert pickle.loads(pickle.dumps(result)) == result
+
+
+def test_result_to_frame_flattens_nested_results(paired_samples):
+    frame = HypothesisTests.t_test_paired(*paired_samples).to_frame()
+    assert len(frame) == 1
+    assert 'difference_stats.mean' in frame.columns
+
+
+def test_result_batch_round_trip(paired_samples):
+    before, after = paired_samples
+    results = [HypothesisTests.t_test_paired(before, after + shift) for shift in range(5)]
+    batch = ResultBatch.from_results(results)
+
+    assert len(batch) == 5
+    assert batch['p_value'].dtype == np.float64
+    np.testing.assert_allclose(batch['t_statistic'], [r['t_statistic'] for r in results])
+    assert batch.row(3) == results[3]
+    assert batch.row(-1).difference_stats == results[-1].difference_stats
+    assert batch.to_frame().shape == (5, len(batch.columns))
+
+
+def test_result_batch_grows_past_capacity():
+    batch = ResultBatch(capacity=2)
+    for a in range(1, 8):
+        batch.append(EffectSizes.odds_ratio_ci(a, 10, 5, 10))
+    assert len(batch) == 7
+    np.testing.assert_allclose(batch['odds_ratio'], [a * 10 / 50 for a in range(1, 8)])
+
+
+def test_result_batch_rejects_mixed_result_types(paired_samples):
+    batch = ResultBatch()
+    batch.append(HypothesisTests.mann_whitney_u(*paired_samples))
+    with pytest.raises(TypeError):
+        batch.append(EffectSizes.odds_ratio_ci(10, 20, 5, 30))
+    assert len(batch) == 1
+    assert batch.result_type is MannWhitneyResult
+
+
+def test_result_batch_checks_declared_type_on_first_append(paired_samples):
+    batch = ResultBatch(result_type=PairedTTestResult)
+    with pytest.raises(TypeError):
+        batch.append(HypothesisTests.mann_whitney_u(*paired_samples))
+    assert len(batch) == 0